@@ -150,12 +150,19 @@ def default():
 
 
 @set.command()
-@click.argument('value', type=click.Choice(["stabilizer", "projectq", "qutip"]))
+@click.argument('value', type=click.Choice(["stabilizer", "projectq", "qutip", "graph", "nearclifford", "numpy"]))
 def backend(value):
-    """The backend to use (stabilizer, projectq, qutip)."""
+    """The backend to use (stabilizer, projectq, qutip, graph, nearclifford, numpy)."""
     Settings.set_setting("BACKEND", "backend", value)
 
 
+@set.command()
+@click.argument('value', type=click.Choice(["double", "single"]))
+def precision(value):
+    """Precision of the amplitudes of the numpy and qutip backends (double or single)."""
+    Settings.set_setting("BACKEND", "precision", value)
+
+
 @set.command()
 @click.argument('value', type=int)
 def max_qubits(value):
@@ -163,6 +170,13 @@ def max_qubits(value):
     Settings.set_setting("BACKEND", "maxqubits_per_node", str(value))
 
 
+@set.command()
+@click.argument('value', type=click.IntRange(min=1))
+def num_threads(value):
+    """Threads used by the numpy backend for registers of 18 or more qubits."""
+    Settings.set_setting("BACKEND", "numthreads", str(value))
+
+
 @set.command()
 @click.argument('value', type=int)
 def max_registers(value):
@@ -251,6 +265,23 @@ def t1(value):
     """The effective T1 to be used for noisy qubits"""
     Settings.set_setting("BACKEND", "t1", str(value))
 
+
+@set.command()
+@click.argument('value', type=click.Choice(["on", "off"]))
+def compress_merges(value):
+    """Whether large registers are compressed when moved between nodes (on/off)"""
+    if value == "on":
+        Settings.set_setting("BACKEND", "compress_merges", 'True')
+    else:
+        Settings.set_setting("BACKEND", "compress_merges", 'False')
+
+
+@set.command()
+@click.argument('value', type=click.Choice(["auto", "on", "off"]))
+def factorize_registers(value):
+    """Whether registers are split into product factors after measurements (auto/on/off)"""
+    Settings.set_setting("BACKEND", "factorize_registers", value)
+
 ###############
 # get command #
 ###############
@@ -264,16 +295,28 @@ def get():
 
 @get.command()
 def backend():
-    """The backend to use (stabilizer, projectq, qutip)."""
+    """The backend to use (stabilizer, projectq, qutip, graph, nearclifford, numpy)."""
     print(Settings.CONF_BACKEND)
 
 
+@get.command()
+def precision():
+    """Precision of the amplitudes of the numpy and qutip backends (double or single)."""
+    print(Settings.CONF_PRECISION)
+
+
 @get.command()
 def max_qubits():
     """Max virt-qubits per node and max sim-qubits per register."""
     print(Settings.CONF_MAXQUBITS)
 
 
+@get.command()
+def num_threads():
+    """Threads used by the numpy backend for registers of 18 or more qubits."""
+    print(Settings.CONF_NUM_THREADS)
+
+
 @get.command()
 def max_registers():
     """How many registers a node can hold."""
@@ -349,6 +392,21 @@ def t1():
     """The effective T1 to be used for noisy qubits"""
     print(Settings.CONF_T1)
 
+
+@get.command()
+def compress_merges():
+    """Whether large registers are compressed when moved between nodes (on/off)"""
+    if Settings.CONF_COMPRESS_MERGES:
+        print("on")
+    else:
+        print("off")
+
+
+@get.command()
+def factorize_registers():
+    """Whether registers are split into product factors after measurements (auto/on/off)"""
+    print(Settings.CONF_FACTORIZE_REGISTERS)
+
 ###############
 # node command #
 ###############
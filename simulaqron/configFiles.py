@@ -265,14 +265,18 @@ def parse_input():
     )
     parser.add_argument("--nodes", required=False, type=str, default=None, help="Node names to be used in the network")
     parser.add_argument("--maxqubits_per_node", required=False, type=str, default="")
+    parser.add_argument("--num_threads", required=False, type=str, default="")
     parser.add_argument("--maxregisters_per_node", required=False, type=str, default="")
     parser.add_argument("--waittime", required=False, type=str, default="")
     parser.add_argument("--backend_loglevel", required=False, type=str, default="")
     parser.add_argument("--backendhandler", required=False, type=str, default="")
     parser.add_argument("--backend", required=False, type=str, default="")
+    parser.add_argument("--precision", required=False, type=str, default="")
     parser.add_argument("--topology_file", required=False, type=str, default="")
     parser.add_argument("--noisy_qubits", required=False, type=str, default="")
     parser.add_argument("--t1", required=False, type=str, default="")
+    parser.add_argument("--compress_merges", required=False, type=str, default="")
+    parser.add_argument("--factorize_registers", required=False, type=str, default="")
     parser.add_argument("--frontend_loglevel", required=False, type=str, default="")
     args = parser.parse_args()
 
@@ -303,6 +307,8 @@ def parse_input():
 
     if len(args.maxqubits_per_node) > 0:
         settings["BACKEND"]["maxqubits_per_node"] = args.maxqubits_per_node
+    if len(args.num_threads) > 0:
+        settings["BACKEND"]["numthreads"] = args.num_threads
     if len(args.maxregisters_per_node) > 0:
         settings["BACKEND"]["maxregisters_per_node"] = args.maxregisters_per_node
     if len(args.waittime) > 0:
@@ -313,12 +319,18 @@ def parse_input():
         settings["BACKEND"]["backendhandler"] = args.backendhandler
     if len(args.backend) > 0:
         settings["BACKEND"]["backend"] = args.backend
+    if len(args.precision) > 0:
+        settings["BACKEND"]["precision"] = args.precision
     if len(args.topology_file) > 0:
         settings["BACKEND"]["topology_file"] = args.topology_file
     if len(args.noisy_qubits) > 0:
         settings["BACKEND"]["noisy_qubits"] = args.noisy_qubits
     if len(args.t1) > 0:
         settings["BACKEND"]["t1"] = args.t1
+    if len(args.compress_merges) > 0:
+        settings["BACKEND"]["compress_merges"] = args.compress_merges
+    if len(args.factorize_registers) > 0:
+        settings["BACKEND"]["factorize_registers"] = args.factorize_registers
     if len(args.frontend_loglevel) > 0:
         settings["FRONTEND"]["loglevel"] = args.frontend_loglevel
 
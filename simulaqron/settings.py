@@ -43,6 +43,7 @@ config_folder = os.path.join(simulaqron_path, "config")
 
 class _DefaultSettings:
     CONF_MAXQUBITS = 20
+    CONF_NUM_THREADS = 1
     CONF_MAXREGS = 1000
     CONF_WAIT_TIME = 0.5
     CONF_RECV_TIMEOUT = 100  # (x 100 ms)
@@ -51,6 +52,7 @@ class _DefaultSettings:
     CONF_LOGGING_LEVEL_BACKEND = logging.WARNING
     CONF_LOGGING_LEVEL_FRONTEND = logging.WARNING
     CONF_BACKEND = "stabilizer"
+    CONF_PRECISION = "double"
     CONF_APP_FILE = os.path.join(config_folder, "appNodes.cfg")
     CONF_CQC_FILE = os.path.join(config_folder, "cqcNodes.cfg")
     CONF_VNODE_FILE = os.path.join(config_folder, "virtualNodes.cfg")
@@ -58,6 +60,8 @@ class _DefaultSettings:
     CONF_TOPOLOGY_FILE = ""
     CONF_NOISY_QUBITS = False
     CONF_T1 = 1
+    CONF_COMPRESS_MERGES = False
+    CONF_FACTORIZE_REGISTERS = "auto"
 
 
 class Settings:
@@ -69,6 +73,7 @@ class Settings:
 
     # default settings for if file is not ready yet
     CONF_MAXQUBITS = _DefaultSettings.CONF_MAXQUBITS
+    CONF_NUM_THREADS = _DefaultSettings.CONF_NUM_THREADS
     CONF_MAXREGS = _DefaultSettings.CONF_MAXREGS
     CONF_WAIT_TIME = _DefaultSettings.CONF_WAIT_TIME
     CONF_RECV_TIMEOUT = _DefaultSettings.CONF_RECV_TIMEOUT
@@ -77,6 +82,7 @@ class Settings:
     CONF_LOGGING_LEVEL_BACKEND = _DefaultSettings.CONF_LOGGING_LEVEL_BACKEND
     CONF_LOGGING_LEVEL_FRONTEND = _DefaultSettings.CONF_LOGGING_LEVEL_FRONTEND
     CONF_BACKEND = _DefaultSettings.CONF_BACKEND
+    CONF_PRECISION = _DefaultSettings.CONF_PRECISION
     CONF_TOPOLOGY_FILE = _DefaultSettings.CONF_TOPOLOGY_FILE
     CONF_APP_FILE = _DefaultSettings.CONF_APP_FILE
     CONF_CQC_FILE = _DefaultSettings.CONF_CQC_FILE
@@ -84,6 +90,8 @@ class Settings:
     CONF_NODES_FILE = _DefaultSettings.CONF_NODES_FILE
     CONF_NOISY_QUBITS = _DefaultSettings.CONF_NOISY_QUBITS
     CONF_T1 = _DefaultSettings.CONF_T1
+    CONF_COMPRESS_MERGES = _DefaultSettings.CONF_COMPRESS_MERGES
+    CONF_FACTORIZE_REGISTERS = _DefaultSettings.CONF_FACTORIZE_REGISTERS
 
     log_levels = {
         "info": logging.INFO,
@@ -93,6 +101,13 @@ class Settings:
         "critical": logging.CRITICAL
     }
 
+    # Floating point precision of the amplitudes of the dense backends
+    precisions = ("double", "single")
+
+    # When registers are split into product factors after measurements: "auto" only for engines with a bounded
+    # partition search (see quantumEngine.boundedPartition), "on" for all engines and "off" never
+    factorize_modes = ("auto", "on", "off")
+
     @classmethod
     def init_settings(cls):
 
@@ -111,6 +126,12 @@ class Settings:
             _config['BACKEND']['MaxQubits_Per_Node'] = str(cls.CONF_MAXQUBITS)
             config_changed = True
 
+        if "NumThreads" in backend:
+            cls.CONF_NUM_THREADS = int(backend['NumThreads'])
+        else:
+            _config['BACKEND']['NumThreads'] = str(cls.CONF_NUM_THREADS)
+            config_changed = True
+
         if "MaxRegisters_Per_Node" in backend:
             cls.CONF_MAXREGS = int(backend['MaxRegisters_Per_Node'])
         else:
@@ -160,6 +181,16 @@ class Settings:
             backend["backend"] = cls.CONF_BACKEND
             config_changed = True
 
+        if "Precision" in backend:
+            _precision = backend['Precision'].lower()
+            if _precision in cls.precisions:
+                cls.CONF_PRECISION = _precision
+            else:
+                backend['Precision'] = cls.CONF_PRECISION
+        else:
+            backend['Precision'] = cls.CONF_PRECISION
+            config_changed = True
+
         if "Topology_File" in backend:
             cls.CONF_TOPOLOGY_FILE = backend['Topology_File']
         else:
@@ -202,6 +233,25 @@ class Settings:
             backend['T1'] = str(cls.CONF_T1)
             config_changed = True
 
+        if "Compress_Merges" in backend:
+            cls.CONF_COMPRESS_MERGES = backend['Compress_Merges'] == 'True'
+        else:
+            backend['Compress_Merges'] = str(cls.CONF_COMPRESS_MERGES)
+            config_changed = True
+
+        if "Factorize_Registers" in backend:
+            # Older settings files store this as True or False
+            _factorize = {"true": "on", "false": "off"}.get(
+                backend['Factorize_Registers'].lower(), backend['Factorize_Registers'].lower()
+            )
+            if _factorize in cls.factorize_modes:
+                cls.CONF_FACTORIZE_REGISTERS = _factorize
+            else:
+                backend['Factorize_Registers'] = cls.CONF_FACTORIZE_REGISTERS
+        else:
+            backend['Factorize_Registers'] = cls.CONF_FACTORIZE_REGISTERS
+            config_changed = True
+
         if "FRONTEND" not in _config:
             _config['FRONTEND'] = {}
         frontend = _config['FRONTEND']
@@ -235,14 +285,18 @@ class Settings:
     @classmethod
     def default_settings(cls):
         cls.CONF_MAXQUBITS = _DefaultSettings.CONF_MAXQUBITS
+        cls.CONF_NUM_THREADS = _DefaultSettings.CONF_NUM_THREADS
         cls.CONF_MAXREGS = _DefaultSettings.CONF_MAXREGS
         cls.CONF_WAIT_TIME = _DefaultSettings.CONF_WAIT_TIME
         cls.CONF_LOGGING_LEVEL_BACKEND = _DefaultSettings.CONF_LOGGING_LEVEL_BACKEND
         cls.CONF_LOGGING_LEVEL_FRONTEND = _DefaultSettings.CONF_LOGGING_LEVEL_FRONTEND
         cls.CONF_BACKEND = _DefaultSettings.CONF_BACKEND
+        cls.CONF_PRECISION = _DefaultSettings.CONF_PRECISION
         cls.CONF_TOPOLOGY_FILE = _DefaultSettings.CONF_TOPOLOGY_FILE
         cls.CONF_NOISY_QUBITS = _DefaultSettings.CONF_NOISY_QUBITS
         cls.CONF_T1 = _DefaultSettings.CONF_T1
+        cls.CONF_COMPRESS_MERGES = _DefaultSettings.CONF_COMPRESS_MERGES
+        cls.CONF_FACTORIZE_REGISTERS = _DefaultSettings.CONF_FACTORIZE_REGISTERS
 
         if os.path.exists(cls._settings_file):
             os.remove(cls._settings_file)
@@ -0,0 +1,86 @@
+import unittest
+from functools import reduce
+import numpy as np
+
+from simulaqron.virtNode import factorization
+from simulaqron.virtNode.basics import quantumError
+
+_PAULIS = {
+    "I": np.eye(2),
+    "X": np.array([[0, 1], [1, 0]]),
+    "Y": np.array([[0, -1j], [1j, 0]]),
+    "Z": np.diag([1, -1]),
+}
+
+
+def permute(state, order):
+    """
+    Returns the state where qubit i is qubit order[i] of the given state.
+    """
+    n = len(order)
+    return np.transpose(state.reshape([2] * n), order).reshape(-1)
+
+
+def five_qubit_code_state():
+    """
+    Returns the logical zero of the five qubit code, whose two-qubit reduced states are all maximally mixed.
+    """
+    generators = ["XZZXI", "IXZZX", "XIXZZ", "ZXIXZ", "ZZZZZ"]
+    state = np.ones(32, dtype=complex)
+    for generator in generators:
+        pauli = reduce(np.kron, [_PAULIS[p] for p in generator])
+        state = (state + pauli @ state) / 2
+    return state / np.linalg.norm(state)
+
+
+class TestFactorization(unittest.TestCase):
+    def setUp(self):
+        self.bell = np.array([1, 0, 0, 1]) / np.sqrt(2)
+        self.ghz = np.array([1, 0, 0, 0, 0, 0, 0, 1j]) / np.sqrt(2)
+        self.plus = np.array([1, 1]) / np.sqrt(2)
+
+    def test_partition(self):
+        state = reduce(np.kron, [self.bell, self.plus, self.ghz, self.bell]).astype(complex)
+        self.assertEqual(factorization.pure_state_partition(state, 8), [[0, 1], [2], [3, 4, 5], [6, 7]])
+        state = permute(state, [3, 0, 5, 1, 2, 6, 4, 7])
+        self.assertEqual(factorization.pure_state_partition(state, 8), [[0, 2, 6], [1, 3], [4], [5, 7]])
+
+    def test_partition_small(self):
+        self.assertEqual(factorization.pure_state_partition(np.ones(1, dtype=complex), 0), [[]])
+        self.assertEqual(factorization.pure_state_partition(self.plus.astype(complex), 1), [[0]])
+        self.assertEqual(factorization.pure_state_partition(self.bell.astype(complex), 2), [[0, 1]])
+
+    def test_partition_single_precision(self):
+        state = reduce(np.kron, [self.plus, self.bell, self.plus]).astype(np.complex64)
+        self.assertEqual(factorization.pure_state_partition(state, 4), [[0], [1, 2], [3]])
+
+    def test_partition_without_pairwise_correlations(self):
+        state = permute(np.kron(five_qubit_code_state(), self.bell), [0, 5, 1, 2, 6, 3, 4])
+        self.assertEqual(factorization.pure_state_partition(state, 7), [[0, 2, 3, 5, 6], [1, 4]])
+
+    def test_partition_too_many_qubits(self):
+        n = factorization.MAX_QUBITS + 1
+        state = reduce(np.kron, [self.plus] * n).astype(complex)
+        self.assertEqual(factorization.pure_state_partition(state, n), [list(range(n))])
+
+    def test_is_random_outcome(self):
+        self.assertTrue(factorization.is_random_outcome(0.5, np.complex128))
+        self.assertFalse(factorization.is_random_outcome(0, np.complex128))
+        self.assertFalse(factorization.is_random_outcome(1 - 1e-12, np.complex128))
+        self.assertFalse(factorization.is_random_outcome(1e-7, np.complex64))
+
+    def test_split(self):
+        state = permute(reduce(np.kron, [self.ghz, self.plus]).astype(complex), [3, 0, 2, 1])
+        factor, rest = factorization.split_pure_state(state, 4, [1, 3, 2])
+        self.assertTrue(np.isclose(abs(np.vdot(factor, self.ghz)), 1))
+        self.assertTrue(np.isclose(abs(np.vdot(rest, self.plus)), 1))
+        self.assertTrue(np.allclose(permute(np.kron(rest, factor), [0, 1, 3, 2]), state))
+
+    def test_split_entangled(self):
+        state = np.kron(self.ghz, self.plus).astype(complex)
+        with self.assertRaises(quantumError):
+            factorization.split_pure_state(state, 4, [0, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
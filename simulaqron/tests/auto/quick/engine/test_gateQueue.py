@@ -0,0 +1,97 @@
+import unittest
+import weakref
+import numpy as np
+
+from simulaqron.toolbox.gateMatrices import GATE_MATRICES
+from simulaqron.virtNode.gateQueue import gateQueue
+from simulaqron.virtNode.numpySimulator import numpyEngine
+
+
+class TestGateQueue(unittest.TestCase):
+    def setUp(self):
+        self.applied = []
+        self.queue = gateQueue(
+            lambda gate, q: self.applied.append((gate, q)),
+            lambda gate, q1, q2: self.applied.append((gate, q1, q2)),
+        )
+
+    def test_unfused_gates_unchanged(self):
+        self.queue.add_onequbit_gate("H", 0, matrix=GATE_MATRICES["H"])
+        self.queue.add_twoqubit_gate("CNOT", 1, 2, matrix=GATE_MATRICES["CNOT"])
+        self.assertEqual(len(self.queue), 2)
+        self.assertEqual(self.applied, [])
+        self.queue.flush()
+        self.assertEqual(self.applied, [("H", 0), ("CNOT", 1, 2)])
+        self.assertEqual(len(self.queue), 0)
+
+    def test_fuse_onequbit_gates(self):
+        for gate in ["H", "T", "H", "Z"]:
+            self.queue.add_onequbit_gate(GATE_MATRICES[gate], 3)
+        self.queue.flush()
+        self.assertEqual(len(self.applied), 1)
+        gate, q = self.applied[0]
+        self.assertEqual(q, 3)
+        H, T, Z = GATE_MATRICES["H"], GATE_MATRICES["T"], GATE_MATRICES["Z"]
+        self.assertTrue(np.allclose(gate, Z @ H @ T @ H))
+
+    def test_fuse_twoqubit_gates(self):
+        H, CNOT = GATE_MATRICES["H"], GATE_MATRICES["CNOT"]
+        self.queue.add_onequbit_gate(H, 0)
+        self.queue.add_onequbit_gate(H, 2)
+        self.queue.add_twoqubit_gate(CNOT, 0, 1)
+        self.queue.add_twoqubit_gate(CNOT, 1, 0)
+        self.queue.add_onequbit_gate(H, 1)
+        self.queue.flush()
+        self.assertEqual(len(self.applied), 2)
+        self.assertTrue(np.allclose(self.applied[0][0], H))
+        self.assertEqual(self.applied[0][1], 2)
+        gate, q1, q2 = self.applied[1]
+        self.assertEqual((q1, q2), (0, 1))
+        CNOT10 = np.array([[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]])
+        expected = np.kron(np.eye(2), H) @ CNOT10 @ CNOT @ np.kron(H, np.eye(2))
+        self.assertTrue(np.allclose(gate, expected))
+
+    def test_other_pair_applies_pending(self):
+        CNOT = GATE_MATRICES["CNOT"]
+        self.queue.add_twoqubit_gate(CNOT, 0, 1)
+        self.queue.add_twoqubit_gate(CNOT, 1, 2)
+        self.assertEqual(len(self.applied), 1)
+        self.assertEqual(self.applied[0][1:], (0, 1))
+        self.queue.clear()
+        self.queue.flush()
+        self.assertEqual(len(self.applied), 1)
+
+
+class TestEngineGateQueue(unittest.TestCase):
+    def test_state_after_buffered_gates(self):
+        eng = numpyEngine("Alice", 0)
+        eng.add_fresh_qubit()
+        eng.add_fresh_qubit()
+        eng.apply_H(0)
+        eng.apply_CNOT(0, 1)
+        eng.apply_X(1)
+        eng.add_fresh_qubit()
+        eng.apply_H(2)
+        expected = np.kron(np.array([0, 1, 1, 0]) / np.sqrt(2), np.array([1, 1]) / np.sqrt(2))
+        re, im = eng.get_register_RI()
+        self.assertTrue(np.allclose(np.array(re) + 1j * np.array(im), expected))
+
+    def test_measure_after_buffered_gates(self):
+        eng = numpyEngine("Alice", 0)
+        eng.add_fresh_qubit()
+        eng.apply_X(0)
+        eng.apply_H(0)
+        eng.apply_H(0)
+        self.assertEqual(eng.measure_qubit(0), 1)
+
+    def test_engine_not_kept_alive(self):
+        eng = numpyEngine("Alice", 0)
+        eng.add_fresh_qubit()
+        eng.apply_H(0)
+        ref = weakref.ref(eng)
+        del eng
+        self.assertIsNone(ref())
+
+
+if __name__ == "__main__":
+    unittest.main()
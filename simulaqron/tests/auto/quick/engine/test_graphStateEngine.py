@@ -0,0 +1,370 @@
+import unittest
+import numpy as np
+
+from simulaqron.virtNode.graphStateSimulator import graphStateEngine
+from simulaqron.virtNode.basics import noQubitError, quantumError
+from simulaqron.toolbox.stabilizerStates import StabilizerState
+from simulaqron.toolbox.graphStates import GraphState
+
+
+def register_state(eng):
+    edges, vops = eng.get_register_RI()
+    return GraphState(edges, vops=vops).to_stabilizer_state()
+
+
+class TestGraphStateEngine_init(unittest.TestCase):
+    def test_init(self):
+        eng = graphStateEngine("Alice", 0)
+        self.assertEqual(eng.maxQubits, 10)
+        self.assertEqual(eng.activeQubits, 0)
+        self.assertEqual(len(eng.qubitReg), 0)
+
+        eng = graphStateEngine("Alice", 0, 5)
+        self.assertEqual(eng.maxQubits, 5)
+        self.assertEqual(eng.activeQubits, 0)
+        self.assertEqual(len(eng.qubitReg), 0)
+
+
+class TestGraphStateEngine(unittest.TestCase):
+    def setUp(self):
+        self.eng = graphStateEngine("Alice", 0)
+
+    def test_reset(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.reset(5, 3)
+        self.assertEqual(self.eng.num, 5)
+        self.assertEqual(self.eng.maxQubits, 3)
+        self.assertEqual(self.eng.activeQubits, 0)
+        for _ in range(3):
+            num = self.eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        self.assertEqual([self.eng.measure_qubit(0) for _ in range(3)], [0, 0, 1])
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_add_fresh_qubit(self):
+        num = self.eng.add_fresh_qubit()
+        self.assertEqual(num, 0)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertEqual(len(self.eng.qubitReg), 1)
+
+    def test_add_to_many_fresh_qubits(self):
+        for _ in range(10):
+            self.eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            self.eng.add_fresh_qubit()
+
+    def test_add_qubit(self):
+        new_state = [[0, 1]]
+        num = self.eng.add_qubit(new_state)
+        self.assertEqual(num, 0)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertEqual(len(self.eng.qubitReg), 1)
+        state = register_state(self.eng)
+        self.assertEqual(state, StabilizerState(new_state))
+
+    def test_add_qubit_H(self):
+        new_state = [[1, 0]]
+        num = self.eng.add_qubit(new_state)
+        self.assertEqual(num, 0)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertEqual(len(self.eng.qubitReg), 1)
+        state = register_state(self.eng)
+        self.assertEqual(state, StabilizerState(new_state))
+
+    def test_remove_qubit(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.remove_qubit(num)
+        self.assertEqual(self.eng.activeQubits, 0)
+        self.assertEqual(len(self.eng.qubitReg), 0)
+        with self.assertRaises(quantumError):
+            self.eng.remove_qubit(num)
+
+    def test_get_register_RI(self):
+        self.eng.add_fresh_qubit()
+        self.eng.add_fresh_qubit()
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState(2))
+
+    def test_H(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 0]]))
+
+    def test_K(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_K(num)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 1]]))
+
+    def test_X(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[0, 1, 1]]))
+
+    def test_Y(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        self.eng.apply_Y(num)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 0, 1]]))
+
+    def test_Z(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        self.eng.apply_Z(num)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 0, 1]]))
+
+    def test_Rx(self):
+        num = self.eng.add_fresh_qubit()
+        with self.assertRaises(AttributeError):
+            self.eng.apply_rotation(num, (1, 0, 0), np.pi / 2)
+
+    def test_Ry(self):
+        num = self.eng.add_fresh_qubit()
+        with self.assertRaises(AttributeError):
+            self.eng.apply_rotation(num, (0, 1, 0), np.pi / 2)
+
+    def test_Rz(self):
+        num = self.eng.add_fresh_qubit()
+        with self.assertRaises(AttributeError):
+            self.eng.apply_rotation(num, (0, 0, 1), np.pi / 2)
+
+    def test_cnot(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]]))
+
+    def test_cz(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_H(num2)
+        self.eng.apply_CPHASE(num1, num2)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 0, 0, 1], [0, 1, 1, 0]]))
+
+    def test_measure0(self):
+        num = self.eng.add_fresh_qubit()
+        m = self.eng.measure_qubit(num)
+        self.assertEqual(m, 0)
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_measure1(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        m = self.eng.measure_qubit(num)
+        self.assertEqual(m, 1)
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_measure_inplace(self):
+        num = self.eng.add_fresh_qubit()
+        m = self.eng.measure_qubit_inplace(num)
+        self.assertEqual(m, 0)
+        self.assertEqual(self.eng.activeQubits, 1)
+
+    def test_measure_absorbed_EPR(self):
+        for _ in range(20):
+            eng = graphStateEngine("Alice", 0)
+            # The graph state on two vertices with H on the second is an EPR pair
+            eng.absorb_parts([[0, 1]], [0, 1], 2)
+            m0 = eng.measure_qubit_inplace(0)
+            m1 = eng.measure_qubit(1)
+            self.assertEqual(m0, m1)
+            self.assertEqual(eng.activeQubits, 1)
+            self.assertEqual(eng.measure_qubit(0), m0)
+
+    def test_measure_GHZ(self):
+        n = 20
+        eng = graphStateEngine("Alice", 0, n)
+        for _ in range(10):
+            qubits = [eng.add_fresh_qubit() for _ in range(n)]
+            eng.apply_H(qubits[0])
+            for i in range(1, n):
+                eng.apply_CNOT(qubits[i - 1], qubits[i])
+            outcomes = [eng.measure_qubit(0) for _ in range(n)]
+            self.assertEqual(len(set(outcomes)), 1)
+            self.assertEqual(eng.activeQubits, 0)
+
+    def test_sample_measurements(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.apply_X(num2)
+        outcomes = self.eng.sample_measurements([num1, num2], 100)
+        self.assertEqual(len(outcomes), 100)
+        self.assertTrue(all(m1 != m2 for m1, m2 in outcomes))
+        self.assertEqual(self.eng.activeQubits, 2)
+        with self.assertRaises(quantumError):
+            self.eng.sample_measurements([num1, 2], 1)
+
+    def test_absorb_both_empty(self):
+        eng2 = graphStateEngine("Alice", 0)
+        self.eng.absorb(eng2)
+        self.assertEqual(self.eng.activeQubits, 0)
+        self.assertEqual(len(self.eng.qubitReg), 0)
+
+    def test_absorb_other_empty(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        eng2 = graphStateEngine("Alice", 0)
+        self.eng.absorb(eng2)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertEqual(len(self.eng.qubitReg), 1)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 0]]))
+
+    def test_absorb_this_empty_H(self):
+        eng2 = graphStateEngine("Alice", 0)
+        num = eng2.add_fresh_qubit()
+        eng2.apply_H(num)
+        self.eng.absorb(eng2)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertEqual(len(self.eng.qubitReg), 1)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 0]]))
+
+    def test_absorb_this_empty_CNOT(self):
+        eng2 = graphStateEngine("Alice", 0)
+        num1 = eng2.add_fresh_qubit()
+        num2 = eng2.add_fresh_qubit()
+        eng2.apply_H(num1)
+        eng2.apply_CNOT(num1, num2)
+        self.eng.absorb(eng2)
+        self.assertEqual(self.eng.activeQubits, 2)
+        self.assertEqual(len(self.eng.qubitReg), 2)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]]))
+
+    def test_absorb_this_empty_GHZ(self):
+        n = 5
+        eng2 = graphStateEngine("Alice", 0)
+        qubits = [eng2.add_fresh_qubit() for _ in range(n)]
+        eng2.apply_H(qubits[0])
+        for i in range(1, n):
+            eng2.apply_CNOT(qubits[0], qubits[i])
+        self.eng.absorb(eng2)
+        self.assertEqual(self.eng.activeQubits, n)
+        self.assertEqual(len(self.eng.qubitReg), n)
+        state = register_state(self.eng)
+        ref = [1 / np.sqrt(2)] + [0] * (2 ** n - 2) + [1 / np.sqrt(2)]
+        ref = [[1] * n + [0] * n]
+        for i in range(n - 1):
+            ref += [[0] * n + [0] * i + [1] * 2 + [0] * (n - i - 2)]
+        self.assertTrue(state == StabilizerState(ref))
+
+    def test_absorb_2GHZ(self):
+        n = 5
+        eng2 = graphStateEngine("Alice", 0)
+        for eng in [self.eng, eng2]:
+            qubits = [eng.add_fresh_qubit() for _ in range(n)]
+            eng.apply_H(qubits[0])
+            for i in range(1, n):
+                eng.apply_CNOT(qubits[0], qubits[i])
+        self.eng.absorb(eng2)
+        self.assertEqual(self.eng.activeQubits, 2 * n)
+        self.assertEqual(len(self.eng.qubitReg), 2 * n)
+
+    def test_absorb_to_big_this_empty(self):
+        eng2 = graphStateEngine("Alice", 0, 11)
+        for _ in range(11):
+            eng2.add_fresh_qubit()
+        with self.assertRaises(quantumError):
+            self.eng.absorb(eng2)
+
+    def test_absorb_to_big(self):
+        self.eng.add_fresh_qubit()
+        eng2 = graphStateEngine("Alice", 0)
+        for _ in range(10):
+            eng2.add_fresh_qubit()
+        with self.assertRaises(quantumError):
+            self.eng.absorb(eng2)
+
+    def test_absorb_parts_both_empty(self):
+        eng2 = graphStateEngine("Alice", 0)
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 0)
+        self.assertEqual(len(self.eng.qubitReg), 0)
+
+    def test_absorb_parts(self):
+        self.eng.add_fresh_qubit()
+        eng2 = graphStateEngine("Alice", 0)
+        eng2.add_fresh_qubit()
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 2)
+        self.assertEqual(len(self.eng.qubitReg), 2)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[0, 0, 1, 0], [0, 0, 0, 1]]))
+
+    def test_absorb_parts_EPR(self):
+        eng2 = graphStateEngine("Alice", 0)
+        num1 = eng2.add_fresh_qubit()
+        num2 = eng2.add_fresh_qubit()
+        eng2.apply_H(num1)
+        eng2.apply_CNOT(num1, num2)
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 2)
+        self.assertEqual(len(self.eng.qubitReg), 2)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]]))
+
+    def test_absorb_parts_other_empty(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        eng2 = graphStateEngine("Alice", 0)
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertEqual(len(self.eng.qubitReg), 1)
+        state = register_state(self.eng)
+        self.assertTrue(state == StabilizerState([[1, 0]]))
+
+    def test_absorb_bytes_GHZ(self):
+        self.eng.add_fresh_qubit()
+        eng2 = graphStateEngine("Alice", 0)
+        nums = [eng2.add_fresh_qubit() for _ in range(3)]
+        eng2.apply_H(nums[0])
+        eng2.apply_CNOT(nums[0], nums[1])
+        eng2.apply_CNOT(nums[1], nums[2])
+        eng2.apply_K(nums[2])
+        self.eng.absorb_bytes(eng2.get_register_bytes())
+        self.assertEqual(self.eng.activeQubits, 4)
+        state = register_state(self.eng)
+        expected = StabilizerState(1)
+        expected.absorb(register_state(eng2))
+        self.assertTrue(state == expected)
+
+    def test_split(self):
+        nums = [self.eng.add_fresh_qubit() for _ in range(3)]
+        self.eng.apply_H(nums[0])
+        self.eng.apply_X(nums[1])
+        self.eng.apply_CNOT(nums[0], nums[2])
+        self.assertEqual(self.eng.find_partition(), [[0, 2], [1]])
+
+        # The graph of the moved qubits is relabelled to follow the qubit already in the other register
+        eng2 = graphStateEngine("Alice", 1)
+        eng2.add_fresh_qubit()
+        self.eng.split([nums[0], nums[2]], eng2)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertTrue(register_state(self.eng) == StabilizerState(["-1Z"]))
+        self.assertEqual(eng2.activeQubits, 3)
+        self.assertTrue(register_state(eng2) == StabilizerState(["ZII", "IXX", "IZZ"]))
+
+        eng3 = graphStateEngine("Alice", 2)
+        with self.assertRaises(quantumError):
+            eng2.split([1], eng3)
+        self.assertEqual(eng2.activeQubits, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
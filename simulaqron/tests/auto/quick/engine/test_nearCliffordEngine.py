@@ -0,0 +1,260 @@
+import unittest
+import numpy as np
+
+from simulaqron.virtNode.nearCliffordSimulator import nearCliffordEngine
+from simulaqron.virtNode.basics import noQubitError, quantumError
+from simulaqron.toolbox.nearCliffordStates import NearCliffordState
+
+
+def register_vector(eng):
+    Re, Im = eng.get_register_RI()
+    generators, paulis, real_parts = Re
+    return NearCliffordState(generators, paulis, np.array(real_parts) + 1j * np.array(Im)).to_state_vector()
+
+
+class TestNearCliffordEngine_init(unittest.TestCase):
+    def test_init(self):
+        eng = nearCliffordEngine("Alice", 0)
+        self.assertEqual(eng.maxQubits, 10)
+        self.assertEqual(eng.activeQubits, 0)
+        self.assertEqual(len(eng.qubitReg), 0)
+
+        eng = nearCliffordEngine("Alice", 0, 5)
+        self.assertEqual(eng.maxQubits, 5)
+        self.assertEqual(eng.activeQubits, 0)
+        self.assertEqual(len(eng.qubitReg), 0)
+
+
+class TestNearCliffordEngine(unittest.TestCase):
+    def setUp(self):
+        self.eng = nearCliffordEngine("Alice", 0)
+
+    def assertRegisterState(self, vector):
+        self.assertAlmostEqual(abs(np.vdot(register_vector(self.eng), vector)), 1)
+
+    def test_reset(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.reset(5, 3)
+        self.assertEqual(self.eng.num, 5)
+        self.assertEqual(self.eng.maxQubits, 3)
+        self.assertEqual(self.eng.activeQubits, 0)
+        for _ in range(3):
+            num = self.eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        self.assertEqual([self.eng.measure_qubit(0) for _ in range(3)], [0, 0, 1])
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_add_fresh_qubit(self):
+        num = self.eng.add_fresh_qubit()
+        self.assertEqual(num, 0)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertEqual(len(self.eng.qubitReg), 1)
+
+    def test_add_to_many_fresh_qubits(self):
+        for _ in range(10):
+            self.eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            self.eng.add_fresh_qubit()
+
+    def test_add_qubit(self):
+        num = self.eng.add_qubit([[1, 0]])
+        self.assertEqual(num, 0)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertRegisterState(np.array([1, 1]) / np.sqrt(2))
+
+    def test_remove_qubit(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.remove_qubit(num)
+        self.assertEqual(self.eng.activeQubits, 0)
+        self.assertEqual(len(self.eng.qubitReg), 0)
+        with self.assertRaises(quantumError):
+            self.eng.remove_qubit(num)
+
+    def test_H(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        self.assertRegisterState(np.array([1, 1]) / np.sqrt(2))
+
+    def test_K(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_K(num)
+        self.assertRegisterState(np.array([1, 1j]) / np.sqrt(2))
+
+    def test_Y(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        self.eng.apply_Y(num)
+        self.assertRegisterState(np.array([1, -1]) / np.sqrt(2))
+
+    def test_T(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        self.eng.apply_T(num)
+        self.assertRegisterState(np.array([1, np.exp(1j * np.pi / 4)]) / np.sqrt(2))
+        self.assertEqual(self.eng.qubitReg.num_terms, 2)
+
+    def test_Rx(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_rotation(num, (1, 0, 0), np.pi / 2)
+        self.assertRegisterState(np.array([1, -1j]) / np.sqrt(2))
+
+    def test_Ry(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_rotation(num, (0, 1, 0), np.pi / 3)
+        self.assertRegisterState(np.array([np.cos(np.pi / 6), np.sin(np.pi / 6)]))
+
+    def test_Rz(self):
+        num = self.eng.add_fresh_qubit()
+        with self.assertRaises(ValueError):
+            self.eng.apply_rotation(num, (0, 0, 0), np.pi / 2)
+
+    def test_onequbit_gate(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_onequbit_gate(np.array([[1, 1], [1, -1]]) / np.sqrt(2), num)
+        self.assertEqual(self.eng.qubitReg.num_terms, 1)
+        self.assertRegisterState(np.array([1, 1]) / np.sqrt(2))
+        with self.assertRaises(quantumError):
+            self.eng.apply_onequbit_gate(np.identity(2), 1)
+
+    def test_twoqubit_gate(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_X(num1)
+        swap = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+        self.eng.apply_twoqubit_gate(swap, num1, num2)
+        self.assertRegisterState(np.array([0, 1, 0, 0]))
+        with self.assertRaises(quantumError):
+            self.eng.apply_twoqubit_gate(swap, num1, num1)
+
+    def test_cnot(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.assertRegisterState(np.array([1, 0, 0, 1]) / np.sqrt(2))
+
+    def test_cz(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_H(num2)
+        self.eng.apply_CPHASE(num1, num2)
+        self.assertRegisterState(np.array([1, 1, 1, -1]) / 2)
+
+    def test_measure0(self):
+        num = self.eng.add_fresh_qubit()
+        m = self.eng.measure_qubit(num)
+        self.assertEqual(m, 0)
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_measure1(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        m = self.eng.measure_qubit(num)
+        self.assertEqual(m, 1)
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_measure_inplace(self):
+        num = self.eng.add_fresh_qubit()
+        m = self.eng.measure_qubit_inplace(num)
+        self.assertEqual(m, 0)
+        self.assertEqual(self.eng.activeQubits, 1)
+
+    def test_measure_T_EPR(self):
+        for _ in range(20):
+            eng = nearCliffordEngine("Alice", 0)
+            num1 = eng.add_fresh_qubit()
+            num2 = eng.add_fresh_qubit()
+            eng.apply_H(num1)
+            eng.apply_T(num1)
+            eng.apply_CNOT(num1, num2)
+            m1 = eng.measure_qubit_inplace(num1)
+            m2 = eng.measure_qubit(num2)
+            self.assertEqual(m1, m2)
+            self.assertEqual(eng.activeQubits, 1)
+
+    def test_sample_measurements(self):
+        num = self.eng.add_fresh_qubit()
+        with self.assertRaises(quantumError):
+            self.eng.sample_measurements([num], 1)
+
+    def test_absorb(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        eng2 = nearCliffordEngine("Alice", 0)
+        num = eng2.add_fresh_qubit()
+        eng2.apply_H(num)
+        eng2.apply_T(num)
+        self.eng.absorb(eng2)
+        self.assertEqual(self.eng.activeQubits, 2)
+        self.assertRegisterState(np.kron([1, 1], [1, np.exp(1j * np.pi / 4)]) / 2)
+
+    def test_absorb_to_big(self):
+        self.eng.add_fresh_qubit()
+        eng2 = nearCliffordEngine("Alice", 0)
+        for _ in range(10):
+            eng2.add_fresh_qubit()
+        with self.assertRaises(quantumError):
+            self.eng.absorb(eng2)
+
+    def test_absorb_parts_both_empty(self):
+        eng2 = nearCliffordEngine("Alice", 0)
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 0)
+        self.assertEqual(len(self.eng.qubitReg), 0)
+
+    def test_absorb_parts(self):
+        self.eng.add_fresh_qubit()
+        eng2 = nearCliffordEngine("Alice", 0)
+        num1 = eng2.add_fresh_qubit()
+        num2 = eng2.add_fresh_qubit()
+        eng2.apply_H(num1)
+        eng2.apply_T(num1)
+        eng2.apply_CNOT(num1, num2)
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 3)
+        self.assertRegisterState(np.kron([1, 0], [1, 0, 0, np.exp(1j * np.pi / 4)]) / np.sqrt(2))
+
+    def test_absorb_bytes_both_empty(self):
+        eng2 = nearCliffordEngine("Alice", 0)
+        self.eng.absorb_bytes(eng2.get_register_bytes())
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_absorb_bytes(self):
+        self.eng.add_fresh_qubit()
+        eng2 = nearCliffordEngine("Alice", 0)
+        num1 = eng2.add_fresh_qubit()
+        num2 = eng2.add_fresh_qubit()
+        eng2.apply_H(num1)
+        eng2.apply_T(num1)
+        eng2.apply_CNOT(num1, num2)
+        self.eng.absorb_bytes(eng2.get_register_bytes())
+        self.assertEqual(self.eng.activeQubits, 3)
+        self.assertRegisterState(np.kron([1, 0], [1, 0, 0, np.exp(1j * np.pi / 4)]) / np.sqrt(2))
+
+    def test_split(self):
+        # Qubits 0 and 1 are entangled by a non-Clifford state, qubit 2 is in |+> and qubit 3 in |1>
+        nums = [self.eng.add_fresh_qubit() for _ in range(4)]
+        self.eng.apply_H(nums[0])
+        self.eng.apply_T(nums[0])
+        self.eng.apply_CNOT(nums[0], nums[1])
+        self.eng.apply_H(nums[2])
+        self.eng.apply_X(nums[3])
+        self.assertEqual(self.eng.find_partition(), [[0, 1], [2], [3]])
+
+        eng2 = nearCliffordEngine("Alice", 1)
+        self.eng.split([3, 2], eng2)
+        self.assertEqual(self.eng.activeQubits, 2)
+        self.assertRegisterState(np.array([1, 0, 0, np.exp(1j * np.pi / 4)]) / np.sqrt(2))
+        self.assertAlmostEqual(abs(np.vdot(register_vector(eng2), np.kron([0, 1], [1, 1]) / np.sqrt(2))), 1)
+        with self.assertRaises(quantumError):
+            self.eng.split([1], eng2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,382 @@
+import unittest
+from unittest import mock
+import numpy as np
+
+from simulaqron.settings import Settings
+from simulaqron.virtNode import numpySimulator
+from simulaqron.virtNode.numpySimulator import numpyEngine
+from simulaqron.virtNode.basics import noQubitError, quantumError
+
+
+class TestNumpyEngine_init(unittest.TestCase):
+    def test_init(self):
+        eng = numpyEngine("Alice", 0)
+        self.assertEqual(eng.maxQubits, 10)
+        self.assertEqual(eng.activeQubits, 0)
+        self.assertEqual(len(eng.qubitReg), 1)
+
+        eng = numpyEngine("Alice", 0, 5)
+        self.assertEqual(eng.maxQubits, 5)
+        self.assertEqual(eng.activeQubits, 0)
+        self.assertEqual(len(eng.qubitReg), 1)
+
+
+class TestNumpyEngine(unittest.TestCase):
+    def setUp(self):
+        self.eng = numpyEngine("Alice", 0)
+
+    @staticmethod
+    def abs_inner_product(state, ref):
+        comb_state = np.array(state[0]) + 1j * np.array(state[1])
+        inner = np.dot(comb_state, np.array(ref).conj())
+        return np.abs(inner)
+
+    def test_reset(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.reset(5, 3)
+        self.assertEqual(self.eng.num, 5)
+        self.assertEqual(self.eng.maxQubits, 3)
+        self.assertEqual(self.eng.activeQubits, 0)
+        for _ in range(3):
+            num = self.eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        self.assertEqual([self.eng.measure_qubit(0) for _ in range(3)], [0, 0, 1])
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_add_fresh_qubit(self):
+        num = self.eng.add_fresh_qubit()
+        self.assertEqual(num, 0)
+        self.assertEqual(self.eng.activeQubits, 1)
+        self.assertEqual(len(self.eng.qubitReg), 2)
+
+    def test_add_to_many_fresh_qubits(self):
+        for _ in range(10):
+            self.eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            self.eng.add_fresh_qubit()
+
+    def test_add_qubit_H(self):
+        self.eng.add_fresh_qubit()
+        new_state = [1 / np.sqrt(2), 1 / np.sqrt(2)]
+        num = self.eng.add_qubit(new_state)
+        self.assertEqual(num, 1)
+        state = self.eng.get_register_RI()
+        self.assertAlmostEqual(self.abs_inner_product(state, [1 / np.sqrt(2), 1 / np.sqrt(2), 0, 0]), 1)
+
+    def test_add_unphysical_qubit(self):
+        with self.assertRaises(quantumError):
+            self.eng.add_qubit([1, 1])
+
+    def test_remove_qubit(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.remove_qubit(num)
+        self.assertEqual(self.eng.activeQubits, 0)
+        with self.assertRaises(quantumError):
+            self.eng.remove_qubit(num)
+
+    def test_replace_qubit(self):
+        for _ in range(3):
+            self.eng.add_fresh_qubit()
+        self.eng.apply_X(2)
+        self.eng.replace_qubit(0, [0, 1])
+        self.assertEqual(self.eng.activeQubits, 3)
+        self.assertTrue(np.allclose(self.eng.qubitReg, np.kron([0, 1], np.kron([1, 0], [0, 1]))))
+
+        # Replacing a qubit of an entangled pair collapses the other one
+        self.eng.apply_H(0)
+        self.eng.apply_CNOT(0, 1)
+        plus = np.array([1, 1]) / np.sqrt(2)
+        self.eng.replace_qubit(1, plus)
+        state = self.eng.qubitReg.reshape(2, 2, 2)
+        outcome = int(abs(state[1, 0, 1]) > 0.5)
+        expected = np.kron(np.eye(2)[outcome], np.kron(plus, [0, 1]))
+        self.assertAlmostEqual(abs(np.vdot(self.eng.qubitReg, expected)), 1)
+
+    def test_K(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_K(num)
+        state = self.eng.get_register_RI()
+        self.assertAlmostEqual(self.abs_inner_product(state, [1 / np.sqrt(2), 1j / np.sqrt(2)]), 1)
+
+    def test_Y(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num)
+        self.eng.apply_Y(num)
+        state = self.eng.get_register_RI()
+        ref = [-1j / np.sqrt(2), 1j / np.sqrt(2)]
+        self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
+
+    def test_rotation(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_rotation(num, (1, 0, 0), np.pi / 2)
+        state = self.eng.get_register_RI()
+        self.assertAlmostEqual(self.abs_inner_product(state, [1 / np.sqrt(2), -1j / np.sqrt(2)]), 1)
+
+        # Rotating by pi around (X + Z) / sqrt(2) is a Hadamard up to a phase
+        self.eng.apply_rotation(num, (1, 0, 0), -np.pi / 2)
+        self.eng.apply_rotation(num, (1, 0, 1), np.pi)
+        state = self.eng.get_register_RI()
+        self.assertAlmostEqual(self.abs_inner_product(state, [1 / np.sqrt(2), 1 / np.sqrt(2)]), 1)
+
+    def test_cnot(self):
+        # Both give (|000> + |101>) / sqrt(2), also when the qubits are not neighbours
+        for control, target in [(0, 2), (2, 0)]:
+            eng = numpyEngine("Alice", 0)
+            for _ in range(3):
+                eng.add_fresh_qubit()
+            eng.apply_H(control)
+            eng.apply_CNOT(control, target)
+            state = eng.get_register_RI()
+            ref = (np.eye(8)[0] + np.eye(8)[5]) / np.sqrt(2)
+            self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
+
+    def test_cz(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_H(num2)
+        self.eng.apply_CPHASE(num1, num2)
+        state = self.eng.get_register_RI()
+        ref = [1 / 2, 1 / 2, 1 / 2, -1 / 2]
+        self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
+
+    def test_twoqubit_gate(self):
+        # A SWAP is not a controlled gate
+        swap = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+        for _ in range(3):
+            self.eng.add_fresh_qubit()
+        self.eng.apply_X(2)
+        self.eng.apply_twoqubit_gate(swap, 2, 0)
+        state = self.eng.get_register_RI()
+        self.assertAlmostEqual(self.abs_inner_product(state, np.eye(8)[4]), 1)
+
+    def test_faulty_twoqubit_gate(self):
+        self.eng.add_fresh_qubit()
+        with self.assertRaises(quantumError):
+            self.eng.apply_CNOT(0, 0)
+        with self.assertRaises(quantumError):
+            self.eng.apply_CNOT(0, 1)
+
+    def test_measure(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        self.assertEqual(self.eng.measure_qubit(num), 1)
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_may_factorize(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.measure_qubit_inplace(num1)
+        self.assertFalse(self.eng.mayFactorize)
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.measure_qubit_inplace(num2)
+        self.assertTrue(self.eng.mayFactorize)
+        self.eng.reset(0)
+        self.assertFalse(self.eng.mayFactorize)
+
+    def test_measure_inplace(self):
+        for _ in range(10):
+            eng = numpyEngine("Alice", 0)
+            num1 = eng.add_fresh_qubit()
+            num2 = eng.add_fresh_qubit()
+            eng.apply_H(num1)
+            eng.apply_CNOT(num1, num2)
+            m = eng.measure_qubit_inplace(num1)
+            self.assertEqual(eng.activeQubits, 2)
+            state = eng.get_register_RI()
+            self.assertAlmostEqual(self.abs_inner_product(state, np.eye(4)[3 * m]), 1)
+
+    def test_measure_removes_qubit(self):
+        for _ in range(10):
+            eng = numpyEngine("Alice", 0)
+            for _ in range(3):
+                eng.add_fresh_qubit()
+            eng.apply_H(0)
+            eng.apply_CNOT(0, 1)
+            eng.apply_X(2)
+            m = eng.measure_qubit(1)
+            self.assertEqual(eng.activeQubits, 2)
+            state = eng.get_register_RI()
+            self.assertAlmostEqual(self.abs_inner_product(state, np.eye(4)[2 * m + 1]), 1)
+
+    def test_sample_measurements(self):
+        nums = [self.eng.add_fresh_qubit() for _ in range(3)]
+        self.eng.apply_H(nums[0])
+        self.eng.apply_CNOT(nums[0], nums[2])
+        self.eng.apply_X(nums[1])
+        outcomes = self.eng.sample_measurements([nums[2], nums[1], nums[0]], 100)
+        self.assertEqual(len(outcomes), 100)
+        self.assertTrue(all(m2 == m0 and m1 == 1 for m2, m1, m0 in outcomes))
+        self.assertEqual(len(set(m0 for _, _, m0 in outcomes)), 2)
+        self.assertEqual(self.eng.activeQubits, 3)
+        with self.assertRaises(quantumError):
+            self.eng.sample_measurements([nums[0], 3], 1)
+        with self.assertRaises(quantumError):
+            self.eng.sample_measurements([nums[0], nums[0]], 1)
+
+    def test_absorb_GHZ(self):
+        n = 5
+        eng2 = numpyEngine("Alice", 0)
+        qubits = [eng2.add_fresh_qubit() for _ in range(n)]
+        eng2.apply_H(qubits[0])
+        for i in range(1, n):
+            eng2.apply_CNOT(qubits[0], qubits[i])
+        self.eng.add_fresh_qubit()
+        self.eng.absorb(eng2)
+        self.assertEqual(self.eng.activeQubits, n + 1)
+        state = self.eng.get_register_RI()
+        ref = [1 / np.sqrt(2)] + [0] * (2 ** n - 2) + [1 / np.sqrt(2)] + [0] * 2 ** n
+        self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
+
+    def test_absorb_to_big(self):
+        self.eng.add_fresh_qubit()
+        eng2 = numpyEngine("Alice", 0)
+        for _ in range(10):
+            eng2.add_fresh_qubit()
+        with self.assertRaises(quantumError):
+            self.eng.absorb(eng2)
+
+    def test_absorb_parts_EPR(self):
+        eng2 = numpyEngine("Alice", 0)
+        num1 = eng2.add_fresh_qubit()
+        num2 = eng2.add_fresh_qubit()
+        eng2.apply_H(num1)
+        eng2.apply_CNOT(num1, num2)
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 2)
+        state = self.eng.get_register_RI()
+        ref = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
+        self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
+
+    def test_absorb_parts_both_empty(self):
+        eng2 = numpyEngine("Alice", 0)
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 0)
+
+    def test_absorb_parts_grows_buffer(self):
+        # During a merge maxQubits is increased before the register is absorbed
+        eng = numpyEngine("Alice", 0, 2)
+        eng.add_fresh_qubit()
+        eng.apply_X(0)
+        eng.maxQubits = 4
+        eng.absorb_parts([0, 1 / np.sqrt(2), 1 / np.sqrt(2), 0], [0, 0, 0, 0], 2)
+        self.assertEqual(eng.activeQubits, 3)
+        state = eng.get_register_RI()
+        self.assertAlmostEqual(self.abs_inner_product(state, (np.eye(8)[5] + np.eye(8)[6]) / np.sqrt(2)), 1)
+
+    def test_buffer_grows_with_qubits(self):
+        # A merge can raise maxQubits far above the qubits in the register, which should not be allocated
+        eng = numpyEngine("Alice", 0, 2)
+        eng.add_fresh_qubit()
+        eng.maxQubits = 30
+        eng.absorb_parts([1, 0, 0, 0], [0, 0, 0, 0], 2)
+        self.assertEqual(len(eng._buffer), 8)
+        eng.add_fresh_qubit()
+        self.assertEqual(len(eng._buffer), 16)
+        eng.absorb_parts([0] * 31 + [1], [0] * 32, 5)
+        self.assertEqual(eng.activeQubits, 9)
+        self.assertEqual(len(eng._buffer), 2 ** 9)
+        self.assertEqual(eng.get_register_RI()[0][31], 1)
+
+
+class TestNumpyEngine_threads(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(numpySimulator, "_PARALLEL_MIN_QUBITS", 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, Settings, "CONF_NUM_THREADS", Settings.CONF_NUM_THREADS)
+
+    @staticmethod
+    def run_circuit(num_threads):
+        Settings.CONF_NUM_THREADS = num_threads
+        np.random.seed(42)
+        eng = numpyEngine("Alice", 0)
+        for _ in range(5):
+            eng.add_fresh_qubit()
+        for i in range(5):
+            eng.apply_H(i)
+            eng.apply_rotation(i, (1, 2, 3), 0.3 * (i + 1))
+        eng.apply_CNOT(0, 4)
+        eng.apply_CNOT(3, 1)
+        eng.apply_CPHASE(2, 0)
+        eng.apply_twoqubit_gate(np.kron([[1, 1], [1, -1]], [[0, 1], [1, 0]]) / np.sqrt(2), 4, 2)
+        eng.apply_T(3)
+        outcome = eng.measure_qubit_inplace(1)
+        return outcome, eng.qubitReg.copy()
+
+    def test_threads_agree(self):
+        outcome1, state1 = self.run_circuit(1)
+        for num_threads in [2, 3, 4, 16]:
+            outcome, state = self.run_circuit(num_threads)
+            self.assertEqual(outcome, outcome1)
+            self.assertTrue(np.allclose(state, state1))
+            self.assertAlmostEqual(np.vdot(state, state).real, 1)
+
+
+class TestNumpyEngine_precision(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, Settings, "CONF_PRECISION", Settings.CONF_PRECISION)
+
+    @staticmethod
+    def run_circuit(precision, num_gates):
+        Settings.CONF_PRECISION = precision
+        np.random.seed(0)
+        eng = numpyEngine("Alice", 0)
+        for _ in range(8):
+            eng.add_fresh_qubit()
+        for _ in range(num_gates // 2):
+            q1, q2 = np.random.choice(8, 2, replace=False)
+            eng.apply_rotation(q1, np.random.rand(3), 6 * np.random.rand())
+            eng.apply_CNOT(q1, q2)
+        return eng
+
+    def test_single_precision_storage(self):
+        eng = self.run_circuit("single", 0)
+        self.assertEqual(eng.qubitReg.dtype, np.complex64)
+        self.assertEqual(eng._buffer.nbytes, 8 * 2 ** 10)
+        eng.absorb_parts([1, 0], [0, 0], 1)
+        self.assertEqual(eng.qubitReg.dtype, np.complex64)
+        self.assertEqual(eng.measure_qubit(8), 0)
+
+    def test_split_single_precision(self):
+        Settings.CONF_PRECISION = "single"
+        eng = numpyEngine("Alice", 0)
+        nums = [eng.add_fresh_qubit() for _ in range(3)]
+        eng.apply_H(nums[0])
+        eng.apply_X(nums[1])
+        eng.apply_CNOT(nums[0], nums[2])
+        self.assertEqual(eng.find_partition(), [[0, 2], [1]])
+
+        eng2 = numpyEngine("Alice", 1)
+        eng2.add_fresh_qubit()
+        eng.split([nums[0], nums[2]], eng2)
+        self.assertEqual(eng.qubitReg.dtype, np.complex64)
+        self.assertEqual(eng2.qubitReg.dtype, np.complex64)
+        self.assertTrue(np.allclose(eng2.qubitReg, [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2), 0, 0, 0, 0]))
+
+        # The remaining qubit stays in the buffer, to which qubits are appended again
+        self.assertTrue(np.allclose(eng.qubitReg, [0, 1]))
+        eng.add_fresh_qubit()
+        self.assertTrue(np.allclose(eng.qubitReg, [0, 0, 1, 0]))
+
+        with self.assertRaises(quantumError):
+            eng2.split([1], eng)
+        self.assertEqual(eng2.activeQubits, 3)
+
+    def test_single_precision_error(self):
+        # Every gate adds a rounding error of a few units of 2^-24 to the amplitudes, so the distance to the
+        # double precision state should stay below 2^-20 per gate
+        num_gates = 500
+        double = self.run_circuit("double", num_gates).qubitReg
+        single = self.run_circuit("single", num_gates).qubitReg
+        self.assertLess(np.linalg.norm(single - double), num_gates * 2 ** -20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ from simulaqron.toolbox import has_module
 
 if has_module.main("projectq"):
 
+    from simulaqron.virtNode import projectQSimulator
     from simulaqron.virtNode.projectQSimulator import projectQEngine
     from simulaqron.virtNode.basics import noQubitError, quantumError
 
@@ -50,6 +51,24 @@ class TestProjectQEngine(unittest.TestCase):
         inner = np.dot(comb_state, np.array(ref).conj())
         return np.abs(inner)
 
+    @if_has_module
+    def test_reset(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.reset(5, 3)
+        self.assertEqual(self.eng.num, 5)
+        self.assertEqual(self.eng.maxQubits, 3)
+        self.assertEqual(self.eng.activeQubits, 0)
+        for _ in range(3):
+            num = self.eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        self.assertEqual([self.eng.measure_qubit(0) for _ in range(3)], [0, 0, 1])
+        self.assertEqual(self.eng.activeQubits, 0)
+
     @if_has_module
     def test_add_fresh_qubit(self):
         num = self.eng.add_fresh_qubit()
@@ -221,6 +240,17 @@ class TestProjectQEngine(unittest.TestCase):
         self.assertEqual(m, 0)
         self.assertEqual(self.eng.activeQubits, 1)
 
+    @if_has_module
+    def test_sample_measurements(self):
+        nums = [self.eng.add_fresh_qubit() for _ in range(3)]
+        self.eng.apply_H(nums[0])
+        self.eng.apply_CNOT(nums[0], nums[1])
+        self.eng.apply_X(nums[2])
+        outcomes = self.eng.sample_measurements([nums[2], nums[0], nums[1]], 100)
+        self.assertEqual(len(outcomes), 100)
+        self.assertTrue(all(m2 == 1 and m0 == m1 for m2, m0, m1 in outcomes))
+        self.assertEqual(self.eng.activeQubits, 3)
+
     @if_has_module
     def test_absorb_both_empty(self):
         eng2 = projectQEngine("Alice", 0)
@@ -356,6 +386,104 @@ class TestProjectQEngine(unittest.TestCase):
         ref = [1 / np.sqrt(2), 1 / np.sqrt(2)]
         self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
 
+    @if_has_module
+    def test_get_register_RI_qubit_order(self):
+        # The order in which the allocations reach the simulator differs from the order of the qubits here
+        for _ in range(4):
+            self.eng.add_fresh_qubit()
+        self.eng.apply_CNOT(3, 1)
+        self.eng.apply_CNOT(3, 1)
+        self.eng.apply_K(2)
+        state = self.eng.get_register_RI()
+        ref = [0] * 16
+        ref[0] = 1 / np.sqrt(2)
+        ref[4] = 1j / np.sqrt(2)
+        self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
+
+    @if_has_module
+    def test_absorb_parts_product(self):
+        num = self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        eng2 = projectQEngine("Alice", 0)
+        num1 = eng2.add_fresh_qubit()
+        eng2.add_fresh_qubit()
+        eng2.apply_H(num1)
+        self.eng.absorb_parts(*eng2.get_register_RI(), eng2.activeQubits)
+        self.assertEqual(self.eng.activeQubits, 3)
+        state = self.eng.get_register_RI()
+        ref = [0, 1 / np.sqrt(2), 0, 1 / np.sqrt(2), 0, 0, 0, 0]
+        self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
+        self.assertEqual(self.eng.measure_qubit(2), 0)
+        self.assertEqual(self.eng.measure_qubit(0), 1)
+
+    @if_has_module
+    def test_reuse_project_q_engine(self):
+        eng2 = projectQEngine("Alice", 0)
+        for _ in range(3):
+            eng2.add_fresh_qubit()
+        eng2.apply_H(0)
+        eng2.apply_CNOT(0, 1)
+        eng2.apply_CNOT(0, 2)
+        main_engine = eng2.eng
+        del eng2
+
+        # The qubits are deallocated before the engine is kept for reuse
+        self.assertEqual(main_engine.backend.cheat()[0], {})
+        eng3 = projectQEngine("Alice", 0)
+        self.assertIs(eng3.eng, main_engine)
+        eng3.add_fresh_qubit()
+        state = eng3.get_register_RI()
+        self.assertAlmostEqual(self.abs_inner_product(state, [1, 0]), 1)
+
+    @if_has_module
+    def test_idle_engines_limited(self):
+        del projectQSimulator._idle_engines[:]
+        engines = [projectQEngine("Alice", i) for i in range(projectQSimulator._IDLE_ENGINES_SIZE + 2)]
+        for eng in engines:
+            eng.add_fresh_qubit()
+            eng.apply_H(0)
+        del eng
+        del engines
+        self.assertEqual(len(projectQSimulator._idle_engines), projectQSimulator._IDLE_ENGINES_SIZE)
+        self.assertTrue(all(eng.backend.cheat()[0] == {} for eng in projectQSimulator._idle_engines))
+
+    @if_has_module
+    def test_absorb_this_empty_other_deleted(self):
+        eng2 = projectQEngine("Alice", 0)
+        eng2.add_fresh_qubit()
+        eng2.add_fresh_qubit()
+        eng2.apply_H(0)
+        eng2.apply_CNOT(0, 1)
+        self.eng.absorb(eng2)
+        del eng2
+        state = self.eng.get_register_RI()
+        ref = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
+        self.assertAlmostEqual(self.abs_inner_product(state, ref), 1)
+
+    @if_has_module
+    def test_split(self):
+        nums = [self.eng.add_fresh_qubit() for _ in range(3)]
+        self.eng.apply_H(nums[0])
+        self.eng.apply_X(nums[1])
+        self.eng.apply_CNOT(nums[0], nums[2])
+        self.assertEqual(self.eng.find_partition(), [[0, 2], [1]])
+
+        eng2 = projectQEngine("Alice", 1)
+        eng2.add_fresh_qubit()
+        self.eng.split([nums[0], nums[2]], eng2)
+        # Only the project Q qubit of the remaining qubit is still allocated
+        self.eng.eng.flush()
+        self.assertEqual(len(self.eng.eng.backend.cheat()[0]), 1)
+        self.eng.apply_X(0)
+        self.assertAlmostEqual(self.abs_inner_product(self.eng.get_register_RI(), [1, 0]), 1)
+        self.assertEqual(eng2.activeQubits, 3)
+        ref = [1 / np.sqrt(2), 0, 0, 0, 0, 0, 1 / np.sqrt(2), 0]
+        self.assertAlmostEqual(self.abs_inner_product(eng2.get_register_RI(), ref), 1)
+
+        with self.assertRaises(quantumError):
+            eng2.split([1], self.eng)
+        self.assertEqual(eng2.activeQubits, 3)
+
 
 if __name__ == "__main__":
     if _has_module:
@@ -29,11 +29,16 @@
 
 import unittest
 
+from simulaqron.settings import Settings
 from simulaqron.toolbox import has_module
 
 if has_module.main("qutip"):
 
+    import numpy as np
+    import qutip as qp
+
     from simulaqron.virtNode.qutipSimulator import qutipEngine
+    from simulaqron.virtNode.basics import noQubitError, quantumError
 
     _has_module = True
 
@@ -51,6 +56,27 @@ def if_has_module(test):
 
 
 class TestQutipEngine(unittest.TestCase):
+    @if_has_module
+    def test_reset(self):
+        eng = qutipEngine("Alice", 0)
+        num1 = eng.add_fresh_qubit()
+        num2 = eng.add_fresh_qubit()
+        eng.apply_H(num1)
+        eng.apply_CNOT(num1, num2)
+        eng.measure_qubit_inplace(num1)
+        eng.reset(5, 3)
+        self.assertEqual(eng.num, 5)
+        self.assertEqual(eng.maxQubits, 3)
+        self.assertEqual(eng.activeQubits, 0)
+        self.assertTrue(eng.is_pure)
+        for _ in range(3):
+            num = eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            eng.add_fresh_qubit()
+        eng.apply_X(num)
+        self.assertEqual([eng.measure_qubit(0) for _ in range(3)], [0, 0, 1])
+        self.assertEqual(eng.activeQubits, 0)
+
     @if_has_module
     def test_tracing(self):
         se = qutipEngine("alice", 0, 10)
@@ -100,6 +126,171 @@ class TestQutipEngine(unittest.TestCase):
         outcome = se.measure_qubit(0)
         self.assertEqual(outcome, 1)
 
+    @if_has_module
+    def test_measure_mixed(self):
+        for _ in range(10):
+            se = qutipEngine("alice", 0, 10)
+            se.absorb_parts([[0.5, 0], [0, 0.5]], [[0, 0], [0, 0]], 1)
+            se.add_fresh_qubit()
+            se.add_fresh_qubit()
+            se.apply_CNOT(0, 2)
+            self.assertFalse(se.is_pure)
+
+            outcome = se.measure_qubit_inplace(2)
+            expected = np.zeros((2, 2))
+            expected[outcome, outcome] = 1
+            self.assertTrue(np.allclose(se.get_qubits([0]).full(), expected))
+            self.assertTrue(np.allclose(se.get_qubits([2, 0]).full(), np.kron(expected, expected)))
+            self.assertAlmostEqual(se.qubitReg.tr(), 1)
+
+    @if_has_module
+    def test_sample_measurements(self):
+        se = qutipEngine("alice", 0)
+        se.add_fresh_qubit()
+        se.add_fresh_qubit()
+        se.apply_X(1)
+        self.assertEqual(se.sample_measurements([1, 0], 3), [[1, 0]] * 3)
+
+        # A mixed register, where qubit 2 is a copy of the maximally mixed qubit 0
+        se = qutipEngine("alice", 0)
+        se.absorb_parts([[0.5, 0], [0, 0.5]], [[0, 0], [0, 0]], 1)
+        se.add_fresh_qubit()
+        se.add_fresh_qubit()
+        se.apply_CNOT(0, 2)
+        outcomes = se.sample_measurements([0, 1, 2], 100)
+        self.assertTrue(all(m0 == m2 and m1 == 0 for m0, m1, m2 in outcomes))
+        self.assertEqual(len(set(m0 for m0, _, _ in outcomes)), 2)
+        self.assertFalse(se.is_pure)
+
+    @if_has_module
+    def test_pure_until_entangled_qubit_removed(self):
+        se = qutipEngine("alice", 0, 10)
+        for _ in range(3):
+            se.add_fresh_qubit()
+        se.apply_H(0)
+        se.apply_CNOT(0, 1)
+        se.apply_H(2)
+        self.assertTrue(se.is_pure)
+
+        # Qubit 2 is not entangled with the rest
+        se.remove_qubit(2)
+        self.assertTrue(se.is_pure)
+        bell = (qp.tensor(qp.basis(2, 0), qp.basis(2, 0)) + qp.tensor(qp.basis(2, 1), qp.basis(2, 1))).unit()
+        self.assertTrue(np.allclose(se.qubitReg.full(), (bell * bell.dag()).full()))
+
+        se.remove_qubit(1)
+        self.assertFalse(se.is_pure)
+        self.assertTrue(np.allclose(se.qubitReg.full(), np.eye(2) / 2))
+
+    @if_has_module
+    def test_replace_qubit(self):
+        se = qutipEngine("alice", 0, 10)
+        for _ in range(3):
+            se.add_fresh_qubit()
+        se.apply_X(2)
+        se.replace_qubit(0, qp.basis(2, 1))
+        expected = qp.tensor(qp.basis(2, 1), qp.basis(2, 0), qp.basis(2, 1))
+        self.assertTrue(se.is_pure)
+        self.assertTrue(np.allclose(se.qubitReg.full(), (expected * expected.dag()).full()))
+
+        # Replacing a qubit of an entangled pair leaves the other one mixed
+        se.apply_H(0)
+        se.apply_CNOT(0, 1)
+        plus = (qp.basis(2, 0) + qp.basis(2, 1)).unit()
+        se.replace_qubit(1, plus * plus.dag())
+        self.assertFalse(se.is_pure)
+        expected = qp.tensor(qp.qeye(2) / 2, plus * plus.dag(), qp.basis(2, 1) * qp.basis(2, 1).dag())
+        self.assertTrue(np.allclose(se.qubitReg.full(), expected.full()))
+
+    @if_has_module
+    def test_absorb_parts_purity(self):
+        se = qutipEngine("alice", 0, 10)
+        se.add_fresh_qubit()
+        se.apply_H(0)
+
+        se2 = qutipEngine("bob", 0, 10)
+        se2.add_fresh_qubit()
+        se2.apply_K(0)
+        Re, Im = se2.get_register_RI()
+        se.absorb_parts(Re, Im, 1)
+        self.assertTrue(se.is_pure)
+        self.assertEqual(se.activeQubits, 2)
+
+        se.absorb_parts([[0.5, 0], [0, 0.5]], [[0, 0], [0, 0]], 1)
+        self.assertFalse(se.is_pure)
+        self.assertEqual(se.activeQubits, 3)
+        self.assertTrue(np.allclose(se.get_qubits([1]).full(), se2.qubitReg.full()))
+
+    @if_has_module
+    def test_twoqubit_gate_positions(self):
+        # Compare against the full expanded unitary for neighbouring, distant and reversed qubits
+        U = qp.rand_unitary(4, dims=[[2, 2], [2, 2]])
+        for qubit1, qubit2 in [(0, 1), (1, 3), (3, 0), (2, 1)]:
+            se = qutipEngine("alice", 0, 10)
+            for _ in range(4):
+                se.add_fresh_qubit()
+            for q in range(4):
+                se.apply_rotation(q, (1, q, 0.5), 0.3 * (q + 1))
+            rho = se.qubitReg
+
+            se.apply_twoqubit_gate(U, qubit1, qubit2)
+            overallU = qp.gate_expand_2toN(U, 4, qubit1, qubit2)
+            overallU.dims = rho.dims
+            expected = overallU * rho * overallU.dag()
+
+            self.assertTrue(np.allclose(se.qubitReg.full(), expected.full()))
+
+    @if_has_module
+    def test_single_precision(self):
+        # Every gate adds a rounding error of a few units of 2^-24 to the amplitudes, so the distance to the
+        # double precision density matrix should stay below 2^-20 per gate
+        self.addCleanup(setattr, Settings, "CONF_PRECISION", Settings.CONF_PRECISION)
+        numGates = 200
+        rho = {}
+        for precision in ["double", "single"]:
+            Settings.CONF_PRECISION = precision
+            np.random.seed(0)
+            se = qutipEngine("alice", 0, 10)
+            for _ in range(5):
+                se.add_fresh_qubit()
+            for _ in range(numGates // 2):
+                q1, q2 = np.random.choice(5, 2, replace=False)
+                se.apply_rotation(q1, np.random.rand(3), 6 * np.random.rand())
+                se.apply_CNOT(q1, q2)
+            se.remove_qubit(4)
+            self.assertEqual(se._rho.dtype, np.complex64 if precision == "single" else np.complex128)
+            re, im = se.get_register_RI()
+            rho[precision] = np.array(re) + 1j * np.array(im)
+            se.measure_qubit(0)
+
+        self.assertLess(np.linalg.norm(rho["single"] - rho["double"]), numGates * 2 ** -20)
+
+    @if_has_module
+    def test_split(self):
+        se = qutipEngine("alice", 0, 10)
+        for _ in range(3):
+            se.add_fresh_qubit()
+        se.apply_H(0)
+        se.apply_X(1)
+        se.apply_CNOT(0, 2)
+        self.assertEqual(se.find_partition(), [[0, 2], [1]])
+        se2 = qutipEngine("alice", 1, 10)
+        se2.add_fresh_qubit()
+        se.split([0, 2], se2)
+        self.assertTrue(se.is_pure)
+        self.assertTrue(np.allclose(se.qubitReg.full(), np.diag([0, 1])))
+        bell = (qp.tensor(qp.basis(2, 0), qp.basis(2, 0)) + qp.tensor(qp.basis(2, 1), qp.basis(2, 1))).unit()
+        expected = qp.tensor(qp.basis(2, 0), bell)
+        self.assertTrue(np.allclose(se2.qubitReg.full(), (expected * expected.dag()).full()))
+
+        # Registers in a mixed state are never split
+        se.remove_qubit(0)
+        se2.remove_qubit(1)
+        self.assertFalse(se2.is_pure)
+        self.assertEqual(se2.find_partition(), [[0, 1]])
+        with self.assertRaises(quantumError):
+            se2.split([1], se)
+
 
 if __name__ == '__main__':
     if _has_module:
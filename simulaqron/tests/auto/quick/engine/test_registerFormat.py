@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+
+from simulaqron.settings import Settings
+from simulaqron.toolbox import has_module
+from simulaqron.virtNode import registerFormat
+from simulaqron.virtNode.basics import quantumError
+from simulaqron.virtNode.numpySimulator import numpyEngine
+from simulaqron.virtNode.stabilizerSimulator import stabilizerEngine
+
+_engines = [numpyEngine]
+if has_module.main("qutip"):
+    from simulaqron.virtNode.qutipSimulator import qutipEngine
+
+    _engines.append(qutipEngine)
+if has_module.main("projectq"):
+    from simulaqron.virtNode.projectQSimulator import projectQEngine
+
+    _engines.append(projectQEngine)
+
+
+def prepare(eng):
+    """
+    Prepares the state (|00> + i|11>)|1> / sqrt(2), which is not symmetric under exchanging qubits.
+    """
+    nums = [eng.add_fresh_qubit() for _ in range(3)]
+    eng.apply_H(nums[0])
+    eng.apply_CNOT(nums[0], nums[1])
+    eng.apply_T(nums[1])
+    eng.apply_T(nums[1])
+    eng.apply_X(nums[2])
+
+
+class TestRegisterFormat(unittest.TestCase):
+    def test_pack_unpack(self):
+        state = np.arange(8) + 1j * np.arange(8)
+        data = registerFormat.pack_register(registerFormat.KET, 3, state)
+        kind, num, unpacked = registerFormat.unpack_register(data)
+        self.assertEqual(kind, registerFormat.KET)
+        self.assertEqual(num, 3)
+        self.assertEqual(unpacked.dtype, np.dtype("<c16"))
+        self.assertTrue(np.array_equal(unpacked, state))
+
+        rho = np.eye(4, dtype=np.complex64) / 4
+        data = registerFormat.pack_register(registerFormat.DENSITY_MATRIX, 2, rho)
+        self.assertEqual(len(data), 12 + 16 * 8)
+        kind, num, unpacked = registerFormat.unpack_register(data, registerFormat.DENSITY_MATRIX)
+        self.assertEqual(unpacked.shape, (4, 4))
+        self.assertEqual(unpacked.dtype, np.dtype("<c8"))
+        self.assertTrue(np.array_equal(unpacked, rho))
+
+        data = registerFormat.pack_register(registerFormat.STABILIZER, 5, b"words")
+        self.assertEqual(bytes(registerFormat.unpack_register(data)[2]), b"words")
+
+    def test_invalid(self):
+        data = registerFormat.pack_register(registerFormat.KET, 1, np.array([1, 0], dtype=complex))
+        with self.assertRaises(quantumError):
+            registerFormat.unpack_register(data[:8])
+        with self.assertRaises(quantumError):
+            registerFormat.unpack_register(b"XXXX" + data[4:])
+        with self.assertRaises(quantumError):
+            registerFormat.unpack_register(data[:4] + b"\xff" + data[5:])
+        with self.assertRaises(quantumError):
+            registerFormat.unpack_register(data[:-1])
+        with self.assertRaises(quantumError):
+            registerFormat.unpack_register(data, registerFormat.STABILIZER)
+
+    def test_wrong_kind(self):
+        eng = stabilizerEngine("Alice", 0)
+        eng.add_fresh_qubit()
+        with self.assertRaises(quantumError):
+            numpyEngine("Alice", 0).absorb_bytes(eng.get_register_bytes())
+
+    def test_between_engines(self):
+        expected = np.kron(np.array([1, 0, 0, 1j]) / np.sqrt(2), [0, 1])
+        for sender in _engines:
+            for receiver in _engines:
+                with self.subTest(sender=sender.__name__, receiver=receiver.__name__):
+                    eng = sender("Alice", 0)
+                    prepare(eng)
+                    eng2 = receiver("Bob", 0)
+                    eng2.add_fresh_qubit()
+                    eng2.absorb_bytes(eng.get_register_bytes())
+                    self.assertEqual(eng2.activeQubits, 4)
+                    _, _, state = registerFormat.unpack_register(eng2.get_register_bytes(), registerFormat.KET)
+                    self.assertTrue(np.allclose(state, np.kron([1, 0], expected)))
+
+    def test_single_precision(self):
+        Settings.CONF_PRECISION = "single"
+        try:
+            eng = numpyEngine("Alice", 0)
+            prepare(eng)
+            data = eng.get_register_bytes()
+        finally:
+            Settings.CONF_PRECISION = "double"
+        self.assertEqual(len(data), 12 + 8 * 8)
+        eng2 = numpyEngine("Bob", 0)
+        eng2.absorb_bytes(data)
+        self.assertEqual(eng2.qubitReg.dtype, np.complex128)
+        self.assertTrue(np.allclose(eng2.qubitReg, np.kron(np.array([1, 0, 0, 1j]) / np.sqrt(2), [0, 1])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,23 @@ class TestStabilizerEngine(unittest.TestCase):
     def setUp(self):
         self.eng = stabilizerEngine("Alice", 0)
 
+    def test_reset(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.reset(5, 3)
+        self.assertEqual(self.eng.num, 5)
+        self.assertEqual(self.eng.maxQubits, 3)
+        self.assertEqual(self.eng.activeQubits, 0)
+        for _ in range(3):
+            num = self.eng.add_fresh_qubit()
+        with self.assertRaises(noQubitError):
+            self.eng.add_fresh_qubit()
+        self.eng.apply_X(num)
+        self.assertEqual([self.eng.measure_qubit(0) for _ in range(3)], [0, 0, 1])
+        self.assertEqual(self.eng.activeQubits, 0)
+
     def test_add_fresh_qubit(self):
         num = self.eng.add_fresh_qubit()
         self.assertEqual(num, 0)
@@ -131,6 +148,13 @@ class TestStabilizerEngine(unittest.TestCase):
         state, _ = self.eng.get_register_RI()
         self.assertTrue(StabilizerState(state) == StabilizerState([[1, 0, 0, 1], [0, 1, 1, 0]]))
 
+    def test_apply_circuit(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_circuit([("H", num1), ("CNOT", num1, num2), ("X", num2)])
+        state, _ = self.eng.get_register_RI()
+        self.assertTrue(StabilizerState(state) == StabilizerState(["+1XX", "-1ZZ"]))
+
     def test_measure0(self):
         num = self.eng.add_fresh_qubit()
         m = self.eng.measure_qubit(num)
@@ -144,12 +168,59 @@ class TestStabilizerEngine(unittest.TestCase):
         self.assertEqual(m, 1)
         self.assertEqual(self.eng.activeQubits, 0)
 
+    def test_may_factorize(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.measure_qubit_inplace(num1)
+        self.assertFalse(self.eng.mayFactorize)
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.measure_qubit_inplace(num2)
+        self.assertTrue(self.eng.mayFactorize)
+        self.eng.reset(0)
+        self.assertFalse(self.eng.mayFactorize)
+
     def test_measure_inplace(self):
         num = self.eng.add_fresh_qubit()
         m = self.eng.measure_qubit_inplace(num)
         self.assertEqual(m, 0)
         self.assertEqual(self.eng.activeQubits, 1)
 
+    def test_measure_absorbed_EPR(self):
+        for _ in range(20):
+            eng = stabilizerEngine("Alice", 0)
+            eng.absorb_parts([[1, 1, 0, 0], [0, 0, 1, 1]], None, 2)
+            m0 = eng.measure_qubit_inplace(0)
+            m1 = eng.measure_qubit(1)
+            self.assertEqual(m0, m1)
+            self.assertEqual(eng.activeQubits, 1)
+            self.assertEqual(eng.measure_qubit(0), m0)
+
+    def test_absorb_bytes(self):
+        eng2 = stabilizerEngine("Alice", 0)
+        num1 = eng2.add_fresh_qubit()
+        num2 = eng2.add_fresh_qubit()
+        eng2.apply_H(num1)
+        eng2.apply_CNOT(num1, num2)
+        self.eng.add_fresh_qubit()
+        self.eng.absorb_bytes(eng2.get_register_bytes())
+        self.assertEqual(self.eng.activeQubits, 3)
+        state, _ = self.eng.get_register_RI()
+        self.assertTrue(StabilizerState(state) == StabilizerState(["ZII", "IXX", "IZZ"]))
+
+    def test_sample_measurements(self):
+        num1 = self.eng.add_fresh_qubit()
+        num2 = self.eng.add_fresh_qubit()
+        self.eng.apply_H(num1)
+        self.eng.apply_CNOT(num1, num2)
+        self.eng.apply_X(num2)
+        outcomes = self.eng.sample_measurements([num1, num2], 100)
+        self.assertEqual(len(outcomes), 100)
+        self.assertTrue(all(m1 != m2 for m1, m2 in outcomes))
+        self.assertEqual(self.eng.activeQubits, 2)
+        with self.assertRaises(quantumError):
+            self.eng.sample_measurements([num1, 2], 1)
+
     def test_absorb_both_empty(self):
         eng2 = stabilizerEngine("Alice", 0)
         self.eng.absorb(eng2)
@@ -270,6 +341,31 @@ class TestStabilizerEngine(unittest.TestCase):
         state, _ = self.eng.get_register_RI()
         self.assertTrue(StabilizerState(state) == StabilizerState([[1, 0]]))
 
+    def test_split(self):
+        # Measuring a qubit of a GHZ state leaves the other two in a product state
+        nums = [self.eng.add_fresh_qubit() for _ in range(3)]
+        self.eng.apply_H(nums[0])
+        self.eng.apply_CNOT(nums[0], nums[1])
+        self.eng.apply_CNOT(nums[0], nums[2])
+        outcome = self.eng.measure_qubit(nums[1])
+        self.assertEqual(self.eng.find_partition(), [[0], [1]])
+
+        eng2 = stabilizerEngine("Alice", 1)
+        eng2.add_fresh_qubit()
+        eng2.apply_H(0)
+        self.eng.split([1], eng2)
+        # The destabilizers tracked for the measurement are kept
+        self.assertTrue(self.eng.qubitReg._has_destabilizers)
+        self.assertEqual(self.eng.measure_qubit(0), outcome)
+        self.assertEqual(eng2.activeQubits, 2)
+        expected = StabilizerState(["+1XI", "-1IZ" if outcome == 1 else "+1IZ"])
+        self.assertTrue(StabilizerState(eng2.get_register_RI()[0]) == expected)
+
+        eng2.apply_CNOT(0, 1)
+        with self.assertRaises(quantumError):
+            eng2.split([1], stabilizerEngine("Alice", 2))
+        self.assertEqual(eng2.activeQubits, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import numpy as np
+from scipy.linalg import expm
+
+from simulaqron.toolbox.gateMatrices import GATE_MATRICES, ROTATION_STEPS, rotation_matrix
+
+
+class TestGateMatrices(unittest.TestCase):
+    def test_unitary(self):
+        for name, matrix in GATE_MATRICES.items():
+            with self.subTest(gate=name):
+                self.assertTrue(np.allclose(matrix @ matrix.conj().T, np.eye(len(matrix))))
+
+    def test_read_only(self):
+        with self.assertRaises(ValueError):
+            GATE_MATRICES["H"][0, 0] = 0
+        with self.assertRaises(ValueError):
+            rotation_matrix((1, 0, 0), np.pi)[0, 0] = 0
+
+    def test_rotation(self):
+        paulis = [GATE_MATRICES[p] for p in "XYZ"]
+        for n, a in [((1, 0, 0), 0.3), ((0, 2, 0), 2 * np.pi / ROTATION_STEPS * 17), ((1, 1, -1), -1.2)]:
+            generator = sum(c * p for c, p in zip(n, paulis)) / np.linalg.norm(n)
+            self.assertTrue(np.allclose(rotation_matrix(n, a), expm(-0.5j * a * generator)))
+
+    def test_rotation_cached(self):
+        for axis in [(1, 0, 0), (0, 1, 0), (0, 0, 1)]:
+            for step in [0, 1, 128, 255]:
+                a = 2 * np.pi / ROTATION_STEPS * step
+                self.assertIs(rotation_matrix(axis, a), rotation_matrix(axis, a))
+        self.assertIs(rotation_matrix((0, 0, 2), np.pi / 2), rotation_matrix((0, 0, 1), np.pi / 2))
+        self.assertIsNot(rotation_matrix((0, 0, 1), 0.1), rotation_matrix((0, 0, 1), 0.1))
+
+    def test_rotation_zero_axis(self):
+        with self.assertRaises(ValueError):
+            rotation_matrix((0, 0, 0), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,246 @@
+import unittest
+import random
+import networkx as nx
+
+from simulaqron.toolbox.graphStates import GraphState
+from simulaqron.toolbox.stabilizerStates import StabilizerState
+
+
+def random_circuit(n, nr_gates):
+    circuit = []
+    for _ in range(nr_gates):
+        gate = random.choice(["X", "Y", "Z", "H", "K", "S", "CNOT", "CZ"])
+        if gate in ["CNOT", "CZ"]:
+            if n > 1:
+                circuit.append((gate,) + tuple(random.sample(range(n), 2)))
+        else:
+            circuit.append((gate, random.randrange(n)))
+    return circuit
+
+
+def apply_circuit(state, circuit):
+    for gate in circuit:
+        getattr(state, "apply_{}".format(gate[0]))(*gate[1:])
+
+
+class TestGraphStates(unittest.TestCase):
+    def test_faulty_init(self):
+        with self.assertRaises(ValueError):
+            GraphState("XX")
+
+        with self.assertRaises(ValueError):
+            GraphState([[0, 1]])
+
+        with self.assertRaises(ValueError):
+            GraphState([[0, 2]], vops=[0, 0])
+
+        with self.assertRaises(ValueError):
+            GraphState([[0, 1]], vops=[0, 24])
+
+        with self.assertRaises(ValueError):
+            GraphState(nx.Graph([(1, 2)]))
+
+    def test_init(self):
+        state = GraphState()
+        self.assertEqual(state.num_qubits, 0)
+        self.assertEqual(state.to_stabilizer_state(), StabilizerState())
+
+        state = GraphState(3)
+        self.assertEqual(len(state), 3)
+        self.assertEqual(state.to_stabilizer_state(), StabilizerState(3))
+
+        graph = nx.complete_graph(4)
+        state = GraphState(graph)
+        self.assertEqual(len(state), 4)
+        self.assertEqual(state.to_stabilizer_state(), StabilizerState(graph))
+
+        state = GraphState([[0, 1], [1, 2]], vops=[0, 0, 0])
+        self.assertEqual(state.to_stabilizer_state(), StabilizerState(nx.path_graph(3)))
+
+    def test_copy(self):
+        state = GraphState(2)
+        state.apply_H(0)
+        copy = GraphState(state)
+        state.apply_CNOT(0, 1)
+        self.assertEqual(copy.to_stabilizer_state(), StabilizerState(["XI", "IZ"]))
+        self.assertEqual(state.to_stabilizer_state(), StabilizerState(["XX", "ZZ"]))
+
+    def test_to_lists(self):
+        for _ in range(20):
+            n = random.randint(1, 8)
+            state = GraphState(n)
+            apply_circuit(state, random_circuit(n, 30))
+            edges, vops = state.to_lists()
+            self.assertEqual(GraphState(edges, vops=vops).to_stabilizer_state(), state.to_stabilizer_state())
+
+    def test_single_qubit_gates(self):
+        for gate, generator in [
+            ("X", "-1Z"),
+            ("Y", "-1Z"),
+            ("Z", "+1Z"),
+            ("H", "+1X"),
+            ("K", "+1Y"),
+            ("S", "+1Z"),
+        ]:
+            state = GraphState(1)
+            getattr(state, "apply_{}".format(gate))(0)
+            self.assertEqual(state.to_stabilizer_state(), StabilizerState([generator]))
+
+    def test_faulty_gates(self):
+        state = GraphState(2)
+        with self.assertRaises(ValueError):
+            state.apply_H(2)
+        with self.assertRaises(ValueError):
+            state.apply_CZ(0, 0)
+        with self.assertRaises(ValueError):
+            state.apply_CNOT(0, -1)
+
+    def test_CNOT(self):
+        state = GraphState(2)
+        state.apply_H(0)
+        state.apply_CNOT(0, 1)
+        self.assertEqual(state.to_stabilizer_state(), StabilizerState(["XX", "ZZ"]))
+
+    def test_CZ(self):
+        state = GraphState(2)
+        state.apply_H(0)
+        state.apply_H(1)
+        state.apply_CZ(0, 1)
+        self.assertEqual(state.to_stabilizer_state(), StabilizerState(nx.complete_graph(2)))
+        self.assertEqual(state.to_lists(), ([[0, 1]], [0, 0]))
+
+    def test_random_circuits(self):
+        for _ in range(100):
+            n = random.randint(1, 8)
+            circuit = random_circuit(n, 50)
+            state = GraphState(n)
+            apply_circuit(state, circuit)
+            stabilizer_state = StabilizerState(n)
+            apply_circuit(stabilizer_state, circuit)
+            self.assertEqual(state.to_stabilizer_state(), stabilizer_state)
+
+    def test_measure_deterministic(self):
+        state = GraphState(3)
+        state.apply_X(1)
+        self.assertEqual(state.measure(1, inplace=True), 1)
+        self.assertEqual(state.measure(0), 0)
+        self.assertEqual(len(state), 2)
+        self.assertEqual(state.measure(0), 1)
+        self.assertEqual(state.measure(0), 0)
+        self.assertEqual(len(state), 0)
+
+    def test_measure_faulty(self):
+        with self.assertRaises(ValueError):
+            GraphState(2).measure(2)
+
+    def test_measure_GHZ(self):
+        n = 10
+        for _ in range(20):
+            state = GraphState(n)
+            state.apply_H(0)
+            for i in range(1, n):
+                state.apply_CNOT(0, i)
+            m = state.measure(n // 2)
+            self.assertEqual(len(state), n - 1)
+            for i in range(n - 1):
+                self.assertEqual(state.measure(0, inplace=random.random() < 0.5), m)
+
+    def test_measure_random_circuits(self):
+        for _ in range(100):
+            n = random.randint(1, 8)
+            state = GraphState(n)
+            apply_circuit(state, random_circuit(n, 50))
+            position = random.randrange(n)
+            m = state.measure(position, inplace=True)
+            # The outcome is now deterministic
+            self.assertEqual(state.measure(position, inplace=True), m)
+            self.assertEqual(state.to_stabilizer_state().measure(position), m)
+            # Removing the last qubit by measuring it
+            if n > 1:
+                m = state.measure(n - 1)
+                self.assertEqual(len(state), n - 1)
+                position = random.randrange(n - 1)
+                m = state.measure(position, inplace=True)
+                self.assertEqual(state.to_stabilizer_state().measure(position), m)
+
+    def test_add_qubit(self):
+        state = GraphState(nx.complete_graph(3))
+        state.add_qubit()
+        self.assertEqual(len(state), 4)
+        self.assertEqual(state.to_stabilizer_state(), StabilizerState(nx.complete_graph(3)) * StabilizerState(1))
+
+    def test_add_qubit_from_array(self):
+        for generator in [[0, 1], [0, 1, 1], [1, 0], [1, 0, 1], [1, 1], [1, 1, 1]]:
+            state = GraphState(1)
+            state.add_qubit_from_array([generator])
+            self.assertEqual(state.to_stabilizer_state(), StabilizerState(1) * StabilizerState([generator]))
+        with self.assertRaises(ValueError):
+            GraphState().add_qubit_from_array([[0, 0]])
+        with self.assertRaises(ValueError):
+            GraphState().add_qubit_from_array([[1, 0, 0, 1]])
+
+    def test_absorb(self):
+        for _ in range(20):
+            n1 = random.randint(0, 5)
+            n2 = random.randint(0, 5)
+            state1 = GraphState(n1)
+            apply_circuit(state1, random_circuit(n1, 20) if n1 > 0 else [])
+            state2 = GraphState(n2)
+            apply_circuit(state2, random_circuit(n2, 20) if n2 > 0 else [])
+            expected = state1.to_stabilizer_state() * state2.to_stabilizer_state()
+            self.assertEqual((state1 * state2).to_stabilizer_state(), expected)
+            state1.absorb(state2)
+            self.assertEqual(len(state1), n1 + n2)
+            self.assertEqual(state1.to_stabilizer_state(), expected)
+
+    def test_find_partition(self):
+        state = GraphState([[0, 3], [1, 2]], vops=[0, 1, 2, 3])
+        self.assertEqual(state.find_partition(), [[0, 3], [1, 2]])
+        state.apply_CZ(3, 2)
+        self.assertEqual(state.find_partition(), [[0, 1, 2, 3]])
+        self.assertEqual(GraphState(2).find_partition(), [[0], [1]])
+
+    def test_split(self):
+        for _ in range(20):
+            n1 = random.randint(1, 5)
+            n2 = random.randint(1, 5)
+            state1 = GraphState(n1)
+            apply_circuit(state1, random_circuit(n1, 20))
+            state2 = GraphState(n2)
+            apply_circuit(state2, random_circuit(n2, 20))
+            state = state1 * state2
+            for positions in state.find_partition():
+                self.assertTrue(max(positions) < n1 or min(positions) >= n1)
+            removed = state.split(list(range(n1, n1 + n2)))
+            self.assertEqual(len(state), n1)
+            self.assertEqual(state.to_stabilizer_state(), state1.to_stabilizer_state())
+            self.assertEqual(removed.to_stabilizer_state(), state2.to_stabilizer_state())
+        with self.assertRaises(ValueError):
+            GraphState([[0, 1]], vops=[0, 0]).split([0])
+
+    def test_has_random_outcome(self):
+        for _ in range(20):
+            n = random.randint(1, 5)
+            state = GraphState(n)
+            apply_circuit(state, random_circuit(n, 20))
+            stabilizer_state = state.to_stabilizer_state()
+            for i in range(n):
+                self.assertEqual(state.has_random_outcome(i), stabilizer_state.has_random_outcome(i))
+
+    def test_many_qubits(self):
+        # A chain of EPR pairs joined by entanglement swapping, i.e. a GHZ state up to local Cliffords
+        n = 2000
+        state = GraphState(n)
+        for i in range(0, n, 2):
+            state.apply_H(i)
+            state.apply_CNOT(i, i + 1)
+        for i in range(1, n - 1, 2):
+            state.apply_CNOT(i, i + 1)
+            state.apply_H(i)
+        outcomes = [state.measure(i, inplace=True) for i in range(n)]
+        self.assertEqual(len(state), n)
+        self.assertEqual(outcomes, [state.measure(i, inplace=True) for i in range(n)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,8 @@ from simulaqron.local.setup import setup_local, assemble_qubit
 from simulaqron.network import Network
 from simulaqron.settings import Settings
 from simulaqron.toolbox.stabilizerStates import StabilizerState
+from simulaqron.toolbox.graphStates import GraphState
+from simulaqron.toolbox.nearCliffordStates import NearCliffordState
 from simulaqron.toolbox import get_simulaqron_path
 
 
@@ -74,7 +76,7 @@ class localNode(pb.Root):
             rho = assemble_qubit(realRho, imagRho)
             expectedRho = [[0.5, 0, 0, 0.5], [0, 0, 0, 0], [0, 0, 0, 0], [0.5, 0, 0, 0.5]]
             correct = np.all(np.isclose(rho, expectedRho))
-        elif Settings.CONF_BACKEND == "projectq":
+        elif Settings.CONF_BACKEND in ["projectq", "numpy"]:
             (realvec, imagvec) = yield self.virtRoot.callRemote("get_register_RI", self.q1)
             state = [r + (1j * j) for r, j in zip(realvec, imagvec)]
             expectedState = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
@@ -84,11 +86,78 @@ class localNode(pb.Root):
             state = StabilizerState(array)
             expectedState = StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]])
             correct = state == expectedState
+        elif Settings.CONF_BACKEND == "graph":
+            (edges, vops) = yield self.virtRoot.callRemote("get_register_RI", self.q1)
+            state = GraphState(edges, vops=vops).to_stabilizer_state()
+            expectedState = StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]])
+            correct = state == expectedState
+        elif Settings.CONF_BACKEND == "nearclifford":
+            (Re, Im) = yield self.virtRoot.callRemote("get_register_RI", self.q1)
+            state = NearCliffordState(Re[0], Re[1], np.array(Re[2]) + 1j * np.array(Im)).to_state_vector()
+            expectedState = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
+            correct = np.isclose(abs(np.vdot(state, expectedState)), 1)
         else:
             ValueError("Unknown backend {}".format(Settings.CONF_BACKEND))
 
         return bool(correct)
 
+    # This can be called by Alice to let Bob entangle a fresh qubit with a larger register simulated by Alice
+    @inlineCallbacks
+    def remote_merge_with_larger(self, virtualNum):
+        """
+        Extends the GHZ state of the qubit received from Alice by a fresh qubit. The register of the fresh qubit is
+        smaller, so it is moved to Alice.
+
+        Arguments
+        virtualNum	number of the virtual qubit received from Alice
+        """
+
+        logging.debug("LOCAL %s: Getting reference to qubit number %d.", self.node.name, virtualNum)
+        self.qR = yield self.virtRoot.callRemote("get_virtual_ref", virtualNum)
+        self.q = yield self.virtRoot.callRemote("new_qubit_inreg", self.qReg)
+        yield self.qR.callRemote("cnot_onto", self.q)
+
+        # The fresh qubit is now simulated by Alice at the end of her register
+        simNode = yield self.q.callRemote("get_simNode")
+        num = yield self.q.callRemote("get_number")
+        return simNode == "Alice" and num == 3
+
+    @inlineCallbacks
+    def remote_measure_merged(self):
+        """
+        Measures the qubits used in remote_merge_with_larger.
+        """
+        mR = yield self.qR.callRemote("measure")
+        m = yield self.q.callRemote("measure")
+        return [mR, m]
+
+    # This can be called by Alice to let Bob merge her large register into his larger one
+    @inlineCallbacks
+    def remote_receive_large_register(self, virtualNum, numQubits):
+        """
+        Entangles the qubit received from Alice with a fresh qubit in a register of numQubits qubits, such that the
+        smaller register of Alice is moved to this node.
+
+        Arguments
+        virtualNum	number of the virtual qubit received from Alice
+        numQubits	number of qubits in the register to create
+        """
+
+        logging.debug("LOCAL %s: Getting reference to qubit number %d.", self.node.name, virtualNum)
+        qR = yield self.virtRoot.callRemote("get_virtual_ref", virtualNum)
+        reg = yield self.virtRoot.callRemote("add_register", numQubits)
+        qubits = []
+        for _ in range(numQubits):
+            q = yield self.virtRoot.callRemote("new_qubit_inreg", reg)
+            qubits.append(q)
+        yield qR.callRemote("cnot_onto", qubits[0])
+
+        simNode = yield qR.callRemote("get_simNode")
+        (_, _, activeQ, _, _) = yield self.virtRoot.callRemote("get_register", qubits[0])
+        mR = yield qR.callRemote("measure")
+        m = yield qubits[0].callRemote("measure")
+        return simNode == "Bob" and activeQ == 2 * numQubits - 1 and mR == m
+
     # This can be called by Alice to tell Bob where to get the qubit and what corrections to apply
     @inlineCallbacks
     def remote_receive_one_qubit(self, virtualNum, cnot_direction=0):
@@ -122,7 +191,7 @@ class localNode(pb.Root):
             rho = assemble_qubit(realRho, imagRho)
             expectedRho = [[0.5, 0, 0, 0.5], [0, 0, 0, 0], [0, 0, 0, 0], [0.5, 0, 0, 0.5]]
             correct = np.all(np.isclose(rho, expectedRho))
-        elif Settings.CONF_BACKEND == "projectq":
+        elif Settings.CONF_BACKEND in ["projectq", "numpy"]:
             (realvec, imagvec) = yield self.virtRoot.callRemote("get_register_RI", qA)
             state = [r + (1j * j) for r, j in zip(realvec, imagvec)]
             expectedState = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
@@ -132,6 +201,16 @@ class localNode(pb.Root):
             state = StabilizerState(array)
             expectedState = StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]])
             correct = state == expectedState
+        elif Settings.CONF_BACKEND == "graph":
+            (edges, vops) = yield self.virtRoot.callRemote("get_register_RI", qA)
+            state = GraphState(edges, vops=vops).to_stabilizer_state()
+            expectedState = StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]])
+            correct = state == expectedState
+        elif Settings.CONF_BACKEND == "nearclifford":
+            (Re, Im) = yield self.virtRoot.callRemote("get_register_RI", qA)
+            state = NearCliffordState(Re[0], Re[1], np.array(Re[2]) + 1j * np.array(Im)).to_state_vector()
+            expectedState = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
+            correct = np.isclose(abs(np.vdot(state, expectedState)), 1)
         else:
             ValueError("Unknown backend {}".format(Settings.CONF_BACKEND))
 
@@ -139,6 +218,9 @@ class localNode(pb.Root):
 
 
 class TestMerge(unittest.TestCase):
+    # Backend settings which differ from the default ones, as keys and values of the settings file
+    backend_settings = {}
+
     @classmethod
     def setUpClass(cls):
         cls.nodes = []
@@ -148,6 +230,8 @@ class TestMerge(unittest.TestCase):
         cls.processes_to_wait_for = None
 
         Settings.default_settings()
+        for key, value in cls.backend_settings.items():
+            Settings.set_setting("BACKEND", key, value)
         nodes = ["Alice", "Bob", "Charlie"]
         cls.network = Network(nodes=nodes)
         cls.network.start()
@@ -251,7 +335,7 @@ class TestBothLocal(TestMerge):
             rho = assemble_qubit(realRho, imagRho)
             expectedRho = [[0.5, 0, 0, 0.5], [0, 0, 0, 0], [0, 0, 0, 0], [0.5, 0, 0, 0.5]]
             correct = np.all(np.isclose(rho, expectedRho))
-        elif Settings.CONF_BACKEND == "projectq":
+        elif Settings.CONF_BACKEND in ["projectq", "numpy"]:
             (realvec, imagvec, _, _, _) = yield virtRoot.callRemote("get_register", qA)
             state = [r + (1j * j) for r, j in zip(realvec, imagvec)]
             expectedState = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
@@ -261,6 +345,16 @@ class TestBothLocal(TestMerge):
             state = StabilizerState(array)
             expectedState = StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]])
             correct = state == expectedState
+        elif Settings.CONF_BACKEND == "graph":
+            (edges, vops, _, _, _) = yield virtRoot.callRemote("get_register", qA)
+            state = GraphState(edges, vops=vops).to_stabilizer_state()
+            expectedState = StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]])
+            correct = state == expectedState
+        elif Settings.CONF_BACKEND == "nearclifford":
+            (Re, Im, _, _, _) = yield virtRoot.callRemote("get_register", qA)
+            state = NearCliffordState(Re[0], Re[1], np.array(Re[2]) + 1j * np.array(Im)).to_state_vector()
+            expectedState = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
+            correct = np.isclose(abs(np.vdot(state, expectedState)), 1)
         else:
             ValueError("Unknown backend {}".format(Settings.CONF_BACKEND))
 
@@ -304,7 +398,7 @@ class TestBothLocalNotSameReg(TestBothLocal):
             rho = assemble_qubit(realRho, imagRho)
             expectedRho = [[0.5, 0, 0, 0.5], [0, 0, 0, 0], [0, 0, 0, 0], [0.5, 0, 0, 0.5]]
             correct = np.all(np.isclose(rho, expectedRho))
-        elif Settings.CONF_BACKEND == "projectq":
+        elif Settings.CONF_BACKEND in ["projectq", "numpy"]:
             (realvec, imagvec, _, _, _) = yield virtRoot.callRemote("get_register", qA)
             state = [r + (1j * j) for r, j in zip(realvec, imagvec)]
             expectedState = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
@@ -314,6 +408,16 @@ class TestBothLocalNotSameReg(TestBothLocal):
             state = StabilizerState(array)
             expectedState = StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]])
             correct = state == expectedState
+        elif Settings.CONF_BACKEND == "graph":
+            (edges, vops, _, _, _) = yield virtRoot.callRemote("get_register", qA)
+            state = GraphState(edges, vops=vops).to_stabilizer_state()
+            expectedState = StabilizerState([[1, 1, 0, 0], [0, 0, 1, 1]])
+            correct = state == expectedState
+        elif Settings.CONF_BACKEND == "nearclifford":
+            (Re, Im, _, _, _) = yield virtRoot.callRemote("get_register", qA)
+            state = NearCliffordState(Re[0], Re[1], np.array(Re[2]) + 1j * np.array(Im)).to_state_vector()
+            expectedState = [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)]
+            correct = np.isclose(abs(np.vdot(state, expectedState)), 1)
         else:
             ValueError("Unknown backend {}".format(Settings.CONF_BACKEND))
 
@@ -322,6 +426,229 @@ class TestBothLocalNotSameReg(TestBothLocal):
         reactor.stop()
 
 
+class TestSampleMeasurements(TestBothLocal):
+    @classmethod
+    @inlineCallbacks
+    def alice(cls, qReg, virtRoot, myName, classicalNet, send_end):
+        """
+        Code to execute for the local client node. Called if all connections are established.
+
+        Arguments
+        qReg		quantum register (twisted object supporting remote method calls)
+        virtRoot	virtual quantum ndoe (twisted object supporting remote method calls)
+        myName		name of this node (string)
+        classicalNet	servers in the classical communication network (dictionary of hosts)
+        """
+
+        logging.debug("LOCAL %s: Runing client side program.", myName)
+
+        # Create 2 qubits
+        qA = yield virtRoot.callRemote("new_qubit_inreg", qReg)
+        qB = yield virtRoot.callRemote("new_qubit_inreg", qReg)
+
+        # Put qubits A and B in an EPR state
+        yield qA.callRemote("apply_H")
+        yield qA.callRemote("cnot_onto", qB)
+
+        if Settings.CONF_BACKEND == "nearclifford":
+            # Sampling is not supported by the near Clifford backend, which needs to report this as an error
+            try:
+                yield virtRoot.callRemote("sample_measurements", [qA, qB], 100)
+                correct = False
+            except Exception as err:
+                correct = "not supported" in str(err)
+        else:
+            outcomes = yield virtRoot.callRemote("sample_measurements", [qA, qB], 100)
+            correct = len(outcomes) == 100
+            correct = correct and all(mA == mB for mA, mB in outcomes)
+            correct = correct and len(set(mA for mA, _ in outcomes)) == 2
+
+            # The qubits are not measured
+            (realvec, _) = yield virtRoot.callRemote("get_register_RI", qA)
+            correct = correct and len(realvec) > 0
+
+        send_end.send(correct)
+
+        reactor.stop()
+
+
+class TestSampleAfterMeasurement(TestBothLocal):
+    backend_settings = {"factorize_registers": "on"}
+
+    @classmethod
+    @inlineCallbacks
+    def alice(cls, qReg, virtRoot, myName, classicalNet, send_end):
+        """
+        Code to execute for the local client node. Called if all connections are established.
+
+        Arguments
+        qReg		quantum register (twisted object supporting remote method calls)
+        virtRoot	virtual quantum ndoe (twisted object supporting remote method calls)
+        myName		name of this node (string)
+        classicalNet	servers in the classical communication network (dictionary of hosts)
+        """
+
+        logging.debug("LOCAL %s: Runing client side program.", myName)
+
+        # Create two EPR pairs A, B and C, D and a qubit E holding the parity of B and C
+        qubits = []
+        for _ in range(5):
+            q = yield virtRoot.callRemote("new_qubit_inreg", qReg)
+            qubits.append(q)
+        qA, qB, qC, qD, qE = qubits
+        yield qA.callRemote("apply_H")
+        yield qA.callRemote("cnot_onto", qB)
+        yield qC.callRemote("apply_H")
+        yield qC.callRemote("cnot_onto", qD)
+        yield qB.callRemote("cnot_onto", qE)
+        yield qC.callRemote("cnot_onto", qE)
+
+        # Measuring E in the X basis leaves the two EPR pairs in a product, which may be split into two registers
+        yield qE.callRemote("apply_H")
+        yield qE.callRemote("measure")
+
+        if Settings.CONF_BACKEND == "nearclifford":
+            # Sampling is not supported by the near Clifford backend, which needs to report this as an error
+            try:
+                yield virtRoot.callRemote("sample_measurements", [qA, qC, qB, qD], 200)
+                correct = False
+            except Exception as err:
+                correct = "not supported" in str(err)
+        else:
+            outcomes = yield virtRoot.callRemote("sample_measurements", [qA, qC, qB, qD], 200)
+            correct = len(outcomes) == 200
+            correct = correct and all(mA == mB and mC == mD for mA, mC, mB, mD in outcomes)
+            correct = correct and len(set((mA, mC) for mA, mC, _, _ in outcomes)) == 4
+
+        send_end.send(correct)
+
+        reactor.stop()
+
+
+class TestFactorizeAfterMeasurement(TestBothLocal):
+    backend_settings = {"factorize_registers": "on"}
+
+    @classmethod
+    @inlineCallbacks
+    def alice(cls, qReg, virtRoot, myName, classicalNet, send_end):
+        """
+        Code to execute for the local client node. Called if all connections are established.
+
+        Arguments
+        qReg		quantum register (twisted object supporting remote method calls)
+        virtRoot	virtual quantum ndoe (twisted object supporting remote method calls)
+        myName		name of this node (string)
+        classicalNet	servers in the classical communication network (dictionary of hosts)
+        """
+
+        logging.debug("LOCAL %s: Runing client side program.", myName)
+
+        # Measuring a qubit in its own register leaves an empty register for reuse
+        qF = yield virtRoot.callRemote("new_qubit")
+        yield qF.callRemote("measure")
+        poolBefore = yield virtRoot.callRemote("get_register_pool_stats")
+
+        # Create two EPR pairs A, B and C, D and a qubit E holding the parity of B and C
+        qubits = []
+        for _ in range(5):
+            q = yield virtRoot.callRemote("new_qubit_inreg", qReg)
+            qubits.append(q)
+        qA, qB, qC, qD, qE = qubits
+        yield qA.callRemote("apply_H")
+        yield qA.callRemote("cnot_onto", qB)
+        yield qC.callRemote("apply_H")
+        yield qC.callRemote("cnot_onto", qD)
+        yield qB.callRemote("cnot_onto", qE)
+        yield qC.callRemote("cnot_onto", qE)
+        (_, _, activeQ, regNum, _) = yield virtRoot.callRemote("get_register", qA)
+        correct = activeQ == 5
+
+        # Measuring E in the X basis leaves the two EPR pairs in a product, so C and D are moved to the register
+        # left by F and are renumbered
+        yield qE.callRemote("apply_H")
+        yield qE.callRemote("measure")
+        details = []
+        for q in [qA, qB, qC, qD]:
+            (_, _, activeQ, qRegNum, qubitNum) = yield virtRoot.callRemote("get_register", q)
+            details.append((activeQ, qRegNum, qubitNum))
+        correct = correct and details[0] == (2, regNum, 0) and details[1] == (2, regNum, 1)
+        correct = correct and details[2][1] != regNum and details[2][0] == 2 and details[2][1] == details[3][1]
+        correct = correct and [details[2][2], details[3][2]] == [0, 1]
+        poolAfter = yield virtRoot.callRemote("get_register_pool_stats")
+        correct = correct and poolAfter["hits"] == poolBefore["hits"] + 1
+
+        # The qubits can still be used, also together with the ones in the other register
+        yield qB.callRemote("cnot_onto", qC)
+        mA = yield qA.callRemote("measure")
+        mB = yield qB.callRemote("measure")
+        mC = yield qC.callRemote("measure")
+        mD = yield qD.callRemote("measure")
+        correct = correct and mA == mB and mC == mD ^ mB
+
+        send_end.send(bool(correct))
+
+        reactor.stop()
+
+
+class TestFactorizeNearClifford(TestBothLocal):
+    backend_settings = {"backend": "nearclifford", "factorize_registers": "on"}
+
+    @classmethod
+    @inlineCallbacks
+    def alice(cls, qReg, virtRoot, myName, classicalNet, send_end):
+        """
+        Code to execute for the local client node. Called if all connections are established.
+
+        Arguments
+        qReg		quantum register (twisted object supporting remote method calls)
+        virtRoot	virtual quantum ndoe (twisted object supporting remote method calls)
+        myName		name of this node (string)
+        classicalNet	servers in the classical communication network (dictionary of hosts)
+        """
+
+        logging.debug("LOCAL %s: Runing client side program.", myName)
+
+        # Put A in T H|0>, B, C and D in a GHZ state and E in |+>
+        qubits = []
+        for _ in range(5):
+            q = yield virtRoot.callRemote("new_qubit_inreg", qReg)
+            qubits.append(q)
+        qA, qB, qC, qD, qE = qubits
+        yield qA.callRemote("apply_H")
+        yield qA.callRemote("apply_T")
+        yield qB.callRemote("apply_H")
+        yield qB.callRemote("cnot_onto", qC)
+        yield qC.callRemote("cnot_onto", qD)
+        yield qE.callRemote("apply_H")
+        (_, _, activeQ, regNum, _) = yield virtRoot.callRemote("get_register", qA)
+        correct = activeQ == 5
+
+        # Measuring E has a random outcome, after which A, on which the terms differ, is moved out of the register
+        # of the larger GHZ state
+        yield qE.callRemote("measure")
+        details = []
+        for q in [qA, qB, qC, qD]:
+            (_, _, activeQ, qRegNum, qubitNum) = yield virtRoot.callRemote("get_register", q)
+            details.append((activeQ, qRegNum, qubitNum))
+        correct = correct and details[0][0] == 1 and details[0][1] != regNum and details[0][2] == 0
+        correct = correct and details[1:] == [(3, regNum, 0), (3, regNum, 1), (3, regNum, 2)]
+
+        (Re, Im, _, _, _) = yield virtRoot.callRemote("get_register", qA)
+        state = NearCliffordState(Re[0], Re[1], np.array(Re[2]) + 1j * np.array(Im)).to_state_vector()
+        expectedState = [1 / np.sqrt(2), np.exp(1j * np.pi / 4) / np.sqrt(2)]
+        correct = correct and np.isclose(abs(np.vdot(state, expectedState)), 1)
+
+        # The GHZ state is left intact
+        mB = yield qB.callRemote("measure")
+        mC = yield qC.callRemote("measure")
+        mD = yield qD.callRemote("measure")
+        correct = correct and mB == mC == mD
+
+        send_end.send(bool(correct))
+
+        reactor.stop()
+
+
 class TestBothRemote(TestMerge):
     @classmethod
     def setUpClass(cls):
@@ -584,5 +911,96 @@ class TestRemoteBtoA(TestBothRemoteSameNodeDiffReg):
         reactor.stop()
 
 
+class TestMergeSmallerRegister(TestBothRemoteSameNodeDiffReg):
+    @staticmethod
+    @inlineCallbacks
+    def alice(qReg, virtRoot, myName, classicalNet, send_end):
+        """
+        Code to execute for the local client node. Called if all connections are established.
+
+        Arguments
+        qReg		quantum register (twisted object supporting remote method calls)
+        virtRoot	virtual quantum ndoe (twisted object supporting remote method calls)
+        myName		name of this node (string)
+        classicalNet	servers in the classical communication network (dictionary of hosts)
+        """
+
+        logging.debug("LOCAL %s: Runing client side program.", myName)
+
+        # Create a GHZ state of 3 qubits
+        qubits = []
+        for _ in range(3):
+            q = yield virtRoot.callRemote("new_qubit_inreg", qReg)
+            qubits.append(q)
+        qA, qB, qC = qubits
+        yield qA.callRemote("apply_H")
+        yield qA.callRemote("cnot_onto", qB)
+        yield qA.callRemote("cnot_onto", qC)
+        (_, _, _, regNum, _) = yield virtRoot.callRemote("get_register", qB)
+
+        # Let Bob entangle qubit A, which we still simulate, with a fresh qubit in a register of one qubit at Bob
+        remoteNum = yield virtRoot.callRemote("send_qubit", qA, "Bob")
+        bob = classicalNet.hostDict["Bob"]
+        correct = yield bob.root.callRemote("merge_with_larger", remoteNum)
+
+        # The qubit of Bob was moved to our register, which stayed here
+        (_, _, activeQ, newRegNum, _) = yield virtRoot.callRemote("get_register", qB)
+        correct = correct and activeQ == 4 and newRegNum == regNum
+
+        # All four qubits are in a GHZ state
+        outcomes = yield bob.root.callRemote("measure_merged")
+        mB = yield qB.callRemote("measure")
+        mC = yield qC.callRemote("measure")
+        correct = correct and len(set(outcomes + [mB, mC])) == 1
+
+        send_end.send(bool(correct))
+
+        reactor.stop()
+
+
+class TestCompressedMerge(TestBothRemoteSameNodeDiffReg):
+    # A near Clifford register with many terms is large enough to be compressed and sent in several pages, while the
+    # merged register stays small
+    backend_settings = {"backend": "nearclifford", "compress_merges": "True"}
+    num_qubits = 11
+
+    @classmethod
+    @inlineCallbacks
+    def alice(cls, qReg, virtRoot, myName, classicalNet, send_end):
+        """
+        Code to execute for the local client node. Called if all connections are established.
+
+        Arguments
+        qReg		quantum register (twisted object supporting remote method calls)
+        virtRoot	virtual quantum ndoe (twisted object supporting remote method calls)
+        myName		name of this node (string)
+        classicalNet	servers in the classical communication network (dictionary of hosts)
+        """
+
+        logging.debug("LOCAL %s: Runing client side program.", myName)
+
+        # Apply H and T to each qubit, giving 2^11 terms which take up more than 64 KiB
+        reg = yield virtRoot.callRemote("add_register", cls.num_qubits)
+        qubits = []
+        for _ in range(cls.num_qubits):
+            q = yield virtRoot.callRemote("new_qubit_inreg", reg)
+            yield q.callRemote("apply_H")
+            yield q.callRemote("apply_T")
+            qubits.append(q)
+
+        # Bob entangles the first qubit with his larger register, to which our register is moved
+        remoteNum = yield virtRoot.callRemote("send_qubit", qubits[0], "Bob")
+        bob = classicalNet.hostDict["Bob"]
+        correct = yield bob.root.callRemote("receive_large_register", remoteNum, cls.num_qubits + 1)
+
+        # Our other qubits are now simulated by Bob
+        simNode = yield qubits[1].callRemote("get_simNode")
+        correct = correct and simNode == "Bob"
+
+        send_end.send(bool(correct))
+
+        reactor.stop()
+
+
 if __name__ == '__main__':
     unittest.main()
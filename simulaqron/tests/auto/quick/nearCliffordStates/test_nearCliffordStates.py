@@ -0,0 +1,301 @@
+import unittest
+import random
+import numpy as np
+
+from simulaqron.toolbox.nearCliffordStates import NearCliffordState
+from simulaqron.toolbox.stabilizerStates import StabilizerState
+
+_GATES = {
+    "X": np.array([[0, 1], [1, 0]], dtype=complex),
+    "Y": np.array([[0, -1j], [1j, 0]], dtype=complex),
+    "Z": np.array([[1, 0], [0, -1]], dtype=complex),
+    "H": np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2),
+    "K": np.array([[1, -1j], [1j, -1]], dtype=complex) / np.sqrt(2),
+    "S": np.array([[1, 0], [0, 1j]], dtype=complex),
+    "T": np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex),
+    "CNOT": np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]], dtype=complex),
+    "CZ": np.diag([1, 1, 1, -1]).astype(complex),
+}
+
+
+def apply_dense(vector, matrix, positions):
+    """
+    Applies a gate on the qubits 'positions' to a state vector where the first qubit is the most significant
+    """
+    n = int(np.log2(len(vector)))
+    k = len(positions)
+    tensor = np.moveaxis(vector.reshape([2] * n), positions, range(k))
+    tensor = np.dot(matrix, tensor.reshape(2 ** k, -1)).reshape([2] * n)
+    return np.moveaxis(tensor, range(k), positions).reshape(-1)
+
+
+def random_unitary(k):
+    q, r = np.linalg.qr(np.random.randn(2 ** k, 2 ** k) + 1j * np.random.randn(2 ** k, 2 ** k))
+    return q * (np.diag(r) / np.abs(np.diag(r)))
+
+
+class TestNearCliffordStates(unittest.TestCase):
+    def assertSameState(self, state, vector):
+        self.assertAlmostEqual(abs(np.vdot(state.to_state_vector(), vector)), 1)
+
+    def test_init(self):
+        s = NearCliffordState()
+        self.assertEqual(s.num_qubits, 0)
+        self.assertEqual(s.num_terms, 1)
+
+        s = NearCliffordState(3)
+        self.assertEqual(len(s), 3)
+        self.assertSameState(s, np.eye(8)[0])
+
+        # (X + Z)|0> / sqrt(2) = H|0>
+        s = NearCliffordState([[0, 1]], paulis=[[1, 0], [0, 0]], coefficients=[1, 1])
+        self.assertSameState(s, np.ones(2) / np.sqrt(2))
+
+        # Terms which describe the same state are merged
+        s = NearCliffordState(["XX", "ZZ"], paulis=[[0, 0, 0, 0], [1, 1, 0, 0], [1, 0, 0, 0]])
+        self.assertEqual(s.num_terms, 2)
+
+    def test_faulty_init(self):
+        with self.assertRaises(ValueError):
+            NearCliffordState(2, paulis=[[0, 0]])
+
+        with self.assertRaises(ValueError):
+            NearCliffordState(1, paulis=[[0, 0], [1, 0]], coefficients=[1])
+
+        # Z|0> - |0> = 0
+        with self.assertRaises(ValueError):
+            NearCliffordState(1, paulis=[[0, 1], [0, 0]], coefficients=[1, -1])
+
+    def test_clifford_gates(self):
+        for _ in range(20):
+            n = random.randint(1, 4)
+            s = NearCliffordState(n)
+            vector = np.eye(2 ** n)[0]
+            for _ in range(20):
+                gate = random.choice(["X", "Y", "Z", "H", "K", "S", "CNOT", "CZ"])
+                if gate in ["CNOT", "CZ"]:
+                    if n == 1:
+                        continue
+                    positions = random.sample(range(n), 2)
+                else:
+                    positions = [random.randrange(n)]
+                getattr(s, "apply_{}".format(gate))(*positions)
+                vector = apply_dense(vector, _GATES[gate], positions)
+                self.assertEqual(s.num_terms, 1)
+            self.assertSameState(s, vector)
+
+    def test_non_clifford_gates(self):
+        for _ in range(20):
+            n = random.randint(1, 4)
+            s = NearCliffordState(n)
+            vector = np.eye(2 ** n)[0]
+            for _ in range(15):
+                gate = random.choice(["H", "S", "CNOT", "T", "rotation", "single", "two"])
+                position = random.randrange(n)
+                if gate in ["CNOT", "two"] and n == 1:
+                    continue
+                if gate == "rotation":
+                    axis = np.random.randn(3)
+                    angle = random.uniform(0, 2 * np.pi)
+                    s.apply_rotation(position, axis, angle)
+                    axis = axis / np.linalg.norm(axis)
+                    generator = sum(a * _GATES[p] for a, p in zip(axis, ["X", "Y", "Z"]))
+                    matrix = np.cos(angle / 2) * np.identity(2) - 1j * np.sin(angle / 2) * generator
+                    vector = apply_dense(vector, matrix, [position])
+                elif gate == "single":
+                    matrix = random_unitary(1)
+                    s.apply_single_qubit_gate(position, matrix)
+                    vector = apply_dense(vector, matrix, [position])
+                elif gate == "two":
+                    positions = random.sample(range(n), 2)
+                    matrix = random_unitary(2)
+                    s.apply_two_qubit_gate(*positions, matrix)
+                    vector = apply_dense(vector, matrix, positions)
+                elif gate == "CNOT":
+                    positions = random.sample(range(n), 2)
+                    s.apply_CNOT(*positions)
+                    vector = apply_dense(vector, _GATES[gate], positions)
+                else:
+                    getattr(s, "apply_{}".format(gate))(position)
+                    vector = apply_dense(vector, _GATES[gate], [position])
+                self.assertLessEqual(s.num_terms, 2 ** n)
+            self.assertSameState(s, vector)
+
+    def test_T_doubles_terms(self):
+        s = NearCliffordState(3)
+        # T on |0> only gives a phase
+        s.apply_T(0)
+        self.assertEqual(s.num_terms, 1)
+        for i in range(3):
+            s.apply_H(i)
+            s.apply_T(i)
+        self.assertEqual(s.num_terms, 8)
+
+    def test_single_qubit_clifford(self):
+        s = NearCliffordState(1)
+        s.apply_single_qubit_gate(0, _GATES["H"] * 1j)
+        s.apply_single_qubit_gate(0, np.dot(_GATES["S"], _GATES["K"]))
+        self.assertEqual(s.num_terms, 1)
+        self.assertSameState(s, np.dot(_GATES["S"], np.dot(_GATES["K"], np.ones(2) / np.sqrt(2))))
+
+    def test_measure(self):
+        for _ in range(50):
+            n = random.randint(1, 4)
+            s = NearCliffordState(n)
+            vector = np.eye(2 ** n)[0]
+            for _ in range(10):
+                gate = random.choice(["H", "CNOT", "T"])
+                if gate == "CNOT":
+                    if n == 1:
+                        continue
+                    positions = random.sample(range(n), 2)
+                else:
+                    positions = [random.randrange(n)]
+                getattr(s, "apply_{}".format(gate))(*positions)
+                vector = apply_dense(vector, _GATES[gate], positions)
+            position = random.randrange(n)
+            outcome = s.measure(position, inplace=True)
+            projector = np.diag([1 - outcome, outcome])
+            vector = apply_dense(vector, projector, [position])
+            self.assertGreater(np.linalg.norm(vector), 1e-6)
+            vector /= np.linalg.norm(vector)
+            self.assertSameState(s, vector)
+
+            # Remove the qubit, which is now in the state |outcome>
+            s.measure(position)
+            vector = np.take(vector.reshape([2] * n), outcome, axis=position).reshape(-1)
+            self.assertEqual(len(s), n - 1)
+            self.assertSameState(s, vector)
+
+    def test_measure_statistics(self):
+        # H T H|0> gives the outcome 1 with probability (1 - cos(pi / 4)) / 2 and Rx(a)|0> with sin(a / 2)^2
+        for prepare, probability in [
+            (lambda s: [s.apply_H(0), s.apply_T(0), s.apply_H(0)], (1 - np.cos(np.pi / 4)) / 2),
+            (lambda s: s.apply_rotation(0, (1, 0, 0), 1), np.sin(0.5) ** 2),
+        ]:
+            shots = 1000
+            ones = 0
+            for _ in range(shots):
+                s = NearCliffordState(1)
+                prepare(s)
+                ones += s.measure(0)
+            self.assertAlmostEqual(ones / shots, probability, delta=5 * np.sqrt(probability / shots))
+
+    def test_many_qubits(self):
+        # A GHZ state on many qubits with a few T gates stays tractable
+        n = 200
+        s = NearCliffordState(n)
+        s.apply_H(0)
+        for i in range(n - 1):
+            s.apply_CNOT(i, i + 1)
+        for i in range(0, n, 40):
+            s.apply_H(i)
+            s.apply_T(i)
+        self.assertEqual(s.num_terms, 2 ** 5)
+        s.measure(0)
+        self.assertEqual(len(s), n - 1)
+
+    def test_absorb(self):
+        s1 = NearCliffordState(1)
+        s1.apply_H(0)
+        s1.apply_T(0)
+        s2 = NearCliffordState(StabilizerState(["XX", "ZZ"]))
+        s2.apply_rotation(1, (0, 1, 0), 0.3)
+        vector = np.kron(s1.to_state_vector(), s2.to_state_vector())
+        s3 = s1 * s2
+        self.assertEqual(s3.num_terms, s1.num_terms * s2.num_terms)
+        self.assertSameState(s3, vector)
+        s1.absorb(s2)
+        self.assertSameState(s1, vector)
+        self.assertEqual(len(s1), 3)
+
+    def test_split(self):
+        s = NearCliffordState(StabilizerState(["XXI", "ZZI", "IIZ"]))
+        s.apply_H(2)
+        self.assertEqual(s.find_partition(), [[0, 1], [2]])
+        s.apply_T(1)
+        s.apply_T(2)
+        self.assertEqual(s.find_partition(), [[0, 1, 2]])
+
+        s = NearCliffordState(StabilizerState(["XIX", "IZI", "ZIZ"]))
+        s.apply_T(1)
+        s.apply_rotation(1, (1, 0, 0), 0.4)
+        self.assertEqual(s.find_partition(), [[0, 2], [1]])
+        vector = s.to_state_vector().reshape(2, 2, 2)
+        removed = s.split([0, 2])
+        self.assertEqual(len(s), 1)
+        self.assertSameState(removed, np.array([1, 0, 0, 1]) / np.sqrt(2))
+        self.assertSameState(s, vector[0, :, 0] / np.linalg.norm(vector[0, :, 0]))
+        with self.assertRaises(ValueError):
+            NearCliffordState(StabilizerState(["XX", "ZZ"])).split([0])
+        s = NearCliffordState(2)
+        s.apply_H(0)
+        s.apply_T(0)
+        removed = s.split([0])
+        self.assertSameState(removed, np.array([1, np.exp(1j * np.pi / 4)]) / np.sqrt(2))
+        self.assertSameState(s, np.array([1, 0]))
+
+        # All terms apply X to qubit 2, which is applied to the removed qubit
+        paulis = [[0, 0, 1, 1, 0, 0], [0, 0, 1, 0, 0, 0]]
+        s = NearCliffordState(StabilizerState(["XXI", "ZZI", "IIZ"]), paulis, [0.6, 0.8j])
+        self.assertEqual(s.find_partition(), [[0, 1], [2]])
+        removed = s.split([2])
+        self.assertSameState(removed, np.array([0, 1]))
+        self.assertSameState(s, np.array([0.6 + 0.8j, 0, 0, -0.6 + 0.8j]) / np.sqrt(2))
+
+        # The terms differ on qubit 0 only, which is moved out of the larger Clifford block, also if the other
+        # qubits keep a shared Pauli
+        s = NearCliffordState(4)
+        s.apply_H(0)
+        s.apply_T(0)
+        s.apply_H(1)
+        s.apply_CNOT(1, 2)
+        s.apply_CNOT(2, 3)
+        generators, paulis, coefficients = s.to_lists()
+        for pauli in paulis:
+            pauli[3] = 1
+        s = NearCliffordState(generators, paulis, coefficients)
+        self.assertEqual(s.find_partition(), [[0], [1, 2, 3]])
+        removed = s.split([0])
+        self.assertEqual(len(s), 3)
+        self.assertSameState(removed, np.array([1, np.exp(1j * np.pi / 4)]) / np.sqrt(2))
+        self.assertSameState(s, np.array([0, 1, 0, 0, 0, 0, 1, 0]) / np.sqrt(2))
+        self.assertEqual(s.num_terms, 1)
+        s = NearCliffordState(4)
+        s.apply_H(0)
+        s.apply_T(0)
+        s.apply_H(1)
+        s.apply_CNOT(1, 2)
+        s.apply_CNOT(2, 3)
+        removed = s.split([1, 2, 3])
+        self.assertSameState(removed, np.array([1, 0, 0, 0, 0, 0, 0, 1]) / np.sqrt(2))
+        self.assertSameState(s, np.array([1, np.exp(1j * np.pi / 4)]) / np.sqrt(2))
+        s = NearCliffordState(2)
+        s.apply_H(0)
+        s.apply_T(0)
+        s.apply_H(1)
+        s.apply_T(1)
+        with self.assertRaises(ValueError):
+            s.split([0])
+
+    def test_has_random_outcome(self):
+        s = NearCliffordState(2)
+        s.apply_T(0)
+        s.apply_rotation(1, (1, 0, 0), 0.4)
+        self.assertEqual([s.has_random_outcome(0), s.has_random_outcome(1)], [False, True])
+        s.apply_H(0)
+        self.assertTrue(s.has_random_outcome(0))
+
+    def test_to_lists(self):
+        s = NearCliffordState(2)
+        s.apply_H(0)
+        s.apply_T(0)
+        s.apply_CNOT(0, 1)
+        s.apply_rotation(1, (1, 1, 0), 0.7)
+        generators, paulis, coefficients = s.to_lists()
+        s2 = NearCliffordState(generators, paulis, coefficients)
+        self.assertSameState(s2, s.to_state_vector())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -108,6 +108,38 @@ class TestStabilizerStates(unittest.TestCase):
         self.assertEqual(s.num_qubits, 2)
         self.assertTrue(s == z0.tensor_product(z0))
 
+    def test_add_many_qubits(self):
+        n = 150
+        s = StabilizerState()
+        for i in range(n):
+            s.add_qubit()
+            s.apply_H(i)
+        self.assertEqual(s.num_qubits, n)
+        ref = StabilizerState(n)
+        for i in range(n):
+            ref.apply_H(i)
+        self.assertTrue(s == ref)
+
+    def test_absorb(self):
+        # Absorb states such that the generators of the absorbed states do not start at a new word
+        s = StabilizerState(["XX", "ZZ"])
+        parts = [StabilizerState(s)]
+        for n in [1, 70, 3, 65]:
+            other = StabilizerState(n)
+            other.apply_X(n - 1)
+            s.absorb(other)
+            parts.append(other)
+        self.assertEqual(s.num_qubits, 141)
+        ref = StabilizerState()
+        for part in parts:
+            ref = ref * StabilizerState(part.to_array())
+        self.assertTrue(s == ref)
+        self.assertEqual(s.measure(0), s.measure(0))
+        for n in [1, 70, 3, 65]:
+            for _ in range(n - 1):
+                self.assertEqual(s.measure(0), 0)
+            self.assertEqual(s.measure(0), 1)
+
     def test_eq(self):
         state1 = StabilizerState([[0, 1]])
         state2 = StabilizerState([[0, 1]])
@@ -135,6 +167,48 @@ class TestStabilizerStates(unittest.TestCase):
 
         self.assertTrue(s1 == s2)
 
+    def test_to_array_many_qubits(self):
+        # More than 64 qubits such that the generators are spread over multiple words
+        n = 70
+        G = nx.cycle_graph(n)
+        graph_state = StabilizerState(G)
+        array = graph_state.to_array()
+        self.assertEqual(array.shape, (n, 2 * n + 1))
+        self.assertTrue(np.array_equal(array[:, :n], np.identity(n, dtype=bool)))
+        self.assertTrue(np.array_equal(array[:, n:-1], nx.to_numpy_array(G, dtype=bool)))
+        self.assertFalse(array[:, -1].any())
+
+        for i in range(n):
+            graph_state.apply_H(i)
+            graph_state.apply_Z(i)
+        self.assertTrue(graph_state == StabilizerState(graph_state.to_array()))
+
+    def test_to_bytes(self):
+        # States with and without destabilizers, spread over multiple words and with reserved capacity
+        s1 = StabilizerState([[0, 0, 1, 0, 0], [0, 0, 0, 1, 1]])
+        s2 = StabilizerState(nx.cycle_graph(70))
+        s3 = StabilizerState(3)
+        for _ in range(70):
+            s3.add_qubit()
+        s3.apply_H(0)
+        s3.apply_CNOT(0, 72)
+        for s in [StabilizerState(), s1, s2, s3]:
+            s_copy = StabilizerState.from_bytes(s.to_bytes())
+            self.assertTrue(s == s_copy)
+            self.assertEqual(len(s_copy.to_bytes()), len(s.to_bytes()))
+
+        s_copy = StabilizerState.from_bytes(s3.to_bytes())
+        self.assertEqual(s_copy.measure(0, inplace=True), s_copy.measure(72))
+        s_copy.absorb(s1)
+        self.assertEqual(len(s_copy), 74)
+
+    def test_from_bytes_faulty(self):
+        data = StabilizerState(3).to_bytes()
+        with self.assertRaises(ValueError):
+            StabilizerState.from_bytes(data[:-8])
+        with self.assertRaises(ValueError):
+            StabilizerState.from_bytes(data[:-1])
+
     def test_tensor_product(self):
         s1 = StabilizerState([[0, 1]])  # The state |0>
         s2 = StabilizerState([[0, 1]])  # The state |0>
@@ -175,6 +249,23 @@ class TestStabilizerStates(unittest.TestCase):
         S.put_in_standard_form()
         self.assertTrue(np.array_equal(S.to_array(), StabilizerState(["+1XZZ", "-1ZYZ", "-1ZZY"]).to_array()))
 
+    def test_gaussian_elimination_many_qubits(self):
+        n = 100
+        GHZ = StabilizerState(n)
+        GHZ.apply_H(0)
+        for i in range(1, n):
+            GHZ.apply_CNOT(0, i)
+        GHZ.apply_Y(0)
+        # The standard form is -X...X, -Z_0 Z_{n-1} and Z_i Z_{n-1} for i = 1, ..., n - 2
+        ref = np.zeros(shape=(n, 2 * n + 1), dtype=bool)
+        ref[0, :n] = True
+        ref[0, -1] = True
+        for i in range(n - 1):
+            ref[i + 1, n + i] = True
+            ref[i + 1, 2 * n - 1] = True
+        ref[1, -1] = True
+        self.assertTrue(np.array_equal(GHZ.to_array(standard_form=True), ref))
+
     def test_apply_Pauli(self):
         s1 = StabilizerState([[0, 1]])
         s2 = StabilizerState([[0, 1, 1]])
@@ -250,6 +341,38 @@ class TestStabilizerStates(unittest.TestCase):
         self.assertFalse(s1 == s3)
         self.assertTrue(s3 == s4)
 
+    def test_standard_form_cache(self):
+        s = StabilizerState(["XX", "ZZ"])
+        self.assertTrue(s == StabilizerState(["XX", "ZZ"]))
+
+        # Changing the returned array does not affect the state
+        group = s.to_array(standard_form=True)
+        group[:] = False
+        self.assertTrue(s == StabilizerState(["XX", "ZZ"]))
+
+        # The cached standard form is updated when the state changes
+        operations = [
+            (lambda t: t.apply_X(0), ["+1XX", "-1ZZ"]),
+            (lambda t: t.apply_H(1), ["+1XZ", "-1ZX"]),
+            (lambda t: t.apply_circuit([("H", 1)]), ["+1XX", "-1ZZ"]),
+            (lambda t: t.apply_CNOT(0, 1), ["+1XI", "-1IZ"]),
+            (lambda t: t.add_qubit(), ["+1XII", "-1IZI", "+1IIZ"]),
+            (lambda t: t.absorb(StabilizerState(["X"])), ["+1XIII", "-1IZII", "+1IIZI", "+1IIIX"]),
+            (lambda t: t.measure(0), ["-1ZII", "+1IZI", "+1IIX"]),
+        ]
+        for operation, generators in operations:
+            operation(s)
+            self.assertTrue(s == StabilizerState(generators))
+            copy = StabilizerState(s)
+            self.assertTrue(copy == s)
+            self.assertTrue(np.array_equal(copy.to_array(standard_form=True), s.to_array(standard_form=True)))
+
+        # Putting the state in standard form does not change the state
+        s.put_in_standard_form()
+        self.assertTrue(np.array_equal(s.to_array(), s.to_array(standard_form=True)))
+        s.apply_X(0)
+        self.assertTrue(s == StabilizerState(["+1ZII", "+1IZI", "+1IIX"]))
+
     def test_apply_CNOT(self):
 
         # Classical CNOT
@@ -306,6 +429,47 @@ class TestStabilizerStates(unittest.TestCase):
         z0z0.apply_CZ(0, 1)
         self.assertTrue(z0z0 == graph_state)
 
+    def test_apply_circuit(self):
+        s = StabilizerState(3)
+        s.apply_circuit([("H", 0), ("CNOT", 0, 1), ("CNOT", 1, 2), ("Z", 2)])
+        self.assertTrue(s == StabilizerState(["-1XXX", "+1ZZI", "+1IZZ"]))
+
+        # The same circuit as an integer array
+        opcodes = StabilizerState.gate2opcode
+        s = StabilizerState(3)
+        s.apply_circuit(
+            np.array([[opcodes["H"], 0, -1], [opcodes["CNOT"], 0, 1], [opcodes["CNOT"], 1, 2], [opcodes["Z"], 2, -1]])
+        )
+        self.assertTrue(s == StabilizerState(["-1XXX", "+1ZZI", "+1IZZ"]))
+
+    def test_apply_circuit_many_qubits(self):
+        n = 130
+        circuit = []
+        for i in range(n):
+            circuit += [("H", i), ("S", i), ("K", (i + 1) % n), ("Y", i)]
+            circuit += [("CNOT", i, (i + 7) % n), ("CZ", (i + 3) % n, i), ("X", (i + 5) % n)]
+        s1 = StabilizerState(n)
+        s1.apply_circuit(circuit)
+        s2 = StabilizerState(n)
+        for gate, *qubits in circuit:
+            getattr(s2, "apply_{}".format(gate))(*qubits)
+        self.assertTrue(np.array_equal(s1.to_array(), s2.to_array()))
+
+    def test_apply_circuit_faulty(self):
+        s = StabilizerState(2)
+        with self.assertRaises(ValueError):
+            s.apply_circuit([("T", 0)])
+        with self.assertRaises(ValueError):
+            s.apply_circuit([("H", 0), ("H", 2)])
+        with self.assertRaises(ValueError):
+            s.apply_circuit([("CNOT", 0, 0)])
+        with self.assertRaises(ValueError):
+            s.apply_circuit([("CZ", 0, 2)])
+        with self.assertRaises(ValueError):
+            s.apply_circuit(np.array([[8, 0, -1]]))
+        # Nothing should have been applied
+        self.assertTrue(s == StabilizerState(2))
+
     def test_measure(self):
         for _ in range(20):
             z0 = StabilizerState([[0, 1]])
@@ -335,6 +499,35 @@ class TestStabilizerStates(unittest.TestCase):
             outcomes.append(x0.measure(0))
         self.assertTrue(80 <= sum(outcomes) <= 120)
 
+    def test_measure_deterministic(self):
+        # Qubit 2 is in |0>, while qubit 0 and 1 are in the -1 eigenstate of Y
+        s = StabilizerState(["-1YIII", "-1IYII", "+1IIZI", "-1IIZX"])
+        for position, inplace in [(2, True), (2, False)]:
+            m = s.measure(position, inplace=inplace)
+            self.assertEqual(m, 0)
+        self.assertTrue(s == StabilizerState(["-1YII", "-1IYI", "-1IIX"]))
+
+    def test_measure_removes_qubit(self):
+        for _ in range(20):
+            s = StabilizerState(["XXI", "ZZI", "IIZ"])
+            s.apply_X(2)
+            m = s.measure(1)
+            if m == 0:
+                self.assertTrue(s == StabilizerState(["+1ZI", "-1IZ"]))
+            else:
+                self.assertTrue(s == StabilizerState(["-1ZI", "-1IZ"]))
+
+    def test_measure_many_qubits(self):
+        n = 200
+        GHZ = StabilizerState(n)
+        GHZ.apply_H(0)
+        for i in range(1, n):
+            GHZ.apply_CNOT(0, i)
+        m = GHZ.measure(n // 2, inplace=True)
+        outcomes = [GHZ.measure(0) for _ in range(n)]
+        self.assertEqual(outcomes, [m] * n)
+        self.assertEqual(GHZ.num_qubits, 0)
+
     def test_GHZ(self):
         n = 5
         for _ in range(20):
@@ -345,6 +538,96 @@ class TestStabilizerStates(unittest.TestCase):
             outcomes = [GHZ.measure(0) for _ in range(n)]
             self.assertNotIn(False, [outcomes[0] == outcomes[i] for i in range(1, n)])
 
+    def test_sample(self):
+        # The state |1> x (|00> - |11>) / sqrt(2) x |+>
+        s = StabilizerState(["-1ZIII", "-1IXXI", "+1IZZI", "+1IIIX"])
+        ref = StabilizerState(s)
+        outcomes = s.sample([2, 0, 1, 3], 1000)
+        self.assertEqual(outcomes.shape, (1000, 4))
+        self.assertTrue(s == ref)
+        self.assertTrue(np.all(outcomes[:, 1] == 1))
+        self.assertTrue(np.all(outcomes[:, 0] == outcomes[:, 2]))
+        for j in [0, 3]:
+            self.assertTrue(300 < outcomes[:, j].sum() < 700)
+
+        self.assertEqual(s.sample([], 10).shape, (10, 0))
+        self.assertEqual(s.sample([0], 0).shape, (0, 1))
+
+    def test_sample_many_qubits(self):
+        n = 100
+        GHZ = StabilizerState(n)
+        GHZ.apply_H(0)
+        for i in range(1, n):
+            GHZ.apply_CNOT(i - 1, i)
+        GHZ.apply_X(n - 1)
+        outcomes = GHZ.sample(range(n), 200)
+        self.assertTrue(np.all(outcomes[:, :-1] == outcomes[:, :1]))
+        self.assertTrue(np.all(outcomes[:, -1] != outcomes[:, 0]))
+        self.assertEqual(len(set(outcomes[:, 0])), 2)
+
+        # The reduced state of a subset of the qubits is maximally mixed
+        outcomes = GHZ.sample([1, 50, 99], 200)
+        self.assertTrue(np.all(outcomes[:, 0] == outcomes[:, 1]))
+        self.assertTrue(np.all(outcomes[:, 0] != outcomes[:, 2]))
+
+    def test_sample_faulty(self):
+        s = StabilizerState(2)
+        with self.assertRaises(ValueError):
+            s.sample([2], 1)
+        with self.assertRaises(ValueError):
+            s.sample([0, 0], 1)
+        with self.assertRaises(ValueError):
+            s.sample([0], -1)
+
+    def test_find_partition(self):
+        # The state |1> x (|0+> - |1->) / sqrt(2) x |+>, with the entangled pair on qubits 1 and 3
+        s = StabilizerState(["-1ZIII", "-1IXIZ", "+1IIXI", "+1IZIX"])
+        self.assertEqual(s.find_partition(), [[0], [1, 3], [2]])
+        s.apply_H(0)
+        s.apply_CNOT(3, 1)
+        self.assertEqual(s.find_partition(), [[0], [1, 3], [2]])
+        s.apply_CZ(0, 2)
+        self.assertEqual(s.find_partition(), [[0, 2], [1, 3]])
+
+        # Generators acting on several qubits of a product state
+        self.assertEqual(StabilizerState(["ZZ", "ZI"]).find_partition(), [[0], [1]])
+        self.assertEqual(StabilizerState(1).find_partition(), [[0]])
+
+    def test_split(self):
+        s = StabilizerState(["-1ZIII", "-1IXIX", "+1IIXI", "+1IZIZ"])
+        removed = s.split([3, 1])
+        self.assertEqual(removed, StabilizerState(["-1XX", "+1ZZ"]))
+        self.assertEqual(s, StabilizerState(["-1ZI", "+1IX"]))
+        removed = s.split([0])
+        self.assertEqual(removed, StabilizerState(["-1Z"]))
+        self.assertEqual(s, StabilizerState(["X"]))
+        with self.assertRaises(ValueError):
+            StabilizerState(["XX", "ZZ"]).split([0])
+
+    def test_split_keeps_destabilizers(self):
+        s = StabilizerState(4)
+        s.apply_H(0)
+        s.apply_CNOT(0, 1)
+        s.apply_CNOT(1, 2)
+        s.apply_H(3)
+        s.apply_CNOT(3, 2)
+        outcome = s.measure(1, inplace=True)
+        removed = s.split([0])
+        self.assertTrue(s._has_destabilizers)
+        self.assertTrue(removed._has_destabilizers)
+        self.assertEqual(removed.measure(0), outcome)
+        self.assertEqual(s.measure(0), outcome)
+        # The remaining qubits are in the state (|outcome, 0> + |1 - outcome, 1>) / sqrt(2)
+        self.assertEqual(s.measure(0, inplace=True), outcome ^ s.measure(1))
+
+    def test_has_random_outcome(self):
+        s = StabilizerState(["ZII", "IXX", "IZZ"])
+        self.assertEqual([s.has_random_outcome(i) for i in range(3)], [False, True, True])
+        s.measure(1, inplace=True)
+        self.assertEqual([s.has_random_outcome(i) for i in range(3)], [False, False, False])
+        with self.assertRaises(ValueError):
+            s.has_random_outcome(3)
+
     def test_going_to_graph(self):
         one_Bell_pair = StabilizerState(["-1XX", "+1ZZ"])
         G = nx.Graph()
@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+
+from simulaqron.settings import Settings
+from simulaqron.toolbox.stabilizerStates import StabilizerState
+from simulaqron.virtNode.virtual import virtualNode, _merge_moves_first
+
+
+class TestFactorizeRegisters(unittest.TestCase):
+    num_qubits = 30
+
+    @classmethod
+    def setUpClass(cls):
+        Settings.default_settings()
+
+    @classmethod
+    def tearDownClass(cls):
+        Settings.default_settings()
+
+    def setUp(self):
+        # A node without any other nodes in its network, which therefore does not connect to anything
+        myID = SimpleNamespace(name="Alice")
+        self.node = virtualNode(myID, SimpleNamespace(hostDict={"Alice": myID}), maxQubits=self.num_qubits)
+
+        # Put all qubits in a GHZ state in one register
+        self.reg = self.node.remote_new_register(maxQubits=self.num_qubits)
+        self.qubits = [self.node.remote_new_qubit_inreg(self.reg).result for _ in range(self.num_qubits)]
+        self.qubits[0].remote_apply_H()
+        for q in self.qubits[1:]:
+            self.qubits[0].remote_cnot_onto(q)
+
+    def test_no_partition_search_by_default(self):
+        self.assertEqual(Settings.CONF_BACKEND, "stabilizer")
+        self.assertEqual(Settings.CONF_FACTORIZE_REGISTERS, "auto")
+        self.assertFalse(self.reg.boundedPartition)
+        with mock.patch.object(StabilizerState, "find_partition") as find_partition:
+            outcomes = [q.remote_measure().result for q in self.qubits[:-1]]
+        find_partition.assert_not_called()
+        self.assertEqual(len(set(outcomes)), 1)
+        self.assertEqual(self.reg.activeQubits, 1)
+
+    def test_partition_search_if_enabled(self):
+        find_partition = mock.patch.object(
+            StabilizerState, "find_partition", autospec=True, side_effect=StabilizerState.find_partition
+        )
+        with mock.patch.object(Settings, "CONF_FACTORIZE_REGISTERS", "on"), find_partition as find_partition:
+            outcome = self.qubits[0].remote_measure().result
+        self.assertEqual(find_partition.call_count, 1)
+
+        # The remaining qubits are in a product state and each in its own register
+        registers = {q.simQubit.register for q in self.qubits[1:]}
+        self.assertEqual(len(registers), self.num_qubits - 1)
+        self.assertTrue(all(q.remote_measure().result == outcome for q in self.qubits[1:]))
+
+    def test_partition_search_if_bounded(self):
+        # By default, engines with a bounded search for product states, such as the dense ones, are factorized
+        find_partition = mock.patch.object(
+            StabilizerState, "find_partition", autospec=True, side_effect=StabilizerState.find_partition
+        )
+        with mock.patch.object(type(self.reg), "boundedPartition", True), find_partition as find_partition:
+            outcome = self.qubits[0].remote_measure().result
+        self.assertEqual(find_partition.call_count, 1)
+        registers = {q.simQubit.register for q in self.qubits[1:]}
+        self.assertEqual(len(registers), self.num_qubits - 1)
+        self.assertTrue(all(q.remote_measure().result == outcome for q in self.qubits[1:]))
+
+    def test_no_partition_search_if_off(self):
+        with mock.patch.object(Settings, "CONF_FACTORIZE_REGISTERS", "off"), mock.patch.object(
+            type(self.reg), "boundedPartition", True
+        ), mock.patch.object(StabilizerState, "find_partition") as find_partition:
+            self.qubits[0].remote_measure()
+        find_partition.assert_not_called()
+
+
+class TestMergeDirection(unittest.TestCase):
+    def test_smaller_register_moves(self):
+        self.assertTrue(_merge_moves_first(1, 1, True, 3, 10, False))
+        self.assertFalse(_merge_moves_first(3, 1, False, 1, 10, True))
+
+    def test_equal_size_moves_to_lighter_node(self):
+        self.assertTrue(_merge_moves_first(2, 10, True, 2, 5, False))
+        self.assertFalse(_merge_moves_first(2, 5, False, 2, 10, True))
+
+    def test_full_tie_moves_to_local_node(self):
+        self.assertTrue(_merge_moves_first(2, 5, False, 2, 5, True))
+        self.assertFalse(_merge_moves_first(2, 5, True, 2, 5, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
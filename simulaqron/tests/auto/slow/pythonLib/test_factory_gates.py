@@ -466,7 +466,7 @@ class FactoryGateTest(unittest.TestCase):
             # Test T factory quarter
             sys.stdout.write("Testing T factory (quarter):")
             exp_values = calc_exp_values_single(prep_T_state(1))
-            if Settings.CONF_BACKEND == "stabilizer":
+            if Settings.CONF_BACKEND in ["stabilizer", "graph"]:
                 with self.assertRaises(CQCUnsuppError):
                     cqc.test_preparation(
                         prep_T_CQC_FACTORY_QUARTER, exp_values, iterations=self.iterations, progress=False
@@ -479,7 +479,7 @@ class FactoryGateTest(unittest.TestCase):
             # Test T factory half
             sys.stdout.write("Testing T factory (half):")
             exp_values = calc_exp_values_single(prep_T_state(2))
-            if Settings.CONF_BACKEND == "stabilizer":
+            if Settings.CONF_BACKEND in ["stabilizer", "graph"]:
                 with self.assertRaises(CQCUnsuppError):
                     cqc.test_preparation(
                         prep_T_CQC_FACTORY_HALF, exp_values, iterations=self.iterations, progress=False
@@ -492,7 +492,7 @@ class FactoryGateTest(unittest.TestCase):
             # Test T factory half
             sys.stdout.write("Testing T factory (three quarters):")
             exp_values = calc_exp_values_single(prep_T_state(3))
-            if Settings.CONF_BACKEND == "stabilizer":
+            if Settings.CONF_BACKEND in ["stabilizer", "graph"]:
                 with self.assertRaises(CQCUnsuppError):
                     cqc.test_preparation(
                         prep_T_CQC_FACTORY_THREE_QUARTER, exp_values, iterations=self.iterations, progress=False
@@ -505,7 +505,7 @@ class FactoryGateTest(unittest.TestCase):
             # Test T factory half
             sys.stdout.write("Testing T factory (full):")
             exp_values = calc_exp_values_single(prep_I_state())
-            if Settings.CONF_BACKEND == "stabilizer":
+            if Settings.CONF_BACKEND in ["stabilizer", "graph"]:
                 with self.assertRaises(CQCUnsuppError):
                     cqc.test_preparation(
                         prep_T_CQC_FACTORY_FULL, exp_values, iterations=self.iterations, progress=False
@@ -555,7 +555,7 @@ class FactoryGateTest(unittest.TestCase):
             # To the amount of times this rotation is done
             sys.stdout.write("Testing CNOT rotation of 4 times 1/32:")
             exp_values = calc_exp_values_single(prep_ROT_X_state())
-            if Settings.CONF_BACKEND == "stabilizer":
+            if Settings.CONF_BACKEND in ["stabilizer", "graph"]:
                 with self.assertRaises(CQCUnsuppError):
                     cqc.test_preparation(prep_ROT_X, exp_values, iterations=self.iterations, progress=False)
             else:
@@ -0,0 +1,40 @@
+import sys
+
+from simulaqron.virtNode.projectQSimulator import projectQEngine
+
+from timeit import default_timer as timer
+
+# Usage: python merge_latency.py <maximal number of qubits>
+# Times merging a register of n qubits into a register holding one qubit, i.e. get_register_bytes on the sending
+# engine followed by absorb_bytes on the receiving one, as done by a merge between two nodes.
+
+
+def time_merge(n):
+    sender = projectQEngine("Alice", 0, n)
+    receiver = projectQEngine("Bob", 1, n + 1)
+    for i in range(n):
+        sender.add_fresh_qubit()
+        sender.apply_H(i)
+        sender.apply_T(i)
+    receiver.add_fresh_qubit()
+    sender.flush_gates()
+    sender.eng.flush()
+
+    t1 = timer()
+    receiver.absorb_bytes(sender.get_register_bytes())
+    t2 = timer()
+    return t2 - t1
+
+
+nmax = int(sys.argv[1])
+times = []
+sizes = []
+for n in range(2, nmax + 1):
+    t = time_merge(n)
+    times.append(t)
+    sizes.append(n)
+    print("Merging a register of {} qubits took {} s".format(n, t))
+
+with open("merge_latency_projectq.txt", "w") as f:
+    for (n, t) in zip(sizes, times):
+        f.write("{} {}\n".format(n, t))
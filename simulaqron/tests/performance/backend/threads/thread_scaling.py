@@ -0,0 +1,42 @@
+import sys
+
+import numpy as np
+
+from simulaqron.settings import Settings
+from simulaqron.virtNode.numpySimulator import numpyEngine
+
+from timeit import default_timer as timer
+
+# Usage: python thread_scaling.py <number of qubits> <maximal number of threads>
+n = int(sys.argv[1])
+max_threads = int(sys.argv[2])
+
+thread_counts = []
+times = []
+num_threads = 1
+while num_threads <= max_threads:
+    Settings.CONF_NUM_THREADS = num_threads
+    np.random.seed(0)
+    eng = numpyEngine("Alice", 0, n)
+    for _ in range(n):
+        eng.add_fresh_qubit()
+    t1 = timer()
+    for i in range(n):
+        eng.apply_H(i)
+        eng.apply_T(i)
+    for i in range(n - 1):
+        eng.apply_CNOT(i, i + 1)
+    for i in range(n):
+        eng.apply_rotation(i, (1, 0, 0), 0.1)
+    for i in range(n):
+        eng.measure_qubit_inplace(i)
+    t2 = timer()
+    thread_counts.append(num_threads)
+    times.append(t2 - t1)
+    print("Circuit on {} qubits took {} s using {} threads (speedup {:.2f})".format(
+        n, t2 - t1, num_threads, times[0] / (t2 - t1)))
+    num_threads *= 2
+
+with open("run_time_threads_{}_qubits.txt".format(n), "w") as f:
+    for (k, t) in zip(thread_counts, times):
+        f.write("{} {}\n".format(k, t))
@@ -0,0 +1,98 @@
+import sys
+import random
+
+import numpy as np
+from timeit import default_timer as timer
+
+from simulaqron.toolbox.stabilizerStates import StabilizerState
+
+
+def reference_gaussian_elimination(matrix):
+    """
+    The previous implementation of StabilizerState.boolean_gaussian_elimination,
+    which tracks the phase of each row addition column by column.
+    """
+    new_matrix = np.array(matrix, dtype=bool)
+    m, n = new_matrix.shape
+
+    h = 0
+    k = 0
+    while (h < m) and (k < n):
+        non_zero_ind = new_matrix[:, k].nonzero()[0]
+        non_zero_ind_under_h = non_zero_ind[non_zero_ind >= h]
+        if len(non_zero_ind_under_h) == 0:
+            k += 1
+        else:
+            i_max = non_zero_ind_under_h[0]
+            if i_max != h:
+                new_matrix[[h, i_max]] = new_matrix[[i_max, h]]
+            non_zero_except_i_max = non_zero_ind[non_zero_ind != i_max]
+
+            for i_loop in non_zero_except_i_max:
+                extra_phase = 0
+                for j in range(m):
+                    extra_phase += StabilizerState.Pauli_phase_tracking(
+                        [new_matrix[i_loop, j], new_matrix[i_loop, j + m]], [new_matrix[h, j], new_matrix[h, j + m]]
+                    )
+                new_matrix[i_loop, :] = np.logical_xor(new_matrix[i_loop, :], new_matrix[h, :])
+                if (extra_phase / 2) % 2:
+                    new_matrix[i_loop, -1] = np.logical_not(new_matrix[i_loop, -1])
+            h += 1
+            k += 1
+    return new_matrix
+
+
+def random_stabilizer_state(n):
+    """
+    Returns a stabilizer state on n qubits prepared by a random Clifford circuit.
+    """
+    S = StabilizerState(n)
+    for _ in range(4 * n):
+        gate = random.choice(["H", "S", "X", "Z", "CNOT", "CZ"])
+        if gate in ["CNOT", "CZ"]:
+            if n > 1:
+                control, target = random.sample(range(n), 2)
+                getattr(S, "apply_{}".format(gate))(control, target)
+        else:
+            getattr(S, "apply_{}".format(gate))(random.randrange(n))
+    return S
+
+
+if __name__ == "__main__":
+    # Usage: python gaussian_elimination.py [nmax] [step] [nmax_reference]
+    nmax = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    step = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    nmax_reference = int(sys.argv[3]) if len(sys.argv) > 3 else nmax
+    sizes = []
+    times = []
+    reference_times = []
+    for n in range(step, nmax + 1, step):
+        matrix = random_stabilizer_state(n).to_array()
+
+        t1 = timer()
+        result = StabilizerState.boolean_gaussian_elimination(matrix)
+        t2 = timer()
+        sizes.append(n)
+        times.append(t2 - t1)
+
+        if n <= nmax_reference:
+            t1 = timer()
+            reference = reference_gaussian_elimination(matrix)
+            t2 = timer()
+            reference_times.append(t2 - t1)
+            if not np.array_equal(result, reference):
+                raise RuntimeError("Results differ from the reference implementation for n={}".format(n))
+            print(
+                "Gaussian elimination on {} qubits took {} s (reference: {} s)".format(
+                    n, times[-1], reference_times[-1]
+                )
+            )
+        else:
+            print("Gaussian elimination on {} qubits took {} s".format(n, times[-1]))
+
+    with open("run_time_gaussian_elimination.txt", "w") as f:
+        for (n, t) in zip(sizes, times):
+            f.write("{} {}\n".format(n, t))
+    with open("run_time_gaussian_elimination_reference.txt", "w") as f:
+        for (n, t) in zip(sizes, reference_times):
+            f.write("{} {}\n".format(n, t))
@@ -0,0 +1,66 @@
+##########################################################################################
+#
+# This file contains the matrices of the gates supported by the quantum engines, for the
+# backends which apply gates as dense matrices. The fixed gates are computed once and
+# rotations are cached, such that applying a gate does not allocate a new matrix.
+#
+##########################################################################################
+
+import numpy as np
+from functools import lru_cache
+
+# CQC specifies the angle of a rotation as a number of steps of 2 pi / 256
+ROTATION_STEPS = 256
+
+
+def _read_only(matrix):
+    matrix.setflags(write=False)
+    return matrix
+
+
+GATE_MATRICES = {
+    "I": np.array([[1, 0], [0, 1]], dtype=complex),
+    "X": np.array([[0, 1], [1, 0]], dtype=complex),
+    "Y": np.array([[0, -1j], [1j, 0]], dtype=complex),
+    "Z": np.array([[1, 0], [0, -1]], dtype=complex),
+    "H": np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2),
+    "K": np.array([[1, -1j], [1j, -1]], dtype=complex) / np.sqrt(2),
+    "T": np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]], dtype=complex),
+    "CNOT": np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]], dtype=complex),
+    "CPHASE": np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, -1]], dtype=complex),
+}
+GATE_MATRICES = {name: _read_only(matrix) for name, matrix in GATE_MATRICES.items()}
+
+
+def rotation_matrix(n, a):
+    """
+    Returns the matrix exp(-i a / 2 (n_x X + n_y Y + n_z Z)) of the rotation around the (normalized) axis n
+    with the angle a. Rotations with an angle which is a multiple of 2 pi / ROTATION_STEPS, as used by CQC,
+    are cached per axis and step. The returned matrix is read-only.
+    :param n: A tuple of three numbers specifying the rotation axis, e.g n=(1,0,0)
+    :type n: tuple
+    :param a: The rotation angle in radians.
+    :type a: float
+    :return: The rotation
+    :rtype: :obj:`numpy.array`
+    """
+    norm = np.linalg.norm(n)
+    if norm == 0:
+        raise ValueError("Rotation vector n can't be 0")
+    axis = tuple(float(c) / norm for c in n)
+
+    step = a * ROTATION_STEPS / (2 * np.pi)
+    if abs(step - round(step)) < 1e-9:
+        # A rotation by 4 pi is the identity, a rotation by 2 pi only gives a global phase of -1
+        return _quantized_rotation(axis, round(step) % (2 * ROTATION_STEPS))
+    return _read_only(_rotation(axis, a))
+
+
+@lru_cache(maxsize=8 * ROTATION_STEPS)
+def _quantized_rotation(axis, step):
+    return _read_only(_rotation(axis, 2 * np.pi * step / ROTATION_STEPS))
+
+
+def _rotation(axis, a):
+    generator = axis[0] * GATE_MATRICES["X"] + axis[1] * GATE_MATRICES["Y"] + axis[2] * GATE_MATRICES["Z"]
+    return np.cos(a / 2) * GATE_MATRICES["I"] - 1j * np.sin(a / 2) * generator
@@ -0,0 +1,635 @@
+##########################################################################################
+#
+# This file contains classes for describing stabilizer states as graph states together
+# with local Clifford operations on each vertex, following Anders and Briegel (quant-ph/0504117).
+# Gates and measurements only touch the neighbourhood of the involved vertices and therefore
+# scale with the vertex degree rather than with the number of qubits.
+#
+##########################################################################################
+
+import numpy as np
+import networkx as nx
+from random import randint
+
+from simulaqron.toolbox.stabilizerStates import StabilizerState
+
+_GATE_MATRICES = {
+    "I": np.array([[1, 0], [0, 1]], dtype=complex),
+    "X": np.array([[0, 1], [1, 0]], dtype=complex),
+    "Y": np.array([[0, -1j], [1j, 0]], dtype=complex),
+    "Z": np.array([[1, 0], [0, -1]], dtype=complex),
+    "H": np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2),
+    "K": np.array([[1, -1j], [1j, -1]], dtype=complex) / np.sqrt(2),
+    "S": np.array([[1, 0], [0, 1j]], dtype=complex),
+}
+
+# exp(i pi/4 X) and exp(-i pi/4 Z), i.e. the inverses of the operators sqrt(-iX) and sqrt(iZ) in quant-ph/0504117
+_GATE_MATRICES["sqrt_iX"] = (_GATE_MATRICES["I"] + 1j * _GATE_MATRICES["X"]) / np.sqrt(2)
+_GATE_MATRICES["sqrt_minIZ"] = (_GATE_MATRICES["I"] - 1j * _GATE_MATRICES["Z"]) / np.sqrt(2)
+
+# The Paulis are indexed as 0 -> I, 1 -> X, 2 -> Y, 3 -> Z
+_PAULIS = ["I", "X", "Y", "Z"]
+
+
+def _matrix_key(matrix):
+    """
+    Returns a hashable key of a matrix which is independent of the global phase of the matrix.
+    :param matrix: The matrix
+    :type matrix: :obj:`numpy.array`
+    :return: The key
+    :rtype: tuple
+    """
+    flat = np.asarray(matrix, dtype=complex).flatten()
+    first = flat[np.flatnonzero(np.abs(flat) > 1e-9)[0]]
+    flat = np.round(flat * abs(first) / first, 6) + 0.0
+    return tuple(zip(flat.real, flat.imag))
+
+
+def _generate_cliffords():
+    """
+    Generates the 24 single qubit Clifford operations (up to global phase) from H and S.
+    :return: The matrices and, for each of them, a sequence of 'H' and 'S' which when applied in order gives the matrix
+    :rtype: tuple of list
+    """
+    matrices = [_GATE_MATRICES["I"]]
+    decompositions = [[]]
+    keys = {_matrix_key(matrices[0]): 0}
+    i = 0
+    while i < len(matrices):
+        for gate in ["H", "S"]:
+            matrix = np.dot(_GATE_MATRICES[gate], matrices[i])
+            key = _matrix_key(matrix)
+            if key not in keys:
+                keys[key] = len(matrices)
+                matrices.append(matrix)
+                decompositions.append(decompositions[i] + [gate])
+        i += 1
+    return matrices, decompositions, keys
+
+
+_CLIFFORDS, _DECOMPOSITIONS, _CLIFFORD_KEYS = _generate_cliffords()
+
+
+def _clifford_index(matrix):
+    """
+    Returns the index of a single qubit Clifford operation, given as a matrix.
+    :param matrix: The matrix
+    :type matrix: :obj:`numpy.array`
+    :return: The index
+    :rtype: int
+    """
+    return _CLIFFORD_KEYS[_matrix_key(matrix)]
+
+
+_GATE_INDICES = {gate: _clifford_index(matrix) for gate, matrix in _GATE_MATRICES.items()}
+_I = _GATE_INDICES["I"]
+_H = _GATE_INDICES["H"]
+_X = _GATE_INDICES["X"]
+_Z = _GATE_INDICES["Z"]
+_SQRT_IX = _GATE_INDICES["sqrt_iX"]
+_SQRT_MINIZ = _GATE_INDICES["sqrt_minIZ"]
+
+# _MULTIPLICATION[a][b] is the index of the product of Clifford a and Clifford b (in this order)
+_MULTIPLICATION = [[_clifford_index(np.dot(a, b)) for b in _CLIFFORDS] for a in _CLIFFORDS]
+
+# _CONJUGATION[a][p] is (sign, q) such that a * P * a^dagger = sign * Q
+_CONJUGATION = []
+for _a in _CLIFFORDS:
+    _row = [(1, 0)]
+    for _p in _PAULIS[1:]:
+        _conjugated = np.dot(np.dot(_a, _GATE_MATRICES[_p]), _a.conj().T)
+        for _q, _pauli in enumerate(_PAULIS[1:], 1):
+            # The Paulis are orthogonal w.r.t. the Hilbert-Schmidt inner product
+            _sign = int(round(np.trace(np.dot(_conjugated, _GATE_MATRICES[_pauli])).real / 2))
+            if _sign != 0:
+                _row.append((_sign, _q))
+    _CONJUGATION.append(_row)
+
+# The Cliffords commuting with Z, which also commute with CZ
+_Z_COMMUTING = frozenset(a for a in range(len(_CLIFFORDS)) if _CONJUGATION[a][3] == (1, 3))
+
+
+def _lc_sequences():
+    """
+    For each Clifford, finds a shortest sequence of local complementations which reduces it to the identity.
+    'a' stands for a local complementation on the vertex itself, which multiplies its VOP from the right by
+    sqrt(iX), and 'b' for a local complementation on one of its neighbours, which multiplies by sqrt(-iZ).
+    :return: The sequences
+    :rtype: list of str
+    """
+    sequences = {_I: ""}
+    queue = [_I]
+    i = 0
+    while i < len(queue):
+        current = queue[i]
+        # Find the Cliffords which are mapped to 'current' by one more step
+        for step, clifford in [("a", _SQRT_IX), ("b", _SQRT_MINIZ)]:
+            inverse = _MULTIPLICATION[current][_clifford_index(_CLIFFORDS[clifford].conj().T)]
+            if inverse not in sequences:
+                sequences[inverse] = step + sequences[current]
+                queue.append(inverse)
+        i += 1
+    return [sequences[a] for a in range(len(_CLIFFORDS))]
+
+
+_LC_SEQUENCES = _lc_sequences()
+
+
+def _cz_table():
+    """
+    Computes the effect of CZ on two vertices which are connected to nothing else than possibly each other.
+    _CZ_TABLE[edge][a][b] is (new_edge, new_a, new_b), where new_a (new_b) is commuting with Z if a (b) is.
+    :return: The table
+    :rtype: list
+    """
+    nr_cliffords = len(_CLIFFORDS)
+    cz = np.diag([1, 1, 1, -1]).astype(complex)
+    graph_states = np.array([np.ones(4) / 2, np.dot(cz, np.ones(4) / 2)]).reshape(2, 2, 2)
+    configurations = [(e, a, b) for e in range(2) for a in range(nr_cliffords) for b in range(nr_cliffords)]
+    cliffords = np.array(_CLIFFORDS)
+    states = np.einsum("aij,bkl,ejl->eabik", cliffords, cliffords, graph_states).reshape(len(configurations), 4)
+    # overlaps[j, i] is the overlap between configuration j and CZ applied to configuration i
+    overlaps = np.abs(np.dot(states.conj(), np.dot(cz, states.T)))
+
+    table = [[[None] * nr_cliffords for _ in range(nr_cliffords)] for _ in range(2)]
+    for i, (e, a, b) in enumerate(configurations):
+        for j in np.flatnonzero(overlaps[:, i] > 1 - 1e-6):
+            new_e, new_a, new_b = configurations[j]
+            if (a not in _Z_COMMUTING or new_a in _Z_COMMUTING) and (b not in _Z_COMMUTING or new_b in _Z_COMMUTING):
+                table[e][a][b] = (new_e, new_a, new_b)
+                break
+    return table
+
+
+_CZ_TABLE = _cz_table()
+
+
+class GraphState:
+    def __init__(self, data=None, vops=None):
+        """
+        This class represent a stabilizer state as a graph state together with a local Clifford operation
+        (vertex operator, VOP) on each vertex, i.e. the state is (prod_v VOP_v) |G>, see quant-ph/0504117.
+        The state can be manipulated using Clifford operations and measurements in the standard basis.
+        The cost of these only depends on the degrees of the involved vertices and not on the number of qubits.
+
+        :param data:
+            Can be one of the following:
+
+            'None' (default):
+                Then this is seen as a state on no qubits.
+
+            'int':
+                Then a state on this many qubits are created, all in the state |0> as:
+                    GraphState(5)  # This is the then the state |00000>
+
+            'networkx.Graph':
+                Then the graph state corresponding to this graph will be created.
+                This assumes that the nodes are numbered from 0 to n - 1, where n is the number of nodes.
+
+            A list of edges:
+                Then the graph state of the graph with these edges is created, where the vertices are the
+                qubit positions. 'vops' then needs to be given, and determines the number of qubits.
+                This is the form returned by GraphState.to_lists, for example:
+                    GraphState([[0, 1]], vops=[0, 0])  # A graph state on two qubits
+
+            'GraphState':
+                Then a copy of this state is created.
+        :param vops: list of int
+            Only used if 'data' is a graph or a list of edges. The index of the VOP of each vertex,
+            defaults to the identity.
+        """
+        # The vertex of each qubit, in the order of the qubits
+        self._vertices = []
+        self._neighbors = {}
+        self._vops = {}
+        self._next_vertex = 0
+        if data is None:
+            pass
+        elif isinstance(data, int):
+            for _ in range(data):
+                self.add_qubit()
+        elif isinstance(data, nx.Graph):
+            n = data.number_of_nodes()
+            if set(data.nodes()) != set(range(n)):
+                raise ValueError("The nodes of the graph should be numbered from 0 to n - 1")
+            if vops is None:
+                vops = [_I] * n
+            self._set_graph(n, data.edges(), vops)
+        elif isinstance(data, GraphState):
+            self._vertices = list(data._vertices)
+            self._neighbors = {v: set(neighbors) for v, neighbors in data._neighbors.items()}
+            self._vops = dict(data._vops)
+            self._next_vertex = data._next_vertex
+        elif isinstance(data, (list, tuple, np.ndarray)):
+            if vops is None:
+                raise ValueError("The VOPs need to be given together with a list of edges")
+            self._set_graph(len(vops), data, vops)
+        else:
+            raise ValueError("Unknown input type")
+
+    def _set_graph(self, n, edges, vops):
+        """
+        Sets the state to the graph state on n qubits with the given edges followed by the given VOPs.
+        :param n: The number of qubits
+        :type n: int
+        :param edges: The edges, as pairs of qubit positions
+        :type edges: iterable
+        :param vops: The index of the VOP of each qubit
+        :type vops: list of int
+        :return: None
+        """
+        if len(vops) != n:
+            raise ValueError("There should be one VOP for each vertex")
+        for vop in vops:
+            if not (0 <= vop < len(_CLIFFORDS)):
+                raise ValueError("{} is not a valid VOP".format(vop))
+        self._vertices = list(range(n))
+        self._neighbors = {v: set() for v in range(n)}
+        self._vops = {v: int(vop) for v, vop in enumerate(vops)}
+        self._next_vertex = n
+        for v, u in edges:
+            v, u = int(v), int(u)
+            if v == u or not (0 <= v < n and 0 <= u < n):
+                raise ValueError("({}, {}) is not a valid edge".format(v, u))
+            self._neighbors[v].add(u)
+            self._neighbors[u].add(v)
+
+    @property
+    def num_qubits(self):
+        return len(self._vertices)
+
+    def __len__(self):
+        return self.num_qubits
+
+    def __repr__(self):
+        edges, vops = self.to_lists()
+        return "GraphState(edges={}, vops={})".format(edges, vops)
+
+    def __str__(self):
+        return str(self.to_stabilizer_state())
+
+    def _check_position(self, position):
+        n = self.num_qubits
+        if not (position >= 0 and position < n):
+            raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
+
+    def add_qubit(self):
+        """
+        Appends a qubit in the state \|0\> to the current state
+        :return: None
+        """
+        vertex = self._next_vertex
+        self._next_vertex += 1
+        self._vertices.append(vertex)
+        self._neighbors[vertex] = set()
+        # |0> = H|+>
+        self._vops[vertex] = _H
+
+    def add_qubit_from_array(self, array):
+        """
+        Appends a qubit in the single qubit stabilizer state described by 'array', in the form used by
+        StabilizerState, i.e. [[x, z]] or [[x, z, phase]].
+        :param array: The generator of the single qubit state
+        :type array: array-like
+        :return: None
+        """
+        array = np.array(array, dtype=bool)
+        if array.shape == (2,) or array.shape == (3,):
+            array = array.reshape(1, -1)
+        if not (array.shape == (1, 2) or array.shape == (1, 3)):
+            raise ValueError("Can only add a single qubit state")
+        pauli = _PAULIS.index(StabilizerState.bool2Pauli[(array[0, 0], array[0, 1])])
+        if pauli == 0:
+            raise ValueError("The identity does not describe a state")
+        sign = -1 if (array.shape[1] == 3 and array[0, 2]) else 1
+        self.add_qubit()
+        # The state VOP|+> is stabilized by VOP * X * VOP^dagger
+        vop = next(a for a in range(len(_CLIFFORDS)) if _CONJUGATION[a][1] == (sign, pauli))
+        self._vops[self._vertices[-1]] = vop
+
+    def absorb(self, other):
+        """
+        Appends the qubits of another GraphState to this state in place, i.e. this state becomes the
+        tensor product of itself and other.
+        :param other: The other GraphState to absorb
+        :type other: :obj:`GraphState`
+        :return: None
+        """
+        if not isinstance(other, GraphState):
+            raise ValueError("Can only absorb other GraphState")
+        # Relabel the vertices of other
+        relabel = {v: self._next_vertex + i for i, v in enumerate(other._vertices)}
+        self._next_vertex += len(relabel)
+        for v in other._vertices:
+            new_v = relabel[v]
+            self._vertices.append(new_v)
+            self._neighbors[new_v] = set(relabel[u] for u in other._neighbors[v])
+            self._vops[new_v] = other._vops[v]
+
+    def tensor_product(self, other):
+        """
+        Performs the tensor product with another GraphState and returns a new GraphState.
+        :param other: The other GraphState to perform the tensor product with
+        :type other: :obj:`GraphState`
+        :return: The tensor product of self and other
+        :rtype: :obj:`GraphState`
+        """
+        if not isinstance(other, GraphState):
+            raise ValueError("Can only perform tensor product with other GraphState")
+        new_state = GraphState(self)
+        new_state.absorb(other)
+        return new_state
+
+    def __mul__(self, other):
+        return self.tensor_product(other)
+
+    def find_partition(self):
+        """
+        Finds the finest partition of the qubits into sets which are in a product with each other, i.e. such that
+        this state is the tensor product of states on these sets. Since a connected graph state is entangled
+        between any two parts, and the VOPs are local, these are the connected components of the graph.
+        :return: Sorted lists of qubit positions covering all qubits, ordered by their first qubit
+        :rtype: list
+        """
+        positions = {v: i for i, v in enumerate(self._vertices)}
+        partition = []
+        seen = set()
+        for v in self._vertices:
+            if v in seen:
+                continue
+            component = {v}
+            stack = [v]
+            while stack:
+                for u in self._neighbors[stack.pop()]:
+                    if u not in component:
+                        component.add(u)
+                        stack.append(u)
+            seen |= component
+            partition.append(sorted(positions[u] for u in component))
+        return partition
+
+    def split(self, positions):
+        """
+        Removes the qubits at 'positions', which need to be in a product with the other qubits (see find_partition),
+        from this state in place and returns their state. The remaining qubits keep their order.
+        :param positions: The positions of the qubits to remove
+        :type positions: list of int
+        :return: The state of the removed qubits, in the order of 'positions'
+        :rtype: :obj:`GraphState`
+        """
+        for position in positions:
+            self._check_position(position)
+        vertices = [self._vertices[position] for position in positions]
+        removed = set(vertices)
+        if any(u not in removed for v in vertices for u in self._neighbors[v]):
+            raise ValueError("The qubits {} are entangled with the other qubits".format(list(positions)))
+        new_state = GraphState()
+        new_state._vertices = vertices
+        new_state._neighbors = {v: self._neighbors.pop(v) for v in vertices}
+        new_state._vops = {v: self._vops.pop(v) for v in vertices}
+        new_state._next_vertex = self._next_vertex
+        self._vertices = [v for v in self._vertices if v not in removed]
+        return new_state
+
+    def to_lists(self):
+        """
+        Returns the edges of the graph and the VOPs, where the vertices are labeled by the qubit positions.
+        This can be used to construct the same state again as GraphState(edges, vops=vops).
+        :return: The edges as a list of pairs and the index of the VOP of each qubit
+        :rtype: tuple of lists
+        """
+        positions = {v: i for i, v in enumerate(self._vertices)}
+        edges = [
+            [positions[v], positions[u]]
+            for v in self._vertices
+            for u in self._neighbors[v]
+            if positions[v] < positions[u]
+        ]
+        vops = [self._vops[v] for v in self._vertices]
+        return edges, vops
+
+    def to_stabilizer_state(self):
+        """
+        Returns the StabilizerState describing the same state.
+        :return: The state
+        :rtype: :obj:`StabilizerState`
+        """
+        n = self.num_qubits
+        if n == 0:
+            return StabilizerState()
+        edges, vops = self.to_lists()
+        graph = nx.Graph()
+        graph.add_nodes_from(range(n))
+        graph.add_edges_from(edges)
+        state = StabilizerState(graph)
+        for position, vop in enumerate(vops):
+            for gate in _DECOMPOSITIONS[vop]:
+                getattr(state, "apply_{}".format(gate))(position)
+        return state
+
+    def _apply_clifford(self, position, clifford):
+        self._check_position(position)
+        vertex = self._vertices[position]
+        self._vops[vertex] = _MULTIPLICATION[clifford][self._vops[vertex]]
+
+    def apply_X(self, position):
+        """
+        Applies the X operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._apply_clifford(position, _X)
+
+    def apply_Y(self, position):
+        """
+        Applies the Y operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._apply_clifford(position, _GATE_INDICES["Y"])
+
+    def apply_Z(self, position):
+        """
+        Applies the Z operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._apply_clifford(position, _Z)
+
+    def apply_H(self, position):
+        """
+        Applies the H operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._apply_clifford(position, _H)
+
+    def apply_K(self, position):
+        """
+        Applies the K operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._apply_clifford(position, _GATE_INDICES["K"])
+
+    def apply_S(self, position):
+        """
+        Applies the S operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._apply_clifford(position, _GATE_INDICES["S"])
+
+    def _toggle_edge(self, v, u):
+        if u in self._neighbors[v]:
+            self._neighbors[v].discard(u)
+            self._neighbors[u].discard(v)
+        else:
+            self._neighbors[v].add(u)
+            self._neighbors[u].add(v)
+
+    def _local_complementation(self, vertex):
+        """
+        Performs a local complementation on 'vertex' and updates the VOPs such that the state is unchanged.
+        :param vertex: The vertex
+        :type vertex: int
+        :return: None
+        """
+        neighbors = self._neighbors[vertex]
+        # Toggle all the edges between the neighbors (vertex itself is not one of them)
+        for v in neighbors:
+            self._neighbors[v] ^= neighbors
+            self._neighbors[v].discard(v)
+        self._vops[vertex] = _MULTIPLICATION[self._vops[vertex]][_SQRT_IX]
+        for v in neighbors:
+            self._vops[v] = _MULTIPLICATION[self._vops[v]][_SQRT_MINIZ]
+
+    def _remove_vop(self, vertex, avoid):
+        """
+        Reduces the VOP of 'vertex' to the identity using local complementations. The vertex needs to have
+        at least one neighbor, the neighbor 'avoid' is only used if it is the only one.
+        :param vertex: The vertex
+        :type vertex: int
+        :param avoid: The neighbor to avoid
+        :type avoid: int or None
+        :return: None
+        """
+        partner = next((u for u in self._neighbors[vertex] if u != avoid), avoid)
+        for step in _LC_SEQUENCES[self._vops[vertex]]:
+            if step == "a":
+                self._local_complementation(vertex)
+            else:
+                self._local_complementation(partner)
+
+    def apply_CZ(self, control, target):
+        """
+        Applies CZ between qubit 'control' and qubit 'target'.
+        :param control: The position of the control qubit.
+        :type control: int
+        :param target: The position of the target qubit.
+        :type target: int
+        :return: None
+        """
+        self._check_position(control)
+        self._check_position(target)
+        if control == target:
+            raise ValueError("control and target need to be different")
+        a = self._vertices[control]
+        b = self._vertices[target]
+
+        # Make the VOPs commute with CZ, if the vertices have other neighbors
+        if len(self._neighbors[a] - {b}) > 0:
+            self._remove_vop(a, b)
+        if len(self._neighbors[b] - {a}) > 0:
+            self._remove_vop(b, a)
+        if len(self._neighbors[a] - {b}) > 0 and self._vops[a] not in _Z_COMMUTING:
+            self._remove_vop(a, b)
+
+        edge = b in self._neighbors[a]
+        if self._vops[a] in _Z_COMMUTING and self._vops[b] in _Z_COMMUTING:
+            self._toggle_edge(a, b)
+        else:
+            new_edge, self._vops[a], self._vops[b] = _CZ_TABLE[edge][self._vops[a]][self._vops[b]]
+            if new_edge != edge:
+                self._toggle_edge(a, b)
+
+    def apply_CNOT(self, control, target):
+        """
+        Applies CNOT using qubit 'control' as control and 'target' as target.
+        :param control: The position of the control qubit.
+        :type control: int
+        :param target: The position of the target qubit.
+        :type target: int
+        :return: None
+        """
+        self.apply_H(target)
+        self.apply_CZ(control, target)
+        self.apply_H(target)
+
+    def measure(self, position, inplace=False):
+        """
+        Measures qubit 'position' in the standard basis.
+        If 'inplace=False' the qubit is removed from the state, i.e. the number of qubits in the state is reduced by one
+        If 'inplace=True' the qubit is not removed and the number of qubits remain the same.
+        :param position: The position of the qubit.
+        :type position: int
+        :param inplace: Whether to measure the qubit in place or not. (I.e. to keep it or not)
+        :type inplace: bool
+        :return: The measurement outcome (0 or 1, where 0 is the +1 eigenvalue and 1 is the -1)
+        :rtype: int
+        """
+        self._check_position(position)
+        vertex = self._vertices[position]
+        neighbors = self._neighbors[vertex]
+
+        if len(neighbors) > 0:
+            # If the VOP commutes with Z we can measure Z on the graph state directly
+            if self._vops[vertex] not in _Z_COMMUTING:
+                self._remove_vop(vertex, None)
+            outcome = randint(0, 1)
+
+            # The vertex is disconnected and Z^outcome is applied to its neighbors
+            for u in neighbors:
+                self._neighbors[u].discard(vertex)
+                if outcome == 1:
+                    self._vops[u] = _MULTIPLICATION[self._vops[u]][_Z]
+            self._neighbors[vertex] = set()
+            self._set_vop_to_outcome(vertex, outcome)
+        else:
+            # The qubit is in the state VOP|+>, which is stabilized by VOP * X * VOP^dagger
+            sign, pauli = _CONJUGATION[self._vops[vertex]][1]
+            if pauli == 3:
+                outcome = 0 if sign == 1 else 1
+            else:
+                outcome = randint(0, 1)
+                self._set_vop_to_outcome(vertex, outcome)
+
+        if not inplace:
+            self._vertices.pop(position)
+            del self._neighbors[vertex]
+            del self._vops[vertex]
+        return outcome
+
+    def has_random_outcome(self, position):
+        """
+        Returns whether measuring qubit 'position' in the standard basis has a random outcome, see measure.
+        :param position: The position of the qubit.
+        :type position: int
+        :rtype: bool
+        """
+        self._check_position(position)
+        vertex = self._vertices[position]
+        return len(self._neighbors[vertex]) > 0 or _CONJUGATION[self._vops[vertex]][1][1] != 3
+
+    def _set_vop_to_outcome(self, vertex, outcome):
+        # |0> = H|+> and |1> = XH|+>
+        if outcome == 0:
+            self._vops[vertex] = _H
+        else:
+            self._vops[vertex] = _MULTIPLICATION[_X][_H]
@@ -0,0 +1,632 @@
+##########################################################################################
+#
+# This file contains classes for describing states which are close to stabilizer states,
+# i.e. states produced by Clifford circuits with a few non-Clifford gates (for example T gates
+# or arbitrary rotations), as a weighted sum of stabilizer states.
+#
+##########################################################################################
+
+import numpy as np
+from random import random
+
+from simulaqron.toolbox.stabilizerStates import StabilizerState, _pauli_product_exponent
+from simulaqron.toolbox.graphStates import _CLIFFORD_KEYS, _DECOMPOSITIONS, _matrix_key
+
+# The Paulis I, X, Y and Z as (X-part, Z-part) and as matrices
+_PAULI_BITS = [(False, False), (True, False), (True, True), (False, True)]
+_PAULI_MATRICES = [
+    np.array([[1, 0], [0, 1]], dtype=complex),
+    np.array([[0, 1], [1, 0]], dtype=complex),
+    np.array([[0, -1j], [1j, 0]], dtype=complex),
+    np.array([[1, 0], [0, -1]], dtype=complex),
+]
+
+# Coefficients with an absolute value smaller than this are seen as zero
+_EPSILON = 1e-12
+
+
+def _pauli_decomposition(matrix):
+    """
+    Decomposes a matrix on one or more qubits as a linear combination of tensor products of Paulis.
+    :param matrix: The 2^k-by-2^k matrix
+    :type matrix: :obj:`numpy.array`
+    :return: The non-zero terms as pairs of a tuple of k Pauli indices (0 -> I, 1 -> X, 2 -> Y, 3 -> Z)
+        and a coefficient
+    :rtype: list of tuple
+    """
+    matrix = np.asarray(matrix, dtype=complex)
+    k = int(round(np.log2(matrix.shape[0])))
+    if matrix.shape != (2 ** k, 2 ** k):
+        raise ValueError("The matrix needs to be of dimension 2^k x 2^k")
+    # Paulis are orthogonal w.r.t. the Hilbert-Schmidt inner product, where the first qubit is the most significant
+    terms = []
+    for index in np.ndindex(*([4] * k)):
+        pauli = np.array([[1]], dtype=complex)
+        for p in index:
+            pauli = np.kron(pauli, _PAULI_MATRICES[p])
+        coefficient = np.trace(np.dot(pauli, matrix)) / 2 ** k
+        if abs(coefficient) > _EPSILON:
+            terms.append((index, coefficient))
+    return terms
+
+
+class NearCliffordState:
+    def __init__(self, data=None, paulis=None, coefficients=None):
+        """
+        This class represent a state as a weighted sum of stabilizer states and allows to be manipulated
+        using any (one or two qubit) operations and measurements in the standard basis.
+
+        All terms are of the form P|phi>, where P is a Pauli operator and |phi> is a stabilizer state which is shared
+        by all terms, i.e. the state is
+
+            sum_k c_k P_k |phi>
+
+        Each P_k|phi> is again a stabilizer state, but since all terms are given relative to |phi>, their relative
+        phases are well defined. Clifford operations are applied to |phi> and the Paulis are conjugated,
+        so the number of terms does not change. Any other operation is written as a linear combination of Paulis,
+        such that the number of terms at most doubles for a T gate or a rotation around X, Y or Z.
+        Terms which describe the same state are merged, such that the number of terms is at most 2^t for t
+        non-Clifford gates.
+
+        :param data:
+            Anything that can be given to StabilizerState, describing |phi>, or a NearCliffordState to copy.
+        :param paulis: The Paulis P_k, as a K-by-2n binary array where each row has the X-part followed by the
+            Z-part (as in StabilizerState). Defaults to the identity.
+        :type paulis: :obj:`numpy.array`
+        :param coefficients: The coefficients c_k. Defaults to 1 for each term.
+        :type coefficients: list of complex
+        """
+        if isinstance(data, NearCliffordState):
+            self._stabilizer = StabilizerState(data._stabilizer)
+            self._x = np.array(data._x)
+            self._z = np.array(data._z)
+            self._coefficients = np.array(data._coefficients)
+            return
+        self._stabilizer = StabilizerState(data)
+        n = self._stabilizer.num_qubits
+        if paulis is None:
+            paulis = np.zeros(shape=(1, 2 * n), dtype=bool)
+        paulis = np.array(paulis, dtype=bool)
+        if len(paulis.shape) != 2 or paulis.shape[1] != 2 * n:
+            raise ValueError("'paulis' needs to be an array of dimension K x 2n, where n={}".format(n))
+        if coefficients is None:
+            coefficients = np.ones(len(paulis), dtype=complex)
+        coefficients = np.array(coefficients, dtype=complex).reshape(-1)
+        if len(coefficients) != len(paulis):
+            raise ValueError("The number of coefficients should be the same as the number of Paulis")
+        self._x = paulis[:, :n]
+        self._z = paulis[:, n:]
+        self._coefficients = coefficients
+        self._normalize()
+
+    @property
+    def num_qubits(self):
+        return self._stabilizer.num_qubits
+
+    @property
+    def num_terms(self):
+        return len(self._coefficients)
+
+    def __len__(self):
+        return self.num_qubits
+
+    def __mul__(self, other):
+        return self.tensor_product(other)
+
+    def __repr__(self):
+        return "NearCliffordState({}, {}, {})".format(
+            self._stabilizer.to_array().tolist(), self.to_lists()[1], self._coefficients.tolist()
+        )
+
+    def __str__(self):
+        to_return = ""
+        for coefficient, x, z in zip(self._coefficients, self._x, self._z):
+            paulis = "".join(StabilizerState.bool2Pauli[(bool(x_j), bool(z_j))] for x_j, z_j in zip(x, z))
+            to_return += "{:.4f} * {}\n".format(coefficient, paulis)
+        return to_return + "acting on the stabilizer state with generators:\n" + str(self._stabilizer)
+
+    def _check_position(self, position):
+        n = self.num_qubits
+        if not (position >= 0 and position < n):
+            raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
+
+    def to_lists(self):
+        """
+        Returns the generators of |phi> (see StabilizerState.to_array), the Paulis and the coefficients as lists,
+        which can be given to __init__.
+        :return: The generators, Paulis and coefficients
+        :rtype: tuple of list
+        """
+        paulis = np.concatenate((self._x, self._z), 1)
+        return self._stabilizer.to_array().tolist(), paulis.tolist(), self._coefficients.tolist()
+
+    def to_state_vector(self):
+        """
+        Returns the state vector, where the first qubit is the most significant.
+        Note that this takes time and memory exponential in the number of qubits.
+        :return: The normalized state vector (up to a global phase)
+        :rtype: :obj:`numpy.array`
+        """
+        n = self.num_qubits
+
+        def pauli_matrix(x, z):
+            matrix = np.array([[1]], dtype=complex)
+            for x_j, z_j in zip(x, z):
+                matrix = np.kron(matrix, _PAULI_MATRICES[_PAULI_BITS.index((bool(x_j), bool(z_j)))])
+            return matrix
+
+        # |phi> is the column with largest norm of the projector onto the stabilized subspace
+        projector = np.identity(2 ** n, dtype=complex)
+        for generator in self._stabilizer.to_array():
+            sign = -1 if generator[2 * n] else 1
+            projector = np.dot(projector, np.identity(2 ** n) + sign * pauli_matrix(generator[:n], generator[n:2 * n]))
+        phi = projector[:, np.argmax(np.linalg.norm(projector, axis=0))]
+        phi = phi / np.linalg.norm(phi)
+
+        state = np.zeros(2 ** n, dtype=complex)
+        for coefficient, x, z in zip(self._coefficients, self._x, self._z):
+            state += coefficient * np.dot(pauli_matrix(x, z), phi)
+        return state
+
+    def add_qubit(self):
+        """
+        Appends a qubit in the state \\|0\\> to the current state
+        :return: None
+        """
+        self._stabilizer.add_qubit()
+        self._x = np.concatenate((self._x, np.zeros(shape=(self.num_terms, 1), dtype=bool)), 1)
+        self._z = np.concatenate((self._z, np.zeros(shape=(self.num_terms, 1), dtype=bool)), 1)
+
+    def absorb(self, other):
+        """
+        Appends the qubits of another NearCliffordState to this state in place, i.e. this state becomes the
+        tensor product of itself and other. See also tensor_product.
+        :param other: The other NearCliffordState to absorb
+        :type other: :obj:`NearCliffordState`
+        :return: None
+        """
+        if not isinstance(other, NearCliffordState):
+            raise ValueError("Can only absorb other NearCliffordState")
+        self._stabilizer.absorb(other._stabilizer)
+        k1 = self.num_terms
+        k2 = other.num_terms
+        self._x = np.concatenate((np.repeat(self._x, k2, 0), np.tile(other._x, (k1, 1))), 1)
+        self._z = np.concatenate((np.repeat(self._z, k2, 0), np.tile(other._z, (k1, 1))), 1)
+        self._coefficients = np.outer(self._coefficients, other._coefficients).reshape(-1)
+
+    def tensor_product(self, other):
+        """
+        Performs the tensor product with another NearCliffordState and returns a new NearCliffordState.
+        :param other: The other NearCliffordState to perform the tensor product with
+        :type other: :obj:`NearCliffordState`
+        :return: The tensor product of self and other
+        :rtype: :obj:`NearCliffordState`
+        """
+        new_state = NearCliffordState(self)
+        new_state.absorb(other)
+        return new_state
+
+    def find_partition(self):
+        """
+        Finds a partition of the qubits into sets which are in a product with each other. The sets of the finest
+        partition of |phi> (see StabilizerState.find_partition) on which the Paulis P_k differ are joined into one
+        set, since the sum over the terms can entangle them. On the other sets all terms apply the same local Pauli.
+        This is therefore not always the finest partition.
+        :return: Sorted lists of qubit positions covering all qubits, ordered by their first qubit
+        :rtype: list
+        """
+        varying = self._varying_qubits()
+        partition = []
+        joined = []
+        for positions in self._stabilizer.find_partition():
+            if varying[positions].any():
+                joined += positions
+            else:
+                partition.append(positions)
+        if joined:
+            partition.append(sorted(joined))
+        return sorted(partition)
+
+    def split(self, positions):
+        """
+        Removes the qubits at 'positions', which need to be in a product with the other qubits in |phi> (see
+        find_partition), from this state in place and returns their state, up to a global phase. The remaining qubits
+        keep their order.
+
+        The Paulis P_k may differ either on the removed qubits or on the other ones, but not on both. The terms go
+        along with the qubits on which they differ, while the Pauli shared by all terms is applied to |phi> on the
+        other qubits.
+        :param positions: The positions of the qubits to remove
+        :type positions: list of int
+        :return: The state of the removed qubits, in the order of 'positions'
+        :rtype: :obj:`NearCliffordState`
+        """
+        n = self.num_qubits
+        positions = list(positions)
+        others = [j for j in range(n) if j not in positions]
+        varying = self._varying_qubits()
+        if varying[positions].any() and varying[others].any():
+            raise ValueError("The qubits {} are entangled with the other qubits".format(positions))
+        removed = self._stabilizer.split(positions)
+        if not varying[positions].any():
+            # The Pauli shared by all terms is applied to the removed qubits
+            for i, j in enumerate(positions):
+                if self._z[0, j]:
+                    removed.apply_Z(i)
+                if self._x[0, j]:
+                    removed.apply_X(i)
+            self._x = self._x[:, others]
+            self._z = self._z[:, others]
+            return NearCliffordState(removed)
+
+        # The terms move with the removed qubits and the Pauli shared by all terms is applied to the other qubits
+        paulis = np.concatenate((self._x[:, positions], self._z[:, positions]), 1)
+        removed = NearCliffordState(removed, paulis, self._coefficients)
+        for i, j in enumerate(others):
+            if self._z[0, j]:
+                self._stabilizer.apply_Z(i)
+            if self._x[0, j]:
+                self._stabilizer.apply_X(i)
+        self._x = np.zeros(shape=(1, len(others)), dtype=bool)
+        self._z = np.zeros(shape=(1, len(others)), dtype=bool)
+        self._coefficients = np.ones(1, dtype=complex)
+        return removed
+
+    def _varying_qubits(self):
+        """
+        Returns a boolean array which is True for the qubits on which the Paulis P_k are not all the same.
+        :rtype: :obj:`numpy.array`
+        """
+        return (self._x != self._x[:1]).any(axis=0) | (self._z != self._z[:1]).any(axis=0)
+
+    def _flip_signs(self, negative):
+        """
+        Multiplies the coefficients of the terms given by the boolean mask 'negative' by -1.
+        :return: None
+        """
+        self._coefficients[negative] *= -1
+
+    def apply_X(self, position):
+        """
+        Applies the Pauli X operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._stabilizer.apply_X(position)
+        self._flip_signs(self._z[:, position])
+
+    def apply_Y(self, position):
+        """
+        Applies the Pauli Y operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._stabilizer.apply_Y(position)
+        self._flip_signs(self._x[:, position] ^ self._z[:, position])
+
+    def apply_Z(self, position):
+        """
+        Applies the Pauli Z operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._stabilizer.apply_Z(position)
+        self._flip_signs(self._x[:, position])
+
+    def apply_H(self, position):
+        """
+        Applies the Hadamard operator to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._stabilizer.apply_H(position)
+        x = self._x[:, position].copy()
+        z = self._z[:, position]
+        self._flip_signs(x & z)
+        self._x[:, position] = z
+        self._z[:, position] = x
+
+    def apply_K(self, position):
+        """
+        Applies the K operator (which maps the standard basis to the Y eigenbasis) to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._stabilizer.apply_K(position)
+        self._flip_signs(self._x[:, position] & ~self._z[:, position])
+        self._x[:, position] ^= self._z[:, position]
+
+    def apply_S(self, position):
+        """
+        Applies the phase gate S to qubit 'position'.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        self._stabilizer.apply_S(position)
+        self._flip_signs(self._x[:, position] & self._z[:, position])
+        self._z[:, position] ^= self._x[:, position]
+
+    def apply_CNOT(self, control, target):
+        """
+        Applies CNOT using qubit 'control' as control and 'target' as target.
+        :param control: The control qubit
+        :type control: int
+        :param target: The target qubit
+        :type control: int
+        :return: None
+        """
+        self._stabilizer.apply_CNOT(control, target)
+        x_control, z_control = self._x[:, control], self._z[:, control]
+        x_target, z_target = self._x[:, target], self._z[:, target]
+        self._flip_signs(x_control & z_target & ~(x_target ^ z_control))
+        self._x[:, target] ^= x_control
+        self._z[:, control] ^= z_target
+
+    def apply_CZ(self, control, target):
+        """
+        Applies CZ using qubit 'control' as control and 'target' as target.
+        :param control: The control qubit
+        :type control: int
+        :param target: The target qubit
+        :type control: int
+        :return: None
+        """
+        self._stabilizer.apply_CZ(control, target)
+        x_control, z_control = self._x[:, control], self._z[:, control]
+        x_target, z_target = self._x[:, target], self._z[:, target]
+        self._flip_signs(x_control & x_target & (z_control ^ z_target))
+        self._z[:, target] ^= x_control
+        self._z[:, control] ^= x_target
+
+    def apply_T(self, position):
+        """
+        Applies the T gate, i.e. diag(1, exp(i pi / 4)), to qubit 'position'. This doubles the number of terms,
+        unless the qubit is in a state where terms can be merged.
+        :param position: The position of the qubit.
+        :type position: int
+        :return: None
+        """
+        phase = np.exp(1j * np.pi / 4)
+        self._apply_pauli_sum([position], [((0,), (1 + phase) / 2), ((3,), (1 - phase) / 2)])
+
+    def apply_rotation(self, position, n, a):
+        """
+        Applies a rotation around the axis n with the angle a to qubit 'position', i.e.
+        exp(-i a / 2 (n_x X + n_y Y + n_z Z)) for a normalized axis.
+        :param position: The position of the qubit.
+        :type position: int
+        :param n: A tuple of three numbers specifying the rotation axis, e.g n=(1,0,0)
+        :type n: tuple
+        :param a: The rotation angle in radians.
+        :type a: float
+        :return: None
+        """
+        norm = np.linalg.norm(n)
+        if norm == 0:
+            raise ValueError("Rotation vector n can't be 0")
+        terms = [((0,), np.cos(a / 2))] + [((p,), -1j * np.sin(a / 2) * n[p - 1] / norm) for p in range(1, 4)]
+        self._apply_pauli_sum([position], terms)
+
+    def apply_single_qubit_gate(self, position, matrix):
+        """
+        Applies a single qubit gate, given as a 2-by-2 unitary matrix, to qubit 'position'.
+        Clifford operations are recognized, such that these do not increase the number of terms.
+        :param position: The position of the qubit.
+        :type position: int
+        :param matrix: The unitary
+        :type matrix: :obj:`numpy.array`
+        :return: None
+        """
+        matrix = np.asarray(matrix, dtype=complex)
+        if matrix.shape != (2, 2):
+            raise ValueError("A single qubit gate needs to be a 2x2 matrix")
+        key = _matrix_key(matrix)
+        if key in _CLIFFORD_KEYS:
+            self._check_position(position)
+            # The decomposition is in the order the gates should be applied
+            for gate in _DECOMPOSITIONS[_CLIFFORD_KEYS[key]]:
+                getattr(self, "apply_" + gate)(position)
+        else:
+            self._apply_pauli_sum([position], _pauli_decomposition(matrix))
+
+    def apply_two_qubit_gate(self, position1, position2, matrix):
+        """
+        Applies a two qubit gate, given as a 4-by-4 unitary matrix where 'position1' is the most significant qubit.
+        This can increase the number of terms by up to a factor 16, so use apply_CNOT and apply_CZ when possible.
+        :param position1: The position of the first qubit.
+        :type position1: int
+        :param position2: The position of the second qubit.
+        :type position2: int
+        :param matrix: The unitary
+        :type matrix: :obj:`numpy.array`
+        :return: None
+        """
+        matrix = np.asarray(matrix, dtype=complex)
+        if matrix.shape != (4, 4):
+            raise ValueError("A two qubit gate needs to be a 4x4 matrix")
+        if position1 == position2:
+            raise ValueError("The two qubits cannot be the same")
+        self._apply_pauli_sum([position1, position2], _pauli_decomposition(matrix))
+
+    def _apply_pauli_sum(self, positions, terms):
+        """
+        Applies the operator sum_j a_j Q_j, where Q_j are Paulis on the qubits 'positions', to the state.
+        Each term of the state is replaced by one term per Q_j, after which terms are merged.
+        :param positions: The positions of the qubits
+        :type positions: list of int
+        :param terms: The Q_j, as tuples of Pauli indices (see _pauli_decomposition), together with the a_j
+        :type terms: list of tuple
+        :return: None
+        """
+        for position in positions:
+            self._check_position(position)
+        new_x = []
+        new_z = []
+        new_coefficients = []
+        for paulis, coefficient in terms:
+            x = self._x.copy()
+            z = self._z.copy()
+            # Multiply the Paulis of the terms by Q_j from the left
+            exponent = np.zeros(self.num_terms, dtype=np.int64)
+            for position, pauli in zip(positions, paulis):
+                q_x, q_z = _PAULI_BITS[pauli]
+                exponent += _pauli_product_exponent(q_x, q_z, x[:, position], z[:, position])
+                x[:, position] ^= q_x
+                z[:, position] ^= q_z
+            new_x.append(x)
+            new_z.append(z)
+            new_coefficients.append(coefficient * self._coefficients * 1j ** (exponent % 4))
+        self._x = np.concatenate(new_x)
+        self._z = np.concatenate(new_z)
+        self._coefficients = np.concatenate(new_coefficients)
+        self._normalize()
+
+    def _normalize(self):
+        """
+        Merges terms (see _merge_terms) and normalizes the state.
+        :return: None
+        """
+        norm = self._merge_terms()
+        if norm == 0:
+            raise ValueError("The state is zero")
+        self._coefficients /= norm
+
+    def _merge_terms(self):
+        """
+        Merges terms which describe the same state (up to a phase) and removes terms with zero coefficient.
+
+        The state P|phi> is the common eigenvector of the generators of |phi>, with eigenvalues given by whether P
+        commutes or anticommutes with each of them. Terms for which these agree are therefore proportional,
+        i.e. P_a|phi> = i^e <phi|Q|phi> P_b|phi> where P_b P_a = i^e Q, and terms for which they do not agree are
+        orthogonal. After merging, the norm of the state is therefore the norm of the vector of coefficients.
+        :return: The norm of the state
+        :rtype: float
+        """
+        n = self.num_qubits
+        generators = self._stabilizer.to_array().astype(np.int64)
+        if self.num_terms > 1 and n > 0:
+            anticommuting = (np.dot(self._x, generators[:, n : 2 * n].T) + np.dot(self._z, generators[:, :n].T)) % 2
+            _, representatives, groups = np.unique(
+                np.packbits(anticommuting.astype(bool), axis=1), axis=0, return_index=True, return_inverse=True
+            )
+            groups = groups.reshape(-1)
+            coefficients = np.zeros(len(representatives), dtype=complex)
+            for term, group in enumerate(groups):
+                representative = representatives[group]
+                if term == representative:
+                    coefficients[group] += self._coefficients[term]
+                    continue
+                x_r, z_r = self._x[representative], self._z[representative]
+                x_a, z_a = self._x[term], self._z[term]
+                exponent = int(_pauli_product_exponent(x_r, z_r, x_a, z_a).sum(dtype=np.int64)) % 4
+                sign = self._stabilizer.expectation(np.concatenate((x_r ^ x_a, z_r ^ z_a)))
+                coefficients[group] += self._coefficients[term] * 1j ** exponent * sign
+            self._x = self._x[representatives]
+            self._z = self._z[representatives]
+            self._coefficients = coefficients
+        elif self.num_terms > 1:
+            # With no qubits, all terms are the identity
+            self._x = self._x[:1]
+            self._z = self._z[:1]
+            self._coefficients = np.array([self._coefficients.sum()])
+
+        non_zero = np.abs(self._coefficients) > _EPSILON
+        self._x = self._x[non_zero]
+        self._z = self._z[non_zero]
+        self._coefficients = self._coefficients[non_zero]
+        return np.linalg.norm(self._coefficients)
+
+    def measure(self, position, inplace=False):
+        """
+        Measures qubit 'position' in the standard basis. The outcome is sampled according to its probability,
+        which is computed from the terms.
+        If 'inplace=False' the qubit is removed from the state, i.e. the number of qubits in the state is reduced by one
+        If 'inplace=True' the qubit is not removed and the number of qubits remain the same.
+        :param position: The position of the qubit.
+        :type position: int
+        :param inplace: Whether to measure the qubit in place or not. (I.e. to keep it or not)
+        :type inplace: bool
+        :return: The measurement outcome (0 or 1, where 0 is the +1 eigenvalue and 1 is the -1)
+        :rtype: int
+        """
+        self._check_position(position)
+        n = self.num_qubits
+        z_observable = np.zeros(2 * n, dtype=bool)
+        z_observable[n + position] = True
+        expectation = self._stabilizer.expectation(z_observable)
+        if expectation != 0:
+            # Z is (up to a sign) in the stabilizer group of |phi>, so each term is an eigenvector of Z and the
+            # terms for the two outcomes are orthogonal
+            term_outcomes = self._x[:, position] ^ (expectation == -1)
+            probability_one = np.sum(np.abs(self._coefficients[term_outcomes]) ** 2)
+            outcome = int(random() < probability_one)
+            keep = term_outcomes == outcome
+            self._x = self._x[keep]
+            self._z = self._z[keep]
+            self._coefficients = self._coefficients[keep]
+        else:
+            # Z anticommutes with a generator g of |phi>. With Pi_m the projector onto outcome m, we have
+            # Pi_m P|phi> = P Pi_(m + x) |phi> where x is the X-part of P at the qubit, and
+            # Pi_(1 - o)|phi> = g Pi_o |phi>, where o is the outcome of measuring |phi>
+            generators = self._stabilizer.to_array()
+            g = generators[np.flatnonzero(generators[:, position])[0]]
+            phi_outcome = self._stabilizer.measure(position, inplace=True)
+            g_exponents = _pauli_product_exponent(self._x, self._z, g[:n], g[n : 2 * n]).sum(axis=1, dtype=np.int64)
+            g_coefficients = self._coefficients * 1j ** (g_exponents % 4) * (-1 if g[2 * n] else 1)
+            x_g = self._x ^ g[:n]
+            z_g = self._z ^ g[n : 2 * n]
+            # The unnormalized states after measuring each outcome, whose squared norms are the probabilities
+            candidates = []
+            for outcome in [0, 1]:
+                multiply_by_g = self._x[:, position] ^ outcome ^ phi_outcome
+                candidate = NearCliffordState.__new__(NearCliffordState)
+                candidate._stabilizer = self._stabilizer
+                candidate._x = np.where(multiply_by_g[:, np.newaxis], x_g, self._x)
+                candidate._z = np.where(multiply_by_g[:, np.newaxis], z_g, self._z)
+                candidate._coefficients = np.where(multiply_by_g, g_coefficients, self._coefficients)
+                candidates.append((candidate, candidate._merge_terms() ** 2))
+            outcome = int(random() * (candidates[0][1] + candidates[1][1]) < candidates[1][1])
+            candidate = candidates[outcome][0]
+            self._x = candidate._x
+            self._z = candidate._z
+            self._coefficients = candidate._coefficients
+        self._coefficients = self._coefficients / np.linalg.norm(self._coefficients)
+        if not inplace:
+            self._remove_measured_qubit(position, outcome)
+        return outcome
+
+    def has_random_outcome(self, position):
+        """
+        Returns whether measuring qubit 'position' in the standard basis may have a random outcome. This is not the
+        case if the outcome is fixed for |phi> and no Pauli P_k flips it, since then every term gives that outcome.
+        :param position: The position of the qubit.
+        :type position: int
+        :rtype: bool
+        """
+        self._check_position(position)
+        return self._stabilizer.has_random_outcome(position) or bool(self._x[:, position].any())
+
+    def _remove_measured_qubit(self, position, outcome):
+        """
+        Removes qubit 'position' after it has been measured with the given outcome.
+        :return: None
+        """
+        # All terms now have the same X-part at the qubit and |phi> is an eigenvector of Z on the qubit,
+        # so Z acts as a sign and Y = iXZ as X up to a phase. The X's can then be applied to |phi>
+        phi_outcome = outcome ^ self._x[0, position]
+        z_part = self._z[:, position]
+        self._coefficients[z_part] *= -1 if phi_outcome else 1
+        self._coefficients[z_part & self._x[:, position]] *= 1j
+        self._z[:, position] = False
+        if self._x[0, position]:
+            self._stabilizer.apply_X(position)
+            self._x[:, position] = False
+        self._stabilizer.measure(position)
+        self._x = np.delete(self._x, position, 1)
+        self._z = np.delete(self._z, position, 1)
@@ -9,10 +9,115 @@
 
 import numpy as np
 import networkx as nx
-from scipy.linalg import block_diag
 from random import randint
 
 
+def _nr_words(nr_bits):
+    """
+    Returns the number of 64-bit words needed to store 'nr_bits' bits.
+    """
+    return (nr_bits + 63) // 64
+
+
+def _pack_bits(bits, nr_words=None):
+    """
+    Packs the last axis of a boolean array into 64-bit words (little-endian bit order),
+    i.e. bit 'i' ends up as bit 'i % 64' of word 'i // 64'. Unused bits of the last word are zero.
+    :param bits: The boolean array to pack
+    :type bits: :obj:`numpy.array`
+    :param nr_words: The number of words to pack into, defaults to ceil(nr_bits / 64)
+    :type nr_words: int
+    :return: The packed array, where the last axis has length nr_words
+    :rtype: :obj:`numpy.array` of dtype uint64
+    """
+    bits = np.asarray(bits, dtype=bool)
+    nr_bits = bits.shape[-1]
+    if nr_words is None:
+        nr_words = _nr_words(nr_bits)
+    padded = np.zeros(shape=bits.shape[:-1] + (64 * nr_words,), dtype=bool)
+    padded[..., :nr_bits] = bits
+    return np.packbits(padded, axis=-1, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def _unpack_bits(words, nr_bits):
+    """
+    Inverse of _pack_bits, i.e. unpacks the last axis of an array of 64-bit words into 'nr_bits' booleans.
+    :param words: The packed array
+    :type words: :obj:`numpy.array` of dtype uint64
+    :param nr_bits: The number of bits to unpack
+    :type nr_bits: int
+    :return: The unpacked boolean array
+    :rtype: :obj:`numpy.array`
+    """
+    as_bytes = np.ascontiguousarray(words, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=-1, bitorder="little")[..., :nr_bits].astype(bool)
+
+
+def _pack_bits_at(bits, offset):
+    """
+    Packs the last axis of a boolean array as _pack_bits, but such that bit 'i' ends up at position 'i + offset % 64'.
+    The result should then be placed starting from word 'offset // 64' of the destination.
+    :param bits: The boolean array to pack
+    :type bits: :obj:`numpy.array`
+    :param offset: The position of the first bit in the destination
+    :type offset: int
+    :return: The packed array
+    :rtype: :obj:`numpy.array` of dtype uint64
+    """
+    bits = np.asarray(bits, dtype=bool)
+    padding = np.zeros(shape=bits.shape[:-1] + (offset % 64,), dtype=bool)
+    return _pack_bits(np.concatenate((padding, bits), -1))
+
+
+def _get_bits(words, index):
+    """
+    Returns bit 'index' of the packed last axis of 'words', i.e. the inverse of _pack_bits for a single bit.
+    :param words: The packed array
+    :type words: :obj:`numpy.array` of dtype uint64
+    :param index: The index of the bit
+    :type index: int
+    :return: The bits as a boolean array with one dimension less than 'words'
+    :rtype: :obj:`numpy.array`
+    """
+    return ((words[..., index // 64] >> np.uint64(index % 64)) & np.uint64(1)).astype(bool)
+
+
+def _swap_bits(words, i, j):
+    """
+    Swaps bit 'i' and bit 'j' of the packed last axis of 'words' (inplace).
+    :param words: The packed array
+    :type words: :obj:`numpy.array` of dtype uint64
+    :param i: The index of the first bit
+    :type i: int
+    :param j: The index of the second bit
+    :type j: int
+    :return: None
+    """
+    shift_i = np.uint64(i % 64)
+    shift_j = np.uint64(j % 64)
+    diff = ((words[..., i // 64] >> shift_i) ^ (words[..., j // 64] >> shift_j)) & np.uint64(1)
+    words[..., i // 64] ^= diff << shift_i
+    words[..., j // 64] ^= diff << shift_j
+
+
+def _pauli_product_exponent(x1, z1, x2, z2):
+    """
+    Returns the exponent (in {-1, 0, 1}) of i picked up when multiplying the single qubit Paulis P1 * P2,
+    where P1 and P2 are described by the booleans (x1, z1) and (x2, z2), see quant-ph/0406196.
+    The arguments can be arrays of the same (or broadcastable) shape, in which case this is done elementwise.
+    :return: The exponents
+    :rtype: :obj:`numpy.array` of dtype int8
+    """
+    x1 = np.asarray(x1, dtype=np.int8)
+    z1 = np.asarray(z1, dtype=np.int8)
+    x2 = np.asarray(x2, dtype=np.int8)
+    z2 = np.asarray(z2, dtype=np.int8)
+    # P1 = Y: z2 - x2, P1 = X: z2 * (2 * x2 - 1), P1 = Z: x2 * (1 - 2 * z2)
+    return (
+        x1 * z1 * (z2 - x2) + x1 * (1 - z1) * z2 * (2 * x2 - 1) + (1 - x1) * z1 * x2 * (1 - 2 * z2)
+    ).astype(np.int8)
+
+
 class StabilizerState:
     bool2phase = {False: "+1", True: "-1"}
 
@@ -22,6 +127,8 @@ class StabilizerState:
 
     Pauli2bool = {"I": (False, False), "X": (True, False), "Y": (True, True), "Z": (False, True)}
 
+    gate2opcode = {"X": 0, "Y": 1, "Z": 2, "H": 3, "K": 4, "S": 5, "CNOT": 6, "CZ": 7}
+
     def __init__(self, data=None, check_symplectic=True):
         """
         This class represent a stabilizer state and allows to be manipulated using
@@ -84,89 +191,244 @@ class StabilizerState:
         :param check_symplectic: bool
             Whether to check if all stabilizers commute or not.
         """
+        # The generators in standard form and the pivot columns are cached until the state changes,
+        # see _get_standard_form
+        self._standard_form_dirty = True
+        self._standard_form = None
+        self._pivot_columns = None
+
+        # The destabilizers are only given here when they are known without any computation,
+        # otherwise they are computed when needed, see _track_destabilizers
+        destabilizers = None
         if data is None:
-            self._group = np.empty(shape=(0, 0), dtype=bool)
-            self._nr_rows = 0
-            self._nr_cols = 0
+            group = np.empty(shape=(0, 0), dtype=bool)
+            destabilizers = group
         elif isinstance(data, int):
             X_part = np.zeros(shape=(data, data), dtype=bool)
             Z_part = np.identity(data, dtype=bool)
             phases = np.zeros(shape=(data, 1), dtype=bool)
-            self._group = np.concatenate((X_part, Z_part, phases), 1)
-            self._nr_rows = data
-            self._nr_cols = 2 * data + 1
+            group = np.concatenate((X_part, Z_part, phases), 1)
+            # The destabilizer of Z_i is X_i
+            destabilizers = np.concatenate((Z_part, X_part), 1)
         elif isinstance(data, StabilizerState):
-            self._group = np.array(data._group, dtype=bool)
+            self._x_buffer = np.array(data._x_buffer)
+            self._z_buffer = np.array(data._z_buffer)
+            self._phase_words = np.array(data._phase_words)
             self._nr_rows = data._nr_rows
             self._nr_cols = data._nr_cols
+            self._nr_words = data._nr_words
+            self._has_destabilizers = data._has_destabilizers
+            self._update_views()
+            # The cached arrays are never modified in place and can therefore be shared
+            self._standard_form_dirty = data._standard_form_dirty
+            self._standard_form = data._standard_form
+            self._pivot_columns = data._pivot_columns
+            return
         elif isinstance(data, nx.Graph):
             n = data.number_of_nodes()
             adj_matrix = nx.adjacency_matrix(data)
             X_part = np.identity(n, dtype=bool)
             Z_part = np.array(adj_matrix.todense(), dtype=bool)
             phases = [[False]] * n
-            self._group = np.concatenate((X_part, Z_part, phases), 1)
-            self._nr_rows = n
-            self._nr_cols = 2 * n + 1
+            group = np.concatenate((X_part, Z_part, phases), 1)
+            # The destabilizer of X_i Z_N(i) is Z_i
+            destabilizers = np.concatenate((np.zeros(shape=(n, n), dtype=bool), X_part), 1)
+        elif len(data) == 0:
+            group = np.empty(shape=(0, 0), dtype=bool)
         else:
-            if len(data) == 0:
-                self._group = np.empty(shape=(0, 0), dtype=bool)
-                self._nr_rows = 0
-                self._nr_cols = 0
-                return
-            else:
-                if isinstance(data[0], str):
-                    # We should pre-process this entry since it contains strings and not booleans
-                    n = len(data)
-                    if all(map(lambda gen_str: len(gen_str) == n, data)):
-                        X_part = list(map(lambda gen_str: list(map(lambda P_str: P_str in ("X", "Y"), gen_str)), data))
-                        Z_part = list(map(lambda gen_str: list(map(lambda P_str: P_str in ("Y", "Z"), gen_str)), data))
-                        data = np.concatenate((X_part, Z_part), 1)
-                    elif all(map(lambda gen_str: len(gen_str) == (n + 2), data)):
-                        X_part = list(
-                            map(lambda gen_str: list(map(lambda P_str: P_str in ("X", "Y"), gen_str[2:])), data)
-                        )
-                        Z_part = list(
-                            map(lambda gen_str: list(map(lambda P_str: P_str in ("Y", "Z"), gen_str[2:])), data)
-                        )
-                        phases = list(map(lambda gen_str: [self.phase2bool[gen_str[:2]]], data))
-                        data = np.concatenate((X_part, Z_part, phases), 1)
-                    else:
-                        raise ValueError(
-                            "If data is a length-'n' list or stings, then each string needs be of length 'n' or 'n+2'"
-                        )
-                try:
-                    self._group = np.array(data, dtype=bool)
-                except Exception as err:
-                    print(data)
-                    print(type(data))
+            if isinstance(data[0], str):
+                # We should pre-process this entry since it contains strings and not booleans
+                n = len(data)
+                if all(map(lambda gen_str: len(gen_str) == n, data)):
+                    X_part = list(map(lambda gen_str: list(map(lambda P_str: P_str in ("X", "Y"), gen_str)), data))
+                    Z_part = list(map(lambda gen_str: list(map(lambda P_str: P_str in ("Y", "Z"), gen_str)), data))
+                    data = np.concatenate((X_part, Z_part), 1)
+                elif all(map(lambda gen_str: len(gen_str) == (n + 2), data)):
+                    X_part = list(
+                        map(lambda gen_str: list(map(lambda P_str: P_str in ("X", "Y"), gen_str[2:])), data)
+                    )
+                    Z_part = list(
+                        map(lambda gen_str: list(map(lambda P_str: P_str in ("Y", "Z"), gen_str[2:])), data)
+                    )
+                    phases = list(map(lambda gen_str: [self.phase2bool[gen_str[:2]]], data))
+                    data = np.concatenate((X_part, Z_part, phases), 1)
+                else:
                     raise ValueError(
-                        "Could not create an array of the 'data' due to the following error: {}".format(err)
+                        "If data is a length-'n' list or stings, then each string needs be of length 'n' or 'n+2'"
                     )
+            try:
+                group = np.array(data, dtype=bool)
+            except Exception as err:
+                print(data)
+                print(type(data))
+                raise ValueError(
+                    "Could not create an array of the 'data' due to the following error: {}".format(err)
+                )
+
+            if len(group.shape) != 2:
+                raise ValueError("'data' needs to be an array of rank 2")
+            else:
+                nr_rows, nr_cols = group.shape
 
-                if len(self._group.shape) != 2:
-                    raise ValueError("'data' needs to be an array of rank 2")
+                if 2 * nr_rows == nr_cols:
+                    if nr_rows != 0:
+                        group = np.append(group, [[False]] * nr_rows, 1)
+                elif (2 * nr_rows + 1) == nr_cols:
+                    pass
                 else:
-                    self._nr_rows, self._nr_cols = self._group.shape
-
-                    if 2 * self._nr_rows == self._nr_cols:
-                        if self._nr_rows != 0:
-                            self._group = np.append(self._group, [[False]] * self._nr_rows, 1)
-                    elif (2 * self._nr_rows + 1) == self._nr_cols:
-                        pass
-                    else:
-                        raise ValueError("'data' needs to be an array of dimension n x 2n or n x (2n +1)")
-                if check_symplectic:
-                    # Check that all stabilizers commute, i.e. the matrix should be symplectic
-                    n = self._nr_rows
-                    zeros = np.zeros(shape=(n, n), dtype=int)
-                    identity = np.identity(n, dtype=int)
-                    P = np.block([[zeros, identity], [identity, zeros]])
-                    M = np.array(self._group[:, :-1], dtype=int)
-
-                    commute = M @ P @ M.transpose()
-                    if (commute % 2).any():
-                        raise ValueError("All stabilizer of the group constructed from the input does not commute.")
+                    raise ValueError("'data' needs to be an array of dimension n x 2n or n x (2n +1)")
+            if check_symplectic:
+                # Check that all stabilizers commute, i.e. the matrix should be symplectic
+                # (using floats such that BLAS is used, which is exact since the entries are at most 2n)
+                n = nr_rows
+                zeros = np.zeros(shape=(n, n), dtype=float)
+                identity = np.identity(n, dtype=float)
+                P = np.block([[zeros, identity], [identity, zeros]])
+                M = np.array(group[:, :-1], dtype=float)
+
+                commute = M @ P @ M.transpose()
+                if (commute % 2).any():
+                    raise ValueError("All stabilizer of the group constructed from the input does not commute.")
+
+        self._set_group(group, destabilizers)
+
+    def _set_group(self, group, destabilizers=None):
+        """
+        Stores the boolean matrix 'group' (see __init__) in the packed form used internally.
+
+        The X- and Z-part are stored qubit by qubit, where the bits of all generators (rows) are packed
+        into 64-bit words, i.e. bit 'i % 64' of word 'i // 64' of self._x_words[j] is the X-part of generator 'i'
+        on qubit 'j'. The phases of the generators are packed in the same way in self._phase_words.
+        Bits beyond the number of generators are always zero.
+
+        If 'destabilizers' is given, these are packed in the same way and stored after the words of the generators,
+        i.e. word 'self._nr_words + i // 64' of self._x_words[j] contains the X-part of destabilizer 'i' on qubit 'j'.
+        Destabilizer 'i' anticommutes with generator 'i' and commutes with all other generators, see quant-ph/0406196.
+        Since the columns of the destabilizers are stored together with the ones of the generators, any Clifford
+        operation updates both at the same time. The phases of the destabilizers are not needed and not tracked.
+
+        The packed arrays are views of buffers which can hold more qubits (rows) and more words (self._nr_words is
+        the number of words reserved for the generators), such that qubits can be appended in place, see _reserve.
+        :param group: The boolean matrix describing the generators
+        :type group: :obj:`numpy.array`
+        :param destabilizers: The boolean n-by-2n matrix describing the destabilizers (optional)
+        :type destabilizers: :obj:`numpy.array`
+        :return: None
+        """
+        n = group.shape[0]
+        self._nr_rows = n
+        self._nr_cols = group.shape[1]
+        self._nr_words = _nr_words(n)
+        self._x_buffer = _pack_bits(group[:, :n].transpose())
+        self._z_buffer = _pack_bits(group[:, n : 2 * n].transpose())
+        if group.shape[1] > 2 * n:
+            self._phase_words = _pack_bits(group[:, 2 * n])
+        else:
+            self._phase_words = _pack_bits(np.zeros(n, dtype=bool))
+        self._has_destabilizers = destabilizers is not None
+        if self._has_destabilizers:
+            destabilizers = np.asarray(destabilizers, dtype=bool)
+            self._x_buffer = np.concatenate((self._x_buffer, _pack_bits(destabilizers[:, :n].transpose())), 1)
+            self._z_buffer = np.concatenate((self._z_buffer, _pack_bits(destabilizers[:, n : 2 * n].transpose())), 1)
+        self._update_views()
+
+    def _update_views(self):
+        """
+        Updates self._x_words and self._z_words to be the views of the buffers containing the current qubits.
+        :return: None
+        """
+        self._x_words = self._x_buffer[: self._nr_rows]
+        self._z_words = self._z_buffer[: self._nr_rows]
+
+    def _reserve(self, nr_qubits):
+        """
+        Makes sure that the buffers can hold 'nr_qubits' qubits, by doubling their capacity if needed.
+        Appending qubits one by one is therefore amortized O(n) per qubit.
+        :param nr_qubits: The number of qubits to reserve space for
+        :type nr_qubits: int
+        :return: None
+        """
+        capacity = self._x_buffer.shape[0]
+        w = self._nr_words
+        new_capacity = capacity
+        while new_capacity < nr_qubits:
+            new_capacity = max(1, 2 * new_capacity)
+        new_w = w
+        while 64 * new_w < nr_qubits:
+            new_w = max(1, 2 * new_w)
+        if new_capacity == capacity and new_w == w:
+            return
+
+        nr_halves = 2 if self._has_destabilizers else 1
+        for name in ["_x_buffer", "_z_buffer"]:
+            old_buffer = getattr(self, name)
+            new_buffer = np.zeros(shape=(new_capacity, nr_halves * new_w), dtype=np.uint64)
+            new_buffer[:capacity, :w] = old_buffer[:, :w]
+            if self._has_destabilizers:
+                new_buffer[:capacity, new_w : new_w + w] = old_buffer[:, w:]
+            setattr(self, name, new_buffer)
+        new_phase_words = np.zeros(shape=(new_w,), dtype=np.uint64)
+        new_phase_words[:w] = self._phase_words
+        self._phase_words = new_phase_words
+        self._nr_words = new_w
+        self._update_views()
+
+    def _track_destabilizers(self):
+        """
+        Computes the destabilizers of the current generators (see _set_group), unless they are already tracked.
+
+        This is done by Gaussian elimination over GF(2) and is therefore only done once, after which the
+        destabilizers are updated together with the generators.
+        :return: None
+        """
+        if self._has_destabilizers:
+            return
+        n = self._nr_rows
+        group = self.to_array()
+        # Destabilizer 'i' should have a symplectic inner product with generator 'j' equal to delta_ij, i.e.
+        # A * D^T = I, where A = [Z | X] are the generators with the X- and Z-part swapped.
+        # Row reducing A gives T such that T * A has the identity in the pivot columns, so D^T = T in these rows.
+        A = np.concatenate((group[:, n : 2 * n], group[:, :n]), 1)
+        T = np.identity(n, dtype=bool)
+        pivot_columns = []
+        h = 0
+        for k in range(2 * n):
+            if h == n:
+                break
+            non_zero_ind = np.flatnonzero(A[h:, k])
+            if len(non_zero_ind) == 0:
+                continue
+            i_max = h + non_zero_ind[0]
+            if i_max != h:
+                A[[h, i_max]] = A[[i_max, h]]
+                T[[h, i_max]] = T[[i_max, h]]
+            rows = A[:, k].copy()
+            rows[h] = False
+            A[rows] ^= A[h]
+            T[rows] ^= T[h]
+            pivot_columns.append(k)
+            h += 1
+        if h < n:
+            raise ValueError("The generators of the stabilizer group are not independent")
+        destabilizers = np.zeros(shape=(n, 2 * n), dtype=bool)
+        destabilizers[:, pivot_columns] = T.transpose()
+        self._set_group(group, destabilizers)
+
+    def _destabilizers_to_array(self):
+        """
+        Returns the destabilizers (without phases) as a boolean n-by-2n numpy array, computing them if needed.
+        Row 'i' is the destabilizer of row 'i' of self.to_array().
+        :return: The destabilizers
+        :rtype: :obj:`numpy.array`
+        """
+        self._track_destabilizers()
+        n = self._nr_rows
+        w = self._nr_words
+        if n == 0:
+            return np.empty(shape=(0, 0), dtype=bool)
+        X_part = _unpack_bits(self._x_words[:, w:], n).transpose()
+        Z_part = _unpack_bits(self._z_words[:, w:], n).transpose()
+        return np.concatenate((X_part, Z_part), 1)
 
     @property
     def num_qubits(self):
@@ -180,19 +442,19 @@ class StabilizerState:
                 return False
             else:
                 # Get the standard forms of the groups
-                this_group = self.boolean_gaussian_elimination(self._group)
-                other_group = self.boolean_gaussian_elimination(other._group)
+                this_group, _ = self._get_standard_form()
+                other_group, _ = other._get_standard_form()
                 return np.all(this_group == other_group)
 
     def __mul__(self, other):
         return self.tensor_product(other)
 
     def __repr__(self):
-        return "StabilizerState(np." + self._group.__repr__() + ")"
+        return "StabilizerState(np." + self.to_array().__repr__() + ")"
 
     def __str__(self):
         to_return = "Stabilizer state on {} with the following stabilizer generators:\n".format(self.num_qubits)
-        for row in self._group:
+        for row in self.to_array():
             to_return += "    {} ".format(self.bool2phase[row[-1]])
             n = self.num_qubits
             for i in range(n):
@@ -254,19 +516,21 @@ class StabilizerState:
                 i_max = non_zero_ind_under_h[0]
                 if i_max != h:
                     new_matrix[[h, i_max]] = new_matrix[[i_max, h]]
-                # Add pivot row to the rest
+                # Add pivot row to the rest, all rows at once
                 pivot_columns.append(k)
-                non_zero_except_i_max = non_zero_ind[non_zero_ind != i_max]
-
-                for i_loop in non_zero_except_i_max:
-                    extra_phase = 0  # we count i's here, so 2 -> (-i)^2=-1, 4->1, 6-> -1
-                    for j in range(m):
-                        extra_phase += StabilizerState.Pauli_phase_tracking(
-                            [new_matrix[i_loop, j], new_matrix[i_loop, j + m]], [new_matrix[h, j], new_matrix[h, j + m]]
-                        )
-                    new_matrix[i_loop, :] = np.logical_xor(new_matrix[i_loop, :], new_matrix[h, :])
-                    if (extra_phase / 2) % 2:
-                        new_matrix[i_loop, -1] = np.logical_not(new_matrix[i_loop, -1])
+                rows = new_matrix[:, k].copy()
+                rows[h] = False
+                if rows.any():
+                    pivot_row = new_matrix[h]
+                    other_rows = new_matrix[rows]
+                    # we count i's here, so 2 -> (-i)^2=-1, 4->1, 6-> -1
+                    extra_phase = _pauli_product_exponent(
+                        pivot_row[:m], pivot_row[m : 2 * m], other_rows[:, :m], other_rows[:, m : 2 * m]
+                    ).sum(axis=1, dtype=np.int64)
+                    other_rows ^= pivot_row
+                    # The phase is flipped for an extra -1, but also if the rows anticommute (odd extra phase)
+                    other_rows[:, -1] ^= extra_phase % 4 != 0
+                    new_matrix[rows] = other_rows
                 h += 1
                 k += 1
         if return_pivot_columns:
@@ -276,10 +540,10 @@ class StabilizerState:
 
     def check_symplectic(self):
         n = self._nr_rows
-        zeros = np.zeros(shape=(n, n), dtype=int)
-        identity = np.identity(n, dtype=int)
+        zeros = np.zeros(shape=(n, n), dtype=float)
+        identity = np.identity(n, dtype=float)
         P = np.block([[zeros, identity], [identity, zeros]])
-        M = np.array(self._group[:, :-1], dtype=int)
+        M = np.array(self.to_array()[:, :-1], dtype=float)
 
         commute = M @ P @ M.transpose()
         if (commute % 2).any():
@@ -293,15 +557,64 @@ class StabilizerState:
         Appends a qubit in the state \|0\> to the current state
         :return: None
         """
-        z0 = StabilizerState([[0, 1]])
-        self.__init__(self.tensor_product(z0))
+        self._standard_form_dirty = True
+        n = self._nr_rows
+        self._reserve(n + 1)
+        self._nr_rows = n + 1
+        self._nr_cols = 2 * (n + 1) + 1
+        self._update_views()
+
+        # The new generator is Z and its destabilizer X on the new qubit
+        word = n // 64
+        bit = np.uint64(1) << np.uint64(n % 64)
+        self._z_words[n, word] |= bit
+        if self._has_destabilizers:
+            self._x_words[n, self._nr_words + word] |= bit
+
+    def absorb(self, other):
+        r"""
+        Appends the qubits of another StabilizerState to this state in place, i.e. this state becomes the
+        tensor product of itself and other. See also tensor_product.
+        :param other: The other StabilizerState to absorb
+        :type other: :obj:`StabilizerState`
+        :return: None
+        """
+        if not isinstance(other, StabilizerState):
+            raise ValueError("Can only absorb other StabilizerState")
+        n1 = self._nr_rows
+        n2 = other._nr_rows
+        if n2 == 0:
+            return
+        self._standard_form_dirty = True
+        if self._has_destabilizers:
+            other._track_destabilizers()
+        self._reserve(n1 + n2)
+        self._nr_rows = n1 + n2
+        self._nr_cols = 2 * (n1 + n2) + 1
+        self._update_views()
+
+        # The generators (and destabilizers) of other are shifted to the rows after the ones of this state
+        w = self._nr_words
+        other_w = other._nr_words
+        start = n1 // 64
+        parts = [(slice(None, w), slice(None, other_w))]
+        if self._has_destabilizers:
+            parts.append((slice(w, None), slice(other_w, None)))
+        for this_words, other_words in [(self._x_words, other._x_words), (self._z_words, other._z_words)]:
+            for this_part, other_part in parts:
+                shifted = _pack_bits_at(_unpack_bits(other_words[:, other_part], n2), n1)
+                this_words[n1:, this_part][:, start : start + shifted.shape[1]] |= shifted
+        shifted = _pack_bits_at(_unpack_bits(other._phase_words, n2), n1)
+        self._phase_words[start : start + len(shifted)] |= shifted
 
     def put_in_standard_form(self):
         """
         Puts the generators of the stabilizer group in standard form by performing Gaussiand elemination
         :return: None
         """
-        self._group = self.boolean_gaussian_elimination(self._group)
+        # The group is unchanged, so the cached standard form stays valid
+        group, _ = self._get_standard_form()
+        self._set_group(group)
 
     def tensor_product(self, other):
         r"""
@@ -322,22 +635,69 @@ class StabilizerState:
         """
         if not isinstance(other, StabilizerState):
             raise ValueError("Can only perform tensor product with other StabilizerState")
-        if self.num_qubits == 0:
-            return StabilizerState(other)
-        elif other.num_qubits == 0:
-            return self
-        else:
-            this_X_stab = self._group[:, : self.num_qubits]
-            this_Z_stab = self._group[:, self.num_qubits : -1]
-            other_X_stab = other._group[:, : other.num_qubits]
-            other_Z_stab = other._group[:, other.num_qubits : -1]
+        new_state = StabilizerState(self)
+        new_state.absorb(other)
+        return new_state
 
-            new_X_stab = block_diag(this_X_stab, other_X_stab)
-            new_Z_stab = block_diag(this_Z_stab, other_Z_stab)
-
-            phases = np.append(self._group[:, -1:], other._group[:, -1:], 0)
-            new_group = np.concatenate((new_X_stab, new_Z_stab, phases), 1)
-            return StabilizerState(new_group)
+    def find_partition(self):
+        """
+        Finds the finest partition of the qubits into sets which are in a product with each other, i.e. such that
+        this state is the tensor product of states on these sets.
+
+        These are the connected components of the qubits, where two qubits are connected if a generator in standard
+        form acts on both. The standard form is unique and, for a state which is a product over some sets of qubits,
+        each of its generators acts within one set, since the standard forms of the factors together are in standard
+        form. The components are therefore the finest partition.
+        :return: Sorted lists of qubit positions covering all qubits, ordered by their first qubit
+        :rtype: list
+        """
+        n = self.num_qubits
+        if n < 2:
+            return [list(range(n))]
+        group, _ = self._get_standard_form()
+        support = np.array(group[:, :n] | group[:, n : 2 * n], dtype=float)
+        graph = nx.from_numpy_array(support.transpose() @ support)
+        return sorted(sorted(component) for component in nx.connected_components(graph))
+
+    def split(self, positions):
+        """
+        Removes the qubits at 'positions', which need to be in a product with the other qubits (see find_partition),
+        from this state in place and returns their state. The remaining qubits keep their order.
+        :param positions: The positions of the qubits to remove
+        :type positions: list of int
+        :return: The state of the removed qubits, in the order of 'positions'
+        :rtype: :obj:`StabilizerState`
+        """
+        n = self.num_qubits
+        positions = list(positions)
+        others = [j for j in range(n) if j not in positions]
+        group, pivot_columns = self._get_standard_form()
+        support = group[:, :n] | group[:, n : 2 * n]
+        inside = ~support[:, others].any(axis=1)
+        if inside.sum() != len(positions):
+            raise ValueError("The qubits {} are entangled with the other qubits".format(positions))
+
+        # The tracked destabilizers are replaced by the ones of the standard form, which are single qubit Paulis:
+        # a Z if the pivot column is the X-part of a qubit and an X if it is the Z-part. These act within the block
+        # of their generator and are therefore restricted along with it.
+        destabilizers = None
+        if self._has_destabilizers:
+            destabilizers = np.zeros(shape=(n, 2 * n), dtype=bool)
+            for row, column in enumerate(pivot_columns):
+                destabilizers[row, (column + n) % (2 * n)] = True
+
+        # Each generator in standard form acts either on the removed qubits or on the other ones, see find_partition
+        def restrict(rows, qubits):
+            columns = qubits + [n + j for j in qubits]
+            if destabilizers is None:
+                return group[rows][:, columns + [2 * n]], None
+            return group[rows][:, columns + [2 * n]], destabilizers[rows][:, columns]
+
+        removed = StabilizerState(check_symplectic=False)
+        removed._set_group(*restrict(inside, positions))
+        self._set_group(*restrict(~inside, others))
+        self._standard_form_dirty = True
+        return removed
 
     def to_array(self, standard_form=False, return_pivot_columns=False):
         """
@@ -352,14 +712,97 @@ class StabilizerState:
         :return: The generators of this stabilizer group as a numpy array
         :rtype: :obj:`numpy.array`
         """
-
         if standard_form:
+            group, pivot_columns = self._get_standard_form()
             if return_pivot_columns:
-                return self.boolean_gaussian_elimination(self._group, True)
+                return group.copy(), list(pivot_columns)
             else:
-                return self.boolean_gaussian_elimination(self._group)
+                return group.copy()
+
+        n = self._nr_rows
+        if n == 0:
+            group = np.empty(shape=(0, 0), dtype=bool)
         else:
-            return np.array(self._group, dtype=bool)
+            w = self._nr_words
+            X_part = _unpack_bits(self._x_words[:, :w], n).transpose()
+            Z_part = _unpack_bits(self._z_words[:, :w], n).transpose()
+            phases = _unpack_bits(self._phase_words, n).reshape(n, 1)
+            group = np.concatenate((X_part, Z_part, phases), 1)
+        return group
+
+    def to_bytes(self):
+        """
+        Returns the packed words describing this state as bytes, which can be turned back into a StabilizerState
+        using from_bytes. This is much more compact than to_array and does not create any Python object per entry,
+        which makes it suitable for sending a state over the network.
+
+        The bytes are little-endian 64-bit words: the number of qubits 'n', whether destabilizers are included,
+        the X-words and Z-words of each qubit (see _set_group) and finally the phase words. Unused capacity of the
+        buffers (see _reserve) is not included.
+        :return: The packed state
+        :rtype: bytes
+        """
+        n = self._nr_rows
+        w = self._nr_words
+        m = _nr_words(n)
+        header = np.array([n, self._has_destabilizers], dtype="<u8")
+        parts = [header]
+        for words in [self._x_words, self._z_words]:
+            if self._has_destabilizers:
+                parts.append(np.concatenate((words[:, :m], words[:, w : w + m]), 1))
+            else:
+                parts.append(words[:, :m])
+        parts.append(self._phase_words[:m])
+        return b"".join(np.ascontiguousarray(part, dtype="<u8").tobytes() for part in parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Creates a StabilizerState from bytes given by to_bytes. Since these describe a valid state, no check
+        that the stabilizers commute is made.
+        :param data: The packed state
+        :type data: bytes
+        :return: The unpacked state
+        :rtype: :obj:`StabilizerState`
+        """
+        if len(data) % 8 != 0 or len(data) < 16:
+            raise ValueError("'data' is not a packed StabilizerState")
+        words = np.frombuffer(data, dtype="<u8")
+        n = int(words[0])
+        has_destabilizers = bool(words[1])
+        m = _nr_words(n)
+        nr_halves = 2 if has_destabilizers else 1
+        nr_words_per_part = n * nr_halves * m
+        if len(words) != 2 + 2 * nr_words_per_part + m:
+            raise ValueError("'data' is not a packed StabilizerState on {} qubits".format(n))
+
+        state = cls()
+        start = 2
+        buffers = []
+        for _ in range(2):
+            buffers.append(words[start : start + nr_words_per_part].reshape(n, nr_halves * m).astype(np.uint64))
+            start += nr_words_per_part
+        state._x_buffer, state._z_buffer = buffers
+        state._phase_words = words[start:].astype(np.uint64)
+        state._nr_rows = n
+        state._nr_cols = 2 * n + 1
+        state._nr_words = m
+        state._has_destabilizers = has_destabilizers
+        state._update_views()
+        return state
+
+    def _get_standard_form(self):
+        """
+        Returns the generators in standard form and the pivot columns, see boolean_gaussian_elimination.
+        These are cached and only recomputed if the state changed since the last call, which is tracked by
+        self._standard_form_dirty. The returned array should therefore not be modified.
+        :return: The generators in standard form and the pivot columns
+        :rtype: tuple
+        """
+        if self._standard_form_dirty:
+            self._standard_form, self._pivot_columns = self.boolean_gaussian_elimination(self.to_array(), True)
+            self._standard_form_dirty = False
+        return self._standard_form, self._pivot_columns
 
     def apply_X(self, position):
         """
@@ -371,10 +814,9 @@ class StabilizerState:
         n = self.num_qubits
         if not (position >= 0 and position < n):
             raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
-        yz_rows = self._group[:, position + n]
-
+        self._standard_form_dirty = True
         # Flip phases for Y and Z rows
-        self._group[yz_rows, -1] = np.logical_not(self._group[yz_rows, -1])
+        self._phase_words ^= self._z_words[position, : self._nr_words]
 
     def apply_Y(self, position):
         """
@@ -386,10 +828,10 @@ class StabilizerState:
         n = self.num_qubits
         if not (position >= 0 and position < n):
             raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
-        xz_rows = np.logical_xor(self._group[:, position], self._group[:, position + n])
-
+        self._standard_form_dirty = True
         # Flip phases for X and Z rows
-        self._group[xz_rows, -1] = np.logical_not(self._group[xz_rows, -1])
+        w = self._nr_words
+        self._phase_words ^= self._x_words[position, :w] ^ self._z_words[position, :w]
 
     def apply_Z(self, position):
         """
@@ -401,10 +843,9 @@ class StabilizerState:
         n = self.num_qubits
         if not (position >= 0 and position < n):
             raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
-        xy_rows = self._group[:, position]
-
+        self._standard_form_dirty = True
         # Flip phases for X and Y rows
-        self._group[xy_rows, -1] = np.logical_not(self._group[xy_rows, -1])
+        self._phase_words ^= self._x_words[position, : self._nr_words]
 
     def apply_H(self, position):
         """
@@ -416,12 +857,16 @@ class StabilizerState:
         n = self.num_qubits
         if not (position >= 0 and position < n):
             raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
-        # Swap the Z and X columns
-        self._group[:, [position, position + n]] = self._group[:, [position + n, position]]
+        self._standard_form_dirty = True
+        x_col = self._x_words[position]
+        z_col = self._z_words[position]
 
         # Update the phases
-        y_rows = np.logical_and(self._group[:, position], self._group[:, position + n])
-        self._group[y_rows, -1] = np.logical_not(self._group[y_rows, -1])
+        w = self._nr_words
+        self._phase_words ^= x_col[:w] & z_col[:w]
+
+        # Swap the Z and X columns
+        self._x_words[position], self._z_words[position] = z_col.copy(), x_col.copy()
 
     def apply_K(self, position):
         """
@@ -433,13 +878,16 @@ class StabilizerState:
         n = self.num_qubits
         if not (position >= 0 and position < n):
             raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
-        # Perform effective CNOT from Z column to X column
-        yz_rows = self._group[:, position + n]
-        self._group[yz_rows, position] = np.logical_not(self._group[yz_rows, position])
+        self._standard_form_dirty = True
+        x_col = self._x_words[position]
+        z_col = self._z_words[position]
 
-        # Update the phases
-        x_rows = np.logical_and(self._group[:, position], np.logical_not(self._group[:, position + n]))
-        self._group[x_rows, -1] = np.logical_not(self._group[x_rows, -1])
+        # Update the phases (X rows)
+        w = self._nr_words
+        self._phase_words ^= x_col[:w] & ~z_col[:w]
+
+        # Perform effective CNOT from Z column to X column
+        x_col ^= z_col
 
     def apply_S(self, position):
         """
@@ -451,12 +899,16 @@ class StabilizerState:
         n = self.num_qubits
         if not (position >= 0 and position < n):
             raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
+        self._standard_form_dirty = True
+        x_col = self._x_words[position]
+        z_col = self._z_words[position]
+
+        # Update the phases (Y rows)
+        w = self._nr_words
+        self._phase_words ^= x_col[:w] & z_col[:w]
+
         # Perform effective CNOT from X column to Z column
-        xy_rows = self._group[:, position]
-        self._group[xy_rows, position + n] = np.logical_not(self._group[xy_rows, position + n])
-        # Update the phases
-        x_rows = np.logical_and(self._group[:, position], np.logical_not(self._group[:, position + n]))
-        self._group[x_rows, -1] = np.logical_not(self._group[x_rows, -1])
+        z_col ^= x_col
 
     def apply_sqrt_minIX(self, position):
         self.apply_K(position)
@@ -482,25 +934,23 @@ class StabilizerState:
             raise ValueError("target= {} if not a valid qubit position (i.e. in [0, {}]".format(target, n))
         if control == target:
             raise ValueError("Control and target qubits cannot be the same")
+        self._standard_form_dirty = True
+
+        x_control = self._x_words[control]
+        z_control = self._z_words[control]
+        x_target = self._x_words[target]
+        z_target = self._z_words[target]
+
+        # Update the phases, i.e. flip the rows with X or Y on the control, Y or Z on the target and
+        # where X-part of the target equals the Z-part of the control
+        w = self._nr_words
+        self._phase_words ^= x_control[:w] & z_target[:w] & ~(x_target[:w] ^ z_control[:w])
 
         # Perform effective CNOT from the control X column to target X column
-        xy_control_rows = self._group[:, control]
-        self._group[xy_control_rows, target] = np.logical_not(self._group[xy_control_rows, target])
+        x_target ^= x_control
 
         # Perform effective CNOT from the target Z column to control Z column
-        yz_target_rows = self._group[:, target + n]
-        self._group[yz_target_rows, control + n] = np.logical_not(self._group[yz_target_rows, control + n])
-
-        # Update the phases
-        xy_control_yz_target_rows = np.logical_and(self._group[:, control], self._group[:, target + n])
-        yz_control_xy_target_rows = np.logical_and(self._group[:, control + n], self._group[:, target])
-        not_yz_control_not_xy_target_rows = np.logical_and(
-            np.logical_not(self._group[:, control + n]), np.logical_not(self._group[:, target])
-        )
-        rows_to_flip = np.logical_and(
-            xy_control_yz_target_rows, np.logical_or(yz_control_xy_target_rows, not_yz_control_not_xy_target_rows)
-        )
-        self._group[rows_to_flip, -1] = np.logical_not(self._group[rows_to_flip, -1])
+        z_control ^= z_target
 
     def apply_CZ(self, control, target):
         """
@@ -518,20 +968,139 @@ class StabilizerState:
             raise ValueError("target= {} if not a valid qubit position (i.e. in [0, {}]".format(target, n))
         if control == target:
             raise ValueError("Control and target qubits cannot be the same")
+        self._standard_form_dirty = True
+
+        x_control = self._x_words[control]
+        z_control = self._z_words[control]
+        x_target = self._x_words[target]
+        z_target = self._z_words[target]
 
         # Update the phases
-        x_and_y_rows = np.logical_and(self._group[:, control], self._group[:, target])
-        z_rows = np.logical_xor(self._group[:, control + n], self._group[:, target + n])
-        rows_to_flip = np.logical_and(x_and_y_rows, z_rows)
-        self._group[rows_to_flip, -1] = np.logical_not(self._group[rows_to_flip, -1])
+        w = self._nr_words
+        self._phase_words ^= x_control[:w] & x_target[:w] & (z_control[:w] ^ z_target[:w])
 
         # Perform effective CNOT from the control X column to target Z column
-        xy_control_rows = self._group[:, control]
-        self._group[xy_control_rows, target + n] = np.logical_not(self._group[xy_control_rows, target + n])
+        z_target ^= x_control
 
         # Perform effective CNOT from the target X column to control Z column
-        xy_target_rows = self._group[:, target]
-        self._group[xy_target_rows, control + n] = np.logical_not(self._group[xy_target_rows, control + n])
+        z_control ^= x_target
+
+    def _circuit_to_array(self, ops):
+        """
+        Converts and validates a circuit given to apply_circuit.
+        :param ops: See apply_circuit
+        :return: The circuit as an m-by-3 integer array
+        :rtype: :obj:`numpy.array`
+        """
+        if isinstance(ops, np.ndarray):
+            circuit = np.array(ops, dtype=np.int64)
+        else:
+            circuit = []
+            for op in ops:
+                if len(op) not in [2, 3]:
+                    raise ValueError("Each operation should be of the form (gate, qubit) or (gate, control, target)")
+                gate = op[0]
+                if isinstance(gate, str):
+                    if gate not in self.gate2opcode:
+                        raise ValueError("Unknown gate {}".format(gate))
+                    gate = self.gate2opcode[gate]
+                circuit.append([gate, op[1], op[2] if len(op) == 3 else -1])
+            circuit = np.array(circuit, dtype=np.int64).reshape(-1, 3)
+        if len(circuit.shape) != 2 or circuit.shape[1] != 3:
+            raise ValueError("The circuit needs to be an array of dimension m x 3")
+
+        n = self.num_qubits
+        opcodes, qubits, targets = circuit.transpose()
+        if ((opcodes < 0) | (opcodes >= len(self.gate2opcode))).any():
+            raise ValueError("The circuit contains unknown opcodes")
+        if ((qubits < 0) | (qubits >= n)).any():
+            raise ValueError("The circuit contains qubit positions which are not in [0, {}]".format(n))
+        two_qubit = opcodes >= self.gate2opcode["CNOT"]
+        if ((targets[two_qubit] < 0) | (targets[two_qubit] >= n)).any():
+            raise ValueError("The circuit contains target positions which are not in [0, {}]".format(n))
+        if (targets[two_qubit] == qubits[two_qubit]).any():
+            raise ValueError("Control and target qubits cannot be the same")
+        return circuit
+
+    def apply_circuit(self, ops):
+        """
+        Applies a sequence of Clifford operations. The circuit is validated once and then applied
+        without any further checks.
+
+        For the duration of the circuit, the packed columns of the qubits acted on are kept as Python integers
+        (one bitset per column), which makes the cost of each operation a few integer operations instead of
+        a few NumPy calls. This is much faster than calling the apply_* methods one by one.
+
+        The circuit can be given as:
+            An integer array of dimension m x 3, where each row is (opcode, qubit, target) and opcodes are the
+            values of StabilizerState.gate2opcode. The target is only used for the two qubit gates CNOT and CZ
+            (where 'qubit' is the control).
+
+            A sequence of tuples (gate, qubit) or (gate, control, target), where gate is either an opcode or
+            a key of StabilizerState.gate2opcode, for example:
+                s = StabilizerState(2)
+                s.apply_circuit([("H", 0), ("CNOT", 0, 1)])  # The state (|00> + |11>) / sqrt(2)
+
+        :param ops: The circuit
+        :type ops: :obj:`numpy.array` or list
+        :return: None
+        """
+        circuit = self._circuit_to_array(ops)
+        if len(circuit) == 0:
+            return
+        self._standard_form_dirty = True
+
+        two_qubit = circuit[:, 0] >= self.gate2opcode["CNOT"]
+        qubits = np.unique(np.concatenate((circuit[:, 1], circuit[two_qubit, 2])))
+        nr_bytes = 8 * self._x_words.shape[1]
+        x_bytes = self._x_words[qubits].astype("<u8").tobytes()
+        z_bytes = self._z_words[qubits].astype("<u8").tobytes()
+        x_cols = {}
+        z_cols = {}
+        for i, q in enumerate(qubits.tolist()):
+            x_cols[q] = int.from_bytes(x_bytes[i * nr_bytes : (i + 1) * nr_bytes], "little")
+            z_cols[q] = int.from_bytes(z_bytes[i * nr_bytes : (i + 1) * nr_bytes], "little")
+        phases = int.from_bytes(self._phase_words.astype("<u8").tobytes(), "little")
+        # Only the generators (not the destabilizers) have phases
+        mask = (1 << (64 * self._nr_words)) - 1
+
+        X, Y, Z, H, K, S, CNOT, CZ = [self.gate2opcode[gate] for gate in ["X", "Y", "Z", "H", "K", "S", "CNOT", "CZ"]]
+        for opcode, qubit, target in circuit.tolist():
+            x_col = x_cols[qubit]
+            z_col = z_cols[qubit]
+            if opcode == X:
+                phases ^= z_col & mask
+            elif opcode == Y:
+                phases ^= (x_col ^ z_col) & mask
+            elif opcode == Z:
+                phases ^= x_col & mask
+            elif opcode == H:
+                phases ^= x_col & z_col & mask
+                x_cols[qubit] = z_col
+                z_cols[qubit] = x_col
+            elif opcode == K:
+                phases ^= x_col & ~z_col & mask
+                x_cols[qubit] = x_col ^ z_col
+            elif opcode == S:
+                phases ^= x_col & z_col & mask
+                z_cols[qubit] = z_col ^ x_col
+            elif opcode == CNOT:
+                x_target = x_cols[target]
+                z_target = z_cols[target]
+                phases ^= x_col & z_target & ~(x_target ^ z_col) & mask
+                x_cols[target] = x_target ^ x_col
+                z_cols[qubit] = z_col ^ z_target
+            else:
+                x_target = x_cols[target]
+                z_target = z_cols[target]
+                phases ^= x_col & x_target & (z_col ^ z_target) & mask
+                z_cols[target] = z_target ^ x_col
+                z_cols[qubit] = z_col ^ x_target
+
+        for words, cols in [(self._x_words, x_cols), (self._z_words, z_cols)]:
+            new_bytes = b"".join(cols[q].to_bytes(nr_bytes, "little") for q in qubits.tolist())
+            words[qubits] = np.frombuffer(new_bytes, dtype="<u8").reshape(len(qubits), -1)
+        self._phase_words[:] = np.frombuffer(phases.to_bytes(8 * self._nr_words, "little"), dtype="<u8")
 
     def measure(self, position, inplace=False):
         """
@@ -549,61 +1118,255 @@ class StabilizerState:
         if not (position >= 0 and position < n):
             raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
 
-        tmp_matrix = self._group
-        # Create a new matrix where the X and Z columns of the corresponding qubit are the first.
-        perm = [position] + [i for i in range(n) if i != position]
-        perm.extend([i + n for i in perm])
-        perm.append(2 * n)
-        tmp_matrix = tmp_matrix[:, perm]
-        # Perform Gaussian elimination such that there is maximally one X or Y at the qubit position
-        tmp_matrix = self.boolean_gaussian_elimination(tmp_matrix)
-
-        # Check if there is an X or a Y at the qubit position
-        if tmp_matrix[0, 0]:
-            # The first row (generator) of this matrix is then the only one that doesn't commute with the observabel Z
+        # Measurements are done as in quant-ph/0406196, using the destabilizers
+        self._track_destabilizers()
+        w = self._nr_words
+        x_col = self._x_words[position]
+
+        # Check if there is a generator with an X or a Y at the qubit position
+        anticommuting_words = np.flatnonzero(x_col[:w])
+        if len(anticommuting_words) > 0:
+            # The outcome is random and the first of these generators is replaced by the observable
+            word = anticommuting_words[0]
+            lowest_bit = int(x_col[word]) & -int(x_col[word])
+            row = 64 * int(word) + lowest_bit.bit_length() - 1
             outcome = randint(0, 1)
-            # If outcome is 1 we need to flip phases for the other generators that has an Z at this qubit
-            if outcome == 1:
-                z_rows = tmp_matrix[:, n]
-                tmp_matrix[z_rows, -1] = np.logical_not(tmp_matrix[z_rows, -1])
-            if not inplace:
-                # Simply remove first generator and columns for X and Z of this qubit
-                X_part = tmp_matrix[1:n, 1:n]
-                Z_part_and_phase = tmp_matrix[1:n, n + 1 :]
-                self._group = np.concatenate((X_part, Z_part_and_phase), 1)
-                self._nr_rows = n - 1
-            else:
-                # Set first generator to be the observable
-                tmp_matrix[0, :] = False
-                tmp_matrix[0, n] = True
-                if outcome == 1:
-                    tmp_matrix[0, -1] = not tmp_matrix[0, -1]
-                # Set the rest of the first column to be identity
-                tmp_matrix[1:, n] = False
-                # Swap back the X and Z columns of this qubit
-                self._group = tmp_matrix[:, np.argsort(perm)]
+            self._standard_form_dirty = True
+
+            # Multiply this generator into all other generators and destabilizers which anticommute with the observable
+            rows = x_col.copy()
+            rows[word] ^= np.uint64(lowest_bit)
+            self._multiply_generator_into(row, rows)
+
+            # The generator becomes the destabilizer of the observable
+            for words in (self._x_words, self._z_words):
+                words[:, w:][:, word] &= ~np.uint64(lowest_bit)
+                words[:, w:][:, word] |= words[:, word] & np.uint64(lowest_bit)
+            self._set_generator_to_Z(row, position, outcome)
         else:
-            # Thus means that all stabilizer elements commute with the observable
-            # and therefore that the qubit is already in |0> or |1>
-            if not tmp_matrix[0, -1]:
-                # Qubit is in |0>
-                outcome = 0
-            else:
-                # Qubit is in |1>
-                outcome = 1
+            # Thus means that all stabilizer elements commute with the observable and therefore that the qubit
+            # is already in |0> or |1>. The observable (up to a phase) is then the product of the generators
+            # whose destabilizers anticommute with it.
+            rows = _unpack_bits(x_col[w:], n)
+            outcome = int(self._product_phase(rows))
             if not inplace:
-                tmp_matrix = tmp_matrix[:, np.argsort(perm)]
-                columns = np.arange(2 * n + 1)
-                columns_without_position = np.logical_and(columns != position, columns != (position + n))
-                tmp_matrix = tmp_matrix[np.logical_not(tmp_matrix[:, n + position]), :]
-                self._group = tmp_matrix[:, columns_without_position]
-                self._nr_rows = n - 1
+                # Replace the first of these generators by the observable and keep the destabilizers valid
+                row = int(np.flatnonzero(rows)[0])
+                other_rows = _pack_bits(rows, w)
+                other_rows[row // 64] ^= np.uint64(1) << np.uint64(row % 64)
+                for words in (self._x_words, self._z_words):
+                    words[_get_bits(words[:, w:], row), w:] ^= other_rows
+                self._set_generator_to_Z(row, position, outcome)
             else:
-                # We don't need to do anything here since the state has not changed
-                self._group = tmp_matrix[:, np.argsort(perm)]
+                # We don't need to do anything here since the state has not changed (and the cache is still valid)
                 pass
+        if not inplace:
+            self._standard_form_dirty = True
+            self._remove_measured_qubit(position, row)
         return outcome
 
+    def has_random_outcome(self, position):
+        """
+        Returns whether measuring qubit 'position' in the standard basis has a random outcome, i.e. whether a
+        generator has an X or a Y on this qubit, see measure.
+        :param position: The position of the qubit.
+        :type position: int
+        :rtype: bool
+        """
+        n = self.num_qubits
+        if not (position >= 0 and position < n):
+            raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
+        return bool(self._x_words[position, : self._nr_words].any())
+
+    def sample(self, qubits, shots=1):
+        """
+        Samples the outcomes of measuring the qubits 'qubits' in the standard basis 'shots' times, without changing
+        the state. This is equivalent to copying the state and measuring the qubits, 'shots' times, but much faster.
+
+        The outcomes are uniformly distributed over the solutions of the parity constraints given by the elements of
+        the stabilizer group which only contain Z's on these qubits (and identities elsewhere). These are found by
+        reducing the generators once, after which the samples are computed as an affine map of random bits.
+        :param qubits: The positions of the qubits to measure
+        :type qubits: list of int
+        :param shots: The number of samples
+        :type shots: int
+        :return: The outcomes, where row 'i' contains the outcomes of shot 'i' in the order of 'qubits'
+            (0 is the +1 eigenvalue and 1 is the -1)
+        :rtype: :obj:`numpy.array` of shape (shots, len(qubits))
+        """
+        n = self.num_qubits
+        qubits = [int(position) for position in qubits]
+        for position in qubits:
+            if not (position >= 0 and position < n):
+                raise ValueError("position= {} if not a valid qubit position (i.e. in [0, {}]".format(position, n))
+        if len(set(qubits)) != len(qubits):
+            raise ValueError("The qubits to sample should be distinct")
+        if shots < 0:
+            raise ValueError("The number of shots cannot be negative")
+        k = len(qubits)
+        outcomes = np.zeros(shape=(shots, k), dtype=np.uint8)
+        if k == 0:
+            return outcomes
+
+        # Reorder the qubits such that the ones to sample are last, such that the rows of the echelon form with
+        # a pivot in their Z-columns generate the elements of the group with only Z's on these qubits
+        sampled = set(qubits)
+        order = [position for position in range(n) if position not in sampled] + qubits
+        columns = order + [n + position for position in order] + [2 * n]
+        reduced, pivot_columns = self.boolean_gaussian_elimination(self.to_array()[:, columns], True)
+        first_column = 2 * n - k
+        rows = [row for row, column in enumerate(pivot_columns) if column >= first_column]
+        pivots = [pivot_columns[row] - first_column for row in rows]
+        free = [j for j in range(k) if j not in set(pivots)]
+        constraints = reduced[rows, first_column : 2 * n]
+        parities = reduced[rows, -1]
+
+        # The outcomes of the pivot qubits are determined by the outcomes of the free ones,
+        # since the echelon form is reduced
+        random_bits = np.random.randint(0, 2, size=(shots, len(free)), dtype=np.uint8)
+        outcomes[:, free] = random_bits
+        outcomes[:, pivots] = (np.dot(random_bits, constraints[:, free].T.astype(np.uint8)) + parities) % 2
+        return outcomes
+
+    def expectation(self, pauli):
+        """
+        Returns the expectation value of a Pauli operator in the stabilizer state, which is 0, 1 or -1.
+        It is non-zero exactly when the operator (up to a sign) is an element of the stabilizer group.
+        :param pauli: The Pauli operator, given as a row of to_array, i.e. a binary vector of length 2n or 2n+1
+        :type pauli: :obj:`numpy.array`
+        :return: The expectation value
+        :rtype: int
+        """
+        n = self.num_qubits
+        pauli = np.asarray(pauli, dtype=bool)
+        if pauli.shape not in [(2 * n,), (2 * n + 1,)]:
+            raise ValueError("'pauli' needs to be a binary vector of length 2n or 2n+1, where n={}".format(n))
+
+        # The operator anticommutes with the generators and destabilizers which have an odd number of positions
+        # with an X-part where the operator has a Z-part or vice versa, see _set_group
+        self._track_destabilizers()
+        w = self._nr_words
+        anticommuting = np.bitwise_xor.reduce(self._x_words[pauli[n : 2 * n]], axis=0)
+        anticommuting ^= np.bitwise_xor.reduce(self._z_words[pauli[:n]], axis=0)
+        if anticommuting[:w].any():
+            return 0
+
+        # The operator (up to a phase) is the product of the generators whose destabilizers anticommute with it
+        rows = _unpack_bits(anticommuting[w:], n)
+        negative = self._product_phase(rows)
+        if len(pauli) > 2 * n:
+            negative ^= pauli[2 * n]
+        return -1 if negative else 1
+
+    def _multiply_generator_into(self, row, rows):
+        """
+        Multiplies generator 'row' into the generators and destabilizers given by the packed mask 'rows',
+        which has the same layout as self._x_words[j] (see _set_group).
+        Note that 'row' should not be part of the mask and that the generators in the mask should
+        commute with generator 'row'.
+        :param row: The generator to multiply with
+        :type row: int
+        :param rows: The packed mask of the rows to update
+        :type rows: :obj:`numpy.array` of dtype uint64
+        :return: None
+        """
+        n = self._nr_rows
+        w = self._nr_words
+        x_row = _get_bits(self._x_words[:, :w], row)
+        z_row = _get_bits(self._z_words[:, :w], row)
+
+        # Update the phases, where only the qubits in the support of generator 'row' contribute
+        support = np.flatnonzero(x_row | z_row)
+        x_other = _unpack_bits(self._x_words[support, :w], n)
+        z_other = _unpack_bits(self._z_words[support, :w], n)
+        exponents = _pauli_product_exponent(
+            x_row[support, np.newaxis], z_row[support, np.newaxis], x_other, z_other
+        ).sum(axis=0, dtype=np.int64)
+        flip = (exponents % 4 == 2) ^ _get_bits(self._phase_words, row)
+        self._phase_words ^= _pack_bits(flip, w) & rows[:w]
+
+        # Update the X- and Z-parts
+        self._x_words[x_row] ^= rows
+        self._z_words[z_row] ^= rows
+
+    def _product_phase(self, rows):
+        """
+        Computes the phase of the product of the generators given by the boolean mask 'rows',
+        which should be a Pauli operator with the phase +1 or -1.
+        :param rows: Boolean mask of the generators
+        :type rows: :obj:`numpy.array`
+        :return: Whether the phase is -1
+        :rtype: bool
+        """
+        n = self._nr_rows
+        w = self._nr_words
+        X_part = _unpack_bits(self._x_words[:, :w], n)[:, rows].transpose()
+        Z_part = _unpack_bits(self._z_words[:, :w], n)[:, rows].transpose()
+        phases = _unpack_bits(self._phase_words, n)[rows]
+
+        # The generators are multiplied one by one from the left, so compute the partial products
+        X_prev = np.zeros_like(X_part)
+        Z_prev = np.zeros_like(Z_part)
+        X_prev[1:] = np.logical_xor.accumulate(X_part, axis=0)[:-1]
+        Z_prev[1:] = np.logical_xor.accumulate(Z_part, axis=0)[:-1]
+        exponent = 2 * int(np.sum(phases)) + int(
+            _pauli_product_exponent(X_part, Z_part, X_prev, Z_prev).sum(dtype=np.int64)
+        )
+        return exponent % 4 == 2
+
+    def _set_generator_to_Z(self, row, position, outcome):
+        """
+        Sets generator 'row' to be Z on qubit 'position' with phase (-1)^outcome.
+        :return: None
+        """
+        word = row // 64
+        bit = np.uint64(1) << np.uint64(row % 64)
+        self._x_words[:, word] &= ~bit
+        self._z_words[:, word] &= ~bit
+        self._z_words[position, word] |= bit
+        if outcome:
+            self._phase_words[word] |= bit
+        else:
+            self._phase_words[word] &= ~bit
+
+    def _remove_measured_qubit(self, position, row):
+        """
+        Removes qubit 'position' after it has been measured, where generator 'row' is +/- Z on this qubit
+        and no other generator or destabilizer, except destabilizer 'row', has an X or a Y on this qubit.
+        :return: None
+        """
+        n = self._nr_rows
+        w = self._nr_words
+        word = row // 64
+        bit = np.uint64(1) << np.uint64(row % 64)
+
+        # Multiply generator 'row' into all other rows which have a Z at the qubit position
+        rows = self._z_words[position].copy()
+        rows[word] &= ~bit
+        rows[w + word] &= ~bit
+        if _get_bits(self._phase_words, row):
+            self._phase_words ^= rows[:w]
+        self._z_words[position] ^= rows
+
+        # Move the generator and its destabilizer to the last row and remove it together with the qubit
+        _swap_bits(self._x_words[:, :w], row, n - 1)
+        _swap_bits(self._z_words[:, :w], row, n - 1)
+        _swap_bits(self._x_words[:, w:], row, n - 1)
+        _swap_bits(self._z_words[:, w:], row, n - 1)
+        _swap_bits(self._phase_words, row, n - 1)
+        last_word = (n - 1) // 64
+        last_bit = np.uint64(1) << np.uint64((n - 1) % 64)
+        self._x_words[:, [last_word, w + last_word]] &= ~last_bit
+        self._z_words[:, [last_word, w + last_word]] &= ~last_bit
+        self._phase_words[last_word] &= ~last_bit
+
+        for buffer in [self._x_buffer, self._z_buffer]:
+            buffer[position : n - 1] = buffer[position + 1 : n]
+            buffer[n - 1] = 0
+        self._nr_rows = n - 1
+        self._nr_cols = 2 * (n - 1) + 1
+        self._update_views()
+
     def find_SQC_equiv_graph_state(self, return_operations=False):
         """
         Finds a graph state single qubit Clifford equivalent to self. Method is described
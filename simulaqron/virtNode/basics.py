@@ -28,6 +28,8 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import abc
+
+import numpy as np
 from twisted.spread import pb
 
 
@@ -60,8 +62,13 @@ class quantumEngine(pb.Referenceable):
         node		node this register is started from
         num		number of this register
         maxQubits	maximum number of qubits this register supports
+        mayFactorize	whether the register may have become a product state, see find_partition
     """
 
+    # Whether find_partition takes bounded time for any number of qubits, such that registers are factorized by
+    # default (see Settings.CONF_FACTORIZE_REGISTERS)
+    boundedPartition = False
+
     def __init__(self, node, num, maxQubits=10):
         """
         Initialize the simple engine. If no number is given for maxQubits, the assumption will be 10.
@@ -76,6 +83,23 @@ class quantumEngine(pb.Referenceable):
         # Node that actually simulates this register
         self.simNode = node
 
+        # Whether a measurement since the last call of find_partition may have left some qubits in a product
+        # state with the others. Set by the engines and cleared by the virtual node when it factorizes the register.
+        self.mayFactorize = False
+
+    @abc.abstractmethod
+    def reset(self, num, maxQubits=10):
+        """
+        Resets the register to hold no qubits, such that it can be reused instead of creating a new engine.
+        Afterwards the engine behaves as if it was just created with the given number and maximal number of qubits.
+
+        Arguments:
+        num		new number of this register
+        maxQubits	maximum number of qubits this register supports
+        :rtype: None
+        """
+        pass
+
     @abc.abstractmethod
     def add_fresh_qubit(self):
         """
@@ -242,6 +266,27 @@ class quantumEngine(pb.Referenceable):
         """
         pass
 
+    def flush_gates(self):
+        """
+        Applies the gates which the engine has buffered, if any, to the register. Engines which apply gates
+        immediately do not need to override this.
+        :rtype: None
+        """
+        pass
+
+    def sample_measurements(self, qubitNums, shots):
+        """
+        Samples the outcomes of measuring the desired qubits in the standard basis 'shots' times, without
+        changing the register. Only supported by backends which can do this without collapsing the state.
+
+        Arguments:
+        qubitNums	qubits to be measured
+        shots		number of samples
+        :return: The outcomes, one list with an outcome for each qubit per shot
+        :rtype: list
+        """
+        raise quantumError("Sampling measurements is not supported by this backend")
+
     @abc.abstractmethod
     def replace_qubit(self, qubitNum, state):
         """
@@ -259,14 +304,93 @@ class quantumEngine(pb.Referenceable):
         pass
 
     @abc.abstractmethod
-    def absorb_parts(self, R, I, activeQ):
+    def absorb_parts(self, realPart, imagPart, activeQ):
         """
         Absorb the qubits, given in pieces
 
         Arguments:
-        R		real part of the qubit state as a list
-        I		imaginary part as a list
+        realPart	real part of the qubit state as a list
+        imagPart	imaginary part as a list
         activeQ		active number of qubits
         :rtype: None
         """
         pass
+
+    @abc.abstractmethod
+    def get_register_bytes(self):
+        """
+        Retrieves the entire register packed into bytes, see registerFormat.pack_register. This is much cheaper
+        to send to another node than the lists of get_register_RI.
+        :rtype: bytes
+        """
+        pass
+
+    @abc.abstractmethod
+    def absorb_bytes(self, data):
+        """
+        Absorb the qubits of a register packed by get_register_bytes. This is done by tensoring the state at the end.
+
+        Arguments:
+        data		packed register
+        :rtype: None
+        """
+        pass
+
+    @abc.abstractmethod
+    def find_partition(self):
+        """
+        Finds sets of qubits in the register which are in a product with each other, e.g. after entangled qubits
+        were measured, such that each set can be simulated in a separate register, see split. Engines may return
+        a coarser partition than the finest one when finding that is too expensive.
+        :return: Sorted lists of qubit numbers covering all qubits, ordered by their first qubit
+        :rtype: list
+        """
+        pass
+
+    @abc.abstractmethod
+    def split(self, qubitNums, other):
+        """
+        Moves the qubits qubitNums, which need to be in a product with the other qubits (see find_partition), to
+        the end of the register of the engine other, in this order. The other qubits keep their order.
+        Raises a quantumError if the qubits are entangled with the other qubits.
+
+        Arguments:
+        qubitNums	qubits to be moved
+        other		engine of the same backend to move the qubits to
+        :rtype: None
+        """
+        pass
+
+
+def sample_outcomes(probabilities, numQubits, qubitNums, shots):
+    """
+    Samples the outcomes of measuring the qubits qubitNums of a register of numQubits qubits in the standard basis
+    'shots' times, given the probabilities of the standard basis states of the register, where qubit 0 is the most
+    significant one. Used by the engines which keep the amplitudes or the density matrix of the register.
+
+    Arguments:
+    probabilities	probabilities of the 2 ** numQubits standard basis states
+    numQubits	number of qubits in the register
+    qubitNums	qubits to be measured
+    shots		number of samples
+    :return: The outcomes, one list with an outcome for each qubit per shot
+    :rtype: list
+    """
+    for qubitNum in qubitNums:
+        if not 0 <= qubitNum < numQubits:
+            raise quantumError("No such qubit to be measured.")
+    if len(set(qubitNums)) != len(qubitNums):
+        raise quantumError("Cannot sample the same qubit twice.")
+
+    # Marginalize over the other qubits, the remaining axes are the measured qubits in increasing order
+    others = tuple(q for q in range(numQubits) if q not in qubitNums)
+    marginal = np.asarray(probabilities, dtype=float).reshape([2] * numQubits).sum(axis=others)
+    order = sorted(qubitNums)
+    marginal = np.transpose(marginal, [order.index(q) for q in qubitNums]).reshape(-1)
+
+    # Rounding errors, e.g. in single precision, can make the probabilities slightly negative or not sum to one
+    marginal = np.clip(marginal, 0, None)
+    indices = np.random.choice(len(marginal), size=shots, p=marginal / marginal.sum())
+
+    shifts = np.arange(len(qubitNums) - 1, -1, -1)
+    return ((indices[:, np.newaxis] >> shifts) & 1).tolist()
@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2017, Stephanie Wehner and Axel Dahlberg
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. All advertising materials mentioning features or use of this software
+#    must display the following acknowledgement:
+#    This product includes software developed by Stephanie Wehner, QuTech.
+# 4. Neither the name of the QuTech organization nor the
+#    names of its contributors may be used to endorse or promote products
+#    derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDER ''AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+from simulaqron.virtNode.basics import quantumError
+
+# Tolerance on the purity of reduced states, depending on the precision of the amplitudes
+_TOL = {np.dtype(np.complex128): 1e-10, np.dtype(np.complex64): 1e-6}
+
+# Larger states are not searched for product states, since the search costs O(n^2 2^n) for n qubits, which for
+# larger registers is far more than the measurement after which it is done
+MAX_QUBITS = 16
+
+
+def is_random_outcome(p1, dtype):
+    """
+    Returns whether a measurement which gives 1 with probability p1 has a random outcome, up to the rounding errors
+    of amplitudes of type dtype. Only such measurements can leave the other qubits in a product state.
+    """
+    tol = _TOL.get(np.dtype(dtype), _TOL[np.dtype(np.complex128)])
+    return tol < p1 < 1 - tol
+
+
+def pure_state_partition(state, numQubits):
+    """
+    Finds sets of qubits of a pure state which are in a product with each other, see quantumEngine.find_partition.
+    Returns a list of sorted lists of qubit numbers, ordered by their first qubit.
+
+    A qubit is in a product with the other qubits if its reduced state is pure, which is checked for all qubits at
+    once. Starting from one of the remaining qubits, a set is then grown by adding the qubits correlated with one
+    of its qubits, i.e. for which the reduced state of the pair is not the product of the reduced states, until the
+    reduced state of the set is pure, i.e. until the set has Schmidt rank one with respect to the other qubits.
+    Each set which is found is split off to reduce the size of the state for the next ones. Sets which cannot be
+    completed like this, since they are entangled without pairwise correlations, are kept together. The result is
+    therefore always a valid partition, but in such rare cases not the finest one. States of more than MAX_QUBITS
+    qubits are not searched and returned as a single set.
+
+    Arguments:
+    state		state vector, where the first qubit is the most significant
+    numQubits	number of qubits of the state
+    """
+    if numQubits < 2 or numQubits > MAX_QUBITS:
+        return [list(range(numQubits))]
+    tol = _TOL.get(state.dtype, _TOL[np.dtype(np.complex128)])
+
+    # The reduced state of a qubit is pure if its determinant p0 * p1 - |c|^2 vanishes
+    probs = np.abs(state) ** 2
+    singles = []
+    for q in range(numQubits):
+        part = state.reshape(2 ** q, 2, -1)
+        p1 = probs.reshape(2 ** q, 2, -1)[:, 1, :].sum()
+        c = np.einsum("ij,ij->", part[:, 1, :].conj(), part[:, 0, :])
+        if (1 - p1) * p1 - abs(c) ** 2 <= tol:
+            singles.append(q)
+    partition = [[q] for q in singles]
+
+    # The qubits of the current state, where the ones in rest could not be split off
+    qubits = [q for q in range(numQubits) if q not in singles]
+    if singles and qubits:
+        _, state = split_pure_state(state, numQubits, singles)
+    rest = []
+    while len(qubits) > len(rest):
+        psi = state.reshape([2] * len(qubits))
+        others = [i for i, q in enumerate(qubits) if q not in rest]
+        block, isFactor = _grow_factor(psi, others[0], others[1:], tol)
+        found = [qubits[i] for i in block]
+        if not isFactor:
+            rest += found
+        elif len(found) == len(qubits):
+            partition.append(found)
+            qubits = []
+        else:
+            partition.append(found)
+            _, state = split_pure_state(state, len(qubits), block)
+            qubits = [q for q in qubits if q not in found]
+    if rest:
+        partition.append(sorted(rest))
+    return sorted(partition)
+
+
+def _grow_factor(psi, first, others, tol):
+    """
+    Grows a set of qubits of the pure state psi, with one axis per qubit, from the qubit first by adding the qubits
+    in others which are correlated with one of its qubits, until the reduced state of the set is pure. Returns the
+    sorted set and whether its reduced state is pure.
+    """
+    block = [first]
+    i = 0
+    while i < len(block) and others:
+        correlated = [j for j in others if _correlated(psi, block[i], j, tol)]
+        i += 1
+        if correlated:
+            block = sorted(block + correlated)
+            others = [j for j in others if j not in correlated]
+            if _is_factor(psi, block, tol):
+                return block, True
+    return block, _is_factor(psi, block, tol)
+
+
+def _correlated(psi, i, j, tol):
+    """
+    Checks whether the reduced state of the qubits i and j of the pure state psi, with one axis per qubit, differs
+    from the product of their reduced states.
+    """
+    M = np.moveaxis(psi, [i, j], [0, 1]).reshape(4, -1)
+    rho = (M @ M.conj().T).reshape(2, 2, 2, 2)
+    rho_i = np.trace(rho, axis1=1, axis2=3)
+    rho_j = np.trace(rho, axis1=0, axis2=2)
+    return np.abs(rho - np.einsum("ac,bd->abcd", rho_i, rho_j)).max() > tol
+
+
+def _is_factor(psi, qubitNums, tol):
+    """
+    Checks whether the qubits qubitNums of the pure state psi, with one axis per qubit, are in a product with the
+    other qubits, by checking that their reduced state is pure.
+    """
+    k = len(qubitNums)
+    if k == psi.ndim:
+        return True
+    M = np.moveaxis(psi, qubitNums, range(k)).reshape(2 ** k, -1)
+
+    # The purity is the same for both sides, so use the smaller reduced state
+    rho = M @ M.conj().T if M.shape[0] <= M.shape[1] else M.conj().T @ M
+    return 1 - np.vdot(rho, rho).real <= tol
+
+
+def split_pure_state(state, numQubits, qubitNums):
+    """
+    Splits a pure state into the state of the qubits qubitNums, which need to be in a product with the other
+    qubits, and the state of the other qubits. Returns both state vectors, where the qubits are in the order of
+    qubitNums and the other qubits keep their order.
+
+    Arguments:
+    state		state vector, where the first qubit is the most significant
+    numQubits	number of qubits of the state
+    qubitNums	numbers of the qubits to split off
+    """
+    k = len(qubitNums)
+    M = np.moveaxis(state.reshape([2] * numQubits), qubitNums, range(k)).reshape(2 ** k, -1)
+
+    # M is the outer product of the two states, so its largest row is proportional to the state of the other qubits
+    norms = np.linalg.norm(M, axis=1)
+    r = np.argmax(norms)
+    rest = M[r] / norms[r]
+    factor = M @ rest.conj()
+
+    # The fidelity of the product of the two states with the original state is the squared norm of factor
+    fidelity = np.vdot(factor, factor).real
+    if 1 - fidelity > np.sqrt(_TOL.get(state.dtype, _TOL[np.dtype(np.complex128)])):
+        raise quantumError("Qubits {} are entangled with the other qubits.".format(qubitNums))
+    return factor / np.sqrt(fidelity), rest
@@ -0,0 +1,154 @@
+#
+# Copyright (c) 2017, Stephanie Wehner and Axel Dahlberg
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. All advertising materials mentioning features or use of this software
+#    must display the following acknowledgement:
+#    This product includes software developed by Stephanie Wehner, QuTech.
+# 4. Neither the name of the QuTech organization nor the
+#    names of its contributors may be used to endorse or promote products
+#    derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDER ''AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import inspect
+import weakref
+
+import numpy as np
+
+_IDENTITY = np.eye(2, dtype=complex)
+
+
+class gateQueue:
+    """
+    Buffers the gates applied to a register until its state is needed. Consecutive single-qubit gates on a qubit
+    are multiplied into one 2x2 matrix, and consecutive gates on the same pair of qubits, together with pending
+    single-qubit gates on either of them, into one 4x4 matrix. At most one two-qubit gate is pending, so a
+    two-qubit gate on another pair first applies the pending one.
+
+    Gates which were not fused with another gate are passed on unchanged, so that an engine can keep using
+    special cases for e.g. controlled gates.
+
+    Arguments:
+        apply_onequbit_gate	function (gate, qubitNum) applying a single-qubit gate to the register
+        apply_twoqubit_gate	function (gate, qubit1, qubit2) applying a two-qubit gate to the register
+
+    If these are methods of the engine holding the queue, only weak references to them are kept, such that the
+    engine is deleted as soon as it is no longer used rather than by the garbage collector.
+    """
+
+    def __init__(self, apply_onequbit_gate, apply_twoqubit_gate):
+        self._apply_onequbit_gate = _weak_function(apply_onequbit_gate)
+        self._apply_twoqubit_gate = _weak_function(apply_twoqubit_gate)
+
+        # Pending single-qubit gates as qubitNum: (gate, matrix), where gate is None if several gates were fused
+        self._onequbit = {}
+
+        # Pending two-qubit gate as (qubit1, qubit2, gate, matrix), or None
+        self._twoqubit = None
+
+    def __len__(self):
+        """
+        The number of pending (fused) gates.
+        """
+        return len(self._onequbit) + (self._twoqubit is not None)
+
+    def add_onequbit_gate(self, gate, qubitNum, matrix=None):
+        """
+        Queues a single-qubit gate, given by gate and its 2x2 matrix. If matrix is None, gate is the matrix.
+        """
+        matrix = np.asarray(gate if matrix is None else matrix)
+        if self._twoqubit is not None and qubitNum in self._twoqubit[:2]:
+            qubit1, qubit2, _, pairU = self._twoqubit
+            local = np.kron(matrix, _IDENTITY) if qubitNum == qubit1 else np.kron(_IDENTITY, matrix)
+            self._twoqubit = (qubit1, qubit2, None, local @ pairU)
+        elif qubitNum in self._onequbit:
+            self._onequbit[qubitNum] = (None, matrix @ self._onequbit[qubitNum][1])
+        else:
+            self._onequbit[qubitNum] = (gate, matrix)
+
+    def add_twoqubit_gate(self, gate, qubit1, qubit2, matrix=None):
+        """
+        Queues a two-qubit gate, given by gate and its 4x4 matrix where qubit1 is the most significant qubit.
+        If matrix is None, gate is the matrix.
+        """
+        matrix = np.asarray(gate if matrix is None else matrix)
+        if self._twoqubit is not None:
+            pending1, pending2, pendingGate, pairU = self._twoqubit
+            if (pending1, pending2) == (qubit1, qubit2):
+                self._twoqubit = (qubit1, qubit2, None, matrix @ pairU)
+                return
+            if (pending1, pending2) == (qubit2, qubit1):
+                self._twoqubit = (pending1, pending2, None, _swap_qubits(matrix) @ pairU)
+                return
+            self._twoqubit = None
+            self._apply(self._apply_twoqubit_gate(), pending1, pending2, pendingGate, pairU)
+
+        # Single-qubit gates pending on these qubits come before this gate
+        before1 = self._onequbit.pop(qubit1, None)
+        before2 = self._onequbit.pop(qubit2, None)
+        if before1 is None and before2 is None:
+            self._twoqubit = (qubit1, qubit2, gate, matrix)
+        else:
+            before = np.kron(_IDENTITY if before1 is None else before1[1], _IDENTITY if before2 is None else before2[1])
+            self._twoqubit = (qubit1, qubit2, None, matrix @ before)
+
+    def flush(self):
+        """
+        Applies all pending gates to the register.
+        """
+        onequbit, twoqubit = self._onequbit, self._twoqubit
+        self.clear()
+
+        # The pending single-qubit gates act on other qubits than the two-qubit gate, so the order does not matter
+        for qubitNum, (gate, matrix) in onequbit.items():
+            self._apply(self._apply_onequbit_gate(), qubitNum, gate, matrix)
+        if twoqubit is not None:
+            self._apply(self._apply_twoqubit_gate(), *twoqubit)
+
+    def clear(self):
+        """
+        Discards all pending gates.
+        """
+        self._onequbit = {}
+        self._twoqubit = None
+
+    @staticmethod
+    def _apply(apply, *args):
+        """
+        Calls apply with the qubits and either the original gate or, if that was fused away, the matrix.
+        """
+        *qubits, gate, matrix = args
+        apply(matrix if gate is None else gate, *qubits)
+
+
+def _weak_function(function):
+    """
+    Returns a callable giving function, holding only a weak reference to its object if it is a bound method.
+    """
+    if inspect.ismethod(function):
+        return weakref.WeakMethod(function)
+    return lambda: function
+
+
+def _swap_qubits(gateU):
+    """
+    Returns the 4x4 matrix gateU with the roles of its two qubits exchanged.
+    """
+    return gateU.reshape(2, 2, 2, 2).transpose(1, 0, 3, 2).reshape(4, 4)
@@ -0,0 +1,364 @@
+#
+# Copyright (c) 2017, Stephanie Wehner and Axel Dahlberg
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. All advertising materials mentioning features or use of this software
+#    must display the following acknowledgement:
+#    This product includes software developed by Stephanie Wehner, QuTech.
+# 4. Neither the name of the QuTech organization nor the
+#    names of its contributors may be used to endorse or promote products
+#    derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY <COPYRIGHT HOLDER> ''AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+from simulaqron.virtNode.basics import quantumEngine, quantumError, noQubitError
+from simulaqron.virtNode import registerFormat
+from simulaqron.toolbox.nearCliffordStates import NearCliffordState
+
+
+class nearCliffordEngine(quantumEngine):
+    """
+    Quantum engine which represents the register as a weighted sum of stabilizer states (see NearCliffordState).
+    Clifford operations are as cheap as in the stabilizer formalism, while a T gate or a rotation around X, Y or Z
+    at most doubles the number of terms. Circuits on many qubits with only a few non-Clifford gates can therefore
+    be simulated.
+
+    Attributes:
+        maxQubits:	maximum number of qubits this engine will support.
+    """
+
+    def __init__(self, node, num, maxQubits=10):
+        """
+        Initialize the simple engine. If no number is given for maxQubits, the assumption will be 10.
+        """
+
+        super().__init__(node=node, num=num, maxQubits=maxQubits)
+
+        self.qubitReg = NearCliffordState()
+
+    def reset(self, num, maxQubits=10):
+        """
+        Resets the register to hold no qubits, such that it can be reused as the register with number num.
+        """
+        self.num = num
+        self.maxQubits = maxQubits
+        self.mayFactorize = False
+        self.qubitReg = NearCliffordState()
+
+    @property
+    def activeQubits(self):
+        return self.qubitReg.num_qubits
+
+    def add_fresh_qubit(self):
+        """
+        Add a new qubit initialized in the \\|0\\> state.
+        """
+        # Check if we are still allowed to add qubits
+        if self.activeQubits >= self.maxQubits:
+            raise noQubitError("No more qubits available in register.")
+
+        num = self.activeQubits
+
+        # Prepare a clean qubit state in |0>
+        self.qubitReg.add_qubit()
+
+        return num
+
+    def add_qubit(self, newQubit):
+        """
+        Add new qubit in the state described by the array containing the generators of the stabilizer group.
+        This should be in the form required by the StabilizerState class.
+        """
+
+        # Create the qubit
+        try:
+            qubit = NearCliffordState(newQubit)
+        except Exception:
+            raise ValueError("'newQubits' was not in the correct form to be given as an argument to StabilizerState")
+
+        num = self.activeQubits
+
+        self.qubitReg.absorb(qubit)
+
+        return num
+
+    def remove_qubit(self, qubitNum):
+        """
+        Removes the qubit with the desired number qubitNum
+        """
+        if (qubitNum + 1) > self.activeQubits:
+            raise quantumError("No such qubit to remove")
+
+        self.measure_qubit(qubitNum)
+
+    def get_register_RI(self):
+        """
+        Retrieves the entire register in real and imaginary part. Twisted only likes to send real valued lists,
+        not complex ones.
+        The real part is a list containing the generators of the stabilizer state, the Paulis and the real parts
+        of the coefficients (see NearCliffordState.to_lists) and the imaginary part contains the imaginary parts
+        of the coefficients.
+        """
+        generators, paulis, coefficients = self.qubitReg.to_lists()
+
+        Re = [generators, paulis, np.real(coefficients).tolist()]
+        Im = np.imag(coefficients).tolist()
+
+        return Re, Im
+
+    def get_register_bytes(self):
+        """
+        Retrieves the entire register as a packed near Clifford state, see registerFormat.pack_register. The payload
+        is the number of terms K as a 64-bit integer, the K complex coefficients, the Paulis as a K-by-2n array of
+        bytes and the generators of the stabilizer state as an n-by-(2n+1) array of bytes (see get_register_RI).
+        """
+        return _pack_near_clifford_state(self.qubitReg)
+
+    def apply_H(self, qubitNum):
+        """
+        Applies a Hadamard gate to the qubits with number qubitNum.
+        """
+        self.qubitReg.apply_H(qubitNum)
+
+    def apply_K(self, qubitNum):
+        """
+        Applies a K gate to the qubits with number qubitNum. Maps computational basis to Y eigenbasis.
+        """
+        self.qubitReg.apply_K(qubitNum)
+
+    def apply_X(self, qubitNum):
+        """
+        Applies a X gate to the qubits with number qubitNum.
+        """
+
+        self.qubitReg.apply_X(qubitNum)
+
+    def apply_Z(self, qubitNum):
+        """
+        Applies a Z gate to the qubits with number qubitNum.
+        """
+
+        self.qubitReg.apply_Z(qubitNum)
+
+    def apply_Y(self, qubitNum):
+        """
+        Applies a Y gate to the qubits with number qubitNum.
+        """
+
+        self.qubitReg.apply_Y(qubitNum)
+
+    def apply_T(self, qubitNum):
+        """
+        Applies a T gate to the qubits with number qubitNum.
+        """
+        self.qubitReg.apply_T(qubitNum)
+
+    def apply_rotation(self, qubitNum, n, a):
+        """
+        Applies a rotation around the axis n with the angle a to qubit with number qubitNum. If n is zero a ValueError
+        is raised.
+
+        :param qubitNum: int
+            Qubit number
+        :param n: tuple of floats
+            A tuple of three numbers specifying the rotation axis, e.g n=(1,0,0)
+        :param a: float
+            The rotation angle in radians.
+        """
+        self.qubitReg.apply_rotation(qubitNum, n, a)
+
+    def apply_CNOT(self, qubitNum1, qubitNum2):
+        """
+        Applies the CNOT to the qubit with the numbers qubitNum1 and qubitNum2.
+        """
+        self.qubitReg.apply_CNOT(qubitNum1, qubitNum2)
+
+    def apply_CPHASE(self, qubitNum1, qubitNum2):
+        """
+        Applies the CPHASE to the qubit with the numbers qubitNum1 and qubitNum2.
+        """
+
+        self.qubitReg.apply_CZ(qubitNum1, qubitNum2)
+
+    def apply_onequbit_gate(self, gate, qubitNum):
+        """
+        Applies a unitary gate to the specified qubit.
+
+        Arguments:
+        gate       The 2x2 unitary matrix to be applied
+        qubitNum 	the number of the qubit this gate is applied to
+        """
+        if (qubitNum + 1) > self.activeQubits:
+            raise quantumError("No such qubit to apply a single qubit gate to")
+
+        self.qubitReg.apply_single_qubit_gate(qubitNum, gate)
+
+    def apply_twoqubit_gate(self, gate, qubit1, qubit2):
+        """
+        Applies a unitary gate to the two specified qubits.
+
+        Arguments:
+        gate       The 4x4 unitary matrix to be applied, where qubit1 is the most significant qubit
+        qubit1 		the first qubit
+        qubit2		the second qubit
+        """
+        if (qubit1 + 1) > self.activeQubits:
+            raise quantumError("No such qubit to act as a control qubit")
+
+        if (qubit2 + 1) > self.activeQubits:
+            raise quantumError("No such qubit to act as a target qubit")
+
+        if qubit1 == qubit2:
+            raise quantumError("Control and target are equal")
+
+        self.qubitReg.apply_two_qubit_gate(qubit1, qubit2, gate)
+
+    def measure_qubit_inplace(self, qubitNum):
+        """
+        Measures the desired qubit in the standard basis. This returns the classical outcome. The quantum register
+        is in the post-measurment state corresponding to the obtained outcome.
+
+        Arguments:
+        qubitNum	qubit to be measured
+        """
+
+        # Check we have such a qubit...
+        if (qubitNum + 1) > self.activeQubits:
+            raise quantumError("No such qubit to be measured.")
+
+        # Only a random outcome can leave other qubits in a product state, see quantumEngine.find_partition
+        if self.qubitReg.has_random_outcome(qubitNum):
+            self.mayFactorize = True
+        outcome = self.qubitReg.measure(qubitNum, inplace=True)
+
+        # return measurement outcome
+        return outcome
+
+    def measure_qubit(self, qubitNum):
+        """
+        Measures the desired qubit in the standard basis. This returns the classical outcome and deletes the qubit.
+
+        Arguments:
+        qubitNum	qubit to be measured
+        """
+        if self.qubitReg.has_random_outcome(qubitNum):
+            self.mayFactorize = True
+        outcome = self.qubitReg.measure(qubitNum, inplace=False)
+
+        return outcome
+
+    def replace_qubit(self, qubitNum, state):
+        """
+        Replaces the qubit at position qubitNum with the one given by state.
+        """
+        raise NotImplementedError("Currently you cannot replace a qubit using the near-Clifford backend")
+
+    def absorb(self, other):
+        """
+        Absorb the qubits from the other engine into this one. This is done by tensoring the state at the end.
+        """
+
+        # Check whether there is space
+        newNum = self.activeQubits + other.activeQubits
+        if newNum > self.maxQubits:
+            raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
+
+        self.qubitReg.absorb(other.qubitReg)
+
+    def absorb_parts(self, realPart, imagPart, activeQ):
+        """
+        Absorb the qubits, given in pieces
+
+        Arguments:
+        realPart	The generators, Paulis and real parts of the coefficients (see get_register_RI)
+        imagPart	The imaginary parts of the coefficients
+        activeQ		active number of qubits
+        """
+        # Check whether there is space
+        newNum = self.activeQubits + activeQ
+        if newNum > self.maxQubits:
+            raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
+
+        generators, paulis, real_parts = realPart
+        coefficients = np.array(real_parts) + 1j * np.array(imagPart)
+        self.qubitReg.absorb(NearCliffordState(generators, paulis, coefficients))
+
+    def absorb_bytes(self, data):
+        """
+        Absorb the qubits of a packed near Clifford state, see get_register_bytes.
+
+        Arguments:
+        data		packed register
+        """
+        _, activeQ, payload = registerFormat.unpack_register(data, registerFormat.NEAR_CLIFFORD)
+
+        # Check whether there is space
+        newNum = self.activeQubits + activeQ
+        if newNum > self.maxQubits:
+            raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
+
+        if activeQ > 0:
+            n = activeQ
+            numTerms = int(np.frombuffer(payload, dtype="<u8", count=1)[0])
+            start = 8
+            coefficients = np.frombuffer(payload, dtype="<c16", count=numTerms, offset=start)
+            start += coefficients.nbytes
+            paulis = np.frombuffer(payload, dtype=np.uint8, count=numTerms * 2 * n, offset=start)
+            start += paulis.nbytes
+            generators = np.frombuffer(payload, dtype=np.uint8, offset=start).reshape(n, 2 * n + 1)
+            self.qubitReg.absorb(NearCliffordState(generators, paulis.reshape(numTerms, 2 * n), coefficients))
+
+    def find_partition(self):
+        """
+        Finds sets of qubits in the register which are in a product with each other, see
+        NearCliffordState.find_partition.
+        """
+        return self.qubitReg.find_partition()
+
+    def split(self, qubitNums, other):
+        """
+        Moves the qubits qubitNums, which need to be in a product with the other qubits, to the end of the register
+        of the engine other.
+
+        Arguments:
+        qubitNums	qubits to be moved
+        other		engine to move the qubits to
+        """
+        try:
+            state = self.qubitReg.split(qubitNums)
+        except ValueError as err:
+            raise quantumError(str(err))
+        other.absorb_bytes(_pack_near_clifford_state(state))
+
+
+def _pack_near_clifford_state(state):
+    """
+    Packs a NearCliffordState, see nearCliffordEngine.get_register_bytes.
+    """
+    generators, paulis, coefficients = state.to_lists()
+    parts = [
+        np.array([len(coefficients)], dtype="<u8"),
+        np.array(coefficients, dtype="<c16"),
+        np.array(paulis, dtype=np.uint8),
+        np.array(generators, dtype=np.uint8),
+    ]
+    payload = b"".join(part.tobytes() for part in parts)
+    return registerFormat.pack_register(registerFormat.NEAR_CLIFFORD, state.num_qubits, payload)
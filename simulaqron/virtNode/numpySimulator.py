@@ -0,0 +1,543 @@
+#
+# Copyright (c) 2017, Stephanie Wehner and Axel Dahlberg
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. All advertising materials mentioning features or use of this software
+#    must display the following acknowledgement:
+#    This product includes software developed by Stephanie Wehner, QuTech.
+# 4. Neither the name of the QuTech organization nor the
+#    names of its contributors may be used to endorse or promote products
+#    derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY <COPYRIGHT HOLDER> ''AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL <COPYRIGHT HOLDER> BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import itertools
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from simulaqron.settings import Settings
+from simulaqron.virtNode.basics import quantumEngine, quantumError, noQubitError, sample_outcomes
+from simulaqron.virtNode.gateQueue import gateQueue
+from simulaqron.virtNode import factorization, registerFormat
+from simulaqron.toolbox.gateMatrices import GATE_MATRICES, rotation_matrix
+
+# Registers with fewer qubits are handled by the calling thread, since for them handing the work to a pool costs
+# more than it saves
+_PARALLEL_MIN_QUBITS = 18
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+class numpyEngine(quantumEngine):
+    """
+    Quantum engine which keeps the register as a state vector in a numpy array and needs no further packages.
+    The vector is preallocated for maxQubits qubits and gates and measurements act in place on strided views of
+    it. Qubit 0 is the most significant qubit of the state vector. For registers of at least 18 qubits the work is
+    split over Settings.CONF_NUM_THREADS threads. Gates are buffered in a gateQueue, which fuses consecutive gates,
+    until the state is needed. With Settings.CONF_PRECISION set to "single" the amplitudes are stored as complex64
+    instead of complex128.
+
+    Attributes:
+        maxQubits:	maximum number of qubits this engine will support.
+        activeQubits:	number of qubits currently in the register
+    """
+
+    # The search for product states is bounded by factorization.MAX_QUBITS
+    boundedPartition = True
+
+    def __init__(self, node, num, maxQubits=10):
+        """
+        Initialize the simple engine. If no number is given for maxQubits, the assumption will be 10.
+        """
+
+        super().__init__(node=node, num=num, maxQubits=maxQubits)
+
+        # We start with no active qubits, i.e. the state vector of zero qubits
+        self.activeQubits = 0
+        self._dtype = np.dtype(np.complex64 if Settings.CONF_PRECISION == "single" else np.complex128)
+        self._buffer = np.zeros(2 ** maxQubits, dtype=self._dtype)
+        self._buffer[0] = 1
+
+        self._gates = gateQueue(self._apply_onequbit_gate, self._apply_twoqubit_gate)
+
+    def reset(self, num, maxQubits=10):
+        """
+        Resets the register to hold no qubits, such that it can be reused as the register with number num.
+        The buffer is kept if it has the right size for maxQubits.
+        """
+        self._gates.clear()
+        self.num = num
+        self.maxQubits = maxQubits
+        self.mayFactorize = False
+        self.activeQubits = 0
+        self._dtype = np.dtype(np.complex64 if Settings.CONF_PRECISION == "single" else np.complex128)
+        if len(self._buffer) != 2 ** maxQubits or self._buffer.dtype != self._dtype:
+            self._buffer = np.zeros(2 ** maxQubits, dtype=self._dtype)
+        self._buffer[0] = 1
+
+    @property
+    def qubitReg(self):
+        """
+        The state vector of the register, as a view on the preallocated buffer.
+        """
+        self.flush_gates()
+        return self._vector()
+
+    def flush_gates(self):
+        """
+        Applies the buffered gates to the register.
+        """
+        self._gates.flush()
+
+    def _vector(self):
+        """
+        Returns the state vector as a view on the buffer, without applying buffered gates.
+        """
+        return self._buffer[: 2 ** self.activeQubits]
+
+    def _reserve(self, numQubits):
+        """
+        Makes sure the buffer can hold the state of numQubits qubits, which is needed when maxQubits was increased
+        after the engine was created, e.g. for a merge. The buffer at least doubles when it grows, but does not
+        grow beyond what maxQubits qubits need, since a merge raises maxQubits to the combined capacity of both
+        registers rather than to the qubits they hold.
+        """
+        if len(self._buffer) < 2 ** numQubits:
+            size = max(2 ** numQubits, min(2 * len(self._buffer), 2 ** self.maxQubits))
+            buffer = np.zeros(size, dtype=self._dtype)
+            buffer[: 2 ** self.activeQubits] = self._vector()
+            self._buffer = buffer
+
+    def _tensor(self):
+        """
+        Returns the register as a view with one axis of dimension two for each qubit.
+        """
+        return self._vector().reshape([2] * self.activeQubits)
+
+    def add_fresh_qubit(self):
+        """
+        Add a new qubit initialized in the \\|0\\> state.
+        """
+        return self.add_qubit([1, 0])
+
+    def add_qubit(self, newQubit):
+        """
+        Add new qubit in the state described by the vector newQubit ([a, b])
+        """
+
+        # Check if we are still allowed to add qubits
+        if self.activeQubits >= self.maxQubits:
+            raise noQubitError("No more qubits available in register.")
+
+        newQubit = np.asarray(newQubit, dtype=complex)
+        norm = np.vdot(newQubit, newQubit).real
+        if not np.isclose(norm, 1):
+            raise quantumError("State {} is not normalized.".format(newQubit))
+
+        # The new qubit is the least significant, so amplitude j of the old state becomes 2j and 2j + 1. Buffered
+        # gates act on the old qubits only and can stay buffered.
+        self._reserve(self.activeQubits + 1)
+        old = self._vector().copy()
+        num = self.activeQubits
+        self.activeQubits = self.activeQubits + 1
+        state = self._vector().reshape(-1, 2)
+        state[:, 0] = newQubit[0] * old
+        state[:, 1] = newQubit[1] * old
+
+        return num
+
+    def remove_qubit(self, qubitNum):
+        """
+        Removes the qubit with the desired number qubitNum, by measuring it.
+        """
+        if (qubitNum + 1) > self.activeQubits:
+            raise quantumError("No such qubit to remove")
+
+        self.measure_qubit(qubitNum)
+
+    def get_register_RI(self):
+        """
+        Retrieves the entire register in real and imaginary parts and returns the result as a
+        list. Twisted only likes to send real valued lists, not complex ones.
+        """
+        state = self.qubitReg
+
+        Re = state.real.tolist()
+        Im = state.imag.tolist()
+
+        return Re, Im
+
+    def get_register_bytes(self):
+        """
+        Retrieves the entire register as a packed state vector, see registerFormat.pack_register.
+        """
+        return registerFormat.pack_register(registerFormat.KET, self.activeQubits, self.qubitReg)
+
+    def apply_H(self, qubitNum):
+        """
+        Applies a Hadamard gate to the qubits with number qubitNum.
+        """
+        self.apply_onequbit_gate(GATE_MATRICES["H"], qubitNum)
+
+    def apply_K(self, qubitNum):
+        """
+        Applies a K gate to the qubits with number qubitNum. Maps computational basis to Y eigenbasis.
+        """
+        self.apply_onequbit_gate(GATE_MATRICES["K"], qubitNum)
+
+    def apply_X(self, qubitNum):
+        """
+        Applies a X gate to the qubits with number qubitNum.
+        """
+        self.apply_onequbit_gate(GATE_MATRICES["X"], qubitNum)
+
+    def apply_Z(self, qubitNum):
+        """
+        Applies a Z gate to the qubits with number qubitNum.
+        """
+        self.apply_onequbit_gate(GATE_MATRICES["Z"], qubitNum)
+
+    def apply_Y(self, qubitNum):
+        """
+        Applies a Y gate to the qubits with number qubitNum.
+        """
+        self.apply_onequbit_gate(GATE_MATRICES["Y"], qubitNum)
+
+    def apply_T(self, qubitNum):
+        """
+        Applies a T gate to the qubits with number qubitNum.
+        """
+        self.apply_onequbit_gate(GATE_MATRICES["T"], qubitNum)
+
+    def apply_rotation(self, qubitNum, n, a):
+        """
+        Applies a rotation around the axis n with the angle a to qubit with number qubitNum. If n is zero a ValueError
+        is raised.
+
+        :param qubitNum: int
+            Qubit number
+        :param n: tuple of floats
+            A tuple of three numbers specifying the rotation axis, e.g n=(1,0,0)
+        :param a: float
+            The rotation angle in radians.
+        """
+        self.apply_onequbit_gate(rotation_matrix(n, a), qubitNum)
+
+    def apply_CNOT(self, qubitNum1, qubitNum2):
+        """
+        Applies the CNOT to the qubit with the numbers qubitNum1 and qubitNum2.
+        """
+        self.apply_twoqubit_gate(GATE_MATRICES["CNOT"], qubitNum1, qubitNum2)
+
+    def apply_CPHASE(self, qubitNum1, qubitNum2):
+        """
+        Applies the CPHASE to the qubit with the numbers qubitNum1 and qubitNum2.
+        """
+        self.apply_twoqubit_gate(GATE_MATRICES["CPHASE"], qubitNum1, qubitNum2)
+
+    def apply_onequbit_gate(self, gateU, qubitNum):
+        """
+        Applies a unitary gate to the specified qubit.
+
+        Arguments:
+        gateU       The 2x2 unitary matrix to be applied
+        qubitNum 	the number of the qubit this gate is applied to
+        """
+        if (qubitNum + 1) > self.activeQubits:
+            raise quantumError("No such qubit to apply a single qubit gate to")
+
+        self._gates.add_onequbit_gate(gateU, qubitNum)
+
+    def _apply_onequbit_gate(self, gateU, qubitNum):
+        """
+        Applies the 2x2 matrix gateU to the state, without buffering.
+        """
+        gateU = np.asarray(gateU, dtype=self._dtype)
+        _for_each_part(self._tensor(), [qubitNum], lambda part, axes: _apply_to_axis(part, gateU, axes[0]))
+
+    def apply_twoqubit_gate(self, gateU, qubit1, qubit2):
+        """
+        Applies a unitary gate to the two specified qubits.
+
+        Arguments:
+        gateU       The 4x4 unitary matrix to be applied, where qubit1 is the most significant qubit
+        qubit1 		the first qubit
+        qubit2		the second qubit
+        """
+        if (qubit1 + 1) > self.activeQubits:
+            raise quantumError("No such qubit to act as a control qubit")
+
+        if (qubit2 + 1) > self.activeQubits:
+            raise quantumError("No such qubit to act as a target qubit")
+
+        if qubit1 == qubit2:
+            raise quantumError("Control and target are equal")
+
+        self._gates.add_twoqubit_gate(gateU, qubit1, qubit2)
+
+    def _apply_twoqubit_gate(self, gateU, qubit1, qubit2):
+        """
+        Applies the 4x4 matrix gateU to the state, without buffering.
+        """
+        gateU = np.asarray(gateU, dtype=self._dtype)
+        if np.array_equal(gateU[:2, :2], np.eye(2)) and not gateU[:2, 2:].any() and not gateU[2:, :2].any():
+            kernel = _apply_controlled
+            gateU = gateU[2:, 2:]
+        else:
+            kernel = _apply_to_two_axes
+        _for_each_part(self._tensor(), [qubit1, qubit2], lambda part, axes: kernel(part, gateU, *axes))
+
+    def _probability_of_one(self, qubitNum):
+        """
+        Returns the probability that measuring the qubit qubitNum in the standard basis gives 1.
+        """
+        def kernel(part, axes):
+            ones = part[(slice(None),) * axes[0] + (1, Ellipsis)]
+            return np.vdot(ones, ones).real
+
+        return sum(_for_each_part(self._tensor(), [qubitNum], kernel))
+
+    def measure_qubit_inplace(self, qubitNum):
+        """
+        Measures the desired qubit in the standard basis. This returns the classical outcome. The quantum register
+        is in the post-measurment state corresponding to the obtained outcome.
+
+        Arguments:
+        qubitNum	qubit to be measured
+        """
+
+        # Check we have such a qubit...
+        if (qubitNum + 1) > self.activeQubits:
+            raise quantumError("No such qubit to be measured.")
+
+        self.flush_gates()
+
+        # Sample the measurement outcome
+        p1 = min(max(self._probability_of_one(qubitNum), 0), 1)
+        outcome = int(np.random.random() < p1)
+        if factorization.is_random_outcome(p1, self._dtype):
+            self.mayFactorize = True
+        p = p1 if outcome == 1 else 1 - p1
+
+        # Set the amplitudes of the other outcome to zero and renormalize
+        scale = 1 / np.sqrt(p)
+
+        def kernel(part, axes):
+            part[(slice(None),) * axes[0] + (1 - outcome, Ellipsis)] = 0
+            part[(slice(None),) * axes[0] + (outcome, Ellipsis)] *= scale
+
+        _for_each_part(self._tensor(), [qubitNum], kernel)
+
+        # return measurement outcome
+        return outcome
+
+    def measure_qubit(self, qubitNum):
+        """
+        Measures the desired qubit in the standard basis. This returns the classical outcome and deletes the qubit.
+
+        Arguments:
+        qubitNum	qubit to be measured
+        """
+        outcome = self.measure_qubit_inplace(qubitNum)
+
+        # The measured qubit is in a product state with the rest, so keep the part agreeing with the outcome
+        rest = self._vector().reshape(2 ** qubitNum, 2, -1)[:, outcome, :].copy()
+        self.activeQubits = self.activeQubits - 1
+        self._vector()[:] = rest.reshape(-1)
+
+        return outcome
+
+    def sample_measurements(self, qubitNums, shots):
+        """
+        Samples the outcomes of measuring the desired qubits in the standard basis 'shots' times, without
+        changing the register, see basics.sample_outcomes.
+
+        Arguments:
+        qubitNums	qubits to be measured
+        shots		number of samples
+        """
+        probabilities = np.abs(self.qubitReg) ** 2
+        return sample_outcomes(probabilities, self.activeQubits, qubitNums, shots)
+
+    def replace_qubit(self, qubitNum, state):
+        """
+        Replaces the qubit at position qubitNum with the one given by state, a vector [a, b] as for add_qubit.
+        """
+
+        # Remove the qubit currently there by measuring it out
+        self.remove_qubit(qubitNum)
+
+        # Add the new qubit at the end
+        self.add_qubit(state)
+
+        # Move the new qubit from the end to the correct position, which shifts the later qubits back
+        self.flush_gates()
+        n = self.activeQubits
+        tensor = np.moveaxis(self._tensor(), n - 1, qubitNum)
+        self._vector()[:] = np.ascontiguousarray(tensor).reshape(-1)
+
+    def absorb(self, other):
+        """
+        Absorb the qubits from the other engine into this one. This is done by tensoring the state at the end.
+        """
+        self._absorb_state(other.qubitReg, other.activeQubits)
+
+    def absorb_parts(self, realPart, imagPart, activeQ):
+        """
+        Absorb the qubits, given in pieces
+
+        Arguments:
+        realPart	real part of the qubit state as a list
+        imagPart	imaginary part as a list
+        activeQ		active number of qubits
+        """
+        state = np.array(realPart, dtype=self._dtype)
+        state.imag = imagPart
+        self._absorb_state(state, activeQ)
+
+    def absorb_bytes(self, data):
+        """
+        Absorb the qubits of a packed state vector, see get_register_bytes.
+
+        Arguments:
+        data		packed register
+        """
+        _, activeQ, state = registerFormat.unpack_register(data, registerFormat.KET)
+        self._absorb_state(state, activeQ)
+
+    def _absorb_state(self, state, activeQ):
+        """
+        Tensors the state vector of activeQ qubits at the end of the register. Buffered gates act on the old
+        qubits only and can stay buffered.
+        """
+        # Check whether there is space
+        newNum = self.activeQubits + activeQ
+        if newNum > self.maxQubits:
+            raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
+
+        if activeQ > 0:
+            state = np.kron(self._vector(), state.astype(self._dtype, copy=False))
+            self._reserve(newNum)
+            self.activeQubits = newNum
+            self._vector()[:] = state
+
+    def find_partition(self):
+        """
+        Finds sets of qubits in the register which are in a product with each other, see
+        factorization.pure_state_partition.
+        """
+        return factorization.pure_state_partition(self.qubitReg, self.activeQubits)
+
+    def split(self, qubitNums, other):
+        """
+        Moves the qubits qubitNums, which need to be in a product with the other qubits, to the end of the register
+        of the engine other, which is given their state vector.
+
+        Arguments:
+        qubitNums	qubits to be moved
+        other		engine to move the qubits to
+        """
+        factor, rest = factorization.split_pure_state(self.qubitReg, self.activeQubits, qubitNums)
+        other.absorb_bytes(registerFormat.pack_register(registerFormat.KET, len(qubitNums), factor))
+        self.activeQubits = self.activeQubits - len(qubitNums)
+        self._vector()[:] = rest
+
+
+def _thread_pool():
+    """
+    Returns the shared pool of Settings.CONF_NUM_THREADS threads, which is recreated when the setting changes.
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != Settings.CONF_NUM_THREADS:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool_size = Settings.CONF_NUM_THREADS
+            _pool = ThreadPoolExecutor(max_workers=_pool_size, thread_name_prefix="numpyEngine")
+        return _pool
+
+
+def _for_each_part(state, axes, kernel):
+    """
+    Calls kernel(part, partAxes) on disjoint parts of state, an array with one axis per qubit, and returns the list
+    of results. The parts are obtained by fixing the values of the most significant qubits which are not in axes, so
+    each part contains the full axes and partAxes are their positions within the part. If the register is large
+    and more than one thread is configured, the parts are handled by the thread pool, otherwise the kernel is
+    called once on the whole state.
+    """
+    numThreads = Settings.CONF_NUM_THREADS
+    if numThreads <= 1 or state.ndim < _PARALLEL_MIN_QUBITS:
+        return [kernel(state, axes)]
+
+    free = [q for q in range(state.ndim) if q not in axes]
+    fixed = free[: min(math.ceil(math.log2(numThreads)), len(free))]
+    partAxes = [a - sum(q < a for q in fixed) for a in axes]
+    parts = []
+    for values in itertools.product((0, 1), repeat=len(fixed)):
+        index = [slice(None)] * state.ndim
+        for q, v in zip(fixed, values):
+            index[q] = v
+        parts.append(state[tuple(index)])
+
+    return list(_thread_pool().map(lambda part: kernel(part, partAxes), parts))
+
+
+def _apply_to_axis(state, gateU, axis):
+    """
+    Applies the 2x2 matrix gateU in place to the given axis of the array state, which can be a view. Diagonal and
+    anti-diagonal matrices, e.g. phase gates and X, only scale or swap the two halves of the state.
+    """
+    zero = state[(slice(None),) * axis + (0, Ellipsis)]
+    one = state[(slice(None),) * axis + (1, Ellipsis)]
+    if gateU[0, 1] == 0 and gateU[1, 0] == 0:
+        if gateU[0, 0] != 1:
+            zero *= gateU[0, 0]
+        if gateU[1, 1] != 1:
+            one *= gateU[1, 1]
+    elif gateU[0, 0] == 0 and gateU[1, 1] == 0:
+        old = zero.copy()
+        np.multiply(one, gateU[0, 1], out=zero)
+        np.multiply(old, gateU[1, 0], out=one)
+    else:
+        old = zero.copy()
+        zero *= gateU[0, 0]
+        zero += gateU[0, 1] * one
+        one *= gateU[1, 1]
+        one += gateU[1, 0] * old
+
+
+def _apply_controlled(state, gateU, control, target):
+    """
+    Applies the 2x2 matrix gateU in place to the target axis of state, on the part where the control axis is 1.
+    """
+    controlled = state[(slice(None),) * control + (1, Ellipsis)]
+    _apply_to_axis(controlled, gateU, target if target < control else target - 1)
+
+
+def _apply_to_two_axes(state, gateU, axis1, axis2):
+    """
+    Applies the 4x4 matrix gateU in place to the axes axis1 and axis2 of state, where axis1 is the most significant.
+    """
+    view = np.moveaxis(state, [axis1, axis2], [0, 1])
+    view[...] = (gateU @ view.reshape(4, -1)).reshape(view.shape)
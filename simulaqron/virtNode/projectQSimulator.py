@@ -27,23 +27,41 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import sys
+
 try:
     import projectq as pQ
 except ModuleNotFoundError:
     raise RuntimeError("If you want to use the projectq backend you need to install the python package 'projectq'")
 import numpy as np
 
-from simulaqron.virtNode.basics import quantumEngine, quantumError, noQubitError
+from simulaqron.virtNode.basics import quantumEngine, quantumError, noQubitError, sample_outcomes
+from simulaqron.virtNode.gateQueue import gateQueue
+from simulaqron.virtNode import factorization, registerFormat
+from simulaqron.toolbox.gateMatrices import GATE_MATRICES
+
+# Project Q engines of deleted registers, which hold no qubits and are reused for new registers, see _take_engine.
+# No lock is used, since registers are deleted by the garbage collector, which can run while such a lock is held.
+# Appending to and popping from a list are atomic.
+_idle_engines = []
+
+# Maximal number of idle project Q engines which are kept
+_IDLE_ENGINES_SIZE = 10
 
 
 class projectQEngine(quantumEngine):
     """
-    Basic quantum engine which uses ProjectQ.
+    Basic quantum engine which uses ProjectQ. Gates are buffered in a gateQueue, which fuses consecutive gates
+    into a single matrix gate, until the state is needed. The project Q engine of a deleted register is emptied and
+    kept for the next register, instead of creating a new one each time.
 
     Attributes:
         maxQubits:	maximum number of qubits this engine will support.
     """
 
+    # The search for product states is bounded by factorization.MAX_QUBITS
+    boundedPartition = True
+
     def __init__(self, node, num, maxQubits=10):
         """
         Initialize the simple engine. If no number is given for maxQubits, the assumption will be 10.
@@ -54,18 +72,55 @@ class projectQEngine(quantumEngine):
         # We start with no active qubits
         self.activeQubits = 0
 
-        self.eng = pQ.MainEngine()
+        self.eng = _take_engine()
         self.qubitReg = []
 
-    def __del__(self):
+        self._gates = gateQueue(self._apply_onequbit_gate, self._apply_twoqubit_gate)
+
+    def __del__(self, _is_finalizing=sys.is_finalizing):
         """
-        Measures out all the current qubits, needed for projectQs garbage collectorself.
+        Deallocates the qubits, such that the simulator does not keep their state, and puts the project Q engine
+        back for reuse.
         """
-        # Check first that project Q garbage collector not already removed qubits
-        self.eng.flush()
-        if not len(self.eng.backend.cheat()[0]) == 0:
-            for _ in range(self.activeQubits):
-                self.measure_qubit(0)
+        # The modules used below may already be torn down if Python is shutting down, in which case project Q
+        # deallocates the qubits itself
+        if _is_finalizing():
+            return
+
+        self._gates.clear()
+
+        # Project Q already deallocated the qubits if its engine was flushed on exit
+        if self.activeQubits > 0 and self._qubit(0).id < 0:
+            return
+
+        self._deallocate_qubits()
+        if len(_idle_engines) < _IDLE_ENGINES_SIZE:
+            _idle_engines.append(self.eng)
+
+    def reset(self, num, maxQubits=10):
+        """
+        Resets the register to hold no qubits, such that it can be reused as the register with number num.
+        The project Q engine is kept.
+        """
+        self._gates.clear()
+        self._deallocate_qubits()
+        self.num = num
+        self.maxQubits = maxQubits
+        self.mayFactorize = False
+
+    def _deallocate_qubits(self):
+        """
+        Deallocates all the current qubits. Project Q only deallocates qubits in a classical state, so instead of
+        measuring the qubits one by one the whole register is set to |0...0> at once.
+        """
+        if self.activeQubits > 0:
+            self.eng.flush()
+            state = np.zeros(2 ** self.activeQubits, dtype=complex)
+            state[0] = 1
+            self.eng.backend.set_wavefunction(state, [self._qubit(i) for i in range(self.activeQubits)])
+            self.qubitReg = []
+            self.activeQubits = 0
+            self.eng.flush()
 
     def add_fresh_qubit(self):
         """
@@ -117,14 +172,60 @@ class projectQEngine(quantumEngine):
         Retrieves the entire register in real and imaginary parts and returns the result as a
         list. Twisted only likes to send real valued lists, not complex ones.
         """
-        self.eng.flush()
-        state = self.eng.backend.cheat()[1]
+        state = self._wavefunction()
 
-        Re = tuple(n.real for n in state)
-        Im = tuple(n.imag for n in state)
+        Re = state.real.tolist()
+        Im = state.imag.tolist()
 
         return Re, Im
 
+    def get_register_bytes(self):
+        """
+        Retrieves the entire register as a packed state vector, see registerFormat.pack_register. Note that there
+        the first qubit is the most significant one, as for the other backends.
+        """
+        state = _reverse_qubits(self._wavefunction(), self.activeQubits)
+        return registerFormat.pack_register(registerFormat.KET, self.activeQubits, state)
+
+    def _wavefunction(self):
+        """
+        Returns the state vector of the register as a numpy array, where qubit i is the i-th least significant bit.
+        """
+        self.flush_gates()
+        self.eng.flush()
+        mapping, state = self.eng.backend.cheat()
+        state = np.array(state)
+
+        # The simulator may hold the qubits in another order, e.g. in the order in which their allocation reached it
+        n = self.activeQubits
+        locations = [mapping[self._qubit(i).id] for i in range(n)]
+        if locations != list(range(n)):
+            # Axis j of the tensor is bit n - 1 - j, which needs to become qubit n - 1 - j
+            axes = [n - 1 - locations[n - 1 - j] for j in range(n)]
+            state = state.reshape([2] * n).transpose(axes).reshape(-1)
+        return state
+
+    def _qubit(self, qubitNum):
+        """
+        Returns the project Q qubit with number qubitNum.
+        """
+        qubit = self.qubitReg[qubitNum]
+        return qubit[0] if isinstance(qubit, pQ.types.Qureg) else qubit
+
+    def _append_state(self, state, activeQ):
+        """
+        Tensors the state vector of activeQ qubits at the end of the register, by allocating new qubits and setting
+        the wavefunction of the simulator directly.
+        """
+        old = self._wavefunction()
+        self.qubitReg += [self.eng.allocate_qubit() for _ in range(activeQ)]
+        self.eng.flush()
+
+        # The new qubits are the most significant ones
+        qubits = [self._qubit(i) for i in range(self.activeQubits + activeQ)]
+        self.eng.backend.set_wavefunction(np.kron(state, old), qubits)
+        self.activeQubits += activeQ
+
     def apply_H(self, qubitNum):
         """
         Applies a Hadamard gate to the qubits with number qubitNum.
@@ -214,6 +315,14 @@ class projectQEngine(quantumEngine):
         if (qubitNum + 1) > self.activeQubits:
             raise quantumError("No such qubit to apply a single qubit gate to")
 
+        self._gates.add_onequbit_gate(gate, qubitNum, matrix=_gate_matrix(gate))
+
+    def _apply_onequbit_gate(self, gate, qubitNum):
+        """
+        Applies the project Q gate, or the 2x2 matrix, gate to the specified qubit, without buffering.
+        """
+        if isinstance(gate, np.ndarray):
+            gate = pQ.ops.MatrixGate(gate)
         gate | self.qubitReg[qubitNum]
 
     def apply_twoqubit_gate(self, gate, qubit1, qubit2):
@@ -234,7 +343,30 @@ class projectQEngine(quantumEngine):
         if qubit1 == qubit2:
             raise quantumError("Control and target are equal")
 
-        gate | (self.qubitReg[qubit1], self.qubitReg[qubit2])
+        matrix = _gate_matrix(gate)
+        if matrix is None:
+            # Gates without a known matrix cannot be fused
+            self.flush_gates()
+            self._apply_twoqubit_gate(gate, qubit1, qubit2)
+        else:
+            self._gates.add_twoqubit_gate(gate, qubit1, qubit2, matrix=matrix)
+
+    def _apply_twoqubit_gate(self, gate, qubit1, qubit2):
+        """
+        Applies the project Q gate, or the 4x4 matrix where qubit1 is the most significant, gate to the two
+        specified qubits, without buffering.
+        """
+        if isinstance(gate, np.ndarray):
+            # Project Q takes the first qubit of a matrix gate as the least significant one
+            pQ.ops.MatrixGate(gate) | (self.qubitReg[qubit2], self.qubitReg[qubit1])
+        else:
+            gate | (self.qubitReg[qubit1], self.qubitReg[qubit2])
+
+    def flush_gates(self):
+        """
+        Sends the buffered gates to the project Q engine.
+        """
+        self._gates.flush()
 
     def measure_qubit_inplace(self, qubitNum):
         """
@@ -249,6 +381,16 @@ class projectQEngine(quantumEngine):
         if (qubitNum + 1) > self.activeQubits:
             raise quantumError("No such qubit to be measured.")
 
+        self.flush_gates()
+
+        # Only a random outcome can leave other qubits in a product state, which is not searched for in large
+        # registers, see factorization.pure_state_partition
+        if self.activeQubits <= factorization.MAX_QUBITS:
+            self.eng.flush()
+            p1 = self.eng.backend.get_probability([1], [self._qubit(qubitNum)])
+            if factorization.is_random_outcome(p1, np.complex128):
+                self.mayFactorize = True
+
         pQ.ops.Measure | self.qubitReg[qubitNum]
 
         self.eng.flush()
@@ -274,6 +416,18 @@ class projectQEngine(quantumEngine):
 
         return outcome
 
+    def sample_measurements(self, qubitNums, shots):
+        """
+        Samples the outcomes of measuring the desired qubits in the standard basis 'shots' times, without
+        changing the register, see basics.sample_outcomes.
+
+        Arguments:
+        qubitNums	qubits to be measured
+        shots		number of samples
+        """
+        probabilities = _reverse_qubits(np.abs(self._wavefunction()) ** 2, self.activeQubits)
+        return sample_outcomes(probabilities, self.activeQubits, qubitNums, shots)
+
     def replace_qubit(self, qubitNum, state):
         """
         Replaces the qubit at position qubitNum with the one given by state.
@@ -290,52 +444,104 @@ class projectQEngine(quantumEngine):
         if newNum > self.maxQubits:
             raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
 
-        # Check whether there are in fact qubits to tensor up....
-        if self.activeQubits == 0:
-            self.eng = other.eng
-            self.qubitReg = list(other.qubitReg)
-        elif other.activeQubits > 0:
-            # Get the current state of the other engine
-            other.eng.flush()
-            other_state = other.eng.backend.cheat()[1]
+        # Check whether there are in fact qubits to tensor up.... The state is copied even if this register is
+        # empty, since the project Q engine of the other register must not be shared when that one is deleted.
+        if other.activeQubits > 0:
+            self._append_state(other._wavefunction(), other.activeQubits)
+
+    def absorb_parts(self, realPart, imagPart, activeQ):
+        """
+        Absorb the qubits, given in pieces
 
-            # Allocate qubits in this engine for the new qubits from the other engine
-            qreg = self.eng.allocate_qureg(other.activeQubits)
+        Arguments:
+        realPart	real part of the qubit state as a list
+        imagPart	imaginary part as a list
+        activeQ		active number of qubits
+        """
+        # Check whether there is space
+        newNum = self.activeQubits + activeQ
+        if newNum > self.maxQubits:
+            raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
 
-            # Put the new qubits in the correct state
-            pQ.ops.StatePreparation(other_state) | qreg
+        if activeQ > 0:
 
-            # Add the qubits to the list of qubits
-            self.qubitReg += list(qreg)
+            # Convert the real and imaginary parts to a state
+            state = np.array(realPart, dtype=complex)
+            state.imag = imagPart
 
-        self.activeQubits = newNum
+            self._append_state(state, activeQ)
 
-    def absorb_parts(self, R, I, activeQ):
+    def absorb_bytes(self, data):
         """
-        Absorb the qubits, given in pieces
+        Absorb the qubits of a packed state vector, see get_register_bytes.
 
         Arguments:
-        R		real part of the qubit state as a list
-        I		imaginary part as a list
-        activeQ		active number of qubits
+        data		packed register
         """
+        _, activeQ, state = registerFormat.unpack_register(data, registerFormat.KET)
+
         # Check whether there is space
         newNum = self.activeQubits + activeQ
         if newNum > self.maxQubits:
             raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
 
         if activeQ > 0:
+            self._append_state(_reverse_qubits(state, activeQ), activeQ)
 
-            # Convert the real and imaginary parts to a state
-            state = [re + im * 1j for re, im in zip(R, I)]
+    def find_partition(self):
+        """
+        Finds sets of qubits in the register which are in a product with each other, see
+        factorization.pure_state_partition.
+        """
+        state = _reverse_qubits(self._wavefunction(), self.activeQubits)
+        return factorization.pure_state_partition(state, self.activeQubits)
+
+    def split(self, qubitNums, other):
+        """
+        Moves the qubits qubitNums, which need to be in a product with the other qubits, to the end of the register
+        of the engine other, which is given their state vector. The project Q qubits are reallocated for the state
+        of the other qubits.
+
+        Arguments:
+        qubitNums	qubits to be moved
+        other		engine to move the qubits to
+        """
+        n = self.activeQubits
+        state = _reverse_qubits(self._wavefunction(), n)
+        factor, rest = factorization.split_pure_state(state, n, qubitNums)
+        other.absorb_bytes(registerFormat.pack_register(registerFormat.KET, len(qubitNums), factor))
+        self._deallocate_qubits()
+        self._append_state(_reverse_qubits(rest, n - len(qubitNums)), n - len(qubitNums))
+
+
+def _take_engine():
+    """
+    Returns a project Q engine holding no qubits, which is an idle engine of a deleted register if there is one.
+    """
+    try:
+        return _idle_engines.pop()
+    except IndexError:
+        return pQ.MainEngine()
 
-            # Allocate qubits in this engine for the new qubits from the other engine
-            qreg = self.eng.allocate_qureg(activeQ)
 
-            # Put the new qubits in the correct state
-            pQ.ops.StatePreparation(state) | qreg
+def _reverse_qubits(state, numQubits):
+    """
+    Converts a state vector where the first qubit is the least significant into one where it is the most
+    significant, and the other way around.
+    """
+    return state.reshape([2] * numQubits).transpose().reshape(-1)
 
-            # Add the qubits to the list of qubits
-            self.qubitReg += list(qreg)
 
-            self.activeQubits = newNum
+def _gate_matrix(gate):
+    """
+    Returns the matrix of a project Q gate as a numpy array, where for two-qubit gates the control is the most
+    significant qubit, or None if it is not known.
+    """
+    if gate == pQ.ops.CNOT:
+        return GATE_MATRICES["CNOT"]
+    if gate == pQ.ops.CZ:
+        return GATE_MATRICES["CPHASE"]
+    try:
+        return np.array(gate.matrix, dtype=complex)
+    except AttributeError:
+        return None
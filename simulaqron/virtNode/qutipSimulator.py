@@ -27,7 +27,6 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 import math
-import cmath
 
 import numpy as np
 import logging
@@ -37,7 +36,15 @@ try:
 except ModuleNotFoundError:
     raise RuntimeError("If you want to use the qutip backend you need to install the python package 'qutip'")
 
-from simulaqron.virtNode.basics import quantumEngine, quantumError, noQubitError
+from simulaqron.settings import Settings
+from simulaqron.virtNode.basics import quantumEngine, quantumError, noQubitError, sample_outcomes
+from simulaqron.virtNode.gateQueue import gateQueue
+from simulaqron.virtNode import factorization, registerFormat
+from simulaqron.toolbox.gateMatrices import GATE_MATRICES, rotation_matrix
+
+# Tolerance used when deciding whether a state is pure, e.g. 1 - tr(rho^2) for a density matrix, for each of the
+# precisions in which the state can be stored
+_PURITY_TOL = {np.dtype(np.complex128): 1e-10, np.dtype(np.complex64): 1e-6}
 
 
 class qutipEngine(quantumEngine):
@@ -45,19 +52,102 @@ class qutipEngine(quantumEngine):
     Basic quantum engine which uses QuTip. Works with density matrices and in principle allows full quantum
     dynamics via QuTip. Subsequently, this is quite slow.
 
+    As long as the register is in a pure state it is kept as a state vector, and it is only promoted to a
+    density matrix when a mixed state arises, i.e. when an entangled qubit is traced out or when a mixed
+    state is absorbed. Either is kept as a dense numpy array such that gates can be applied by contracting
+    only the axes of the qubits they act on. Gates are buffered in a gateQueue, which fuses consecutive gates,
+    until the state is needed. The attribute qubitReg exposes the density matrix as a QuTip object.
+
+    With Settings.CONF_PRECISION set to "single" the arrays are stored as complex64 instead of complex128.
+
     Attributes:
         maxQubits:	maximum number of qubits this engine will support.
     """
 
+    # The search for product states is bounded by factorization.MAX_QUBITS
+    boundedPartition = True
+
     def __init__(self, node, num, maxQubits=10):
         """
         Initialize the simple engine. If no number is given for maxQubits, the assumption will be 10.
         """
         super().__init__(node=node, num=num, maxQubits=maxQubits)
 
-        # We start with no active qubits
+        self._dtype = np.dtype(np.complex64 if Settings.CONF_PRECISION == "single" else np.complex128)
+
+        # We start with no active qubits, i.e. the state vector of zero qubits
+        self.activeQubits = 0
+        self._psi = np.ones(1, dtype=self._dtype)
+        self._rho = None
+
+        self._gates = gateQueue(self._apply_onequbit_gate, self._apply_twoqubit_gate)
+
+    def reset(self, num, maxQubits=10):
+        """
+        Resets the register to hold no qubits, such that it can be reused as the register with number num.
+        """
+        self._gates.clear()
+        self.num = num
+        self.maxQubits = maxQubits
+        self.mayFactorize = False
+        self._dtype = np.dtype(np.complex64 if Settings.CONF_PRECISION == "single" else np.complex128)
         self.activeQubits = 0
-        self.qubitReg = qp.Qobj()
+        self._psi = np.ones(1, dtype=self._dtype)
+        self._rho = None
+
+    @property
+    def qubitReg(self):
+        """
+        The density matrix of the register as a QuTip object, with the dimensions of the subsystems set to
+        one qubit each. Can be set to either a ket or a density matrix.
+        """
+        self.flush_gates()
+        rho = self._density_matrix()
+        k = int(math.log2(rho.shape[0]))
+        if k == 0:
+            return qp.Qobj()
+        dimL = [2] * k
+        return qp.Qobj(rho, dims=[dimL, dimL])
+
+    @qubitReg.setter
+    def qubitReg(self, state):
+        self._gates.clear()
+        if state.isket:
+            self._psi = state.full().ravel().astype(self._dtype)
+            self._rho = None
+        else:
+            self._psi = None
+            self._rho = state.full().astype(self._dtype)
+
+    @property
+    def is_pure(self):
+        """
+        Whether the register is currently stored as a state vector.
+        """
+        self.flush_gates()
+        return self._psi is not None
+
+    def flush_gates(self):
+        """
+        Applies the buffered gates to the register.
+        """
+        self._gates.flush()
+
+    def _density_matrix(self):
+        """
+        Returns the density matrix of the register as a numpy array, without changing how it is stored.
+        """
+        if self._psi is not None:
+            return np.outer(self._psi, self._psi.conj())
+        return self._rho
+
+    def _to_density_matrix(self):
+        """
+        Promotes the register from a state vector to a density matrix, if this has not happened already.
+        """
+        if self._psi is not None:
+            self._rho = self._density_matrix()
+            self._psi = None
 
     def add_fresh_qubit(self):
         """
@@ -65,26 +155,28 @@ class qutipEngine(quantumEngine):
         """
 
         # Prepare a clean qubit state in |0>
-        v = qp.basis(2, 0)
-        newQubit = v * v.dag()
+        newQubit = qp.basis(2, 0)
 
         num = self.add_qubit(newQubit)
         return num
 
     def add_qubit(self, newQubit):
         """
-        Add new qubit in the state described by the density matrix newQubit
+        Add new qubit in the state described by newQubit, which can be a ket or a density matrix
         """
 
         # Check if we are still allowed to add qubits
         if self.activeQubits >= self.maxQubits:
             raise noQubitError("No more qubits available in register.")
 
-        # Append to the existing state at the end
-        if self.activeQubits > 0:
-            self.qubitReg = qp.tensor(self.qubitReg, newQubit)
+        # Append to the existing state at the end, buffered gates act on the old qubits only and can stay buffered
+        if self._psi is not None and newQubit.isket:
+            self._psi = np.kron(self._psi, newQubit.full().ravel().astype(self._dtype))
         else:
-            self.qubitReg = newQubit
+            self._to_density_matrix()
+            if newQubit.isket:
+                newQubit = newQubit * newQubit.dag()
+            self._rho = np.kron(self._rho, newQubit.full().astype(self._dtype))
 
         # Index number of that qubit
         num = self.activeQubits
@@ -103,18 +195,28 @@ class qutipEngine(quantumEngine):
 
         # Check if this the only qubit
         if self.activeQubits == 1:
+            self._gates.clear()
             self.activeQubits = 0
-            self.qubitReg = qp.Qobj()
+            self._psi = np.ones(1, dtype=self._dtype)
+            self._rho = None
             return
 
-        # Compute the list of qubits to keep
-        keepList = []
-        for j in range(self.activeQubits):
-            if j != qubitNum:
-                keepList.append(j)
+        self.flush_gates()
+        if self._psi is not None:
+            # View the state as a 2 x 2^(n-1) matrix with a row for each value of the qubit to remove
+            M = np.moveaxis(self._psi.reshape([2] * self.activeQubits), qubitNum, 0).reshape(2, -1)
+            gram = M @ M.conj().T
+            if abs(gram[0, 0] * gram[1, 1] - abs(gram[0, 1]) ** 2) < _PURITY_TOL[self._dtype]:
+                # The qubit is not entangled, so both rows are proportional to the state of the rest
+                row = M[np.argmax(np.diag(gram).real)]
+                self._psi = row / np.linalg.norm(row)
+                self.activeQubits = self.activeQubits - 1
+                return
 
         # Trace out this qubit by taking the partial trace
-        self.qubitReg = self.qubitReg.ptrace(keepList)
+        keepList = [j for j in range(self.activeQubits) if j != qubitNum]
+        self._rho = self._reduced_density_matrix(keepList)
+        self._psi = None
 
         # Update the number of qubits
         self.activeQubits = self.activeQubits - 1
@@ -139,62 +241,58 @@ class qutipEngine(quantumEngine):
         Retrieves the entire register in real and imaginary parts and returns the result as a
         list. Twisted only likes to send real valued lists, not complex ones.
         """
-        Re = self.qubitReg.full().real.tolist()
-        Im = self.qubitReg.full().imag.tolist()
+        self.flush_gates()
+        rho = self._density_matrix()
+        Re = rho.real.tolist()
+        Im = rho.imag.tolist()
 
         return (Re, Im)
 
+    def get_register_bytes(self):
+        """
+        Retrieves the entire register as a packed state vector if it is pure and as a packed density matrix
+        otherwise, see registerFormat.pack_register.
+        """
+        self.flush_gates()
+        if self._psi is not None:
+            return registerFormat.pack_register(registerFormat.KET, self.activeQubits, self._psi)
+        return registerFormat.pack_register(registerFormat.DENSITY_MATRIX, self.activeQubits, self._rho)
+
     def apply_H(self, qubitNum):
         """
         Applies a Hadamard gate to the qubits with number qubitNum.
         """
-
-        f = math.sqrt(2)
-        H = qp.Qobj([[1 / f, 1 / f], [1 / f, -1 / f]], dims=[[2], [2]])
-        self.apply_onequbit_gate(H, qubitNum)
+        self._queue_local_unitary(GATE_MATRICES["H"], [qubitNum])
 
     def apply_K(self, qubitNum):
         """
         Applies a K gate to the qubits with number qubitNum. Maps computational basis to Y eigenbasis.
         """
-
-        f = math.sqrt(2)
-        i = complex(0, 1)
-        K = qp.Qobj([[1 / f, -i / f], [i / f, -1 / f]], dims=[[2], [2]])
-        self.apply_onequbit_gate(K, qubitNum)
+        self._queue_local_unitary(GATE_MATRICES["K"], [qubitNum])
 
     def apply_X(self, qubitNum):
         """
         Applies a X gate to the qubits with number qubitNum.
         """
-
-        X = qp.Qobj([[0, 1], [1, 0]], dims=[[2], [2]])
-        self.apply_onequbit_gate(X, qubitNum)
+        self._queue_local_unitary(GATE_MATRICES["X"], [qubitNum])
 
     def apply_Z(self, qubitNum):
         """
         Applies a Z gate to the qubits with number qubitNum.
         """
-
-        Z = qp.Qobj([[1, 0], [0, -1]], dims=[[2], [2]])
-        self.apply_onequbit_gate(Z, qubitNum)
+        self._queue_local_unitary(GATE_MATRICES["Z"], [qubitNum])
 
     def apply_Y(self, qubitNum):
         """
         Applies a Y gate to the qubits with number qubitNum.
         """
-
-        i = complex(0, 1)
-        Y = qp.Qobj([[0, -i], [i, 0]], dims=[[2], [2]])
-        self.apply_onequbit_gate(Y, qubitNum)
+        self._queue_local_unitary(GATE_MATRICES["Y"], [qubitNum])
 
     def apply_T(self, qubitNum):
         """
         Applies a T gate to the qubits with number qubitNum.
         """
-        i = complex(0, 1)
-        Y = qp.Qobj([[1, 0], [0, cmath.exp(i * np.pi / 4)]], dims=[[2], [2]])
-        self.apply_onequbit_gate(Y, qubitNum)
+        self._queue_local_unitary(GATE_MATRICES["T"], [qubitNum])
 
     def apply_rotation(self, qubitNum, n, a):
         """
@@ -209,101 +307,118 @@ class qutipEngine(quantumEngine):
             The rotation angle in radians.
         :rtype: None
         """
-        nNorm = np.linalg.norm(n)
-        if nNorm == 0:
-            raise ValueError("Rotation vector n can't be 0")
-        R = (-1j * a / (2 * nNorm) * (n[0] * qp.sigmax() + n[1] * qp.sigmay() + n[2] * qp.sigmaz())).expm()
-        self.apply_onequbit_gate(R, qubitNum)
+        self._queue_local_unitary(rotation_matrix(n, a), [qubitNum])
 
     def apply_CNOT(self, qubitNum1, qubitNum2):
         """
         Applies the CNOT to the qubit with the numbers qubitNum1 and qubitNum2.
         """
-
-        # Construct the CNOT matrix
-        cnot = qp.Qobj([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]], dims=[[2, 2], [2, 2]])
-
-        # Apply it to the desired qubits
-        self.apply_twoqubit_gate(cnot, qubitNum1, qubitNum2)
+        self.apply_twoqubit_gate(GATE_MATRICES["CNOT"], qubitNum1, qubitNum2)
 
     def apply_CPHASE(self, qubitNum1, qubitNum2):
         """
         Applies the CPHASE to the qubit with the numbers qubitNum1 and qubitNum2.
         """
-
-        # Construct the CPHASE matrix
-        cphase = qp.Qobj([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, -1]], dims=[[2, 2], [2, 2]])
-
-        # Apply it to the desired qubits
-        self.apply_twoqubit_gate(cphase, qubitNum1, qubitNum2)
+        self.apply_twoqubit_gate(GATE_MATRICES["CPHASE"], qubitNum1, qubitNum2)
 
     def get_qubits(self, list):
         """
         Returns the qubits with numbers in list.
         """
 
-        # Qutip distinguishes between system dimensionality and matrix dimensionality
-        # so we need to make sure it knows we are talking about multiple qubits
-        k = int(math.log2(self.qubitReg.shape[0]))
-        dimL = []
-        for j in range(k):
-            dimL.append(2)
+        dimL = [2] * len(set(list))
+        logging.debug("Dimensions %s", [dimL, dimL])
+        return qp.Qobj(self._reduced_density_matrix(list), dims=[dimL, dimL])
 
-        self.qubitReg.dims = [dimL, dimL]
+    def _reduced_density_matrix(self, keep):
+        """
+        Returns the density matrix of the qubits in keep, in increasing order, as a numpy array by tracing out
+        the other qubits.
+        """
+        self.flush_gates()
+        n = self.activeQubits
+        keep = sorted(set(keep))
+        if self._psi is not None:
+            # With the kept qubits as rows and the rest as columns, the reduced state is psi psi^dagger
+            psi = np.moveaxis(self._psi.reshape([2] * n), keep, range(len(keep))).reshape(2 ** len(keep), -1)
+            return psi @ psi.conj().T
 
-        logging.debug("Dimensions %s", self.qubitReg.dims)
-        return self.qubitReg.ptrace(list)
+        # Sum over the diagonal of the row and column axes of the traced out qubits
+        rowAxes = list(range(n))
+        colAxes = [n + q if q in keep else q for q in range(n)]
+        outAxes = keep + [n + q for q in keep]
+        rho = np.einsum(self._rho.reshape([2] * (2 * n)), rowAxes + colAxes, outAxes)
+        return rho.reshape(2 ** len(keep), 2 ** len(keep))
 
     def apply_onequbit_gate(self, gateU, qubitNum):
         """
         Applies a unitary gate to the specified qubit.
 
         Arguments:
-        gateU   	unitary to apply as Qobj
+        gateU   	unitary to apply as Qobj or numpy array
         qubitNum 	the number of the qubit this gate is applied to
         """
-
-        # Compute the overall unitary, identity everywhere with gateU at position qubitNum
-        overallU = qp.gate_expand_1toN(gateU, self.activeQubits, qubitNum)
-
-        # Qutip distinguishes between system dimensionality and matrix dimensionality
-        # so we need to make sure it knows we are talking about multiple qubits
-        k = int(math.log2(overallU.shape[0]))
-        dimL = []
-        for j in range(k):
-            dimL.append(2)
-
-        overallU.dims = [dimL, dimL]
-        self.qubitReg.dims = [dimL, dimL]
-
-        # Apply the unitary
-        self.qubitReg = overallU * self.qubitReg * overallU.dag()
+        self._queue_local_unitary(_as_array(gateU), [qubitNum])
 
     def apply_twoqubit_gate(self, gateU, qubit1, qubit2):
         """
         Applies a unitary gate to the two specified qubits.
 
         Arguments:
-        gateU		unitary to apply as Qobj
+        gateU		unitary to apply as Qobj or numpy array
         qubit1 		the first qubit
         qubit2		the second qubit
         """
+        if qubit1 == qubit2:
+            raise ValueError("The two qubits of a two-qubit gate need to be different")
+        self._queue_local_unitary(_as_array(gateU), [qubit1, qubit2])
 
-        # Construct the overall unitary
-        overallU = qp.gate_expand_2toN(gateU, self.activeQubits, qubit1, qubit2)
+    def _queue_local_unitary(self, gateU, qubits):
+        """
+        Checks the qubits and buffers the unitary gateU acting on them, see _apply_local_unitary.
+        """
+        n = self.activeQubits
+        for q in qubits:
+            if not 0 <= q < n:
+                raise ValueError("No such qubit {} in a register of {} qubits".format(q, n))
 
-        # Qutip distinguishes between system dimensionality and matrix dimensionality
-        # so we need to make sure it knows we are talking about multiple qubits
-        k = int(math.log2(overallU.shape[0]))
-        dimL = []
-        for j in range(k):
-            dimL.append(2)
+        if len(qubits) == 1:
+            self._gates.add_onequbit_gate(gateU, qubits[0])
+        else:
+            self._gates.add_twoqubit_gate(gateU, *qubits)
 
-        overallU.dims = [dimL, dimL]
-        self.qubitReg.dims = [dimL, dimL]
+    def _apply_onequbit_gate(self, gateU, qubitNum):
+        """
+        Applies the 2x2 matrix gateU to the register, without buffering.
+        """
+        self._apply_local_unitary(gateU, [qubitNum])
 
-        # Apply the  unitary
-        self.qubitReg = overallU * self.qubitReg * overallU.dag()
+    def _apply_twoqubit_gate(self, gateU, qubit1, qubit2):
+        """
+        Applies the 4x4 matrix gateU to the register, without buffering.
+        """
+        self._apply_local_unitary(gateU, [qubit1, qubit2])
+
+    def _apply_local_unitary(self, gateU, qubits):
+        """
+        Applies the unitary gateU to the qubits in the list qubits, where the first qubit in the list
+        corresponds to the most significant tensor factor of gateU.
+
+        Instead of expanding gateU to the full register, U is contracted with the row axes of the target
+        qubits and U^* with the column axes, which costs O(4^n * 2^k) for a k-qubit gate instead of O(8^n).
+
+        Arguments:
+        gateU		unitary to apply as numpy array
+        qubits		list of the qubits this gate is applied to
+        """
+        n = self.activeQubits
+        gateU = np.asarray(gateU, dtype=self._dtype)
+        if self._psi is not None:
+            self._psi = _contract_axes(self._psi, gateU, qubits, n)
+            return
+
+        rho = _contract_axes(self._rho, gateU, qubits, 2 * n)
+        self._rho = _contract_axes(rho, gateU.conj(), [n + q for q in qubits], 2 * n)
 
     def measure_qubit_inplace(self, qubitNum):
         """
@@ -318,29 +433,36 @@ class qutipEngine(quantumEngine):
         if (qubitNum + 1) > self.activeQubits:
             raise quantumError("No such qubit to be measured.")
 
-        # Construct the two measurement operators, and put them at the right position
-        v0 = qp.basis(2, 0)
-        P0 = v0 * v0.dag()
-        M0 = qp.gate_expand_1toN(P0, self.activeQubits, qubitNum)
-
-        v1 = qp.basis(2, 1)
-        P1 = v1 * v1.dag()
-        M1 = qp.gate_expand_1toN(P1, self.activeQubits, qubitNum)
-
-        # Compute the success probabilities
-        obj = M0 * self.qubitReg
-        p0 = obj.tr().real
-        obj = M1 * self.qubitReg
-        p1 = obj.tr().real
+        self.flush_gates()
 
-        # Sample the measurement outcome from these probabilities
-        outcome = int(np.random.choice([0, 1], 1, p=[p0, p1]))
-
-        # Compute the post-measurement state, getting rid of the measured qubit
-        if outcome == 0:
-            self.qubitReg = M0 * self.qubitReg * M0.dag() / p0
+        # Compute the success probabilities from the weights of the two values of the qubit
+        if self._psi is not None:
+            state = self._psi.reshape(2 ** qubitNum, 2, -1)
+            p0 = np.linalg.norm(state[:, 0, :]) ** 2
+            p1 = np.linalg.norm(state[:, 1, :]) ** 2
+        else:
+            diagonal = np.diag(self._rho).real.reshape(2 ** qubitNum, 2, -1)
+            p0 = diagonal[:, 0, :].sum()
+            p1 = diagonal[:, 1, :].sum()
+
+        # Sample the measurement outcome from these probabilities, which in single precision only sum to one
+        # up to rounding errors
+        probs = np.array([p0, p1], dtype=float)
+        outcome = int(np.random.random() < probs[1] / probs.sum())
+        p = probs[outcome]
+        if self._psi is not None and factorization.is_random_outcome(p1 / probs.sum(), self._dtype):
+            self.mayFactorize = True
+
+        # Compute the post-measurement state by keeping only the entries agreeing with the outcome
+        if self._psi is not None:
+            post = np.zeros_like(state)
+            post[:, outcome, :] = state[:, outcome, :] / math.sqrt(p)
+            self._psi = post.reshape(-1)
         else:
-            self.qubitReg = M1 * self.qubitReg * M1.dag() / p1
+            rho = self._rho.reshape(2 ** qubitNum, 2, -1, 2 ** qubitNum, 2, 2 ** (self.activeQubits - qubitNum - 1))
+            post = np.zeros_like(rho)
+            post[:, outcome, :, :, outcome, :] = rho[:, outcome, :, :, outcome, :] / p
+            self._rho = post.reshape(self._rho.shape)
 
         # return measurement outcome
         return outcome
@@ -357,6 +479,22 @@ class qutipEngine(quantumEngine):
 
         return outcome
 
+    def sample_measurements(self, qubitNums, shots):
+        """
+        Samples the outcomes of measuring the desired qubits in the standard basis 'shots' times, without
+        changing the register, see basics.sample_outcomes.
+
+        Arguments:
+        qubitNums	qubits to be measured
+        shots		number of samples
+        """
+        self.flush_gates()
+        if self._psi is not None:
+            probabilities = np.abs(self._psi) ** 2
+        else:
+            probabilities = np.diagonal(self._rho).real
+        return sample_outcomes(probabilities, self.activeQubits, qubitNums, shots)
+
     def replace_qubit(self, qubitNum, state):
         """
         Replaces the qubit at position qubitNum with the one given by state.
@@ -368,11 +506,15 @@ class qutipEngine(quantumEngine):
         # Tensor on the new qubit at the end
         self.add_qubit(state)
 
-        # Put the new qubit in the correct position
-        qList = list(range(self.activeQubits))
-        qList[qubitNum] = self.activeQubits
-        qList[self.activeQubits - 1] = qubitNum
-        self.qubitReg.permute(qList)
+        # Move the new qubit from the end to the correct position, which shifts the later qubits back
+        self.flush_gates()
+        n = self.activeQubits
+        if self._psi is not None:
+            psi = np.moveaxis(self._psi.reshape([2] * n), n - 1, qubitNum)
+            self._psi = np.ascontiguousarray(psi).reshape(-1)
+        else:
+            rho = np.moveaxis(self._rho.reshape([2] * (2 * n)), [n - 1, 2 * n - 1], [qubitNum, n + qubitNum])
+            self._rho = np.ascontiguousarray(rho).reshape(self._rho.shape)
 
     def absorb(self, other):
         """
@@ -384,31 +526,57 @@ class qutipEngine(quantumEngine):
         if newNum > self.maxQubits:
             raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
 
-        # Check whether there are in fact qubits to tensor up....
-        if self.activeQubits == 0:
-            self.qubitReg = other.qubitReg
-        elif other.activeQubits != 0:
-            self.qubitReg = qp.tensor(self.qubitReg, other.qubitReg)
+        # Tensor the state at the end, which stays a state vector if both are pure. Buffered gates of this engine
+        # act on the old qubits only and can stay buffered.
+        other.flush_gates()
+        if self._psi is not None and other._psi is not None:
+            self._psi = np.kron(self._psi, other._psi.astype(self._dtype, copy=False))
+        else:
+            self._to_density_matrix()
+            self._rho = np.kron(self._rho, other._density_matrix().astype(self._dtype, copy=False))
 
         self.activeQubits = newNum
 
-    def absorb_parts(self, R, I, activeQ):
+    def absorb_parts(self, realPart, imagPart, activeQ):
         """
         Absorb the qubits, given in pieces
 
         Arguments:
-        R		real part of the qubit state as a list
-        I		imaginary part as a list
+        realPart	real part of the qubit state as a list
+        imagPart	imaginary part as a list
         activeQ		active number of qubits
         """
 
-        # Convert the real and imaginary parts given as lists into a qutip object
-        M = I
-        for s in range(len(I)):
-            for t in range(len(I)):
-                M[s][t] = R[s][t] + I[s][t] * 1j
+        # Check whether there is space
+        newNum = self.activeQubits + activeQ
+        if newNum > self.maxQubits:
+            raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
 
-        qt = qp.Qobj(M)
+        # Check whether there are in fact qubits to tensor up....
+        if activeQ == 0:
+            return
+
+        # Convert the real and imaginary parts given as lists into a density matrix
+        rho = np.array(realPart, dtype=self._dtype)
+        rho.imag = imagPart
+
+        psi = _pure_state_of(rho)
+        if self._psi is not None and psi is not None:
+            self._psi = np.kron(self._psi, psi)
+        else:
+            self._to_density_matrix()
+            self._rho = np.kron(self._rho, rho)
+
+        self.activeQubits = newNum
+
+    def absorb_bytes(self, data):
+        """
+        Absorb the qubits of a packed state vector or density matrix, see get_register_bytes.
+
+        Arguments:
+        data		packed register
+        """
+        kind, activeQ, state = registerFormat.unpack_register(data, registerFormat.KET, registerFormat.DENSITY_MATRIX)
 
         # Check whether there is space
         newNum = self.activeQubits + activeQ
@@ -416,18 +584,80 @@ class qutipEngine(quantumEngine):
             raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
 
         # Check whether there are in fact qubits to tensor up....
-        if self.activeQubits == 0:
-            self.qubitReg = qt
-        elif qt.shape[0] != 0:
-            self.qubitReg = qp.tensor(self.qubitReg, qt)
+        if activeQ == 0:
+            return
+
+        state = state.astype(self._dtype, copy=False)
+        psi = state if kind == registerFormat.KET else _pure_state_of(state)
+        if self._psi is not None and psi is not None:
+            self._psi = np.kron(self._psi, psi)
+        else:
+            self._to_density_matrix()
+            self._rho = np.kron(self._rho, np.outer(psi, psi.conj()) if kind == registerFormat.KET else state)
 
         self.activeQubits = newNum
 
-        # Qutip distinguishes between system dimensionality and matrix dimensionality
-        # so we need to make sure it knows we are talking about multiple qubits
-        k = int(math.log2(self.qubitReg.shape[0]))
-        dimL = []
-        for j in range(k):
-            dimL.append(2)
+    def find_partition(self):
+        """
+        Finds sets of qubits in the register which are in a product with each other, see
+        factorization.pure_state_partition. A register stored as a density matrix is never split.
+        """
+        self.flush_gates()
+        if self._psi is None:
+            return [list(range(self.activeQubits))]
+        return factorization.pure_state_partition(self._psi, self.activeQubits)
+
+    def split(self, qubitNums, other):
+        """
+        Moves the qubits qubitNums, which need to be in a product with the other qubits, to the end of the register
+        of the engine other, which is given their state vector. Only supported while the register is pure.
+
+        Arguments:
+        qubitNums	qubits to be moved
+        other		engine to move the qubits to
+        """
+        self.flush_gates()
+        if self._psi is None:
+            raise quantumError("Cannot split a register in a mixed state.")
+        factor, rest = factorization.split_pure_state(self._psi, self.activeQubits, qubitNums)
+        other.absorb_bytes(registerFormat.pack_register(registerFormat.KET, len(qubitNums), factor))
+        self.activeQubits = self.activeQubits - len(qubitNums)
+        self._psi = rest
+
 
-        self.qubitReg.dims = [dimL, dimL]
+def _as_array(gateU):
+    """
+    Returns the matrix of a gate given as a Qobj or as a numpy array.
+    """
+    if isinstance(gateU, qp.Qobj):
+        return gateU.full()
+    return gateU
+
+
+def _pure_state_of(rho):
+    """
+    Returns a state vector psi such that rho = \|psi\>\<psi\|, or None if the density matrix rho is mixed.
+    """
+    if 1 - np.vdot(rho, rho).real > _PURITY_TOL[rho.dtype]:
+        return None
+
+    # Every column of rho is proportional to psi, pick the one with the largest weight
+    j = np.argmax(np.diag(rho).real)
+    return rho[:, j] / math.sqrt(rho[j, j].real)
+
+
+def _contract_axes(M, U, axes, numAxes):
+    """
+    Contracts the matrix U with the given axes of the array M, where M is viewed as a tensor with numAxes
+    axes of dimension two. The first axis in axes corresponds to the most significant tensor factor of U.
+    Returns a new array of the same shape as M.
+    """
+    k = len(axes)
+    first = axes[0]
+    if list(axes) == list(range(first, first + k)):
+        # The axes form a contiguous block so a batched matrix product does the job without transposing
+        return np.matmul(U, M.reshape(2 ** first, 2 ** k, -1)).reshape(M.shape)
+
+    T = np.tensordot(U.reshape([2] * (2 * k)), M.reshape([2] * numAxes), axes=(list(range(k, 2 * k)), list(axes)))
+    T = np.moveaxis(T, list(range(k)), list(axes))
+    return np.ascontiguousarray(T).reshape(M.shape)
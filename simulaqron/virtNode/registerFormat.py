@@ -0,0 +1,118 @@
+#
+# Copyright (c) 2017, Stephanie Wehner and Axel Dahlberg
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. All advertising materials mentioning features or use of this software
+#    must display the following acknowledgement:
+#    This product includes software developed by Stephanie Wehner, QuTech.
+# 4. Neither the name of the QuTech organization nor the
+#    names of its contributors may be used to endorse or promote products
+#    derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDER ''AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import struct
+
+import numpy as np
+
+from simulaqron.virtNode.basics import quantumError
+
+# Version of the layout below, to be increased whenever it changes
+REGISTER_FORMAT_VERSION = 1
+
+# Kinds of registers, which determine how the payload is to be read
+KET = 0
+DENSITY_MATRIX = 1
+STABILIZER = 2
+GRAPH = 3
+NEAR_CLIFFORD = 4
+
+_KIND_NAMES = {
+    KET: "state vector",
+    DENSITY_MATRIX: "density matrix",
+    STABILIZER: "stabilizer state",
+    GRAPH: "graph state",
+    NEAR_CLIFFORD: "near Clifford state",
+}
+
+# Element types of the payload, where raw payloads are read by the engine itself
+_RAW = 0
+_DTYPES = {1: np.dtype("<c8"), 2: np.dtype("<c16")}
+_DTYPE_CODES = {dtype: code for code, dtype in _DTYPES.items()}
+
+# Magic, version, kind, element type and number of qubits
+_MAGIC = b"SQRG"
+_HEADER = struct.Struct("<4sHBBI")
+
+
+def pack_register(kind, numQubits, payload):
+    """
+    Packs a register into bytes which can be sent to another node and read back by unpack_register. This layout
+    does not depend on the backend, such that e.g. a state vector can be absorbed by any engine storing one.
+
+    The bytes consist of a header, with the magic b"SQRG", the format version, the kind of register, the element
+    type of the payload and the number of qubits, followed by the payload. A state vector or density matrix is
+    given as a complex numpy array, where the first qubit is the most significant, and stored as its raw
+    little-endian buffer. Any other payload is given as bytes and stored as is.
+
+    Arguments:
+    kind		kind of the register, e.g. KET
+    numQubits	number of qubits of the register
+    payload		numpy array or bytes describing the register
+    """
+    if isinstance(payload, np.ndarray):
+        dtype = np.dtype(np.complex64 if payload.dtype == np.complex64 else np.complex128).newbyteorder("<")
+        code = _DTYPE_CODES[dtype]
+        payload = np.ascontiguousarray(payload, dtype=dtype).tobytes()
+    else:
+        code = _RAW
+    return _HEADER.pack(_MAGIC, REGISTER_FORMAT_VERSION, kind, code, numQubits) + bytes(payload)
+
+
+def unpack_register(data, *kinds):
+    """
+    Unpacks bytes given by pack_register and returns the kind of register, the number of qubits and the payload.
+    A state vector or density matrix is returned as a read-only numpy array using the buffer of data, with the
+    shape (2^n,) or (2^n, 2^n) respectively, any other payload as a memoryview of data.
+
+    Arguments:
+    data		packed register
+    kinds		kinds of registers which are accepted, any if none are given
+    """
+    if len(data) < _HEADER.size:
+        raise quantumError("Not a packed register.")
+    magic, version, kind, code, numQubits = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise quantumError("Not a packed register.")
+    if version != REGISTER_FORMAT_VERSION:
+        raise quantumError("Unsupported version {} of the register format.".format(version))
+    if kind not in _KIND_NAMES or (kinds and kind not in kinds):
+        raise quantumError("Cannot absorb a register of kind {}.".format(_KIND_NAMES.get(kind, kind)))
+
+    payload = memoryview(data)[_HEADER.size :]
+    if code == _RAW:
+        return kind, numQubits, payload
+    if code not in _DTYPES:
+        raise quantumError("Unknown element type {} of a packed register.".format(code))
+
+    dim = 2 ** numQubits
+    shape = (dim,) if kind == KET else (dim, dim)
+    if len(payload) != np.prod(shape) * _DTYPES[code].itemsize:
+        raise quantumError("Packed register does not describe {} qubits.".format(numQubits))
+    return kind, numQubits, np.frombuffer(payload, dtype=_DTYPES[code]).reshape(shape)
@@ -28,6 +28,7 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 from simulaqron.virtNode.basics import quantumEngine, quantumError, noQubitError
+from simulaqron.virtNode import registerFormat
 from simulaqron.toolbox.stabilizerStates import StabilizerState
 
 
@@ -48,6 +49,15 @@ class stabilizerEngine(quantumEngine):
 
         self.qubitReg = StabilizerState()
 
+    def reset(self, num, maxQubits=10):
+        """
+        Resets the register to hold no qubits, such that it can be reused as the register with number num.
+        """
+        self.num = num
+        self.maxQubits = maxQubits
+        self.mayFactorize = False
+        self.qubitReg = StabilizerState()
+
     @property
     def activeQubits(self):
         return self.qubitReg.num_qubits
@@ -81,7 +91,7 @@ class stabilizerEngine(quantumEngine):
 
         num = self.activeQubits
 
-        self.qubitReg = self.qubitReg.tensor_product(qubit)
+        self.qubitReg.absorb(qubit)
 
         return num
 
@@ -107,6 +117,13 @@ class stabilizerEngine(quantumEngine):
 
         return Re, Im
 
+    def get_register_bytes(self):
+        """
+        Retrieves the entire register as a packed stabilizer state, see registerFormat.pack_register, whose
+        payload are the words of StabilizerState.to_bytes.
+        """
+        return registerFormat.pack_register(registerFormat.STABILIZER, self.activeQubits, self.qubitReg.to_bytes())
+
     def apply_H(self, qubitNum):
         """
         Applies a Hadamard gate to the qubits with number qubitNum.
@@ -173,6 +190,15 @@ class stabilizerEngine(quantumEngine):
 
         self.qubitReg.apply_CZ(qubitNum1, qubitNum2)
 
+    def apply_circuit(self, ops):
+        """
+        Applies a sequence of Clifford gates in one go, see StabilizerState.apply_circuit.
+
+        Arguments:
+        ops		the circuit, e.g. [("H", 0), ("CNOT", 0, 1)] or an integer array of (opcode, qubit, target)
+        """
+        self.qubitReg.apply_circuit(ops)
+
     def apply_onequbit_gate(self, gate, qubitNum):
         """
         Applies a unitary gate to the specified qubit.
@@ -208,6 +234,9 @@ class stabilizerEngine(quantumEngine):
         if (qubitNum + 1) > self.activeQubits:
             raise quantumError("No such qubit to be measured.")
 
+        # Only a random outcome can leave other qubits in a product state, see quantumEngine.find_partition
+        if self.qubitReg.has_random_outcome(qubitNum):
+            self.mayFactorize = True
         outcome = self.qubitReg.measure(qubitNum, inplace=True)
 
         # return measurement outcome
@@ -220,10 +249,29 @@ class stabilizerEngine(quantumEngine):
         Arguments:
         qubitNum	qubit to be measured
         """
+        if self.qubitReg.has_random_outcome(qubitNum):
+            self.mayFactorize = True
         outcome = self.qubitReg.measure(qubitNum, inplace=False)
 
         return outcome
 
+    def sample_measurements(self, qubitNums, shots):
+        """
+        Samples the outcomes of measuring the desired qubits in the standard basis 'shots' times, without
+        changing the register, see StabilizerState.sample.
+
+        Arguments:
+        qubitNums	qubits to be measured
+        shots		number of samples
+        """
+
+        # Check we have such qubits...
+        for qubitNum in qubitNums:
+            if (qubitNum + 1) > self.activeQubits:
+                raise quantumError("No such qubit to be measured.")
+
+        return self.qubitReg.sample(qubitNums, shots).tolist()
+
     def replace_qubit(self, qubitNum, state):
         """
         Replaces the qubit at position qubitNum with the one given by state.
@@ -240,15 +288,15 @@ class stabilizerEngine(quantumEngine):
         if newNum > self.maxQubits:
             raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
 
-        self.qubitReg = self.qubitReg.tensor_product(other.qubitReg)
+        self.qubitReg.absorb(other.qubitReg)
 
-    def absorb_parts(self, R, I, activeQ):
+    def absorb_parts(self, realPart, imagPart, activeQ):
         """
         Absorb the qubits, given in pieces
 
         Arguments:
-        R		The array describing the stabilizer state (from StabilizerState.to_array)
-        I		Unused
+        realPart	The array describing the stabilizer state (from StabilizerState.to_array)
+        imagPart	Unused
         activeQ		active number of qubits
         """
         # Check whether there is space
@@ -256,4 +304,42 @@ class stabilizerEngine(quantumEngine):
         if newNum > self.maxQubits:
             raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
 
-        self.qubitReg = self.qubitReg.tensor_product(StabilizerState(R))
+        self.qubitReg.absorb(StabilizerState(realPart))
+
+    def absorb_bytes(self, data):
+        """
+        Absorb the qubits of a packed stabilizer state, see get_register_bytes.
+
+        Arguments:
+        data		packed register
+        """
+        _, activeQ, payload = registerFormat.unpack_register(data, registerFormat.STABILIZER)
+
+        # Check whether there is space
+        newNum = self.activeQubits + activeQ
+        if newNum > self.maxQubits:
+            raise quantumError("Cannot merge: qubits exceed the maximum available.\n")
+
+        self.qubitReg.absorb(StabilizerState.from_bytes(payload))
+
+    def find_partition(self):
+        """
+        Finds sets of qubits in the register which are in a product with each other, see
+        StabilizerState.find_partition.
+        """
+        return self.qubitReg.find_partition()
+
+    def split(self, qubitNums, other):
+        """
+        Moves the qubits qubitNums, which need to be in a product with the other qubits, to the end of the register
+        of the engine other.
+
+        Arguments:
+        qubitNums	qubits to be moved
+        other		engine to move the qubits to
+        """
+        try:
+            state = self.qubitReg.split(qubitNums)
+        except ValueError as err:
+            raise quantumError(str(err))
+        other.absorb_bytes(registerFormat.pack_register(registerFormat.STABILIZER, len(qubitNums), state.to_bytes()))
@@ -29,10 +29,12 @@
 
 import logging
 import random
+import time
+import zlib
 
 from collections import deque
 
-from twisted.spread import pb
+from twisted.spread import pb, util
 from twisted.internet import reactor
 from twisted.internet.defer import inlineCallbacks, DeferredLock, Deferred, DeferredList
 from twisted.internet.task import deferLater
@@ -50,9 +52,50 @@ elif Settings.CONF_BACKEND == "projectq":
     from simulaqron.virtNode.projectQSimulator import projectQEngine
 elif Settings.CONF_BACKEND == "stabilizer":
     from simulaqron.virtNode.stabilizerSimulator import stabilizerEngine
+elif Settings.CONF_BACKEND == "graph":
+    from simulaqron.virtNode.graphStateSimulator import graphStateEngine
+elif Settings.CONF_BACKEND == "nearclifford":
+    from simulaqron.virtNode.nearCliffordSimulator import nearCliffordEngine
+elif Settings.CONF_BACKEND == "numpy":
+    from simulaqron.virtNode.numpySimulator import numpyEngine
 else:
     raise quantumError("Unknown backend {}".format(Settings.CONF_BACKEND))
 
+# Size in bytes of the pieces a packed register is sent in, which needs to stay below the maximal size of a
+# string in a PB message (twisted.spread.banana.SIZE_LIMIT, 640 KiB)
+_PB_CHUNK_SIZE = 512 * 1024
+
+# Size in bytes of the pages a packed register is streamed in during a merge. Other messages on the same
+# connection, e.g. for locks and gates, are sent in between pages rather than after the whole register.
+_PB_PAGE_SIZE = 64 * 1024
+
+# Packed registers of at least this many bytes are compressed before being sent, if Settings.CONF_COMPRESS_MERGES
+_COMPRESS_MIN_SIZE = 64 * 1024
+
+# Maximal number of deleted registers kept by a node for reuse
+_REGISTER_POOL_SIZE = 100
+
+
+def _merge_moves_first(size1, load1, isLocal1, size2, load2, isLocal2):
+    """
+    Decides which of two registers simulated at different nodes is moved to the node of the other one in order to
+    merge them, where True means the first one. The smaller register is moved, since its state is sent over the
+    network. For registers of the same size, it is moved towards the node simulating fewer qubits in total (load)
+    and otherwise towards this node, which saves a remote call for the gate.
+    """
+    return (size1, -load1, isLocal1) <= (size2, -load2, isLocal2)
+
+
+def _factorizes(reg):
+    """
+    Returns whether the register reg is split into product factors after measurements, see
+    Settings.CONF_FACTORIZE_REGISTERS. By default this is only done for engines whose search for product states
+    takes bounded time, since for example a stabilizer register is searched in O(n^3) after each measurement.
+    """
+    if Settings.CONF_FACTORIZE_REGISTERS == "auto":
+        return reg.boundedPartition
+    return Settings.CONF_FACTORIZE_REGISTERS == "on"
+
 
 ######
 #
@@ -144,6 +187,12 @@ class virtualNode(pb.Root):
             # Set up the dictionary of registers
             self.registers = {}
 
+            # Registers whose qubits were all removed, which are reset and reused instead of creating new ones.
+            # The hits and misses count how often remote_new_register could take a register from here.
+            self._register_pool = []
+            self._register_pool_hits = 0
+            self._register_pool_misses = 0
+
             # Initialize the list of qubits at this node
             self.virtQubits = []
             self.simQubits = []
@@ -440,18 +489,34 @@ class virtualNode(pb.Root):
 
             self.numRegs = self.numRegs + 1
             regNum = self.get_new_reg_num()
-            if Settings.CONF_BACKEND == "qutip":
-                newReg = qutipEngine(self.myID, regNum, maxQubits)
-            elif Settings.CONF_BACKEND == "projectq":
-                newReg = projectQEngine(self.myID, regNum, maxQubits)
-            elif Settings.CONF_BACKEND == "stabilizer":
-                newReg = stabilizerEngine(self.myID, regNum, maxQubits)
+            if self._register_pool:
+                newReg = self._register_pool.pop()
+                newReg.reset(regNum, maxQubits)
+                self._register_pool_hits += 1
             else:
-                raise quantumError("Unknown backend {}".format(Settings.CONF_BACKEND))
+                self._register_pool_misses += 1
+                if Settings.CONF_BACKEND == "qutip":
+                    newReg = qutipEngine(self.myID, regNum, maxQubits)
+                elif Settings.CONF_BACKEND == "projectq":
+                    newReg = projectQEngine(self.myID, regNum, maxQubits)
+                elif Settings.CONF_BACKEND == "stabilizer":
+                    newReg = stabilizerEngine(self.myID, regNum, maxQubits)
+                elif Settings.CONF_BACKEND == "graph":
+                    newReg = graphStateEngine(self.myID, regNum, maxQubits)
+                elif Settings.CONF_BACKEND == "nearclifford":
+                    newReg = nearCliffordEngine(self.myID, regNum, maxQubits)
+                elif Settings.CONF_BACKEND == "numpy":
+                    newReg = numpyEngine(self.myID, regNum, maxQubits)
+                else:
+                    raise quantumError("Unknown backend {}".format(Settings.CONF_BACKEND))
 
             self.registers[regNum] = newReg
 
-            logging.debug("VIRTUAL NODE %s: Initializing new simulated register.", self.myID.name)
+            logging.debug(
+                "VIRTUAL NODE %s: Initializing new simulated register (register pool hit rate %.2f).",
+                self.myID.name,
+                self.remote_get_register_pool_stats()["hit_rate"],
+            )
         except Exception as e:
             logging.error("VIRTUAL NODE {}: Critical error when getting new register: {}".format(self.myID.name, e))
             raise e
@@ -472,6 +537,25 @@ class virtualNode(pb.Root):
         self.registers.pop(regnum)
         self.numRegs -= 1
 
+        # Keep a register whose qubits were all removed, e.g. measured, for remote_new_register. Registers which
+        # still hold qubits, e.g. after being merged into another one, are left to the garbage collector.
+        if reg.activeQubits == 0 and len(self._register_pool) < _REGISTER_POOL_SIZE:
+            self._register_pool.append(reg)
+
+    def remote_get_register_pool_stats(self):
+        """
+        Returns the number of registers kept for reuse, how often a new register was taken from these (hits) or
+        had to be created (misses) and the hit rate.
+        """
+        numRequests = self._register_pool_hits + self._register_pool_misses
+        hitRate = self._register_pool_hits / numRequests if numRequests > 0 else 0.0
+        return {
+            "size": len(self._register_pool),
+            "hits": self._register_pool_hits,
+            "misses": self._register_pool_misses,
+            "hit_rate": hitRate,
+        }
+
     @inlineCallbacks
     def remote_new_qubit(self, ignore_max_qubits=False):
         """
@@ -919,15 +1003,15 @@ class virtualNode(pb.Root):
         #
         delNum = delQubit.num
         delRegister = delQubit.register
+        regQubits = [q for q in self.simQubits if q.register == delRegister]
 
         try:
             # We need to manipulate multiple qubits, get global lock
             yield self._get_global_lock()
 
             # Lock all relevant qubits first
-            for q in self.simQubits:
-                if q.register == delRegister:
-                    yield q.lock()
+            for q in regQubits:
+                yield q.lock()
 
             # First we remove the physical qubit from the register
             delRegister.remove_qubit(delNum)
@@ -948,17 +1032,72 @@ class virtualNode(pb.Root):
             # Remove the qubit form the list of simulated qubits
             self.simQubits.remove(delQubit)
 
+            # Removing the qubit may have left parts of the register in a product state, which are split off.
+            # This is only possible if a measurement in the register had a random outcome, see quantumEngine
+            if _factorizes(delRegister) and delRegister.mayFactorize and delRegister.activeQubits > 1:
+                self._factorize_register(delRegister)
+
         except Exception as e:
             logging.error("VIRTUAL NODE %s: Cannot remove sim qubit - %s", self.myID.name, e.strerror)
         finally:
-            # Release all relevant qubits again
+            # Release all relevant qubits again, including the ones moved to another register
             for q in self.simQubits:
-                if q.register == delRegister:
+                if q in regQubits:
                     q.unlock()
 
             # Release the global multi qubit lock
             self._release_global_lock()
 
+    def _factorize_register(self, reg):
+        """
+        Splits the local register reg into one register for each set of qubits in a product state, as found by
+        quantumEngine.find_partition, and updates the simulated qubits accordingly. The largest set stays in reg.
+        Relies on the global lock and the qubits in reg being held.
+
+        Arguments
+        reg		register to factorize
+        """
+        regQubits = {q.num: q for q in self.simQubits if q.register == reg}
+        if len(regQubits) != reg.activeQubits:
+            logging.error("VIRTUAL NODE %s: Inconsistent simulated qubits. Cannot factorize.", self.myID.name)
+            return
+
+        partition = reg.find_partition()
+        reg.mayFactorize = False
+        if len(partition) < 2:
+            return
+        logging.debug(
+            "VIRTUAL NODE %s: Splitting register %d of %d qubits into registers of %s qubits.",
+            self.myID.name,
+            reg.num,
+            reg.activeQubits,
+            [len(qubitNums) for qubitNums in partition],
+        )
+
+        # Qubit numbers change with every split, so keep the qubit objects of the sets to move
+        keep = max(partition, key=len)
+        moves = [[regQubits[num] for num in qubitNums] for qubitNums in partition if qubitNums is not keep]
+        for qubits in moves:
+            try:
+                newReg = self.remote_new_register()
+            except quantumError:
+                logging.debug("VIRTUAL NODE %s: No register available to split off qubits.", self.myID.name)
+                return
+            newReg.maxQubits = max(newReg.maxQubits, len(qubits))
+            try:
+                reg.split([q.num for q in qubits], newReg)
+            except quantumError as err:
+                logging.error("VIRTUAL NODE %s: Cannot split register: %s", self.myID.name, err)
+                self.remote_delete_register(newReg)
+                return
+
+            for num, q in enumerate(qubits):
+                q.register = newReg
+                q.num = num
+            rest = sorted((q for q in self.simQubits if q.register == reg), key=lambda q: q.num)
+            for num, q in enumerate(rest):
+                q.num = num
+
     def remote_merge_regs(self, num1, num2):
         """
         Merges the two local quantum registers. Note that these register may simulate virtual qubits across different
@@ -1060,20 +1199,48 @@ class virtualNode(pb.Root):
         except Exception as e:
             raise e
 
-        # Fetch the details of the remote register and qubit, and remove sim qubits at node
+        # Fetch the details of the remote register and qubit, and remove sim qubits at node. The register itself
+        # is streamed in pages to the collector, see remote_get_register_del
+        start = time.perf_counter()
+        pages = Deferred()
+        collector = util.CallbackPageCollector(pages.callback)
         try:
-            (R, I, activeQ, oldRegNum, oldQubitNum) = yield simNode.root.callRemote("get_register_del", simQubitNum)
+            register = yield simNode.root.callRemote("get_register_del", simQubitNum, collector)
+            R = register["pieces"]
+            if R is None:
+                R = yield pages
         except RemoteError as remote_err:
             self.reraise_remote_error(remote_err)
         except Exception as err:
             raise err
+        activeQ = register["activeQubits"]
+        oldRegNum = register["regNum"]
+        oldQubitNum = register["qubitNum"]
+
+        data = b"".join(R)
+        numSent = len(data)
+        if register["compressed"]:
+            data = zlib.decompress(data)
+        # The clock may not advance during a very small transfer
+        duration = max(time.perf_counter() - start, 1e-9)
+        logging.debug(
+            "VIRTUAL NODE %s: Received register of %d qubits from %s: %d bytes (%d sent) in %.3f s, %.1f MB/s",
+            self.myID.name,
+            activeQ,
+            simNodeName,
+            len(data),
+            numSent,
+            duration,
+            len(data) / duration / 1e6,
+        )
 
         # Get numbering offset from previous register: append at end
         offset = localReg.activeQubits
 
-        # Allow localReg to absorb the remote register
-        localReg.maxQubits = localReg.maxQubits + activeQ
-        localReg.absorb_parts(R, I, activeQ)
+        # Allow localReg to absorb the remote register, unless the remote node had no such qubit
+        if activeQ > 0:
+            localReg.maxQubits = localReg.maxQubits + activeQ
+            localReg.absorb_bytes(data)
 
         # Collect mappings between numbers and objects for updating the virtual qubits
         newD = {}
@@ -1111,6 +1278,37 @@ class virtualNode(pb.Root):
         # Return the qubit object corresponding to the new physical qubit
         return newD[oldQubitNum]
 
+    @inlineCallbacks
+    def remote_merge_into(self, simNodeName, simQubitNum, localQubitNum):
+        """
+        Bring a remote register to this node and merge it into the register of a qubit simulated here, see
+        remote_merge_from. Returns the qubit object corresponding to the remote qubit.
+
+        Arguments
+        simNodeName	name of the node who simulates right now
+        simQubitNum	simulation number of qubit whose register we will merge
+        localQubitNum	simulation number of the local qubit whose register to merge with
+        """
+        localQubit = self._q_num_to_obj(localQubitNum)
+        if localQubit is None:
+            raise quantumError("No simulated qubit with number {} at this node.".format(localQubitNum))
+        newQubit = yield self.remote_merge_from(simNodeName, simQubitNum, localQubit.register)
+        return newQubit
+
+    def remote_get_register_size(self, qubitNum):
+        """
+        Returns the number of qubits in the register of a qubit simulated here, and the number of qubits simulated
+        by this node in total as a measure of its load. These decide which register is moved for a merge.
+
+        Arguments
+        qubitNum	simulation number of the qubit
+        """
+        qubit = self._q_num_to_obj(qubitNum)
+        if qubit is None:
+            raise quantumError("No simulated qubit with number {} at this node.".format(qubitNum))
+        load = sum(reg.activeQubits for reg in self.registers.values())
+        return (qubit.register.activeQubits, load)
+
     @inlineCallbacks
     def remote_update_virtual_merge(self, newSimNodeName, oldSimNodeName, oldRegNum, newD):
         """
@@ -1203,11 +1401,23 @@ class virtualNode(pb.Root):
 
         return (realM, imagM, activeQ, oldRegNum, oldQubitNum)
 
-    def remote_get_register_del(self, qubitNum):
+    def remote_get_register_del(self, qubitNum, collector=None):
         """
         Return the value of of a locally simulated register, and remove the simulated qubits from this node.
 
+        The register is packed (see quantumEngine.get_register_bytes) and compressed if this is enabled and the
+        register is large. If a page collector (see twisted.spread.util) is given, it is streamed in pages to the
+        collector and None is returned in its place. Otherwise it is returned as a list of pieces.
+
+        Returns a dictionary with the pieces, whether they are compressed, the number of qubits in the register,
+        the number of the register and the number of the qubit in it, under the keys "pieces", "compressed",
+        "activeQubits", "regNum" and "qubitNum".
+
         Caution: virtual qubits not updated.
+
+        Arguments
+        qubitNum	simulation number of a qubit in the register
+        collector	remote reference to a page collector receiving the register, or None
         """
 
         assert self._lock.locked
@@ -1220,10 +1430,24 @@ class virtualNode(pb.Root):
 
         # If nothing is found, return
         if gotQ is None:
-            logging.debug("VIRTUAL NODE %s: No simulated qubit with ID %d.", qubitNum)
-            return ([], [], 0, 0, 0)
-
-        (realM, imagM) = gotQ.register.get_register_RI()
+            logging.debug("VIRTUAL NODE %s: No simulated qubit with ID %d.", self.myID.name, qubitNum)
+            return {"pieces": [], "compressed": False, "activeQubits": 0, "regNum": 0, "qubitNum": 0}
+
+        # Send the packed register instead of nested lists
+        packed = gotQ.register.get_register_bytes()
+        compressed = Settings.CONF_COMPRESS_MERGES and len(packed) >= _COMPRESS_MIN_SIZE
+        if compressed:
+            numBytes = len(packed)
+            packed = zlib.compress(packed, 1)
+            logging.debug(
+                "VIRTUAL NODE %s: Compressed register from %d to %d bytes.", self.myID.name, numBytes, len(packed)
+            )
+        if collector is None:
+            # Split such that each piece fits in a PB message
+            realM = [packed[i : i + _PB_CHUNK_SIZE] for i in range(0, len(packed), _PB_CHUNK_SIZE)]
+        else:
+            util.StringPager(collector, packed, chunkSize=_PB_PAGE_SIZE)
+            realM = None
         activeQ = gotQ.register.activeQubits
         oldRegNum = gotQ.register.num
         oldQubitNum = gotQ.num
@@ -1238,7 +1462,13 @@ class virtualNode(pb.Root):
 
         self.remote_delete_register(delRegister)
 
-        return (realM, imagM, activeQ, oldRegNum, oldQubitNum)
+        return {
+            "pieces": realM,
+            "compressed": compressed,
+            "activeQubits": activeQ,
+            "regNum": oldRegNum,
+            "qubitNum": oldQubitNum,
+        }
 
     @inlineCallbacks
     def remote_get_multiple_qubits(self, qList):
@@ -1325,6 +1555,96 @@ class virtualNode(pb.Root):
 
         return (realM, imagM)
 
+    @inlineCallbacks
+    def remote_sample_measurements(self, qList, shots):
+        """
+        Samples the outcomes of measuring multiple qubits virtually located at this node in the standard basis
+        'shots' times, without changing their state. This will fail if the qubits are not simulated at the
+        same node.
+
+        Arguments
+        qList		list of virtual qubits to measure
+        shots		number of samples
+        """
+
+        localSim = False
+        remoteSim = False
+
+        # Check whether we are the simulating node.
+        for q in qList:
+            if q.simNode == q.virtNode:
+                localSim = True
+            else:
+                remoteSim = True
+
+        # Check whether two nodes are the simulator, for now we simply fail in this case
+        if localSim and remoteSim:
+            logging.error(
+                "VIRTUAL NODE %s: Sampling multiple qubits from multiple simulators is currently not supported.",
+                self.myID.name,
+            )
+            return []
+
+        if localSim:
+            nums = [q.simQubit.simNum for q in qList]
+            outcomes = self.remote_sample_state(nums, shots)
+        else:
+            nums = []
+            for q in qList:
+                try:
+                    (num, name) = yield q.simQubit.callRemote("get_details")
+                except RemoteError as remote_err:
+                    self.reraise_remote_error(remote_err)
+                except Exception as err:
+                    raise err
+                nums.append(num)
+            try:
+                outcomes = yield qList[0].simNode.root.callRemote("sample_state", nums, shots)
+            except RemoteError as remote_err:
+                self.reraise_remote_error(remote_err)
+            except Exception as err:
+                raise err
+
+        return outcomes
+
+    def remote_sample_state(self, simNumList, shots):
+        """
+        Samples the outcomes of measuring the qubits corresponding to the IDs in simNumList in the standard
+        basis 'shots' times, see quantumEngine.sample_measurements. The outcomes of each shot are in the order
+        of simNumList.
+
+        The qubits may be in different registers, for example after a register has been factorized. These are
+        in a product state and are therefore sampled independently, after which the outcomes are combined.
+        """
+
+        # Convert simulation numbers to register and real number in register, keeping the position of each qubit
+        registers = []
+        numLists = []
+        positionLists = []
+        for position, n in enumerate(simNumList):
+            for q in self.simQubits:
+                if q.simNum == n:
+                    if q.register not in registers:
+                        registers.append(q.register)
+                        numLists.append([])
+                        positionLists.append([])
+                    index = registers.index(q.register)
+                    numLists[index].append(q.num)
+                    positionLists[index].append(position)
+        if len(registers) == 0 or sum(len(numList) for numList in numLists) != len(simNumList):
+            logging.error("VIRTUAL NODE %s: No such qubits found.", self.myID.name)
+            return []
+
+        if len(registers) == 1:
+            return registers[0].sample_measurements(numLists[0], shots)
+
+        outcomes = [[0] * len(simNumList) for _ in range(shots)]
+        for register, numList, positions in zip(registers, numLists, positionLists):
+            for shot, registerOutcomes in zip(outcomes, register.sample_measurements(numList, shots)):
+                for position, outcome in zip(positions, registerOutcomes):
+                    shot[position] = outcome
+        return outcomes
+
 
 #######
 #
@@ -1898,22 +2218,30 @@ class virtualQubit(pb.Referenceable):
                         "VIRTUAL NODE %s: Remote 2qubit command to %s.", self.virtNode.name, target.simNode.name
                     )
             else:
-                # They are simulated at two different nodes
-
-                if self.simNode == self.virtNode:
+                # They are simulated at two different nodes. Only the smaller register is moved, to the node
+                # simulating the other one, see _merge_moves_first.
+                (fNum, fSize, fLoad) = yield self._get_register_size(self)
+                (tNum, tSize, tLoad) = yield self._get_register_size(target)
+                moveFirst = _merge_moves_first(
+                    fSize, fLoad, self.simNode == self.virtNode, tSize, tLoad, target.simNode == target.virtNode
+                )
+                if moveFirst:
+                    (fromQubit, fromNum, toQubit, toNum) = (self, fNum, target, tNum)
+                else:
+                    (fromQubit, fromNum, toQubit, toNum) = (target, tNum, self, fNum)
+                logging.debug(
+                    "VIRTUAL NODE %s: 2qubit command demands merge of %d qubits from %s to %d qubits at %s.",
+                    self.virtNode.name,
+                    fSize if moveFirst else tSize,
+                    fromQubit.simNode.name,
+                    tSize if moveFirst else fSize,
+                    toQubit.simNode.name,
+                )
 
-                    # We are the locally simulating node of the first qubit, merge all to us
-                    logging.debug(
-                        "VIRTUAL NODE %s: 2qubit command demands merge from remote target sim %s to us.",
-                        self.simNode.name,
-                        target.simNode.name,
-                    )
-                    (fNum, fNode) = yield target.simQubit.callRemote("get_details")
-                    if fNode != target.simNode.name:
-                        logging.error("VIRTUAL NODE %s: Inconsistent simulation. Cannot merge.", self.myID.name)
-                        raise quantumError("Inconsistent simulation.")
-                    target.simQubit = yield self.simNode.root.remote_merge_from(
-                        target.simNode.name, fNum, self.simQubit.register
+                if toQubit.simNode == toQubit.virtNode:
+                    # We are the simulating node of the larger register, merge the other one to us
+                    fromQubit.simQubit = yield self.virtNode.root.remote_merge_from(
+                        fromQubit.simNode.name, fromNum, toQubit.simQubit.register
                     )
 
                     # Get the number of the target in the new register
@@ -1921,62 +2249,19 @@ class virtualQubit(pb.Referenceable):
 
                     # Execute the 2 qubit gate
                     getattr(self.simQubit, localName)(targetNum)
-
-                elif target.simNode == target.virtNode:
-
-                    # We are the locally simulating node of the target qubit, merge all to us
-                    logging.debug(
-                        "VIRTUAL NODE %s: 2qubit command demands merge from remote sim %s to us.",
-                        target.simNode.name,
-                        self.simNode.name,
-                    )
-                    (fNum, fNode) = yield self.simQubit.callRemote("get_details")
-                    if fNode != self.simNode.name:
-                        logging.error("VIRTUAL NODE %s: Inconsistent simulation. Cannot merge.", self.myID.name)
-                        raise quantumError("Inconsistent simulation.")
-                    self.simQubit = yield target.simNode.root.remote_merge_from(
-                        self.simNode.name, fNum, target.simQubit.register
-                    )
+                else:
+                    # Let the remote simulating node of the larger register merge the other one. It updates the
+                    # virtual qubits of all nodes, including ours.
+                    yield toQubit.simNode.root.callRemote("merge_into", fromQubit.simNode.name, fromNum, toNum)
 
                     # Get the number of the target in the new register
-                    targetNum = target.simQubit.num
+                    targetNum = yield target.simQubit.callRemote("get_number")
 
                     # Execute the 2 qubit gate
-                    getattr(self.simQubit, localName)(targetNum)
-
-                else:
-                    # Both qubits are remotely simulated - we will pull both registers to become one local register
+                    yield self.simQubit.callRemote(name, targetNum)
                     logging.debug(
-                        "VIRTUAL NODE %s: 2qubit command demands total remote merge from %s and %s.",
-                        self.virtNode.name,
-                        target.simNode.name,
-                        self.simNode.name,
-                    )
-
-                    # Create a new local register
-                    newLocalReg = self.virtNode.root.remote_add_register()
-
-                    # Fetch the detail of the two registers from remote
-                    (fNum, fNode) = yield self.simQubit.callRemote("get_details")
-                    if fNode != self.simNode.name:
-                        logging.error("VIRTUAL NODE %s: Inconsistent simulation. Cannot merge.", self.myID.name)
-                        raise quantumError("Inconsistent simulation.")
-                    (tNum, tNode) = yield target.simQubit.callRemote("get_details")
-                    if tNode != target.simNode.name:
-                        logging.error("VIRTUAL NODE %s: Inconsistent simulation. Cannot merge.", self.myID.name)
-                        raise quantumError("Inconsistent simulation.")
-
-                    # Pull the remote registers to this node
-                    self.simQubit = yield self.virtNode.root.remote_merge_from(self.simNode.name, fNum, newLocalReg)
-                    target.simQubit = yield target.virtNode.root.remote_merge_from(
-                        target.simNode.name, tNum, newLocalReg
+                        "VIRTUAL NODE %s: Remote 2qubit command to %s.", self.virtNode.name, target.simNode.name
                     )
-                    # Get the number of the target in the new register
-                    targetNum = target.simQubit.num
-
-                    # Finally, execute the two qubit gate
-                    logging.debug("RUN GATE")
-                    getattr(self.simQubit, localName)(targetNum)
         except RemoteError as remote_err:
             self.virtNode.root.reraise_remote_error(remote_err)
         except Exception as e:
@@ -1991,6 +2276,23 @@ class virtualQubit(pb.Referenceable):
 
         return True
 
+    @inlineCallbacks
+    def _get_register_size(self, qubit):
+        """
+        Returns the simulation number of the virtual qubit qubit, the number of qubits in its register and the
+        number of qubits simulated in total by its simulating node, see virtualNode.remote_get_register_size.
+        """
+        if qubit.simNode == qubit.virtNode:
+            simNum = qubit.simQubit.simNum
+            (size, load) = qubit.simNode.root.remote_get_register_size(simNum)
+        else:
+            (simNum, simNodeName) = yield qubit.simQubit.callRemote("get_details")
+            if simNodeName != qubit.simNode.name:
+                logging.error("VIRTUAL NODE %s: Inconsistent simulation. Cannot merge.", self.virtNode.name)
+                raise quantumError("Inconsistent simulation.")
+            (size, load) = yield qubit.simNode.root.callRemote("get_register_size", simNum)
+        return (simNum, size, load)
+
     @inlineCallbacks
     def remote_get_number(self):
         """